@@ -1,9 +1,20 @@
 import asyncio
+import bisect
+import threading
 from datetime import datetime, timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from database import get_db, User, Alert, TimeNotification
-from scrapers import get_doviz_data, get_altin_data, get_borsa_data
+from database import get_db, session_scope, User, Alert, TimeNotification
+from async_scrapers import get_doviz_data, get_altin_data, get_borsa_data, get_all_data
+from message_dispatcher import get_dispatcher
+from quote_events import quote_hub, quote_price
+from market_scheduler import start_poller
+from quote_history import start_history
+from quote_stats import start_quote_stats
+from alert_rules import RuleIndex, describe_rule
+from cluster import cluster
+import config
 import logging
+import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -13,132 +24,596 @@ def format_price(price):
     return f"{price:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 
-# ===== SEVİYE BAZLI UYARILAR =====
-async def check_price_alerts(application):
+# ===== UYARI İNDEKSİ =====
+def normalize_asset_type(asset_type):
+    """Bot 'borsa', eski kayıtlar 'hisse' kullanır - ikisi de borsa verisidir"""
+    return 'hisse' if asset_type == 'borsa' else asset_type
+
+
+def get_snapshot_price(asset_type, asset_name, doviz_data, altin_data, borsa_data):
     """
-    Aktif uyarıları kontrol et ve hedef fiyata ulaşıldığında bildir
+    Veri anlık görüntüsünden (snapshot) ilgili varlığın güncel fiyatını al
+    
+    Returns:
+        tuple: (fiyat, kaynak) - fiyat bulunamazsa (None, 'Bilinmeyen')
     """
-    db = get_db()
+    asset_type = normalize_asset_type(asset_type)
     
-    try:
-        # Aktif uyarıları al
-        active_alerts = db.query(Alert).filter(Alert.is_active == True).all()
+    if asset_type == 'doviz' and asset_name in doviz_data:
+        return doviz_data[asset_name]['satis'], doviz_data.get('_kaynak', 'Bilinmeyen')
+    
+    if asset_type == 'altin' and asset_name in altin_data:
+        return altin_data[asset_name]['satis'], altin_data.get('_kaynak', 'Bilinmeyen')
+    
+    if asset_type == 'hisse' and asset_name in borsa_data:
+        return borsa_data[asset_name]['deger'], borsa_data.get('_kaynak', 'Bilinmeyen')
+    
+    return None, 'Bilinmeyen'
+
+
+class AlertIndex:
+    """
+    Aktif uyarıların bellek içi indeksi
+    
+    (asset_type, asset_name) anahtarı altında her koşul için hedef fiyatlar
+    sıralı tutulur. Yeni fiyat geldiğinde tetiklenen uyarılar tüm uyarıları
+    taramak yerine bisect ile bulunur:
+    - 'ustu': hedef <= fiyat olanlar -> listenin başındaki dilim
+    - 'alti': hedef >= fiyat olanlar -> listenin sonundaki dilim
+    
+    Yüzde / ortalama / kırılım uyarıları self.rules (alert_rules.RuleIndex)
+    içinde tutulur; ekleme, silme ve geri koyma türe göre oraya yönlendirilir.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._books = {}    # (asset_type, asset_name) -> {'ustu': [(hedef, id)], 'alti': [...]}
+        self._alerts = {}   # alert id -> uyarı bilgileri (dict)
+        self.rules = RuleIndex()
+        self.loaded = False
+    
+    def load(self):
+        """Aktif uyarıları tek sorguda (kullanıcılarla birlikte) yükle"""
+        with get_db() as db:
+            rows = db.query(Alert, User.telegram_id).join(
+                User, User.id == Alert.user_id
+            ).filter(Alert.is_active == True).all()
+        
+        self.rules.clear()
+        
+        with self._lock:
+            self._books.clear()
+            self._alerts.clear()
+            
+            for alert, telegram_id in rows:
+                if alert.kind and alert.kind != 'fiyat':
+                    self._add_rule(alert, telegram_id)
+                else:
+                    self._add_locked(alert.id, alert.asset_type, alert.asset_name,
+                                     alert.condition, alert.target_price, telegram_id)
+            
+            self.loaded = True
         
-        if not active_alerts:
-            db.close()
+        logger.info(f"✅ Uyarı indeksi yüklendi: {len(rows)} aktif uyarı")
+    
+    def add(self, alert, telegram_id):
+        """Yeni oluşturulan uyarıyı indekse ekle"""
+        if alert.kind and alert.kind != 'fiyat':
+            self._add_rule(alert, telegram_id)
             return
         
-        # Veri kaynaklarını çek
-        doviz_data = get_doviz_data()
-        altin_data = get_altin_data()
-        borsa_data = get_borsa_data()
+        with self._lock:
+            self._add_locked(alert.id, alert.asset_type, alert.asset_name,
+                             alert.condition, alert.target_price, telegram_id)
+    
+    def _add_rule(self, alert, telegram_id):
+        self._restore_rule({
+            'id': alert.id,
+            'asset_type': alert.asset_type,
+            'asset_name': alert.asset_name,
+            'kind': alert.kind,
+            'condition': alert.condition,
+            'timeframe': alert.timeframe,
+            'period': alert.period,
+            'threshold': alert.threshold,
+            'telegram_id': telegram_id
+        })
+    
+    def _restore_rule(self, info):
+        key = (normalize_asset_type(info['asset_type']), info['asset_name'])
+        self.rules.add(key, info)
+    
+    def _add_locked(self, alert_id, asset_type, asset_name, condition, target_price, telegram_id):
+        if condition not in ('ustu', 'alti'):
+            return
         
-        # Kaynak bilgilerini al
-        doviz_kaynak = doviz_data.get('_kaynak', 'Bilinmeyen')
-        altin_kaynak = altin_data.get('_kaynak', 'Bilinmeyen')
-        borsa_kaynak = borsa_data.get('_kaynak', 'Bilinmeyen')
+        if alert_id in self._alerts:
+            self._remove_locked(alert_id)
+        
+        key = (normalize_asset_type(asset_type), asset_name)
+        book = self._books.setdefault(key, {'ustu': [], 'alti': []})
+        bisect.insort(book[condition], (target_price, alert_id))
+        
+        self._alerts[alert_id] = {
+            'id': alert_id,
+            'asset_type': asset_type,
+            'asset_name': asset_name,
+            'condition': condition,
+            'target_price': target_price,
+            'telegram_id': telegram_id,
+            'key': key
+        }
+    
+    def remove(self, alert_id):
+        """Silinen veya tetiklenen uyarıyı indeksten çıkar"""
+        with self._lock:
+            info = self._remove_locked(alert_id)
+        return info or self.rules.remove(alert_id)
+    
+    def _remove_locked(self, alert_id):
+        info = self._alerts.pop(alert_id, None)
+        if not info:
+            return None
         
-        for alert in active_alerts:
-            current_price = None
-            kaynak = 'Bilinmeyen'
+        book = self._books.get(info['key'])
+        if book:
+            targets = book[info['condition']]
+            item = (info['target_price'], alert_id)
+            i = bisect.bisect_left(targets, item)
+            if i < len(targets) and targets[i] == item:
+                targets.pop(i)
             
-            # İlgili varlığın mevcut fiyatını al
-            if alert.asset_type == 'doviz':
-                if alert.asset_name in doviz_data:
-                    current_price = doviz_data[alert.asset_name]['satis']
-                    kaynak = doviz_kaynak
+            if not book['ustu'] and not book['alti']:
+                del self._books[info['key']]
+        
+        return info
+    
+    def find_triggered(self, asset_type, asset_name, price):
+        """
+        Verilen fiyatla tetiklenen uyarıları bul
+        
+        Returns:
+            list: Tetiklenen uyarıların bilgileri (dict)
+        """
+        with self._lock:
+            book = self._books.get((normalize_asset_type(asset_type), asset_name))
+            if not book or price is None:
+                return []
             
-            elif alert.asset_type == 'altin':
-                if alert.asset_name in altin_data:
-                    current_price = altin_data[alert.asset_name]['satis']
-                    kaynak = altin_kaynak
+            # 'ustu': fiyat >= hedef
+            ustu = book['ustu']
+            hits = ustu[:bisect.bisect_right(ustu, (price, float('inf')))]
             
-            elif alert.asset_type == 'hisse':
-                if alert.asset_name in borsa_data:
-                    current_price = borsa_data[alert.asset_name]['deger']
-                    kaynak = borsa_kaynak
+            # 'alti': fiyat <= hedef
+            alti = book['alti']
+            hits += alti[bisect.bisect_left(alti, (price, float('-inf'))):]
             
-            # Fiyat kontrolü yap
-            if current_price is not None:
-                triggered = False
-                
-                if alert.condition == 'ustu' and current_price >= alert.target_price:
-                    triggered = True
-                elif alert.condition == 'alti' and current_price <= alert.target_price:
-                    triggered = True
-                
-                # Uyarı tetiklenirse
-                if triggered:
-                    # Kullanıcıya bildirim gönder
-                    user = db.query(User).filter(User.id == alert.user_id).first()
-                    
-                    if user:
-                        asset_emoji = {
-                            'doviz': '💱',
-                            'altin': '🏆',
-                            'hisse': '📈'
-                        }
-                        
-                        condition_text = 'üstüne çıktı' if alert.condition == 'ustu' else 'altına düştü'
-                        
-                        message = f"""
+            return [dict(self._alerts[alert_id]) for _, alert_id in hits]
+    
+    def find_rule_triggered(self, asset_type, asset_name, price):
+        """Verilen fiyatla tetiklenen yüzde / ortalama / kırılım uyarıları"""
+        return self.rules.find_triggered((normalize_asset_type(asset_type), asset_name), price)
+    
+    def restore(self, info):
+        """remove() ile alınan uyarıyı indekse geri koy"""
+        if info.get('kind', 'fiyat') != 'fiyat':
+            self._restore_rule(info)
+            return
+        
+        with self._lock:
+            self._add_locked(info['id'], info['asset_type'], info['asset_name'],
+                             info['condition'], info['target_price'], info['telegram_id'])
+    
+    def get(self, alert_id):
+        """Uyarı bilgisini döndür (indekste yoksa None)"""
+        with self._lock:
+            info = self._alerts.get(alert_id)
+        return dict(info) if info else self.rules.get(alert_id)
+    
+    def count_near(self, asset_type, price_of, pct):
+        """
+        Hedefi güncel fiyata yakın (±pct oranında) uyarı sayısı
+        
+        Args:
+            price_of: asset_name -> güncel fiyat (yoksa None) döndüren fonksiyon
+            pct: Oran (0.005 = %0,5)
+        """
+        asset_type = normalize_asset_type(asset_type)
+        
+        with self._lock:
+            books = [
+                (name, list(book['ustu']), list(book['alti']))
+                for (kind, name), book in self._books.items() if kind == asset_type
+            ]
+        
+        count = 0
+        for asset_name, ustu, alti in books:
+            price = price_of(asset_name)
+            if not price:
+                continue
+            
+            low = (price * (1 - pct), float('-inf'))
+            high = (price * (1 + pct), float('inf'))
+            
+            for targets in (ustu, alti):
+                count += bisect.bisect_right(targets, high) - bisect.bisect_left(targets, low)
+        
+        return count
+    
+    def ids(self):
+        """İndeksteki uyarı id'leri (seviye + kural)"""
+        with self._lock:
+            ids = set(self._alerts)
+        return ids | self.rules.ids()
+    
+    def keys(self):
+        """İndekste uyarısı bulunan (asset_type, asset_name) çiftleri"""
+        with self._lock:
+            keys = set(self._books.keys())
+        return list(keys | set(self.rules.keys()))
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._alerts) + len(self.rules)
+
+
+alert_index = AlertIndex()
+_delivering = set()   # Gönderimi süren uyarılar - eşitlemede indekse geri eklenmez
+
+
+@metrics.register_collector
+def _collect_metrics():
+    yield ('finalert_active_alerts', 'gauge', 'Bellekteki aktif uyarı sayısı (seviye + kural)', {}, len(alert_index))
+    stats = report_cache.get_stats()
+    for sonuc in ('hit', 'render'):
+        yield ('finalert_report_cache_total', 'counter', 'Periyodik rapor gövdeleri (önbellekten / yeniden oluşturulan)',
+               {'sonuc': sonuc}, stats[sonuc])
+    yield ('finalert_report_cache_invalidated_total', 'counter', 'Fiyat değişimiyle düşürülen rapor gövdeleri',
+           {}, stats['invalidated'])
+
+
+# ===== SEVİYE BAZLI UYARILAR =====
+def format_alert_message(alert, current_price, kaynak):
+    """Tetiklenen uyarı için bildirim mesajı oluştur"""
+    asset_emoji = {
+        'doviz': '💱',
+        'altin': '🏆',
+        'hisse': '📈'
+    }
+    
+    if alert.get('kind', 'fiyat') != 'fiyat':
+        return format_rule_alert_message(alert, current_price, kaynak, asset_emoji)
+    
+    condition_text = 'üstüne çıktı' if alert['condition'] == 'ustu' else 'altına düştü'
+    
+    return f"""
 🔔 *Fiyat Uyarısı!*
 
-{asset_emoji.get(alert.asset_type, '💰')} *{alert.asset_name}*
+{asset_emoji.get(normalize_asset_type(alert['asset_type']), '💰')} *{alert['asset_name']}*
 
-Hedef Fiyat: ₺{format_price(alert.target_price)}
+Hedef Fiyat: ₺{format_price(alert['target_price'])}
 Güncel Fiyat: ₺{format_price(current_price)}
 
-{alert.asset_name} hedef fiyatın {condition_text}! 
+{alert['asset_name']} hedef fiyatın {condition_text}! 
 
 📡 Kaynak: {kaynak}
 🕐 {datetime.now().strftime('%d.%m.%Y %H:%M')}
 """
-                        
-                        try:
-                            await application.bot.send_message(
-                                chat_id=user.telegram_id,
-                                text=message,
-                                parse_mode='Markdown'
-                            )
-                            
-                            # Uyarıyı devre dışı bırak
-                            alert.is_active = False
-                            alert.triggered_at = datetime.now()
-                            db.commit()
-                            
-                            logger.info(f"✅ Uyarı gönderildi: {user.telegram_id} - {alert.asset_name}")
-                        
-                        except Exception as e:
-                            logger.error(f"❌ Bildirim gönderme hatası: {e}")
+
+
+def format_rule_alert_message(alert, current_price, kaynak, asset_emoji):
+    """Tetiklenen yüzde / ortalama / kırılım uyarısı için bildirim mesajı"""
+    kind = alert['kind']
+    observed = alert.get('observed')
+    
+    if kind == 'yuzde':
+        detail = f"Değişim: %{observed:.2f}"
+    elif kind == 'ortalama':
+        detail = f"Ortalama: ₺{format_price(observed)}"
+    else:
+        detail = f"{'Zirve' if alert['condition'] == 'ustu' else 'Dip'}: ₺{format_price(observed)}"
+    
+    rule = describe_rule(kind, alert['condition'], alert.get('timeframe'), alert.get('period'), alert.get('threshold'))
+    
+    return f"""
+🔔 *Fiyat Uyarısı!*
+
+{asset_emoji.get(normalize_asset_type(alert['asset_type']), '💰')} *{alert['asset_name']}*
+
+Kural: {rule}
+Güncel Fiyat: ₺{format_price(current_price)}
+{detail}
+
+📡 Kaynak: {kaynak}
+🕐 {datetime.now().strftime('%d.%m.%Y %H:%M')}
+"""
+
+
+async def deliver_triggered_alerts(application, triggered):
+    """
+    Tetiklenen uyarıları gönder ve devre dışı bırak
+    
+    Uyarılar gönderimden önce indeksten alınır (aynı uyarı iki kez
+    tetiklenmesin), gönderilemeyenler indekse geri konur.
+    
+    Args:
+        triggered: (uyarı bilgisi, güncel fiyat, kaynak) listesi
+    """
+    claimed = []
+    for alert, current_price, kaynak in triggered:
+        if alert_index.remove(alert['id']):
+            claimed.append((alert, current_price, kaynak))
+    
+    if not claimed:
+        return
+    
+    claimed_ids = {alert['id'] for alert, _, _ in claimed}
+    _delivering.update(claimed_ids)
+    try:
+        await _send_claimed(application, claimed)
+    finally:
+        _delivering.difference_update(claimed_ids)
+
+
+async def _send_claimed(application, claimed):
+    # Eşzamanlı ve hız sınırlı gönderim
+    jobs = [
+        {'chat_id': alert['telegram_id'], 'text': format_alert_message(alert, current_price, kaynak), 'ref': alert}
+        for alert, current_price, kaynak in claimed
+    ]
+    jobs = await get_dispatcher(application.bot).send_batch(jobs)
+    
+    sent = [job['ref'] for job in jobs if job['ok']]
+    for job in jobs:
+        if not job['ok']:
+            alert_index.restore(job['ref'])
+    
+    if not sent:
+        return
+    
+    # Gönderilen uyarıları tek commit ile devre dışı bırak
+    with session_scope() as db:
+        db.query(Alert).filter(Alert.id.in_([alert['id'] for alert in sent])).update(
+            {'is_active': False, 'triggered_at': datetime.now()},
+            synchronize_session=False
+        )
+    
+    logger.info(f"✅ {len(sent)}/{len(jobs)} uyarı gönderildi")
+
+
+async def on_quote_changes(application, changes):
+    """
+    Fiyat değişim olaylarında yalnızca değişen varlıkların uyarılarını değerlendir
+    Fiyatı değişmeyen varlıklar için hiçbir iş yapılmaz
+    """
+    try:
+        triggered = []
+        
+        with metrics.ALERT_TICK_SECONDS.time(yol='olay'):
+            for change in changes:
+                current_price = quote_price(change.asset_type, change.new)
+                
+                if current_price is None:
+                    continue
+                
+                for alert in alert_index.find_triggered(change.asset_type, change.asset_name, current_price):
+                    triggered.append((alert, current_price, change.kaynak))
+                
+                # Yüzde / ortalama / kırılım: varlık başına göstergeler bir kez okunur
+                for alert in alert_index.find_rule_triggered(change.asset_type, change.asset_name, current_price):
+                    triggered.append((alert, current_price, change.kaynak))
+        
+        metrics.ALERT_ASSETS_EVALUATED.inc(len(changes), yol='olay')
+        metrics.ALERTS_TRIGGERED.inc(len(triggered), yol='olay')
+        
+        if triggered:
+            await deliver_triggered_alerts(application, triggered)
+    
+    except Exception as e:
+        logger.error(f"❌ Uyarı değerlendirme hatası: {e}")
+
+
+async def evaluate_alert(application, alert_id):
+    """
+    Yeni eklenen uyarıyı son bilinen fiyatla hemen değerlendir
+    (bir sonraki fiyat değişimini beklemeden)
+    İşçi süreçlerinde yapılmaz - lider uyarıyı eşitlemede alıp değerlendirir
+    """
+    if not cluster.is_leader:
+        return
+    
+    alert = alert_index.get(alert_id)
+    if not alert:
+        return
+    
+    asset_type = normalize_asset_type(alert['asset_type'])
+    quote, kaynak = quote_hub.get_last(asset_type, alert['asset_name'])
+    current_price = quote_price(asset_type, quote)
+    
+    if current_price is None:
+        return
+    
+    if alert.get('kind', 'fiyat') != 'fiyat':
+        hits = alert_index.find_rule_triggered(asset_type, alert['asset_name'], current_price)
+    else:
+        hits = alert_index.find_triggered(asset_type, alert['asset_name'], current_price)
+    
+    triggered = [(hit, current_price, kaynak) for hit in hits if hit['id'] == alert_id]
+    metrics.ALERT_ASSETS_EVALUATED.inc(yol='yeni')
+    metrics.ALERTS_TRIGGERED.inc(len(triggered), yol='yeni')
+    
+    if triggered:
+        await deliver_triggered_alerts(application, triggered)
+
+
+async def check_price_alerts(application):
+    """
+    Tüm aktif uyarıları güncel veriyle kontrol et (tam tarama)
+    Normal akışta uyarılar fiyat değişim olaylarıyla değerlendirilir;
+    bu fonksiyon elle/tek seferlik kontrol içindir
+    """
+    try:
+        if not alert_index.loaded:
+            alert_index.load()
+        
+        keys = alert_index.keys()
+        if not keys:
+            return
+        
+        # Veri kaynaklarını çek (paralel ve önbellekli)
+        doviz_data, altin_data, borsa_data = await get_all_data()
+        
+        triggered = []
+        with metrics.ALERT_TICK_SECONDS.time(yol='tarama'):
+            for asset_type, asset_name in keys:
+                current_price, kaynak = get_snapshot_price(asset_type, asset_name, doviz_data, altin_data, borsa_data)
+                
+                if current_price is None:
+                    continue
+                
+                for alert in alert_index.find_triggered(asset_type, asset_name, current_price):
+                    triggered.append((alert, current_price, kaynak))
+                
+                for alert in alert_index.find_rule_triggered(asset_type, asset_name, current_price):
+                    triggered.append((alert, current_price, kaynak))
+        
+        metrics.ALERT_ASSETS_EVALUATED.inc(len(keys), yol='tarama')
+        metrics.ALERTS_TRIGGERED.inc(len(triggered), yol='tarama')
+        
+        if triggered:
+            await deliver_triggered_alerts(application, triggered)
     
     except Exception as e:
         logger.error(f"❌ Uyarı kontrolü hatası: {e}")
+
+
+async def sync_alert_index(application):
+    """
+    Uyarı indeksini veritabanıyla eşitle (lider süreç)
+    İşçi süreçlerinin eklediği uyarılar indekse alınıp hemen değerlendirilir,
+    silinenler indeksten çıkarılır. Yalnızca id'ler taranır; ayrıntılar
+    yalnızca yeni uyarılar için okunur.
+    """
+    try:
+        # İndeks sorgudan önce okunur: indekse eklenen uyarı zaten commit edilmiştir
+        known = alert_index.ids()
+        with get_db() as db:
+            active = {alert_id for alert_id, in db.query(Alert.id).filter(Alert.is_active == True)}
+        
+        for alert_id in known - active:
+            alert_index.remove(alert_id)
+        
+        added = active - known - _delivering
+        if not added:
+            return
+        
+        with get_db() as db:
+            rows = db.query(Alert, User.telegram_id).join(
+                User, User.id == Alert.user_id
+            ).filter(Alert.id.in_(added)).all()
+        
+        for alert, telegram_id in rows:
+            alert_index.add(alert, telegram_id)
+        
+        for alert, _ in rows:
+            await evaluate_alert(application, alert.id)
+        
+        logger.info(f"🔄 Uyarı indeksi eşitlendi: +{len(rows)} / -{len(known - active)}")
     
-    finally:
-        db.close()
+    except Exception as e:
+        logger.error(f"❌ Uyarı eşitleme hatası: {e}")
 
 
 # ===== ZAMAN BAZLI BİLDİRİMLER =====
+class ReportCache:
+    """
+    Varlık türü kombinasyonu başına hazırlanmış rapor gövdeleri
+    
+    Fiyat değişim akışına abone olur: bir türde değişim gelince o türü içeren
+    raporlar düşürülür. Fiyat değişmedikçe (gece, hafta sonu borsa) periyodik
+    raporlar veri çekmeden ve yeniden oluşturulmadan gönderilir.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bodies = {}       # asset_types -> rapor gövdesi
+        self._generation = 0    # Her değişimde artar - eski veriyle oluşturulan gövde saklanmaz
+        self._unsubscribe = None
+        self.stats = {'hit': 0, 'render': 0, 'invalidated': 0}
+    
+    def start(self):
+        """quote_hub aboneliğini başlat (abone değilken önbellek kullanılmaz)"""
+        if self._unsubscribe is None:
+            self._unsubscribe = quote_hub.subscribe(self.on_changes)
+    
+    def stop(self):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        self.invalidate()
+    
+    def get(self, asset_types):
+        with self._lock:
+            body = self._bodies.get(asset_types) if self._unsubscribe else None
+            if body is not None:
+                self.stats['hit'] += 1
+            return body
+    
+    def generation(self):
+        with self._lock:
+            return self._generation
+    
+    def put(self, asset_types, body, generation):
+        """Gövdeyi sakla - veri çekilirken değişim geldiyse saklanmaz"""
+        with self._lock:
+            self.stats['render'] += 1
+            if self._unsubscribe and generation == self._generation:
+                self._bodies[asset_types] = body
+    
+    def on_changes(self, changes):
+        """quote_hub aboneliği - değişen türleri içeren raporları düşür"""
+        changed = {change.asset_type for change in changes}
+        with self._lock:
+            self._generation += 1
+            stale = [asset_types for asset_types in self._bodies if changed.intersection(asset_types)]
+            for asset_types in stale:
+                del self._bodies[asset_types]
+            self.stats['invalidated'] += len(stale)
+    
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._bodies.clear()
+    
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, size=len(self._bodies))
+
+
+report_cache = ReportCache()
+
+
 async def check_time_notifications(application):
     """
     Periyodik bildirimleri kontrol et ve zamanı gelenleri gönder
     """
-    db = get_db()
-    
     try:
-        # Aktif bildirimleri al
-        active_notifications = db.query(TimeNotification).filter(
-            TimeNotification.is_active == True
-        ).all()
+        # Aktif bildirimleri kullanıcılarıyla birlikte tek sorguda al
+        # (oturum gönderim süresince açık tutulmaz)
+        with get_db() as db:
+            active_notifications = db.query(TimeNotification, User.telegram_id).join(
+                User, User.id == TimeNotification.user_id
+            ).filter(
+                TimeNotification.is_active == True
+            ).all()
         
         if not active_notifications:
-            db.close()
             return
         
         now = datetime.now()
+        due = []
         
-        for notification in active_notifications:
+        for notification, telegram_id in active_notifications:
             # Son gönderim zamanını kontrol et
             should_send = False
             
@@ -158,47 +633,106 @@ async def check_time_notifications(application):
                     should_send = True
             
             if should_send:
-                # Kullanıcıya rapor gönder
-                user = db.query(User).filter(User.id == notification.user_id).first()
-                
-                if user:
-                    # Varlık türlerine göre rapor oluştur
-                    asset_types = notification.asset_types.split(',')
-                    report = generate_report(asset_types)
-                    
-                    try:
-                        await application.bot.send_message(
-                            chat_id=user.telegram_id,
-                            text=report,
-                            parse_mode='Markdown'
-                        )
-                        
-                        # Son gönderim zamanını güncelle
-                        notification.last_sent = now
-                        db.commit()
-                        
-                        logger.info(f"✅ Periyodik rapor gönderildi: {user.telegram_id}")
-                    
-                    except Exception as e:
-                        logger.error(f"❌ Rapor gönderme hatası: {e}")
+                due.append((notification, telegram_id))
+        
+        metrics.NOTIFICATIONS_DUE.inc(len(due))
+        if not due:
+            return
+        
+        # Aynı içerikli bildirimler için rapor yalnızca bir kez oluşturulur; son
+        # fiyat değişiminden beri hazır olan raporlar veri çekmeden kullanılır
+        header = render_report_header()
+        reports = {}
+        missing = set()
+        
+        for notification, _ in due:
+            asset_types = normalize_report_types(notification.asset_types)
+            if asset_types not in reports:
+                body = report_cache.get(asset_types)
+                reports[asset_types] = body
+                if body is None:
+                    missing.add(asset_types)
+        
+        if missing:
+            # Tek veri anlık görüntüsü - eksik raporların hepsi aynı veriden üretilir
+            generation = report_cache.generation()
+            doviz_data, altin_data, borsa_data = await get_all_data()
+            
+            for asset_types in missing:
+                body = render_report_body(asset_types, doviz_data, altin_data, borsa_data)
+                report_cache.put(asset_types, body, generation)
+                reports[asset_types] = body
+        
+        jobs = []
+        for notification, telegram_id in due:
+            asset_types = normalize_report_types(notification.asset_types)
+            jobs.append({'chat_id': telegram_id, 'text': header + reports[asset_types], 'ref': notification.id})
+        
+        # Eşzamanlı ve hız sınırlı gönderim
+        jobs = await get_dispatcher(application.bot).send_batch(jobs)
+        sent_ids = [job['ref'] for job in jobs if job['ok']]
+        
+        # Son gönderim zamanlarını tek commit ile güncelle
+        if sent_ids:
+            with session_scope() as db:
+                db.query(TimeNotification).filter(TimeNotification.id.in_(sent_ids)).update(
+                    {'last_sent': now},
+                    synchronize_session=False
+                )
+        
+        logger.info(f"✅ {len(sent_ids)}/{len(jobs)} periyodik rapor gönderildi")
     
     except Exception as e:
         logger.error(f"❌ Bildirim kontrolü hatası: {e}")
+
+
+def normalize_report_types(asset_types):
+    """
+    Bildirimdeki varlık türlerini normalize et ('borsa' -> 'hisse')
+    Aynı içerikli bildirimler aynı anahtarı alır: ('altin', 'doviz')
     
-    finally:
-        db.close()
+    Args:
+        asset_types: virgülle ayrılmış metin veya liste
+    """
+    if isinstance(asset_types, str):
+        asset_types = asset_types.split(',')
+    
+    return tuple(sorted({normalize_asset_type(t.strip()) for t in asset_types if t.strip()}))
 
 
-def generate_report(asset_types):
+async def generate_report(asset_types):
     """
     Belirtilen varlık türleri için rapor oluştur
     """
-    report = f"📊 *Piyasa Raporu*\n\n🕐 {datetime.now().strftime('%d.%m.%Y %H:%M')}\n\n"
+    asset_types = normalize_report_types(asset_types)
+    
+    doviz_data = await get_doviz_data() if 'doviz' in asset_types else {}
+    altin_data = await get_altin_data() if 'altin' in asset_types else {}
+    borsa_data = await get_borsa_data() if 'hisse' in asset_types else {}
+    
+    return render_report(asset_types, doviz_data, altin_data, borsa_data)
+
+
+def render_report(asset_types, doviz_data, altin_data, borsa_data):
+    """
+    Hazır veri anlık görüntüsünden (snapshot) rapor metnini oluştur
+    Veri çekmez - aynı snapshot birden fazla rapor için kullanılabilir
+    """
+    return render_report_header() + render_report_body(asset_types, doviz_data, altin_data, borsa_data)
+
+
+def render_report_header():
+    """Rapor başlığı (gönderim zamanı) - gövde önbellekten gelse de her gönderimde oluşturulur"""
+    return f"📊 *Piyasa Raporu*\n\n🕐 {datetime.now().strftime('%d.%m.%Y %H:%M')}\n\n"
+
+
+def render_report_body(asset_types, doviz_data, altin_data, borsa_data):
+    """Rapor gövdesi (fiyatlar ve kaynaklar) - yalnızca veri değişince değişir"""
+    report = ""
     
     kaynaklar = []
     
     if 'doviz' in asset_types:
-        doviz_data = get_doviz_data()
         doviz_kaynak = doviz_data.get('_kaynak', 'Bilinmeyen')
         kaynaklar.append(f"Döviz: {doviz_kaynak}")
         
@@ -220,7 +754,6 @@ def generate_report(asset_types):
         report += "\n"
     
     if 'altin' in asset_types:
-        altin_data = get_altin_data()
         altin_kaynak = altin_data.get('_kaynak', 'Bilinmeyen')
         kaynaklar.append(f"Altın: {altin_kaynak}")
         
@@ -239,7 +772,6 @@ def generate_report(asset_types):
         report += "\n"
     
     if 'hisse' in asset_types:
-        borsa_data = get_borsa_data()
         borsa_kaynak = borsa_data.get('_kaynak', 'Bilinmeyen')
         kaynaklar.append(f"Borsa: {borsa_kaynak}")
         
@@ -265,26 +797,40 @@ def generate_report(asset_types):
 
 # ===== SCHEDULER BAŞLATMA =====
 def start_alert_checker(application):
-    """Uyarı kontrolcüsünü başlat"""
+    """
+    Uyarı kontrolcüsünü başlat
+    Uyarılar fiyat değişim olaylarıyla değerlendirilir; zamanlayıcı yalnızca
+    fiyatları piyasa saatine ve uyarı yoğunluğuna göre uyarlanan aralıklarla yeniler
+    """
+    # Aktif uyarıları belleğe al
+    alert_index.load()
+    
+    # Fiyat değişim akışına abone ol
+    async def _on_changes(changes):
+        await on_quote_changes(application, changes)
+    
+    quote_hub.subscribe(_on_changes)
+    
+    # Değişen fiyatları geçmiş tablosuna kaydet (arka plan thread'i)
+    start_history()
+    
+    # Günlük değişim, aralık ve ortalamalar (geçmişten yüklenir, artımlı güncellenir)
+    start_quote_stats()
+    
     scheduler = AsyncIOScheduler()
     
-    # Her 2 dakikada bir kontrol et (GÜVENLİ ve ETKİLİ)
-    # API'lerin güncelleme sıklığına uygun
-    # Ban riski minimal
-    scheduler.add_job(
-        check_price_alerts,
-        'interval',
-        minutes=2,  # ← 2 dakika (720 istek/gün)
-        args=[application],
-        id='alert_checker'
-    )
+    # Varlık sınıfı başına uyarlamalı fiyat yenileme (istek bütçesi içinde)
+    start_poller(scheduler, alert_index)
     
     scheduler.start()
-    logger.info("✅ Uyarı kontrolcüsü başlatıldı (her 2 dakika - güvenli mod)")
+    logger.info("✅ Uyarı kontrolcüsü başlatıldı (olay tabanlı, uyarlamalı fiyat yenileme)")
 
 
 def start_time_notification_checker(application):
     """Zaman bazlı bildirim kontrolcüsünü başlat"""
+    # Rapor gövdeleri fiyat değişim olaylarıyla geçersizleşir
+    report_cache.start()
+    
     scheduler = AsyncIOScheduler()
     
     # Her 2 dakikada bir kontrol et (DAHA SIK)
@@ -299,3 +845,18 @@ def start_time_notification_checker(application):
     scheduler.start()
     logger.info("✅ Bildirim kontrolcüsü başlatıldı (her 2 dakika)")
 
+
+def start_alert_sync(application):
+    """İşçilerin eklediği / sildiği uyarıları düzenli olarak indekse yansıt (lider süreç)"""
+    scheduler = AsyncIOScheduler()
+    
+    scheduler.add_job(
+        sync_alert_index,
+        'interval',
+        seconds=config.CLUSTER_SYNC_INTERVAL,
+        args=[application],
+        id='alert_sync'
+    )
+    
+    scheduler.start()
+    logger.info(f"✅ Uyarı eşitleme başlatıldı (her {config.CLUSTER_SYNC_INTERVAL} sn)")
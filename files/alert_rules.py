@@ -0,0 +1,210 @@
+# FinAlert - Kural tabanlı uyarılar (yüzde hareket, ortalama kesişimi, zirve/dip kırılımı)
+# Uyarılar varlık ve kural parametrelerine göre gruplanır. Yeni fiyat geldiğinde
+# her grup için gösterge (pencere değişimi, ortalama, N günlük zirve/dip)
+# quote_stats'tan bir kez okunur; uyarı başına geçmiş sorgusu yapılmaz.
+# - yuzde:    eşikler sıralı tutulur, tetiklenenler bisect ile tek dilimde bulunur
+# - ortalama: fiyatın ortalamaya göre tarafı saklanır; taraf değişince grubun tamamı tetiklenir
+# - kirilim:  fiyat N günlük zirvenin üstüne / dibin altına geçince grubun tamamı tetiklenir
+import bisect
+import threading
+from quote_stats import quote_stats
+
+KINDS = ('yuzde', 'ortalama', 'kirilim')
+
+TIMEFRAME_LABELS = {
+    '1h': '1 saat',
+    '24h': '24 saat'
+}
+
+
+def describe_rule(kind, condition, timeframe=None, period=None, threshold=None):
+    """Kural uyarısının okunabilir açıklaması"""
+    ustu = condition == 'ustu'
+    
+    if kind == 'yuzde':
+        label = TIMEFRAME_LABELS.get(timeframe, timeframe)
+        return f"{label} içinde %{threshold:g} {'yükselince' if ustu else 'düşünce'}"
+    
+    if kind == 'ortalama':
+        unit = 'günlük' if timeframe == '1d' else 'saatlik'
+        return f"{period} {unit} ortalamayı {'yukarı' if ustu else 'aşağı'} kesince"
+    
+    if kind == 'kirilim':
+        return f"{period} günün {'zirvesini' if ustu else 'dibini'} kırınca"
+    
+    return kind
+
+
+class RuleIndex:
+    """
+    Aktif kural uyarılarının bellek içi indeksi
+    
+    (asset_type, asset_name) altında (kind, timeframe, period, condition) grupları;
+    her grupta (eşik, id) çiftleri sıralı tutulur.
+    """
+    
+    def __init__(self, stats=None):
+        self._stats = stats or quote_stats
+        self._lock = threading.Lock()
+        self._books = {}    # (asset_type, asset_name) -> {grup: [(eşik, id)]}
+        self._alerts = {}   # alert id -> uyarı bilgileri (dict)
+        self._sides = {}    # (asset_type, asset_name, timeframe, period) -> fiyatın ortalamaya göre tarafı
+    
+    def clear(self):
+        with self._lock:
+            self._books.clear()
+            self._alerts.clear()
+    
+    def add(self, key, info):
+        """
+        Uyarıyı ekle
+        
+        Args:
+            key: (asset_type, asset_name) - asset_type normalize edilmiş ('hisse')
+            info: id, kind, condition, timeframe, period, threshold alanlarını
+                  içeren uyarı bilgileri
+        """
+        if info.get('kind') not in KINDS or info.get('condition') not in ('ustu', 'alti'):
+            return
+        
+        with self._lock:
+            if info['id'] in self._alerts:
+                self._remove_locked(info['id'])
+            
+            group = (info['kind'], info.get('timeframe'), info.get('period'), info['condition'])
+            book = self._books.setdefault(key, {})
+            bisect.insort(book.setdefault(group, []), (info.get('threshold') or 0.0, info['id']))
+            
+            self._alerts[info['id']] = dict(info, key=key, group=group)
+    
+    def remove(self, alert_id):
+        """Uyarıyı indeksten çıkar (yoksa None)"""
+        with self._lock:
+            return self._remove_locked(alert_id)
+    
+    def _remove_locked(self, alert_id):
+        info = self._alerts.pop(alert_id, None)
+        if not info:
+            return None
+        
+        book = self._books.get(info['key'])
+        if book:
+            items = book.get(info['group'], [])
+            item = (info.get('threshold') or 0.0, alert_id)
+            i = bisect.bisect_left(items, item)
+            if i < len(items) and items[i] == item:
+                items.pop(i)
+            
+            if not items:
+                book.pop(info['group'], None)
+            if not book:
+                del self._books[info['key']]
+        
+        return info
+    
+    def get(self, alert_id):
+        with self._lock:
+            info = self._alerts.get(alert_id)
+            return dict(info) if info else None
+    
+    def ids(self):
+        """İndeksteki uyarı id'leri"""
+        with self._lock:
+            return set(self._alerts)
+    
+    def keys(self):
+        """Kural uyarısı bulunan (asset_type, asset_name) çiftleri"""
+        with self._lock:
+            return list(self._books.keys())
+    
+    def has_rules(self, key):
+        with self._lock:
+            return key in self._books
+    
+    def _crossed(self, key, timeframe, period, price, ma):
+        # Kilit altında çağrılmalı - ortalama kesişimi: 'ustu', 'alti' veya None
+        side_key = key + (timeframe, period)
+        previous = self._sides.get(side_key)
+        
+        if price > ma:
+            side = 1
+        elif price < ma:
+            side = -1
+        else:
+            return None   # Ortalamaya eşit - taraf değişmez
+        
+        self._sides[side_key] = side
+        if previous == -1 and side == 1:
+            return 'ustu'
+        if previous == 1 and side == -1:
+            return 'alti'
+        return None
+    
+    def find_triggered(self, key, price):
+        """
+        Yeni fiyatla tetiklenen kural uyarıları
+        
+        Args:
+            key: (asset_type, asset_name) - asset_type normalize edilmiş
+        
+        Returns:
+            list: Uyarı bilgileri; 'observed' alanında tetikleyen gösterge değeri
+        """
+        if price is None or not self.has_rules(key):
+            return []
+        
+        snapshot = self._stats.get(*key)
+        if snapshot is None:
+            return []
+        
+        with self._lock:
+            book = self._books.get(key)
+            if not book:
+                return []
+            
+            hits = []
+            crossings = {}
+            
+            for (kind, timeframe, period, condition), items in book.items():
+                observed = None
+                matched = []
+                
+                if kind == 'yuzde':
+                    window = snapshot['windows'].get(timeframe)
+                    change = window['change_pct'] if window else None
+                    if change is None:
+                        continue
+                    
+                    move = change if condition == 'ustu' else -change
+                    matched = items[:bisect.bisect_right(items, (move, float('inf')))]
+                    observed = change
+                
+                elif kind == 'ortalama':
+                    ma = snapshot['ma'].get(timeframe, {}).get(period)
+                    if ma is None:
+                        continue
+                    
+                    if (timeframe, period) not in crossings:
+                        crossings[(timeframe, period)] = self._crossed(key, timeframe, period, price, ma)
+                    if crossings[(timeframe, period)] == condition:
+                        matched = items
+                    observed = ma
+                
+                elif kind == 'kirilim':
+                    high, low = self._stats.extreme(key[0], key[1], period)
+                    if high is None:
+                        continue
+                    
+                    if condition == 'ustu' and price > high:
+                        matched, observed = items, high
+                    elif condition == 'alti' and price < low:
+                        matched, observed = items, low
+                
+                for _, alert_id in matched:
+                    hits.append(dict(self._alerts[alert_id], observed=observed))
+            
+            return hits
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._alerts)
@@ -0,0 +1,451 @@
+# FinAlert - Async veri çekme motoru
+# aiohttp tabanlı, paylaşılan tek ClientSession üzerinden çalışır.
+# Bekleme süreleri asyncio.sleep ile yapılır; bot bir veri çekilirken
+# diğer kullanıcılara cevap vermeye devam eder.
+# Ayrıştırma (parse_*) fonksiyonları ve kaynak adresleri scrapers.py ile ortaktır.
+import asyncio
+import aiohttp
+import config
+import http_pool
+import metrics
+from source_health import source_health
+from scrapers import (
+    quote_cache, get_headers, request_delay, KAYNAK_URLLERI,
+    parse_doviz_tcmb, parse_doviz_exchangerate, parse_doviz_mynet,
+    parse_doviz_dovizcom_html, parse_doviz_sabah, parse_doviz_bigpara,
+    parse_doviz_dovizcom_api, parse_doviz_dovizcom_api_html,
+    parse_altin_trt, parse_altin_bigpara, parse_altin_collectapi,
+    parse_altin_mynet, parse_altin_genelpara,
+    parse_borsa_foreks, parse_borsa_bigpara, parse_borsa_genelpara
+)
+from scrapers import get_borsa_yahoo as get_borsa_yahoo_sync
+
+_session = None
+
+
+async def get_session():
+    """Paylaşılan aiohttp oturumunu al (yoksa oluştur)"""
+    global _session
+    
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=config.REQUEST_TIMEOUT),
+            connector=aiohttp.TCPConnector(
+                limit=config.HTTP_MAX_CONNECTIONS,
+                limit_per_host=config.HTTP_MAX_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=300
+            ),
+            trace_configs=[http_pool.trace_config()]
+        )
+    
+    return _session
+
+
+async def close_session():
+    """Paylaşılan aiohttp oturumunu kapat (bot kapanırken)"""
+    global _session
+    
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    
+    http_pool.close_sessions()
+
+
+async def safe_request(url, delay=True):
+    """
+    Güvenli async HTTP isteği - Ban yememek için gecikmeli
+    Bekleme event loop'u bloklamaz
+    
+    Returns:
+        bytes: Cevap içeriği, hata durumunda None
+    """
+    await asyncio.sleep(request_delay(delay))
+    
+    try:
+        session = await get_session()
+        async with session.get(url, headers=get_headers()) as response:
+            response.raise_for_status()
+            return await response.read()
+    except Exception as e:
+        print(f" İstek hatası ({url}): {e}")
+        return None
+
+
+async def _fetch_parsed(url, parser, timeout, headers=None, as_json=False):
+    """
+    Gecikmesiz async GET + ayrıştırma (koşullu istek, 304'te önceki sonuç)
+    Senkron tarafta doğrudan istek atılan kaynaklar için
+    """
+    session = await get_session()
+    return await http_pool.afetch_parsed(session, url, parser, headers=headers, timeout=timeout, as_json=as_json)
+
+
+async def _scrape_html(url_key, parser, hata_etiketi):
+    """HTML kaynağını async çek ve ortak ayrıştırıcı ile işle (sayfa değişmediyse yeniden ayrıştırılmaz)"""
+    try:
+        # Anlık veri için kısa gecikme
+        await asyncio.sleep(request_delay(delay=False))
+        
+        try:
+            result = await _fetch_parsed(KAYNAK_URLLERI[url_key], parser, config.REQUEST_TIMEOUT, headers=get_headers())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f" İstek hatası ({KAYNAK_URLLERI[url_key]}): {e}")
+            return {}
+        
+        return result or {}
+    
+    except Exception as e:
+        print(f" {hata_etiketi} hatası: {e}")
+        return {}
+
+
+# ===== DÖVİZ MODÜLÜ =====
+async def get_doviz_tcmb():
+    """link1 ad (async)"""
+    try:
+        return await _fetch_parsed(KAYNAK_URLLERI['doviz_tcmb'], parse_doviz_tcmb, timeout=10) or {}
+    
+    except Exception as e:
+        print(f"linK1 verisi çekme hatası: {e}")
+        return {}
+
+
+async def get_doviz_exchangerate():
+    """link2 ad (async) - üç kur paralel sorgulanır"""
+    async def fetch(code):
+        try:
+            url = f"{KAYNAK_URLLERI['doviz_exchangerate']}/{code}"
+            return code, await _fetch_parsed(url, parse_doviz_exchangerate, timeout=5, as_json=True)
+        except:
+            return code, None
+    
+    try:
+        results = await asyncio.gather(*(fetch(code) for code in ['USD', 'EUR', 'GBP']))
+        return {code: entry for code, entry in results if entry}
+    
+    except Exception as e:
+        print(f" link2 API hatası: {e}")
+        return {}
+
+
+async def get_doviz_mynet():
+    """link3 ad (async)"""
+    return await _scrape_html('doviz_mynet', parse_doviz_mynet, 'link3 Finans döviz')
+
+
+async def get_doviz_dovizcom_html():
+    """link4 ad (async)"""
+    return await _scrape_html('doviz_dovizcom_html', parse_doviz_dovizcom_html, 'link4 HTML')
+
+
+async def get_doviz_sabah():
+    """link5 ad (async)"""
+    return await _scrape_html('doviz_sabah', parse_doviz_sabah, 'link5 Finans döviz')
+
+
+async def get_doviz_bigpara():
+    """link6 ad (async)"""
+    return await _scrape_html('doviz_bigpara', parse_doviz_bigpara, 'link6')
+
+
+async def get_doviz_dovizcom_api():
+    """link7 JSON API (async) - API çalışmazsa HTML"""
+    try:
+        try:
+            result = await _fetch_parsed(KAYNAK_URLLERI['doviz_dovizcom_api'], parse_doviz_dovizcom_api, timeout=5, as_json=True)
+            if result is not None:
+                return result
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            raise
+        except:
+            pass
+        
+        return await _scrape_html('doviz_dovizcom_api_html', parse_doviz_dovizcom_api_html, 'link7')
+    
+    except Exception as e:
+        print(f" link7 hatası: {e}")
+        return {}
+
+
+# ===== ALTIN MODÜLÜ =====
+async def get_altin_trt():
+    """link8 ad (async)"""
+    return await _scrape_html('altin_trt', parse_altin_trt, 'link8 altın scraping')
+
+
+async def get_altin_bigpara():
+    """link9 ad (async)"""
+    return await _scrape_html('altin_bigpara', parse_altin_bigpara, 'link9 altın')
+
+
+async def get_altin_collectapi():
+    """link10 ad (async)"""
+    try:
+        return await _fetch_parsed(KAYNAK_URLLERI['altin_collectapi'], parse_altin_collectapi, timeout=5, as_json=True) or {}
+    
+    except Exception as e:
+        print(f" link10 hatası: {e}")
+        return {}
+
+
+async def get_altin_mynet():
+    """link11 ad (async)"""
+    return await _scrape_html('altin_mynet', parse_altin_mynet, 'link11 altın scraping')
+
+
+async def get_altin_genelpara():
+    """link12 ad (async)"""
+    try:
+        return await _fetch_parsed(KAYNAK_URLLERI['altin_genelpara'], parse_altin_genelpara, timeout=10, headers=get_headers(), as_json=True) or {}
+    
+    except Exception as e:
+        print(f" link12 API hatası: {e}")
+        return {}
+
+
+# ===== BORSA MODÜLÜ =====
+async def get_borsa_yahoo():
+    """link13 ad (async) - yfinance senkron olduğu için ayrı thread'de çalışır"""
+    return await asyncio.to_thread(get_borsa_yahoo_sync)
+
+
+async def get_borsa_foreks():
+    """link14 ad (async)"""
+    return await _scrape_html('borsa_foreks', parse_borsa_foreks, 'link14 scraping')
+
+
+async def get_borsa_bigpara():
+    """link15 ad (async)"""
+    return await _scrape_html('borsa_bigpara', parse_borsa_bigpara, 'link15 borsa scraping')
+
+
+async def get_borsa_genelpara():
+    """link16 ad (async)"""
+    try:
+        return await _fetch_parsed(KAYNAK_URLLERI['borsa_genelpara'], parse_borsa_genelpara, timeout=10, headers=get_headers(), as_json=True) or {}
+    
+    except Exception as e:
+        print(f" link16 API hatası: {e}")
+        return {}
+
+
+# ===== KAYNAK ZİNCİRLERİ =====
+# Öncelik sırası ve etiketler scrapers.py'deki zincirlerle aynıdır
+DOVIZ_KAYNAKLARI = [
+    ('link1', get_doviz_sabah),
+    ('link2', get_doviz_mynet),
+    ('link3', get_doviz_dovizcom_html),
+    ('link4', get_doviz_bigpara),
+    ('link5', get_doviz_exchangerate),
+    ('link6', get_doviz_dovizcom_api),
+    ('link7', get_doviz_tcmb),
+]
+
+ALTIN_KAYNAKLARI = [
+    ('link8', get_altin_mynet),
+    ('link9', get_altin_bigpara),
+    ('link10', get_altin_trt),
+    ('link11', get_altin_genelpara),
+    ('link12', get_altin_collectapi),
+]
+
+BORSA_KAYNAKLARI = [
+    ('link13', get_borsa_yahoo),
+    ('link14', get_borsa_genelpara),
+    ('link15', get_borsa_bigpara),
+    ('link16', get_borsa_foreks),
+]
+
+
+async def run_source_chain(kaynaklar):
+    """
+    Kaynakları öncelik sırasıyla dene, ilk dolu sonucu etiketleyip döndür
+    Hiçbiri veri vermezse son kaynağın (boş) sonucu etiketlenerek döner
+    """
+    for kaynak, fetcher in kaynaklar[:-1]:
+        data = await fetcher()
+        if data and len(data) > 0:
+            data['_kaynak'] = kaynak
+            return data
+    
+    kaynak, fetcher = kaynaklar[-1]
+    data = await fetcher()
+    data['_kaynak'] = kaynak
+    return data
+
+
+async def run_source_chain_hedged(kaynaklar, hedge_delay=None, max_parallel=None):
+    """
+    Kaynakları "hedged" modda dene:
+    - Önce birinci kaynak başlatılır
+    - hedge_delay saniye içinde cevap gelmezse (veya kaynak boş dönerse)
+      sıradaki kaynak paralel olarak başlatılır (en fazla max_parallel adet)
+    - Geçerli bir sonuç geldiğinde, daha öncelikli ve hâlâ çalışan kaynaklara
+      en fazla hedge_delay kadar ek süre tanınır; sonra en öncelikli geçerli
+      sonuç seçilir ve kalan istekler iptal edilir
+    
+    Sonuç, sıralı zincirle aynı şekilde '_kaynak' etiketiyle döner.
+    """
+    if hedge_delay is None:
+        hedge_delay = config.HEDGE_DELAY
+    if max_parallel is None:
+        max_parallel = config.HEDGE_MAX_PARALLEL
+    
+    loop = asyncio.get_running_loop()
+    pending = {}   # task -> kaynak sırası
+    results = {}   # kaynak sırası -> sonuç
+    next_index = 0
+    deadline = None
+    
+    def launch():
+        nonlocal next_index
+        task = asyncio.ensure_future(kaynaklar[next_index][1]())
+        pending[task] = next_index
+        next_index += 1
+    
+    def tagged(index):
+        data = results.get(index) or {}
+        data['_kaynak'] = kaynaklar[index][0]
+        return data
+    
+    try:
+        launch()
+        
+        while pending or next_index < len(kaynaklar):
+            if not pending:
+                launch()
+                continue
+            
+            timeout = hedge_delay if deadline is None else max(0, deadline - loop.time())
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            
+            failed = False
+            for task in done:
+                index = pending.pop(task)
+                try:
+                    results[index] = task.result()
+                except Exception:
+                    results[index] = {}
+                if not results[index]:
+                    failed = True
+            
+            valid = sorted(index for index, data in results.items() if data)
+            if valid:
+                best = valid[0]
+                higher_pending = any(index < best for index in pending.values())
+                
+                if not higher_pending:
+                    return tagged(best)
+                if deadline is None:
+                    deadline = loop.time() + hedge_delay
+                elif loop.time() >= deadline:
+                    return tagged(best)
+                continue
+            
+            # Süre doldu veya bir kaynak boş döndü - sıradakini başlat
+            if (failed or not done) and next_index < len(kaynaklar) and len(pending) < max_parallel:
+                launch()
+        
+        # Hiçbir kaynak veri vermedi
+        return tagged(len(kaynaklar) - 1)
+    
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _run_chain(kaynaklar):
+    """
+    Yapılandırmaya göre hedged veya sıralı zinciri çalıştır
+    Devresi açık kaynaklar atlanır, sıra kaynak sağlığına göre düzenlenir
+    """
+    kaynaklar = source_health.prepare(kaynaklar)
+    
+    if config.HEDGED_FETCH:
+        return await run_source_chain_hedged(kaynaklar)
+    return await run_source_chain(kaynaklar)
+
+
+@metrics.timed(metrics.QUOTE_REFRESH_SECONDS, varlik='doviz')
+async def _fetch_doviz_data():
+    try:
+        data = await _run_chain(DOVIZ_KAYNAKLARI)
+        metrics.observe_chain('doviz', DOVIZ_KAYNAKLARI, data)
+        return data
+    except Exception as e:
+        metrics.CHAIN_FAILURES.inc(zincir='doviz')
+        print(f" Döviz verisi çekme hatası: {e}")
+        doviz_data = await get_doviz_tcmb()
+        doviz_data['_kaynak'] = 'linK7'
+        return doviz_data
+
+
+@metrics.timed(metrics.QUOTE_REFRESH_SECONDS, varlik='altin')
+async def _fetch_altin_data():
+    try:
+        data = await _run_chain(ALTIN_KAYNAKLARI)
+        metrics.observe_chain('altin', ALTIN_KAYNAKLARI, data)
+        return data
+    except Exception as e:
+        metrics.CHAIN_FAILURES.inc(zincir='altin')
+        print(f" Altın verisi çekme hatası: {e}")
+        return {'_kaynak': 'Hata'}
+
+
+@metrics.timed(metrics.QUOTE_REFRESH_SECONDS, varlik='borsa')
+async def _fetch_borsa_data():
+    try:
+        data = await _run_chain(BORSA_KAYNAKLARI)
+        metrics.observe_chain('borsa', BORSA_KAYNAKLARI, data)
+        return data
+    except Exception as e:
+        metrics.CHAIN_FAILURES.inc(zincir='borsa')
+        print(f"Borsa verisi çekme hatası: {e}")
+        borsa_data = await get_borsa_genelpara()
+        borsa_data['_kaynak'] = 'link15API'
+        return borsa_data
+
+
+async def get_doviz_data(force_refresh=False):
+    """
+    Döviz verilerini çek (async)
+    Senkron get_doviz_data() ile aynı önbelleği paylaşır
+    """
+    return await quote_cache.aget('doviz', _fetch_doviz_data, force_refresh)
+
+
+async def get_altin_data(force_refresh=False):
+    """Altın fiyatlarını çek (async)"""
+    return await quote_cache.aget('altin', _fetch_altin_data, force_refresh)
+
+
+async def get_borsa_data(force_refresh=False):
+    """Borsa verilerini çek (async)"""
+    return await quote_cache.aget('borsa', _fetch_borsa_data, force_refresh)
+
+
+async def get_all_data(force_refresh=False):
+    """
+    Döviz, altın ve borsa verilerini paralel çek
+    
+    Returns:
+        tuple: (doviz_data, altin_data, borsa_data)
+    """
+    return await asyncio.gather(
+        get_doviz_data(force_refresh),
+        get_altin_data(force_refresh),
+        get_borsa_data(force_refresh)
+    )
+
+
+# Test fonksiyonu
+if __name__ == '__main__':
+    async def _test():
+        doviz, altin, borsa = await get_all_data()
+        print(doviz)
+        print(altin)
+        print(borsa)
+        await close_session()
+    
+    asyncio.run(_test())
@@ -12,13 +12,24 @@ from telegram.ext import (
 )
 from datetime import datetime
 import config
-from database import (
-    init_db, get_db, User, Portfolio, Alert, TimeNotification
+import metrics
+from database import init_db, warm_async_db, close_async_db
+from data_access import (
+    get_user_id, get_active_alerts, count_active_alerts, add_alert, deactivate_alert,
+    get_active_notifications, count_active_notifications, add_notification, deactivate_notification
 )
-from scrapers import get_doviz_data, get_altin_data, get_borsa_data
-from alert_manager import start_alert_checker, start_time_notification_checker
+from async_scrapers import get_doviz_data, get_altin_data, get_borsa_data, close_session
+from alert_manager import (
+    start_alert_checker, start_time_notification_checker, start_alert_sync, alert_index, evaluate_alert
+)
+from cluster import cluster, LEADER, WORKER
+from quote_stats import get_quote_stats
+from loop_watchdog import loop_watchdog, start_loop_watchdog
+from market_scheduler import format_cadence
+from webhook_server import run_webhook
+from alert_rules import describe_rule, TIMEFRAME_LABELS
 from portfolio_manager import (
-    add_portfolio_item, calculate_portfolio_profit_loss, 
+    add_portfolio_item, get_user_portfolio, calculate_portfolio_profit_loss,
     delete_portfolio_item, format_portfolio_report
 )
 
@@ -37,26 +48,14 @@ logger = logging.getLogger(__name__)
 
 
 # ===== YARDIMCI FONKSİYONLAR =====
-def get_or_create_user(telegram_id, username=None):
-    """Kullanıcıyı veritabanında al veya oluştur"""
-    db = get_db()
-    user = db.query(User).filter(User.telegram_id == telegram_id).first()
-    
-    if not user:
-        user = User(telegram_id=telegram_id, username=username)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    
-    db.close()
-    return user
-
-
-def get_current_price(asset_type, asset_name):
+async def get_current_price(asset_type, asset_name):
     """Şu anki fiyatı al"""
     try:
+        # İşçi süreçte tek varlık doğrudan paylaşılan bellekten okunur (veri seti kurulmaz)
+        quote = cluster.get_quote(asset_type, asset_name)
+        
         if asset_type == 'doviz':
-            data = get_doviz_data()
+            data = {asset_name: quote} if quote else await get_doviz_data()
             if data and asset_name in data:
                 # Alış ve satış ortalaması
                 alis = data[asset_name].get('alis', 0)
@@ -64,14 +63,14 @@ def get_current_price(asset_type, asset_name):
                 if alis and satis:
                     return (float(alis) + float(satis)) / 2
         elif asset_type == 'altin':
-            data = get_altin_data()
+            data = {asset_name: quote} if quote else await get_altin_data()
             if data and asset_name in data:
                 # Satış fiyatını kullan
                 satis = data[asset_name].get('satis', 0)
                 if satis:
                     return float(satis)
         elif asset_type == 'borsa':
-            data = get_borsa_data()
+            data = {asset_name: quote} if quote else await get_borsa_data()
             if data and asset_name in data:
                 fiyat = data[asset_name].get('fiyat', 0)
                 if fiyat:
@@ -91,11 +90,48 @@ def format_price(price):
     return f"{price:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
 
 
+def alert_summary(alert):
+    """Uyarının kısa açıklaması (hedef fiyat veya kural)"""
+    if alert.kind and alert.kind != 'fiyat':
+        return describe_rule(alert.kind, alert.condition, alert.timeframe, alert.period, alert.threshold)
+    
+    condition = 'üstüne çıkınca' if alert.condition == 'ustu' else 'altına düşünce'
+    return f"₺{format_price(alert.target_price)} {condition}"
+
+
+def format_daily_stats(asset_type, asset_name, indent='', change=True, ranges=True):
+    """
+    Günlük değişim ve fiyat aralığı satırları (quote_stats)
+    Varlık için henüz istatistik yoksa boş metin döner
+    """
+    stats = get_quote_stats(asset_type, asset_name)
+    if not stats or not stats['day']:
+        return ""
+    
+    day = stats['day']
+    text = ""
+    
+    if change:
+        change_pct = day['change_pct']
+        emoji = "📈" if change_pct > 0 else "📉" if change_pct < 0 else "➖"
+        text += f"{indent}Günlük: {emoji} %{change_pct:.2f}\n"
+    
+    if ranges:
+        text += f"{indent}Gün aralığı: ₺{format_price(day['low'])} - ₺{format_price(day['high'])}\n"
+        
+        window = stats['windows'].get('24h')
+        if window and window['low'] is not None:
+            text += f"{indent}24 saat: ₺{format_price(window['low'])} - ₺{format_price(window['high'])}\n"
+    
+    return text
+
+
 # ===== BOT KOMUTLARI =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='start')
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bot başlangıç komutu"""
     user = update.effective_user
-    get_or_create_user(user.id, user.username)
+    await get_user_id(user.id, user.username)
     
     welcome_text = f"""
 🎯 *FinAlert'e Hoş Geldiniz!* 🎯
@@ -116,6 +152,7 @@ Başlamak için /menu komutunu kullanın!
     await update.message.reply_text(welcome_text, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='menu')
 async def menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Ana menü"""
     keyboard = [
@@ -153,6 +190,7 @@ async def menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 # ===== DÖVİZ MENÜSÜ =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='doviz_menu')
 async def doviz_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Döviz menüsü"""
     keyboard = [
@@ -183,6 +221,7 @@ async def doviz_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='show_doviz')
 async def show_doviz(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Döviz bilgilerini göster"""
     query = update.callback_query
@@ -191,7 +230,7 @@ async def show_doviz(update: Update, context: ContextTypes.DEFAULT_TYPE):
     doviz_type = query.data.split('_')[1]
     
     # Döviz verilerini çek
-    doviz_data = get_doviz_data()
+    doviz_data = await get_doviz_data()
     kaynak = doviz_data.get('_kaynak', 'Bilinmeyen')
     
     if doviz_type == 'all':
@@ -211,7 +250,8 @@ async def show_doviz(update: Update, context: ContextTypes.DEFAULT_TYPE):
             currency_name = currency_names.get(currency, currency)
             message += f"*{currency_name}*\n"
             message += f"  Alış: ₺{format_price(data['alis'])}\n"
-            message += f"  Satış: ₺{format_price(data['satis'])}\n\n"
+            message += f"  Satış: ₺{format_price(data['satis'])}\n"
+            message += format_daily_stats('doviz', currency, indent='  ', ranges=False) + "\n"
         
         message += f"📡 Kaynak: {kaynak}\n"
         message += f"🕐 {datetime.now().strftime('%d.%m.%Y %H:%M')}"
@@ -230,7 +270,8 @@ async def show_doviz(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
             message = f"💱 *{currency_name} Kuru*\n\n"
             message += f"Alış: ₺{format_price(data['alis'])}\n"
-            message += f"Satış: ₺{format_price(data['satis'])}\n\n"
+            message += f"Satış: ₺{format_price(data['satis'])}\n"
+            message += format_daily_stats('doviz', doviz_type) + "\n"
             message += f"📡 Kaynak: {kaynak}\n"
             message += f"🕐 {datetime.now().strftime('%d.%m.%Y %H:%M')}"
         else:
@@ -243,6 +284,7 @@ async def show_doviz(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 # ===== ALTIN MENÜSÜ =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='altin_menu')
 async def altin_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Altın menüsü"""
     keyboard = [
@@ -278,6 +320,7 @@ async def altin_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='show_altin')
 async def show_altin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Altın bilgilerini göster"""
     query = update.callback_query
@@ -286,7 +329,7 @@ async def show_altin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     altin_type = query.data.split('_')[1]
     
     # Altın verilerini çek
-    altin_data = get_altin_data()
+    altin_data = await get_altin_data()
     kaynak = altin_data.get('_kaynak', 'Bilinmeyen')
     
     if altin_type == 'all':
@@ -307,7 +350,8 @@ async def show_altin(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 data = altin_data[key]
                 message += f"*{name}*\n"
                 message += f"  Alış: ₺{format_price(data['alis'])}\n"
-                message += f"  Satış: ₺{format_price(data['satis'])}\n\n"
+                message += f"  Satış: ₺{format_price(data['satis'])}\n"
+                message += format_daily_stats('altin', key, indent='  ', ranges=False) + "\n"
         
         message += f"📡 Kaynak: {kaynak}\n"
         message += f"🕐 {datetime.now().strftime('%d.%m.%Y %H:%M')}"
@@ -326,7 +370,8 @@ async def show_altin(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
             message = f"🏆 *{altin_names.get(altin_type, altin_type)}*\n\n"
             message += f"Alış: ₺{format_price(data['alis'])}\n"
-            message += f"Satış: ₺{format_price(data['satis'])}\n\n"
+            message += f"Satış: ₺{format_price(data['satis'])}\n"
+            message += format_daily_stats('altin', altin_type) + "\n"
             message += f"📡 Kaynak: {kaynak}\n"
             message += f"🕐 {datetime.now().strftime('%d.%m.%Y %H:%M')}"
         else:
@@ -339,6 +384,7 @@ async def show_altin(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 # ===== BORSA MENÜSÜ =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='borsa_menu')
 async def borsa_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Borsa menüsü"""
     keyboard = [
@@ -371,6 +417,7 @@ async def borsa_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='show_borsa')
 async def show_borsa(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Borsa bilgilerini göster"""
     query = update.callback_query
@@ -379,7 +426,7 @@ async def show_borsa(update: Update, context: ContextTypes.DEFAULT_TYPE):
     borsa_type = query.data.split('_')[1]
     
     # Borsa verilerini çek
-    borsa_data = get_borsa_data()
+    borsa_data = await get_borsa_data()
     kaynak = borsa_data.get('_kaynak', 'Bilinmeyen')
     
     if borsa_type == 'all':
@@ -407,7 +454,8 @@ async def show_borsa(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
             message = f"📈 *{borsa_type}*\n\n"
             message += f"Değer: ₺{format_price(data['deger'])}\n"
-            message += f"Değişim: {emoji} %{degisim:.2f}\n\n"
+            message += f"Değişim: {emoji} %{degisim:.2f}\n"
+            message += format_daily_stats('hisse', borsa_type, change=False) + "\n"
             message += f"📡 Kaynak: {kaynak}\n"
             message += f"🕐 {datetime.now().strftime('%d.%m.%Y %H:%M')}"
         else:
@@ -420,6 +468,7 @@ async def show_borsa(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 # ===== CALLBACK HANDLER =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='button_callback')
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Tüm buton callback'lerini yönet"""
     query = update.callback_query
@@ -470,6 +519,10 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await alert_select_asset(update, context)
     elif callback_data.startswith('alert_cond_'):
         await alert_select_condition(update, context)
+    elif callback_data.startswith('alert_kind_'):
+        await alert_select_kind(update, context)
+    elif callback_data.startswith('alert_rule_'):
+        await alert_select_rule(update, context)
     elif callback_data.startswith('alert_del_'):
         await alert_delete_confirm(update, context)
     elif callback_data == 'menu_notifications':
@@ -490,6 +543,7 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await show_help(update, context)
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='show_help')
 async def show_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Yardım mesajı"""
     help_text = """
@@ -532,13 +586,14 @@ async def show_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 # ===== PORTFÖY MENÜSÜ =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='portfolio_menu')
 async def portfolio_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Portföy menüsü"""
     user = update.effective_user if update.message else update.callback_query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
     # Portföy verilerini al
-    portfolio_data = calculate_portfolio_profit_loss(user_obj.id)
+    portfolio_data = await calculate_portfolio_profit_loss(user_id)
     
     keyboard = [
         [InlineKeyboardButton("➕ Varlık Ekle", callback_data='portfolio_add')],
@@ -575,15 +630,16 @@ Toplam {len(portfolio_data['items'])} varlık"""
         )
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='portfolio_report')
 async def portfolio_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Detaylı portföy raporu göster"""
     query = update.callback_query
     await query.answer()
     
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    portfolio_data = calculate_portfolio_profit_loss(user_obj.id)
+    portfolio_data = await calculate_portfolio_profit_loss(user_id)
     report = format_portfolio_report(portfolio_data)
     
     keyboard = [[InlineKeyboardButton("◀️ Geri", callback_data='menu_portfolio')]]
@@ -592,6 +648,7 @@ async def portfolio_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.edit_message_text(report, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='portfolio_add_start')
 async def portfolio_add_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Portföye varlık eklemeye başla"""
     query = update.callback_query
@@ -612,6 +669,7 @@ async def portfolio_add_start(update: Update, context: ContextTypes.DEFAULT_TYPE
     )
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='portfolio_select_type')
 async def portfolio_select_type(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Portföy varlık türü seçildi - Adım 1"""
     query = update.callback_query
@@ -652,6 +710,7 @@ async def portfolio_select_type(update: Update, context: ContextTypes.DEFAULT_TY
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='portfolio_select_asset')
 async def portfolio_select_asset(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Portföy varlık seçildi - Adım 2: Miktar sor"""
     query = update.callback_query
@@ -663,7 +722,7 @@ async def portfolio_select_asset(update: Update, context: ContextTypes.DEFAULT_T
     asset_type = context.user_data['portfolio_asset_type']
     
     # Şu anki fiyatı göster
-    current_price = get_current_price(asset_type, asset_name)
+    current_price = await get_current_price(asset_type, asset_name)
     
     if current_price:
         price_text = f"Şu anki fiyat: ₺{format_price(current_price)}"
@@ -686,6 +745,7 @@ Kaç adet/miktar eklemek istersiniz?
     context.user_data['waiting_for_portfolio_amount'] = True
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='portfolio_save_amount')
 async def portfolio_save_amount(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Portföy miktar girişi - Adım 3: Alış fiyatı sor"""
     if not context.user_data.get('waiting_for_portfolio_amount'):
@@ -709,7 +769,7 @@ async def portfolio_save_amount(update: Update, context: ContextTypes.DEFAULT_TY
         asset_type = context.user_data['portfolio_asset_type']
         
         # Şu anki fiyatı göster
-        current_price = get_current_price(asset_type, asset_name)
+        current_price = await get_current_price(asset_type, asset_name)
         
         if current_price:
             price_text = f"(Şu anki: ₺{format_price(current_price)})"
@@ -737,6 +797,7 @@ Kaç TL'den aldınız? {price_text}
         )
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='portfolio_save_price')
 async def portfolio_save_price(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Portföy alış fiyatı - Adım 4: Kaydet"""
     if not context.user_data.get('waiting_for_portfolio_price'):
@@ -755,23 +816,14 @@ async def portfolio_save_price(update: Update, context: ContextTypes.DEFAULT_TYP
         
         # Veritabanına kaydet
         user = update.effective_user
-        user_obj = get_or_create_user(user.id, user.username)
+        user_id = await get_user_id(user.id, user.username)
         
         asset_type = context.user_data['portfolio_asset_type']
         asset_name = context.user_data['portfolio_asset_name']
         amount = context.user_data['portfolio_amount']
         
-        db = get_db()
-        new_portfolio_item = Portfolio(
-            user_id=user_obj.id,
-            asset_type=asset_type,
-            asset_name=asset_name,
-            amount=amount,
-            purchase_price=purchase_price
-        )
-        db.add(new_portfolio_item)
-        db.commit()
-        db.close()
+        if not await add_portfolio_item(user_id, asset_type, asset_name, amount, purchase_price):
+            raise RuntimeError("Portföy kaydedilemedi")
         
         # Temizle
         context.user_data.pop('waiting_for_portfolio_price', None)
@@ -809,18 +861,17 @@ Portföy raporunuzdan kar/zarar takibi yapabilirsiniz!"""
         context.user_data.pop('waiting_for_portfolio_price', None)
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='portfolio_delete_start')
 async def portfolio_delete_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Portföy varlık silme - Silmek için varlık seç"""
     query = update.callback_query
     await query.answer()
     
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
     # Portföy verilerini al
-    db = get_db()
-    portfolio_items = db.query(Portfolio).filter(Portfolio.user_id == user_obj.id).all()
-    db.close()
+    portfolio_items = await get_user_portfolio(user_id)
     
     if not portfolio_items:
         message = "🗑 *Varlık Sil*\n\nPortföyünüzde varlık yok."
@@ -840,6 +891,7 @@ async def portfolio_delete_start(update: Update, context: ContextTypes.DEFAULT_T
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='portfolio_delete_confirm')
 async def portfolio_delete_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Portföy varlık silme - Onay ve sil"""
     query = update.callback_query
@@ -848,31 +900,18 @@ async def portfolio_delete_confirm(update: Update, context: ContextTypes.DEFAULT
     item_id = int(query.data.replace('portfolio_del_', ''))
     
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    db = get_db()
-    portfolio_item = db.query(Portfolio).filter(
-        Portfolio.id == item_id,
-        Portfolio.user_id == user_obj.id
-    ).first()
+    # Veritabanından sil (yalnızca kullanıcının kendi varlığı)
+    portfolio_item = await delete_portfolio_item(item_id, user_id)
     
     if portfolio_item:
-        # Varlık bilgilerini kaydet
-        asset_name = portfolio_item.asset_name
-        amount = portfolio_item.amount
-        
-        # Veritabanından sil
-        db.delete(portfolio_item)
-        db.commit()
-        
         message = f"""✅ *Varlık Silindi!*
 
-{asset_name} ({amount} adet) portföyünüzden çıkarıldı."""
+{portfolio_item.asset_name} ({portfolio_item.amount} adet) portföyünüzden çıkarıldı."""
     else:
         message = "❌ Varlık bulunamadı!"
     
-    db.close()
-    
     keyboard = [
         [InlineKeyboardButton("💼 Portföyüm", callback_data='menu_portfolio')],
         [InlineKeyboardButton("📱 Ana Menü", callback_data='menu_main')]
@@ -883,18 +922,14 @@ async def portfolio_delete_confirm(update: Update, context: ContextTypes.DEFAULT
 
 
 # ===== UYARILAR MENÜSÜ =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alerts_menu')
 async def alerts_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Uyarılar menüsü"""
     user = update.effective_user if update.message else update.callback_query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    # Aktif uyarıları al
-    db = get_db()
-    alerts = db.query(Alert).filter(
-        Alert.user_id == user_obj.id,
-        Alert.is_active == True
-    ).all()
-    db.close()
+    # Aktif uyarı sayısı
+    alert_count = await count_active_alerts(user_id)
     
     keyboard = [
         [InlineKeyboardButton("➕ Yeni Uyarı", callback_data='alert_add')],
@@ -907,7 +942,7 @@ async def alerts_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     summary = f"""🔔 *Fiyat Uyarıları*
 
-Aktif Uyarı Sayısı: {len(alerts)}
+Aktif Uyarı Sayısı: {alert_count}
 
 Hedef fiyata ulaşıldığında otomatik bildirim alırsınız."""
     
@@ -925,20 +960,16 @@ Hedef fiyata ulaşıldığında otomatik bildirim alırsınız."""
         )
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_list')
 async def alert_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Uyarı listesini göster"""
     query = update.callback_query
     await query.answer()
     
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    db = get_db()
-    alerts = db.query(Alert).filter(
-        Alert.user_id == user_obj.id,
-        Alert.is_active == True
-    ).all()
-    db.close()
+    alerts = await get_active_alerts(user_id)
     
     if not alerts:
         message = "📋 *Uyarılarınız*\n\nHenüz aktif uyarınız yok."
@@ -947,10 +978,9 @@ async def alert_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         for alert in alerts:
             emoji = {'doviz': '💱', 'altin': '🏆', 'hisse': '📈'}.get(alert.asset_type, '💰')
-            condition = 'üstüne çıkınca' if alert.condition == 'ustu' else 'altına düşünce'
             
             message += f"{emoji} *{alert.asset_name}*\n"
-            message += f"  ₺{format_price(alert.target_price)} {condition}\n\n"
+            message += f"  {alert_summary(alert)}\n\n"
     
     keyboard = [[InlineKeyboardButton("◀️ Geri", callback_data='menu_alerts')]]
     reply_markup = InlineKeyboardMarkup(keyboard)
@@ -958,20 +988,16 @@ async def alert_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_delete_start')
 async def alert_delete_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Uyarı silme - Silmek için uyarı seç"""
     query = update.callback_query
     await query.answer()
     
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    db = get_db()
-    alerts = db.query(Alert).filter(
-        Alert.user_id == user_obj.id,
-        Alert.is_active == True
-    ).all()
-    db.close()
+    alerts = await get_active_alerts(user_id)
     
     if not alerts:
         message = "🗑 *Uyarı Sil*\n\nHenüz aktif uyarınız yok."
@@ -983,7 +1009,10 @@ async def alert_delete_start(update: Update, context: ContextTypes.DEFAULT_TYPE)
         for alert in alerts:
             emoji = {'doviz': '💱', 'altin': '🏆', 'borsa': '📈'}.get(alert.asset_type, '💰')
             condition = '📈' if alert.condition == 'ustu' else '📉'
-            button_text = f"{emoji} {alert.asset_name} {condition} ₺{format_price(alert.target_price)}"
+            if alert.kind and alert.kind != 'fiyat':
+                button_text = f"{emoji} {alert.asset_name} {alert_summary(alert)}"
+            else:
+                button_text = f"{emoji} {alert.asset_name} {condition} ₺{format_price(alert.target_price)}"
             keyboard.append([InlineKeyboardButton(button_text, callback_data=f'alert_del_{alert.id}')])
         
         keyboard.append([InlineKeyboardButton("◀️ İptal", callback_data='menu_alerts')])
@@ -992,6 +1021,7 @@ async def alert_delete_start(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_delete_confirm')
 async def alert_delete_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Uyarı silme - Onay ve sil"""
     query = update.callback_query
@@ -1000,31 +1030,20 @@ async def alert_delete_confirm(update: Update, context: ContextTypes.DEFAULT_TYP
     alert_id = int(query.data.replace('alert_del_', ''))
     
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    db = get_db()
-    alert = db.query(Alert).filter(
-        Alert.id == alert_id,
-        Alert.user_id == user_obj.id
-    ).first()
+    # Veritabanından sil (soft delete - is_active = False)
+    alert = await deactivate_alert(user_id, alert_id)
     
     if alert:
-        # Uyarı bilgilerini kaydet
-        asset_name = alert.asset_name
-        target_price = alert.target_price
-        
-        # Veritabanından sil (soft delete - is_active = False)
-        alert.is_active = False
-        db.commit()
+        alert_index.remove(alert_id)
         
         message = f"""✅ *Uyarı Silindi!*
 
-{asset_name} - ₺{format_price(target_price)} uyarısı başarıyla silindi."""
+{alert.asset_name} - {alert_summary(alert)} uyarısı başarıyla silindi."""
     else:
         message = "❌ Uyarı bulunamadı!"
     
-    db.close()
-    
     keyboard = [
         [InlineKeyboardButton("🔔 Uyarılarım", callback_data='alert_list')],
         [InlineKeyboardButton("📱 Ana Menü", callback_data='menu_main')]
@@ -1035,18 +1054,14 @@ async def alert_delete_confirm(update: Update, context: ContextTypes.DEFAULT_TYP
 
 
 # ===== BİLDİRİMLER MENÜSÜ =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='notifications_menu')
 async def notifications_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bildirimler menüsü"""
     user = update.effective_user if update.message else update.callback_query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    # Aktif bildirimleri al
-    db = get_db()
-    notifications = db.query(TimeNotification).filter(
-        TimeNotification.user_id == user_obj.id,
-        TimeNotification.is_active == True
-    ).all()
-    db.close()
+    # Aktif bildirim sayısı
+    notification_count = await count_active_notifications(user_id)
     
     keyboard = [
         [InlineKeyboardButton("➕ Yeni Bildirim", callback_data='notification_add')],
@@ -1059,7 +1074,7 @@ async def notifications_menu(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     summary = f"""⏰ *Periyodik Bildirimler*
 
-Aktif Bildirim: {len(notifications)}
+Aktif Bildirim: {notification_count}
 
 Belirlediğiniz aralıklarla otomatik piyasa raporu alırsınız."""
     
@@ -1077,20 +1092,16 @@ Belirlediğiniz aralıklarla otomatik piyasa raporu alırsınız."""
         )
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='notification_list')
 async def notification_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bildirim listesini göster"""
     query = update.callback_query
     await query.answer()
     
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    db = get_db()
-    notifications = db.query(TimeNotification).filter(
-        TimeNotification.user_id == user_obj.id,
-        TimeNotification.is_active == True
-    ).all()
-    db.close()
+    notifications = await get_active_notifications(user_id)
     
     if not notifications:
         message = "📋 *Bildirimleriniz*\n\nHenüz aktif bildiriminiz yok."
@@ -1117,20 +1128,16 @@ async def notification_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='notification_delete_start')
 async def notification_delete_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bildirim silme - Silmek için bildirim seç"""
     query = update.callback_query
     await query.answer()
     
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    db = get_db()
-    notifications = db.query(TimeNotification).filter(
-        TimeNotification.user_id == user_obj.id,
-        TimeNotification.is_active == True
-    ).all()
-    db.close()
+    notifications = await get_active_notifications(user_id)
     
     if not notifications:
         message = "🗑 *Bildirim Sil*\n\nHenüz aktif bildiriminiz yok."
@@ -1158,6 +1165,7 @@ async def notification_delete_start(update: Update, context: ContextTypes.DEFAUL
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='notification_delete_confirm')
 async def notification_delete_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bildirim silme - Onay ve sil"""
     query = update.callback_query
@@ -1166,16 +1174,12 @@ async def notification_delete_confirm(update: Update, context: ContextTypes.DEFA
     notif_id = int(query.data.replace('notif_del_', ''))
     
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
-    db = get_db()
-    notification = db.query(TimeNotification).filter(
-        TimeNotification.id == notif_id,
-        TimeNotification.user_id == user_obj.id
-    ).first()
+    # Veritabanından sil (soft delete - is_active = False)
+    notification = await deactivate_notification(user_id, notif_id)
     
     if notification:
-        # Bildirim bilgilerini kaydet
         interval_names = {
             'her_saat': 'Her Saat',
             'her_4_saat': 'Her 4 Saat',
@@ -1184,18 +1188,12 @@ async def notification_delete_confirm(update: Update, context: ContextTypes.DEFA
         }
         interval_name = interval_names.get(notification.interval, notification.interval)
         
-        # Veritabanından sil (soft delete - is_active = False)
-        notification.is_active = False
-        db.commit()
-        
         message = f"""✅ *Bildirim Silindi!*
 
 {interval_name} bildirimi başarıyla silindi."""
     else:
         message = "❌ Bildirim bulunamadı!"
     
-    db.close()
-    
     keyboard = [
         [InlineKeyboardButton("📋 Bildirimlerim", callback_data='notification_list')],
         [InlineKeyboardButton("📱 Ana Menü", callback_data='menu_main')]
@@ -1206,6 +1204,7 @@ async def notification_delete_confirm(update: Update, context: ContextTypes.DEFA
 
 
 # ===== UYARI EKLEME =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_add_start')
 async def alert_add_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Yeni uyarı ekleme başlat - Adım 1: Varlık türü seç"""
     query = update.callback_query
@@ -1226,6 +1225,7 @@ Hangi varlık türü için uyarı oluşturmak istersiniz?"""
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_select_type')
 async def alert_select_type(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Uyarı ekleme - Adım 2: Varlık seç"""
     query = update.callback_query
@@ -1266,6 +1266,7 @@ async def alert_select_type(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_select_asset')
 async def alert_select_asset(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Uyarı ekleme - Adım 3: Hedef fiyat ve koşul"""
     query = update.callback_query
@@ -1276,7 +1277,7 @@ async def alert_select_asset(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     # Şu anki fiyatı göster
     asset_type = context.user_data['alert_asset_type']
-    current_price = get_current_price(asset_type, asset_name)
+    current_price = await get_current_price(asset_type, asset_name)
     
     if current_price:
         price_text = f"Şu anki fiyat: ₺{format_price(current_price)}"
@@ -1287,11 +1288,14 @@ async def alert_select_asset(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 {price_text}
 
-Hedef fiyata ulaştığında bildirim almak ister misiniz?"""
+Hedef fiyata ulaştığında mı, yoksa fiyat hareketine göre mi bildirim almak istersiniz?"""
     
     keyboard = [
         [InlineKeyboardButton("📈 Üstüne çıkınca", callback_data='alert_cond_ustu')],
         [InlineKeyboardButton("📉 Altına düşünce", callback_data='alert_cond_alti')],
+        [InlineKeyboardButton("📊 Yüzde hareket", callback_data='alert_kind_yuzde')],
+        [InlineKeyboardButton("〰️ Ortalama kesişimi", callback_data='alert_kind_ortalama')],
+        [InlineKeyboardButton("🏔 Zirve / dip kırılımı", callback_data='alert_kind_kirilim')],
         [InlineKeyboardButton("◀️ Geri", callback_data=f'alert_type_{asset_type}')]
     ]
     
@@ -1299,6 +1303,7 @@ Hedef fiyata ulaştığında bildirim almak ister misiniz?"""
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_select_condition')
 async def alert_select_condition(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Uyarı ekleme - Adım 4: Fiyat gir"""
     query = update.callback_query
@@ -1327,6 +1332,161 @@ Lütfen hedef fiyatı yazın (örn: 42.50):"""
     context.user_data['waiting_for_alert_price'] = True
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_select_kind')
+async def alert_select_kind(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Uyarı ekleme - Adım 4: Kural seç (yüzde / ortalama / kırılım)"""
+    query = update.callback_query
+    await query.answer()
+    
+    kind = query.data.replace('alert_kind_', '')
+    asset_name = context.user_data['alert_asset_name']
+    keyboard = []
+    
+    if kind == 'yuzde':
+        message = f"📊 *{asset_name} - Yüzde Hareket*\n\nHangi süre içindeki hareket takip edilsin?"
+        for timeframe, label in TIMEFRAME_LABELS.items():
+            keyboard.append([
+                InlineKeyboardButton(f"📈 {label} yükseliş", callback_data=f'alert_rule_yuzde_{timeframe}_0_ustu'),
+                InlineKeyboardButton(f"📉 {label} düşüş", callback_data=f'alert_rule_yuzde_{timeframe}_0_alti')
+            ])
+    elif kind == 'ortalama':
+        message = f"〰️ *{asset_name} - Ortalama Kesişimi*\n\nFiyat hangi hareketli ortalamayı kesince?"
+        for timeframe, periods in config.STATS_MA_PERIODS.items():
+            unit = 'gün' if timeframe == '1d' else 'saat'
+            for period in periods:
+                keyboard.append([
+                    InlineKeyboardButton(f"📈 {period} {unit} yukarı", callback_data=f'alert_rule_ortalama_{timeframe}_{period}_ustu'),
+                    InlineKeyboardButton(f"📉 {period} {unit} aşağı", callback_data=f'alert_rule_ortalama_{timeframe}_{period}_alti')
+                ])
+    else:  # kirilim
+        message = f"🏔 *{asset_name} - Zirve / Dip Kırılımı*\n\nKaç günlük zirve veya dip takip edilsin?"
+        for days in config.ALERT_BREAKOUT_DAYS:
+            keyboard.append([
+                InlineKeyboardButton(f"📈 {days} gün zirvesi", callback_data=f'alert_rule_kirilim_1d_{days}_ustu'),
+                InlineKeyboardButton(f"📉 {days} gün dibi", callback_data=f'alert_rule_kirilim_1d_{days}_alti')
+            ])
+    
+    keyboard.append([InlineKeyboardButton("◀️ Geri", callback_data=f'alert_asset_{asset_name}')])
+    
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_select_rule')
+async def alert_select_rule(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Uyarı ekleme - Adım 5: Kuralı kaydet (yüzde uyarısında önce eşik sorulur)"""
+    query = update.callback_query
+    await query.answer()
+    
+    kind, timeframe, period, condition = query.data.replace('alert_rule_', '').split('_')
+    rule = {
+        'kind': kind,
+        'condition': condition,
+        'timeframe': timeframe,
+        'period': int(period) or None
+    }
+    
+    if kind == 'yuzde':
+        context.user_data['alert_rule'] = rule
+        context.user_data['waiting_for_alert_percent'] = True
+        
+        direction = "yükselirse" if condition == 'ustu' else "düşerse"
+        message = f"""📊 *Yüzde Eşiği Belirle*
+
+{context.user_data['alert_asset_name']} fiyatı {TIMEFRAME_LABELS.get(timeframe, timeframe)} içinde yüzde kaç {direction} bildirim alırsınız?
+
+Lütfen yüzde değerini yazın (örn: 2.5):"""
+        
+        keyboard = [[InlineKeyboardButton("◀️ İptal", callback_data='menu_alerts')]]
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        return
+    
+    message, reply_markup, alert_id = await save_rule_alert(query.from_user, context, rule)
+    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+    await evaluate_alert(context.application, alert_id)
+
+
+async def save_rule_alert(user, context, rule):
+    """
+    Kural uyarısını kaydet, indekse ekle ve sohbet verisini temizle
+    
+    Returns:
+        tuple: (onay mesajı, klavye, uyarı id)
+    """
+    user_id = await get_user_id(user.id, user.username)
+    asset_type = context.user_data['alert_asset_type']
+    asset_name = context.user_data['alert_asset_name']
+    
+    new_alert = await add_alert(
+        user_id,
+        asset_type=asset_type,
+        asset_name=asset_name,
+        target_price=0.0,
+        condition=rule['condition'],
+        kind=rule['kind'],
+        timeframe=rule['timeframe'],
+        period=rule['period'],
+        threshold=rule.get('threshold')
+    )
+    
+    # Uyarı indeksini güncelle
+    alert_index.add(new_alert, user.id)
+    alert_id = new_alert.id
+    
+    # Temizle
+    for key in ('alert_asset_type', 'alert_asset_name', 'alert_rule', 'waiting_for_alert_percent'):
+        context.user_data.pop(key, None)
+    
+    rule_text = describe_rule(rule['kind'], rule['condition'], rule['timeframe'], rule['period'], rule.get('threshold'))
+    note = ""
+    if rule['kind'] != 'yuzde':
+        note = "\n(Yeterli fiyat geçmişi oluştuğunda değerlendirilir)"
+    
+    message = f"""✅ *Uyarı Oluşturuldu!*
+
+📊 {asset_name}
+⚡ Kural: {rule_text}
+
+Bot fiyat her güncellendiğinde kontrol edip, kural gerçekleşince bildirim gönderecek!{note}"""
+    
+    keyboard = [
+        [InlineKeyboardButton("🔔 Uyarılarım", callback_data='alert_list')],
+        [InlineKeyboardButton("📱 Ana Menü", callback_data='menu_main')]
+    ]
+    return message, InlineKeyboardMarkup(keyboard), alert_id
+
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_save_percent')
+async def alert_save_percent(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Uyarı ekleme - Yüzde eşiğini al ve kural uyarısını kaydet"""
+    try:
+        threshold = float(update.message.text.replace(',', '.').replace('%', '').strip())
+        
+        if threshold <= 0:
+            await update.message.reply_text(
+                "❌ Geçersiz yüzde! Pozitif bir sayı girin.\n\nTekrar deneyin:"
+            )
+            return
+        
+        rule = dict(context.user_data['alert_rule'], threshold=threshold)
+        message, reply_markup, alert_id = await save_rule_alert(update.effective_user, context, rule)
+        
+        await update.message.reply_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        await evaluate_alert(context.application, alert_id)
+    
+    except ValueError:
+        await update.message.reply_text(
+            "❌ Geçersiz format! Sayı girin (örn: 2.5).\n\nTekrar deneyin:"
+        )
+    except Exception as e:
+        await update.message.reply_text(
+            f"❌ Hata oluştu: {e}\n\n/menu ile ana menüye dönebilirsiniz."
+        )
+        context.user_data.pop('waiting_for_alert_percent', None)
+
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler='message_handler')
 async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Tüm mesaj girişlerini yönet"""
     # Portföy miktar girişi
@@ -1338,8 +1498,12 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Uyarı fiyat girişi
     elif context.user_data.get('waiting_for_alert_price'):
         await alert_save_price(update, context)
+    # Yüzde uyarısı eşik girişi
+    elif context.user_data.get('waiting_for_alert_percent'):
+        await alert_save_percent(update, context)
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='alert_save_price')
 async def alert_save_price(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Uyarı ekleme - Adım 5: Kaydet"""
     if not context.user_data.get('waiting_for_alert_price'):
@@ -1358,24 +1522,23 @@ async def alert_save_price(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         # Veritabanına kaydet
         user = update.effective_user
-        user_obj = get_or_create_user(user.id, user.username)
+        user_id = await get_user_id(user.id, user.username)
         
         asset_type = context.user_data['alert_asset_type']
         asset_name = context.user_data['alert_asset_name']
         condition = context.user_data['alert_condition']
         
-        db = get_db()
-        new_alert = Alert(
-            user_id=user_obj.id,
+        new_alert = await add_alert(
+            user_id,
             asset_type=asset_type,
             asset_name=asset_name,
             target_price=target_price,
-            condition=condition,
-            is_active=True
+            condition=condition
         )
-        db.add(new_alert)
-        db.commit()
-        db.close()
+        
+        # Uyarı indeksini güncelle
+        alert_index.add(new_alert, user.id)
+        alert_id = new_alert.id
         
         # Temizle
         context.user_data.pop('waiting_for_alert_price', None)
@@ -1391,7 +1554,7 @@ async def alert_save_price(update: Update, context: ContextTypes.DEFAULT_TYPE):
 💰 Hedef: ₺{format_price(target_price)}
 ⚡ Koşul: {cond_text}
 
-Bot her 4 dakikada kontrol edip, hedefe ulaşınca bildirim gönderecek!"""
+Bot fiyat her güncellendiğinde kontrol edip, hedefe ulaşınca bildirim gönderecek!"""
         
         keyboard = [
             [InlineKeyboardButton("🔔 Uyarılarım", callback_data='alert_list')],
@@ -1400,6 +1563,9 @@ Bot her 4 dakikada kontrol edip, hedefe ulaşınca bildirim gönderecek!"""
         reply_markup = InlineKeyboardMarkup(keyboard)
         
         await update.message.reply_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        
+        # Hedef zaten aşılmışsa bir sonraki fiyat değişimini bekleme
+        await evaluate_alert(context.application, alert_id)
     
     except ValueError:
         await update.message.reply_text(
@@ -1413,6 +1579,7 @@ Bot her 4 dakikada kontrol edip, hedefe ulaşınca bildirim gönderecek!"""
 
 
 # ===== BİLDİRİM EKLEME =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='notification_add_start')
 async def notification_add_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Yeni bildirim ekleme başlat - Adım 1: Aralık seç"""
     query = update.callback_query
@@ -1434,6 +1601,7 @@ Ne sıklıkta piyasa raporu almak istersiniz?"""
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='notification_select_interval')
 async def notification_select_interval(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bildirim ekleme - Adım 2: Varlık türlerini seç"""
     query = update.callback_query
@@ -1468,6 +1636,7 @@ Hangi piyasa verilerini raporlara dahil etmek istersiniz?
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler='notification_select_types')
 async def notification_select_types(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bildirim ekleme - Adım 3: Kaydet"""
     query = update.callback_query
@@ -1482,20 +1651,11 @@ async def notification_select_types(update: Update, context: ContextTypes.DEFAUL
     
     # Veritabanına kaydet
     user = query.from_user
-    user_obj = get_or_create_user(user.id, user.username)
+    user_id = await get_user_id(user.id, user.username)
     
     interval = context.user_data['notif_interval']
     
-    db = get_db()
-    new_notification = TimeNotification(
-        user_id=user_obj.id,
-        interval=interval,
-        asset_types=asset_types,
-        is_active=True
-    )
-    db.add(new_notification)
-    db.commit()
-    db.close()
+    await add_notification(user_id, interval, asset_types)
     
     # Temizle
     context.user_data.pop('notif_interval', None)
@@ -1530,15 +1690,59 @@ Bot düzenli olarak piyasa raporu gönderecek!"""
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
 
-# ===== ANA FONKSİYON =====
-def main():
-    """Bot'u başlat"""
-    # Veritabanını başlat
-    init_db()
+# ===== YÖNETİCİ KOMUTLARI =====
+@metrics.timed(metrics.HANDLER_SECONDS, handler='loop_report')
+async def loop_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Event loop gecikmesi, en çok bloklayan çağrı yerleri ve fiyat yenileme temposu (yalnızca yöneticiler)
+    /lag sifirla - kayıtları sıfırlar
+    """
+    if update.effective_user.id not in config.ADMIN_IDS:
+        await update.message.reply_text("⛔ Bu komut yalnızca yöneticiler içindir.")
+        return
     
-    # Bot uygulamasını oluştur
-    application = Application.builder().token(config.BOT_TOKEN).build()
+    if context.args and context.args[0].lower() == 'sifirla':
+        loop_watchdog.reset()
+        await update.message.reply_text("✅ Loop bekçisi kayıtları sıfırlandı.")
+        return
     
+    # Çağrı yeri adlarında _ ve * bulunur - düz metin gönderilir (Telegram sınırı 4096)
+    # Tempo bölümü önce gelir: uzun çağrı yeri listesi kırpılsa da görünür
+    report = loop_watchdog.format_report()
+    cadence = format_cadence()
+    if cadence:
+        report = f"{cadence}\n\n{report}"
+    
+    await update.message.reply_text(report[:4000])
+
+
+# ===== ANA FONKSİYON =====
+async def on_startup(application):
+    """Bot başlarken async veritabanı motorunu ısıt ve loop bekçisini başlat (çalışan event loop gerekir)"""
+    await warm_async_db()
+    start_loop_watchdog()
+
+
+async def on_shutdown(application):
+    """Bot kapanırken loop bekçisini durdur, lider kilidini bırak, HTTP oturumunu ve async veritabanı bağlantılarını kapat"""
+    loop_watchdog.stop()
+    cluster.stop()
+    await close_session()
+    await close_async_db()
+
+
+def start_leader_tasks(application):
+    """Fiyat yenileme, uyarı değerlendirme ve periyodik bildirimler (tek / lider süreç)"""
+    start_alert_checker(application)
+    start_time_notification_checker(application)
+    
+    # İşçilerin eklediği / sildiği uyarılar lider indeksine yansıtılır
+    if cluster.role == LEADER:
+        start_alert_sync(application)
+
+
+def add_handlers(application):
+    """Komut, mesaj ve buton handler'larını uygulamaya ekle"""
     # Komut handler'ları
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("menu", menu))
@@ -1548,20 +1752,38 @@ def main():
     application.add_handler(CommandHandler("portfolio", portfolio_menu))
     application.add_handler(CommandHandler("alerts", alerts_menu))
     application.add_handler(CommandHandler("notifications", notifications_menu))
+    application.add_handler(CommandHandler("lag", loop_report))
     
     # Mesaj handler (fiyat/miktar girişi için)
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, message_handler))
     
     # Callback handler
     application.add_handler(CallbackQueryHandler(button_callback))
+
+
+def main():
+    """Bot'u başlat"""
+    # Veritabanını başlat
+    init_db()
     
-    # Arka plan görevlerini başlat
-    start_alert_checker(application)
-    start_time_notification_checker(application)
+    # Metrik ucu (/metrics) - yapılandırmada kapatılabilir
+    metrics.start_metrics_server()
+    
+    # Bot uygulamasını oluştur
+    application = Application.builder().token(config.BOT_TOKEN).post_init(on_startup).post_shutdown(on_shutdown).build()
+    add_handlers(application)
+    
+    # Arka plan görevleri - çoklu süreçte yalnızca liderde (BOT_ROLE, cluster.py)
+    cluster.start(on_leader=lambda: start_leader_tasks(application))
+    if cluster.role == WORKER and config.BOT_MODE != 'webhook':
+        logger.warning("⚠️ İşçi süreç polling ile çalışıyor - birden fazla süreç için BOT_MODE=webhook kullanın")
     
     # Bot'u çalıştır
-    logger.info("🚀 FinAlert botu başlatılıyor...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    logger.info(f"🚀 FinAlert botu başlatılıyor ({config.BOT_MODE})...")
+    if config.BOT_MODE == 'webhook':
+        run_webhook(application)
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,331 @@
+# FinAlert - Lider / işçi süreç ayrımı
+# Birden fazla bot süreci çalıştığında fiyat çekimi, uyarı değerlendirme ve
+# periyodik bildirimler yalnızca liderde yapılır (kaynaklara tek süreç gider,
+# uyarılar iki kez gönderilmez). İşçiler yalnızca kullanıcı güncellemelerini
+# işler; fiyatları liderin yazdığı paylaşılan depodan (quote_snapshots) okur.
+# - Roller (BOT_ROLE): single (tek süreç, varsayılan), leader, worker, auto
+# - auto: lider, kilit dosyası (CLUSTER_LOCK_FILE) ile seçilir; kilidi alamayan
+#   süreç işçi olur ve kilidi düzenli dener - lider kapanırsa yerini alır
+# - Kullanıcılar telegram_id'ye göre işçilere dağıtılır (shard_of): konuşma
+#   durumu (user_data) işçinin belleğinde olduğundan kullanıcı hep aynı işçiye gider
+# - Aynı makinedeki işçiler fiyatları önce paylaşılan bellekten (shared_quotes.py)
+#   okur; eşleme yoksa veya varlık düzende değilse quote_snapshots tablosuna döner
+import json
+import logging
+import os
+import time
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from database import engine, QuoteSnapshot
+from scrapers import quote_cache
+from shared_quotes import SharedQuoteMap
+from quote_stats import start_quote_stats
+import config
+import metrics
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+SINGLE = 'single'
+LEADER = 'leader'
+WORKER = 'worker'
+AUTO = 'auto'
+
+ASSET_CLASSES = ('doviz', 'altin', 'borsa')
+
+
+def shard_of(telegram_id, count):
+    """Kullanıcının işlendiği işçinin sırası (0 .. count-1)"""
+    return telegram_id % count if count > 1 else 0
+
+
+# ===== LİDER KİLİDİ =====
+class LeaderLock:
+    """
+    Kilit dosyası ile lider seçimi (engellemeyen)
+    Kilit, dosya açık kaldığı sürece tutulur; süreç kapanınca (çökse bile)
+    işletim sistemi kilidi bırakır.
+    """
+    
+    def __init__(self, path=None):
+        self.path = path or config.CLUSTER_LOCK_FILE
+        self._file = None
+    
+    @property
+    def held(self):
+        return self._file is not None
+    
+    def acquire(self):
+        """Kilidi almayı dene - alındıysa (veya zaten tutuluyorsa) True"""
+        if self._file is not None:
+            return True
+        
+        lock_file = open(self.path, 'a+')
+        try:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        
+        # Kilidi tutan sürecin PID'i (yalnızca bilgi amaçlı)
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        
+        self._file = lock_file
+        return True
+    
+    def release(self):
+        """Kilidi bırak"""
+        if self._file is None:
+            return
+        
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+# ===== PAYLAŞILAN FİYAT DEPOSU =====
+class SharedQuoteStore:
+    """Varlık sınıfı başına son veri seti (aynı SQLite dosyası, WAL ile eşzamanlı okuma)"""
+    
+    def __init__(self, bind=None):
+        self._engine = bind or engine
+    
+    def write(self, asset_class, data):
+        """Lider: yenilenen veri setini yaz (önbellek dinleyicisi)"""
+        values = {
+            'asset_class': asset_class,
+            'data': json.dumps(data, ensure_ascii=False),
+            'fetched_at': time.time(),
+            'producer': os.getpid()
+        }
+        statement = insert(QuoteSnapshot).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=['asset_class'],
+            set_={name: statement.excluded[name] for name in ('data', 'fetched_at', 'producer')}
+        )
+        
+        with self._engine.begin() as conn:
+            conn.execute(statement)
+    
+    def read(self, asset_class, max_age=None):
+        """
+        İşçi: son veri setini oku
+        
+        Returns:
+            dict: Veri seti; yoksa veya max_age saniyeden eskiyse boş sözlük
+        """
+        max_age = config.CLUSTER_MAX_AGE if max_age is None else max_age
+        
+        with self._engine.connect() as conn:
+            row = conn.execute(
+                select(QuoteSnapshot.data, QuoteSnapshot.fetched_at).where(QuoteSnapshot.asset_class == asset_class)
+            ).first()
+        
+        if row is None or time.time() - row.fetched_at > max_age:
+            return {}
+        return json.loads(row.data)
+    
+    def get_stats(self):
+        """Varlık sınıfı başına verinin yaşı (saniye) ve yazan süreç"""
+        with self._engine.connect() as conn:
+            rows = conn.execute(
+                select(QuoteSnapshot.asset_class, QuoteSnapshot.fetched_at, QuoteSnapshot.producer)
+            ).all()
+        
+        now = time.time()
+        return {row.asset_class: {'age': now - row.fetched_at, 'producer': row.producer} for row in rows}
+
+
+# ===== ROL YÖNETİMİ =====
+class Cluster:
+    """
+    Sürecin rolünü belirler ve role göre görevleri başlatır
+    
+    Kullanım:
+        cluster.start(on_leader=lambda: start_leader_tasks(application))
+    """
+    
+    def __init__(self, store=None, lock=None, quote_map=None):
+        self.store = store or SharedQuoteStore()
+        self.lock = lock or LeaderLock()
+        self.quote_map = quote_map or SharedQuoteMap()
+        self.role = SINGLE
+        self._configured = SINGLE
+        self._on_leader = None
+        self._writer_added = False
+        self._scheduler = None
+    
+    @property
+    def is_leader(self):
+        """Fiyat çekimi ve uyarı gönderimi bu süreçte mi yapılıyor? (tek süreç dahil)"""
+        return self.role in (SINGLE, LEADER)
+    
+    def start(self, on_leader, role=None):
+        """
+        Rolü belirle ve başlat
+        
+        Args:
+            on_leader: Lider görevlerini (fiyat yenileme, uyarılar, bildirimler) başlatan fonksiyon
+            role: Yapılandırmadaki rol yerine kullanılacak rol
+        """
+        self._configured = role or config.BOT_ROLE
+        self._on_leader = on_leader
+        
+        if self._configured == SINGLE:
+            self.role = SINGLE
+            on_leader()
+            return self.role
+        
+        if self._configured == WORKER:
+            self._become_worker()
+            return self.role
+        
+        if self.lock.acquire():
+            self._become_leader()
+        elif self._configured == LEADER:
+            raise SystemExit(f"❌ Lider kilidi başka bir süreçte: {self.lock.path}")
+        else:
+            self._become_worker()
+            self._schedule_election()
+        
+        return self.role
+    
+    def _become_leader(self):
+        self.role = LEADER
+        
+        for asset_class in ASSET_CLASSES:
+            quote_cache.set_reader(asset_class, None)
+        
+        if config.SHARED_QUOTES_ENABLED and not self.quote_map.open(writer=True):
+            logger.warning(f"⚠️ Paylaşılan fiyat belleği açılamadı: {self.quote_map.path}")
+        
+        # Yenilenen her veri seti paylaşılan depoya (ve belleğe) yazılır
+        if not self._writer_added:
+            quote_cache.add_listener(self._write_snapshot)
+            self._writer_added = True
+        
+        self._on_leader()
+        logger.info(f"👑 Lider süreç (PID {os.getpid()}): fiyat yenileme ve uyarılar bu süreçte")
+    
+    def _become_worker(self):
+        self.role = WORKER
+        
+        ttl = config.SHARED_QUOTES_READ_TTL if config.SHARED_QUOTES_ENABLED else config.CLUSTER_READ_TTL
+        for asset_class in ASSET_CLASSES:
+            quote_cache.set_reader(
+                asset_class,
+                lambda asset_class=asset_class: self._read_snapshot(asset_class),
+                ttl
+            )
+        
+        # Günlük değişim / ortalamalar: geçmişten yüklenir, depodan okunan fiyatlarla güncellenir
+        start_quote_stats()
+        logger.info(f"👷 İşçi süreç (PID {os.getpid()}): fiyatlar paylaşılan depodan okunuyor")
+    
+    def _write_snapshot(self, asset_class, data):
+        if self.role == LEADER and asset_class in ASSET_CLASSES:
+            if self.quote_map.is_open:
+                self.quote_map.write(asset_class, data)
+            self.store.write(asset_class, data)
+    
+    def _read_snapshot(self, asset_class):
+        if config.SHARED_QUOTES_ENABLED:
+            data = self.quote_map.read(asset_class)
+            if data is not None:
+                return data
+        return self.store.read(asset_class)
+    
+    def get_quote(self, asset_class, asset_name):
+        """
+        İşçi: tek varlığı doğrudan paylaşılan bellekten oku
+        
+        Returns:
+            dict: Varlığın alanları; tek süreç / liderde veya bellekte yoksa None
+            (çağıran önbellekli veri setine döner)
+        """
+        if self.role != WORKER or not config.SHARED_QUOTES_ENABLED:
+            return None
+        return self.quote_map.get(asset_class, asset_name)
+    
+    def _schedule_election(self):
+        # Lider kapanırsa kilidi ilk alan işçi liderliği devralır
+        self._scheduler = AsyncIOScheduler()
+        self._scheduler.add_job(
+            self._try_promote,
+            'interval',
+            seconds=config.CLUSTER_LOCK_RETRY,
+            id='leader_election'
+        )
+        self._scheduler.start()
+    
+    async def _try_promote(self):
+        if self.role == LEADER or not self.lock.acquire():
+            return
+        
+        self._scheduler.remove_job('leader_election')
+        logger.warning("⚠️ Lider kilidi boşaldı - liderlik devralınıyor")
+        self._become_leader()
+    
+    def stop(self):
+        """Kilidi bırak (kapanışta)"""
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+        self.lock.release()
+        self.quote_map.close()
+    
+    def get_stats(self):
+        """Rol, kilit ve paylaşılan deponun durumu"""
+        return {
+            'role': self.role,
+            'configured': self._configured,
+            'pid': os.getpid(),
+            'lock_held': self.lock.held,
+            'snapshots': self.store.get_stats(),
+            'shared_memory': self.quote_map.get_stats()
+        }
+
+
+cluster = Cluster()
+
+
+def get_cluster_stats():
+    """Süreç rolü ve paylaşılan fiyat deposu özeti"""
+    return cluster.get_stats()
+
+
+@metrics.register_collector
+def _collect_metrics():
+    yield ('finalert_cluster_leader', 'gauge', 'Fiyat yenileme ve uyarılar bu süreçte mi (1 = tek süreç / lider)',
+           {'rol': cluster.role}, int(cluster.is_leader))
+    
+    if cluster.role != SINGLE:
+        for asset_class, stats in cluster.store.get_stats().items():
+            yield ('finalert_shared_quote_age_seconds', 'gauge', 'Paylaşılan depodaki verinin yaşı',
+                   {'varlik': asset_class}, stats['age'])
+        
+        stats = cluster.quote_map.get_stats()
+        for sonuc in ('reads', 'retries', 'fallbacks'):
+            yield ('finalert_shared_memory_reads_total', 'counter',
+                   'Paylaşılan bellek okumaları (retries = yazım sürerken tekrar, fallbacks = depoya dönüş)',
+                   {'sonuc': sonuc}, stats[sonuc])
+        yield ('finalert_shared_memory_writes_total', 'counter', 'Paylaşılan belleğe yazılan veri setleri',
+               {}, stats['writes'])
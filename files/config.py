@@ -4,17 +4,177 @@ import os
 # Telegram Bot Token (BotFather'dan alınacak)
 BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', 'TOKEN KODUNU BURAYA YAPIŞTIRIN!')
 
+# Güncelleme alma yöntemi: 'polling' (varsayılan) veya 'webhook'
+BOT_MODE = os.getenv('BOT_MODE', 'polling')
+
+# Webhook - TLS sonlandıran ters vekil (nginx vb.) arkasında çalışması beklenir
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')        # Telegram'a bildirilecek genel adres; boşsa setWebhook yapılmaz
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '8080'))
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')  # Boşsa her başlatmada üretilir (birden fazla süreçte aynı verilmeli)
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', '8'))   # Aynı anda işlenen güncelleme sayısı
+WEBHOOK_QUEUE_SIZE = 1000          # İşçi başına kuyruk sınırı (doluysa 503, Telegram tekrar gönderir)
+WEBHOOK_MAX_CONNECTIONS = 40       # Telegram'ın aynı anda açacağı en fazla bağlantı
+# Yönlendirici: doluysa güncellemeler kullanıcının işçisine (telegram_id % işçi sayısı) aktarılır
+# Örn. "http://127.0.0.1:8081/telegram,http://127.0.0.1:8082/telegram"
+WEBHOOK_ROUTES = [adres.strip() for adres in os.getenv('WEBHOOK_ROUTES', '').split(',') if adres.strip()]
+
+# Süreç rolü (cluster.py) - fiyat çekimi, uyarılar ve bildirimler yalnızca liderde yapılır
+# single: tek süreç (varsayılan) | leader | worker | auto: kilit dosyasıyla lider seçimi
+BOT_ROLE = os.getenv('BOT_ROLE', 'single')
+CLUSTER_LOCK_FILE = os.getenv('CLUSTER_LOCK_FILE', 'finalert.leader.lock')
+CLUSTER_LOCK_RETRY = 10        # İşçi, lider kilidini bu aralıkla (saniye) yeniden dener
+CLUSTER_READ_TTL = 5           # İşçide paylaşılan depodan okunan verinin önbellek süresi (saniye)
+CLUSTER_MAX_AGE = 3 * 3600     # Bundan eski depo verisi kullanılmaz (piyasa kapalıyken yenileme 1 saat)
+CLUSTER_SYNC_INTERVAL = 5      # Lider, işçilerin eklediği uyarıları bu aralıkla indekse alır (saniye)
+# Paylaşılan bellek fiyat görüntüsü (shared_quotes.py) - aynı makinedeki işçiler fiyatları
+# veritabanı yerine mmap dosyasından okur (düzende olmayan varlıklarda depoya dönülür)
+SHARED_QUOTES_ENABLED = os.getenv('SHARED_QUOTES_ENABLED', '1') != '0'
+SHARED_QUOTES_FILE = os.getenv('SHARED_QUOTES_FILE', 'finalert.quotes.mmap')
+SHARED_QUOTES_READ_TTL = 1     # Bellekten okuma ucuz olduğundan işçi önbelleği kısa tutulur (saniye)
+
 # Veritabanı
 DATABASE_URL = 'sqlite:///finalert.db'
+DB_POOL_SIZE = 5        # Havuzda açık tutulan bağlantı sayısı
+DB_MAX_OVERFLOW = 10    # Yoğunlukta açılabilecek ek bağlantı
+# Async motor (handler'lar) - SQLite tek yazıcılı; ek bağlantılar yazma kilidinde busy_timeout ile
+# geri çekilip kuyruktan uzun bekler. Küçük, taşmasız havuz kuyruğu havuzda tutar (db_benchmark.py)
+DB_ASYNC_POOL_SIZE = 3      # Aynı anda en fazla 3 sorgu (okuma paralelliğinden feragat)
+DB_ASYNC_MAX_OVERFLOW = 0
+# SQLite performans ayarları - her yeni bağlantıda uygulanır
+DB_PRAGMAS = {
+    'journal_mode': 'WAL',      # Okuyucular yazarı beklemez
+    'synchronous': 'NORMAL',    # WAL ile güvenli, her commit'te fsync yok
+    'cache_size': -20000,       # ~20 MB sayfa önbelleği (negatif = KB)
+    'mmap_size': 268435456,     # 256 MB bellek eşlemeli okuma
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000        # Kilitli veritabanında 5 sn bekle (ms)
+}
+
+# Fiyat geçmişi (quote_history.py)
+HISTORY_ENABLED = True
+HISTORY_FLUSH_SECONDS = 5      # Biriken fiyatların veritabanına toplu yazılma aralığı
+# Çubuk çözünürlükleri (saniye) - günlük çubuklar Türkiye saatine göre
+HISTORY_RESOLUTIONS = {
+    '1m': 60,
+    '1h': 3600,
+    '1d': 86400
+}
+# Saklama süreleri (gün) - None: süresiz
+HISTORY_RETENTION_DAYS = {
+    'tick': 7,
+    '1m': 30,
+    '1h': 365,
+    '1d': None
+}
+
+# Anlık istatistikler (quote_stats.py) - her fiyat değişiminde O(1) güncellenir
+STATS_WINDOWS = {            # Kayan pencereler: en düşük / en yüksek / ortalama / oynaklık
+    '1h': 3600,
+    '24h': 86400
+}
+STATS_MA_PERIODS = {         # Çözünürlük -> hareketli ortalama periyotları (tamamlanan çubuk sayısı)
+    '1h': (20, 50),
+    '1d': (7, 20, 50)
+}
+STATS_MAX_BARS = 400         # Çözünürlük başına bellekte tutulan tamamlanmış çubuk
+ALERT_BREAKOUT_DAYS = (7, 30, 90)   # Zirve/dip kırılımı uyarılarında seçilebilen gün sayıları
+
+# Kullanıcı kimlik önbelleği (data_access.py) - telegram_id -> users.id
+USER_CACHE_SIZE = 50000     # En fazla tutulan kullanıcı (en az kullanılan düşer)
+USER_CACHE_TTL = 600        # Kaydın geçerlilik süresi (saniye) - başka süreçteki silme/pasifleştirme en geç bu sürede görülür
 
 # Scraping ayarları
 REQUEST_TIMEOUT = 10
 REQUEST_DELAY = 2  # Saniye cinsinden istekler arası bekleme süresi
+REQUEST_JITTER = True  # İstek öncesi rastgele bekleme (ban önlemi) - ölçümlerde kapatılır
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+HTTP_MAX_CONNECTIONS = 20          # Async oturumdaki toplam bağlantı sınırı
+HTTP_MAX_CONNECTIONS_PER_HOST = 4  # Aynı siteye aynı anda en fazla bağlantı
+HTTP_CONDITIONAL_REQUESTS = True   # ETag/Last-Modified ile koşullu istek (304'te yeniden ayrıştırma yok)
+
+# Hedged (paralel yedekli) çekim - öncelikli kaynak geç kalırsa sıradaki paralel başlatılır
+HEDGED_FETCH = True
+HEDGE_DELAY = 1.5          # Sıradaki kaynağı başlatmadan önce beklenecek süre (saniye)
+HEDGE_MAX_PARALLEL = 3     # Aynı anda en fazla kaç kaynak denenir
+
+# Kaynak sağlığı ve devre kesici (circuit breaker)
+SOURCE_HEALTH_WINDOW = 50         # Başarı oranı / gecikme için son kaç çağrı tutulur
+SOURCE_FAILURE_THRESHOLD = 3      # Art arda bu kadar hatada kaynak devresi açılır (atlanır)
+SOURCE_OPEN_SECONDS = 120         # Açık devrenin tekrar denenmeden önce bekleyeceği süre
+SOURCE_ADAPTIVE_ORDER = True      # Zinciri en hızlı sağlıklı kaynaktan başlayarak sırala
+SOURCE_LATENCY_BUCKET = 0.5       # Bu farktan (saniye) küçük gecikmeler eşit sayılır, öncelik korunur
+
+# Fiyat önbelleği - aynı verinin her buton/kontrolde tekrar çekilmesini engeller
+CACHE_TTL = {
+    'doviz': 60,   # saniye
+    'altin': 60,
+    'borsa': 120
+}
+CACHE_ERROR_TTL = 15  # Başarısız çekim sonucu kısa süre tutulur (kaynaklara yüklenmemek için)
+
+# Borsa sembol evreni (XU100 endeksi ayrıca her zaman çekilir)
+# BORSA_SEMBOLLERI ortam değişkeniyle değiştirilebilir: "THYAO,GARAN,ASELS"
+BORSA_SEMBOLLERI = [
+    kod.strip().upper()
+    for kod in os.getenv('BORSA_SEMBOLLERI', 'THYAO,GARAN,AKBNK,EREGL,SAHOL,TUPRS,PETKM,SISE').split(',')
+    if kod.strip()
+]
 
 # Bildirim kontrol aralığı (dakika)
 ALERT_CHECK_INTERVAL = 4  # Her 4 dakikada kontrol et (ÇOK GÜVENLİ - BAN RİSKİ %0)
 
+# Fiyat yenileme (uyarılar yalnızca değişen fiyatlar için değerlendirilir)
+# Aralık piyasa saatine, oynaklığa ve hedefe yakın uyarı sayısına göre ayarlanır
+POLL_INTERVALS = {   # saniye - seans durumuna göre temel aralık
+    'doviz': {'open': 120, 'quiet': 600, 'closed': 3600},
+    'altin': {'open': 120, 'quiet': 600, 'closed': 3600},
+    'hisse': {'open': 120, 'quiet': 900, 'closed': 3600}
+}
+POLL_MIN_INTERVAL = 30          # Hiçbir durumda bundan sık yenilenmez (saniye)
+POLL_NEAR_ALERT_PCT = 0.5       # Hedefi fiyata %0,5 yakın uyarılar "yakın" sayılır
+POLL_NEAR_ALERT_MAX = 6         # Yakın uyarı hızlandırmasının üst sınırı (uyarı sayısı)
+POLL_VOLATILITY_REF = 0.3       # Yenileme başına %0,3 ortalama hareket = 2x hız
+
+# Kaynak istek bütçesi - varlık sınıfı başına saatte en fazla kaynak çekimi
+# (kullanıcı sorgularıyla yapılan çekimler de sayılır; ban riskini sınırlar)
+REQUEST_BUDGET_PER_HOUR = {
+    'doviz': 60,
+    'altin': 60,
+    'hisse': 60
+}
+
+# Borsa İstanbul seans saatleri (Türkiye saati, UTC+3)
+BIST_SEANS = ('10:00', '18:10')
+# Piyasaların kapalı olduğu resmi tatiller (AA-GG her yıl, YYYY-AA-GG tek seferlik)
+# Dini bayramlar her yıl değişir - BIST_TATILLERI ortam değişkeniyle eklenebilir
+PIYASA_TATILLERI = ['01-01', '04-23', '05-01', '05-19', '07-15', '08-30', '10-29'] + [
+    gun.strip() for gun in os.getenv('BIST_TATILLERI', '').split(',') if gun.strip()
+]
+
+# Telegram gönderim sınırları (toplu uyarı/rapor dağıtımı)
+SEND_WORKERS = 8                   # Eşzamanlı gönderici sayısı
+TELEGRAM_GLOBAL_RATE = 25          # Saniyede en fazla mesaj (Telegram sınırı ~30)
+TELEGRAM_PER_CHAT_INTERVAL = 1.0   # Aynı sohbete iki mesaj arası en az süre (saniye)
+SEND_MAX_RETRIES = 3               # Ağ hatası / RetryAfter sonrası en fazla tekrar
+
+# Yönetici Telegram ID'leri (virgülle ayrılmış) - /lag gibi yönetici komutları için
+ADMIN_IDS = {
+    int(kimlik) for kimlik in os.getenv('ADMIN_IDS', '').split(',') if kimlik.strip().isdigit()
+}
+
+# Event loop bekçisi - loop'u bloklayan senkron çağrıları bulur
+LOOP_WATCHDOG_ENABLED = True
+LOOP_LAG_INTERVAL = 0.1     # Kalp atışı aralığı (saniye)
+LOOP_LAG_THRESHOLD = 0.1    # Bu gecikmeden (saniye) uzun bloklamalarda yığın alınır
+LOOP_WATCHDOG_TOP = 10      # Raporda gösterilecek çağrı yeri sayısı
+
+# Metrikler - Prometheus metin biçiminde yerel HTTP ucu (/metrics)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') != '0'
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')   # Yalnızca yerel erişim
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+
 # Zaman bazlı bildirim seçenekleri
 TIME_INTERVALS = {
     'her_saat': 3600,
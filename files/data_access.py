@@ -0,0 +1,287 @@
+# FinAlert - Handler'lar için async veri erişimi
+# Bot handler'ları event loop üzerinde çalışır; senkron SQLAlchemy oturumu her
+# sorguda loop'u bloklar. Buradaki fonksiyonlar async oturumla (aiosqlite)
+# çalışır ve await edilir. Dönen nesneler oturum kapandıktan sonra da okunabilir
+# (expire_on_commit=False); ilişkiler (user.alerts vb.) yüklenmez.
+# Portföy işlemleri portfolio_manager.py'dedir.
+# Kullanıcı kimlik önbelleği (telegram_id -> users.id) neredeyse her etkileşimde
+# yapılan kullanıcı sorgusunu ortadan kaldırır.
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import select, func, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import get_async_db, async_session_scope, User, Alert, TimeNotification
+import config
+import metrics
+
+
+# ===== KULLANICI KİMLİK ÖNBELLEĞİ =====
+class UserIdentityCache:
+    """
+    telegram_id -> users.id eşlemesi (sınırlı LRU + TTL)
+    - Yalnızca aktif kullanıcılar tutulur; oluşturulan kullanıcı hemen yazılır (write-through)
+    - Kullanıcı satırı güncellenir / silinirse kayıt düşürülür (ORM olayları, aşağıda)
+    - Başka süreçteki veya ORM dışındaki değişiklikler en geç TTL sonunda görülür
+    - İsabet / ıska / süre dolumu / taşma / geçersizleştirme sayaçları
+    """
+    
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # telegram_id -> (user_id, bitiş zamanı - monotonic)
+        self._owners = {}               # user_id -> telegram_id (satır olaylarında geçersizleştirme için)
+        self.stats = {'hit': 0, 'miss': 0, 'expired': 0, 'evicted': 0, 'invalidated': 0}
+    
+    def get(self, telegram_id):
+        """Kullanıcının id'si; önbellekte yoksa veya süresi dolduysa None"""
+        with self._lock:
+            entry = self._entries.get(telegram_id)
+            if entry is None:
+                self.stats['miss'] += 1
+                return None
+            
+            if time.monotonic() >= entry[1]:
+                self._drop_locked(telegram_id)
+                self.stats['expired'] += 1
+                self.stats['miss'] += 1
+                return None
+            
+            self._entries.move_to_end(telegram_id)
+            self.stats['hit'] += 1
+            return entry[0]
+    
+    def put(self, telegram_id, user_id):
+        with self._lock:
+            if telegram_id in self._entries:
+                self._drop_locked(telegram_id)
+            
+            self._entries[telegram_id] = (user_id, time.monotonic() + self.ttl)
+            self._owners[user_id] = telegram_id
+            
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._drop_locked(oldest)
+                self.stats['evicted'] += 1
+    
+    def invalidate(self, telegram_id=None):
+        """Kullanıcının kaydını (veya tamamını) düşür"""
+        with self._lock:
+            if telegram_id is None:
+                self.stats['invalidated'] += len(self._entries)
+                self._entries.clear()
+                self._owners.clear()
+            elif telegram_id in self._entries:
+                self._drop_locked(telegram_id)
+                self.stats['invalidated'] += 1
+    
+    def invalidate_user(self, user_id):
+        """users.id ile geçersizleştir (satır olaylarında telegram_id değişmiş olabilir)"""
+        with self._lock:
+            telegram_id = self._owners.get(user_id)
+        if telegram_id is not None:
+            self.invalidate(telegram_id)
+    
+    def _drop_locked(self, telegram_id):
+        user_id, _ = self._entries.pop(telegram_id)
+        if self._owners.get(user_id) == telegram_id:
+            del self._owners[user_id]
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+    
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats, size=len(self._entries))
+        
+        total = stats['hit'] + stats['miss']
+        stats['hit_rate'] = stats['hit'] / total if total else 0.0
+        return stats
+
+
+user_cache = UserIdentityCache(config.USER_CACHE_SIZE, config.USER_CACHE_TTL)
+
+
+# Geçersizleştirme kancaları - senkron ve async oturumların hepsinde çalışır
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    user_cache.invalidate_user(target.id)
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    user_cache.invalidate_user(target.id)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _user_bulk_changed(orm_execute_state):
+    # update(User) / delete(User) toplu sorguları satır olayı üretmez - önbellek tamamen temizlenir
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        user_cache.invalidate()
+
+
+@metrics.register_collector
+def _collect_metrics():
+    stats = user_cache.get_stats()
+    for sonuc in ('hit', 'miss'):
+        yield ('finalert_user_cache_requests_total', 'counter', 'Kullanıcı kimlik önbelleği istekleri',
+               {'sonuc': sonuc}, stats[sonuc])
+    for neden in ('expired', 'evicted', 'invalidated'):
+        yield ('finalert_user_cache_drops_total', 'counter', 'Önbellekten düşen kayıtlar (süre, taşma, geçersizleştirme)',
+               {'neden': neden}, stats[neden])
+    yield ('finalert_user_cache_hit_ratio', 'gauge', 'Kullanıcı tablosuna gitmeden çözülen isteklerin oranı',
+           {}, stats['hit_rate'])
+    yield ('finalert_user_cache_size', 'gauge', 'Önbellekteki kullanıcı sayısı', {}, stats['size'])
+
+
+# ===== KULLANICILAR =====
+async def get_or_create_user(telegram_id, username=None):
+    """Kullanıcıyı veritabanında al veya oluştur (aktif kullanıcı kimlik önbelleğine yazılır)"""
+    async with get_async_db() as db:
+        user = (await db.execute(select(User).where(User.telegram_id == telegram_id))).scalars().first()
+        
+        if not user:
+            user = User(telegram_id=telegram_id, username=username)
+            db.add(user)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Aynı kullanıcının eşzamanlı başka bir güncellemesi kaydı önce oluşturdu
+                await db.rollback()
+                user = (await db.execute(select(User).where(User.telegram_id == telegram_id))).scalars().one()
+    
+    if user.is_active:
+        user_cache.put(telegram_id, user.id)
+    
+    return user
+
+
+async def get_user_id(telegram_id, username=None):
+    """
+    Kullanıcının users.id değeri - önbellekteyse veritabanına gidilmez,
+    değilse kullanıcı alınır veya oluşturulur
+    """
+    user_id = user_cache.get(telegram_id)
+    if user_id is not None:
+        return user_id
+    
+    user = await get_or_create_user(telegram_id, username)
+    return user.id
+
+
+def get_user_cache_stats():
+    """Kullanıcı kimlik önbelleği istatistikleri"""
+    return user_cache.get_stats()
+
+
+# ===== UYARILAR =====
+async def get_active_alerts(user_id):
+    """Kullanıcının aktif uyarıları"""
+    async with get_async_db() as db:
+        result = await db.execute(
+            select(Alert).where(Alert.user_id == user_id, Alert.is_active == True)
+        )
+        return result.scalars().all()
+
+
+async def count_active_alerts(user_id):
+    """Kullanıcının aktif uyarı sayısı (nesneler yüklenmez)"""
+    async with get_async_db() as db:
+        return await db.scalar(
+            select(func.count(Alert.id)).where(Alert.user_id == user_id, Alert.is_active == True)
+        )
+
+
+async def add_alert(user_id, **fields):
+    """
+    Yeni uyarı kaydet
+    
+    Args:
+        user_id: Kullanıcı ID'si
+        **fields: Alert sütunları (asset_type, asset_name, target_price, condition, kind...)
+    
+    Returns:
+        Alert: Kaydedilen uyarı (id atanmış)
+    """
+    async with async_session_scope() as db:
+        alert = Alert(user_id=user_id, is_active=True, **fields)
+        db.add(alert)
+    
+    return alert
+
+
+async def deactivate_alert(user_id, alert_id):
+    """
+    Kullanıcının uyarısını pasifleştir (soft delete - is_active = False)
+    
+    Returns:
+        Alert: Pasifleştirilen uyarı; bulunamazsa None
+    """
+    async with async_session_scope() as db:
+        alert = (await db.execute(
+            select(Alert).where(Alert.id == alert_id, Alert.user_id == user_id)
+        )).scalars().first()
+        
+        if alert:
+            alert.is_active = False
+    
+    return alert
+
+
+# ===== ZAMAN BAZLI BİLDİRİMLER =====
+async def get_active_notifications(user_id):
+    """Kullanıcının aktif bildirimleri"""
+    async with get_async_db() as db:
+        result = await db.execute(
+            select(TimeNotification).where(TimeNotification.user_id == user_id, TimeNotification.is_active == True)
+        )
+        return result.scalars().all()
+
+
+async def count_active_notifications(user_id):
+    """Kullanıcının aktif bildirim sayısı (nesneler yüklenmez)"""
+    async with get_async_db() as db:
+        return await db.scalar(
+            select(func.count(TimeNotification.id)).where(
+                TimeNotification.user_id == user_id, TimeNotification.is_active == True
+            )
+        )
+
+
+async def add_notification(user_id, interval, asset_types):
+    """Yeni zaman bazlı bildirim kaydet"""
+    async with async_session_scope() as db:
+        notification = TimeNotification(
+            user_id=user_id,
+            interval=interval,
+            asset_types=asset_types,
+            is_active=True
+        )
+        db.add(notification)
+    
+    return notification
+
+
+async def deactivate_notification(user_id, notif_id):
+    """
+    Kullanıcının bildirimini pasifleştir (soft delete - is_active = False)
+    
+    Returns:
+        TimeNotification: Pasifleştirilen bildirim; bulunamazsa None
+    """
+    async with async_session_scope() as db:
+        notification = (await db.execute(
+            select(TimeNotification).where(TimeNotification.id == notif_id, TimeNotification.user_id == user_id)
+        )).scalars().first()
+        
+        if notification:
+            notification.is_active = False
+    
+    return notification
@@ -1,12 +1,97 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, ForeignKey
+from sqlalchemy import create_engine, event, text, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from contextlib import contextmanager, asynccontextmanager
 from datetime import datetime
+import time
 import config
+import metrics
 
 Base = declarative_base()
-engine = create_engine(config.DATABASE_URL, echo=False)
-SessionLocal = sessionmaker(bind=engine)
+
+
+def _create_engine(url):
+    """SQLite için havuzlu, thread'ler arası paylaşılabilen motor"""
+    if not url.startswith('sqlite'):
+        return create_engine(url, echo=False)
+    
+    engine = create_engine(
+        url,
+        echo=False,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        connect_args={'check_same_thread': False}
+    )
+    
+    return _apply_pragmas(engine)
+
+
+def _create_async_engine(url):
+    """
+    Handler'lar için async motor (SQLite: aiosqlite)
+    Sorgular aiosqlite'ın kendi thread'inde çalışır, event loop beklemez.
+    Aynı dosyayı senkron motorla paylaşır; PRAGMA'lar ve metrikler ortaktır.
+    """
+    if url.startswith('sqlite:'):
+        url = url.replace('sqlite:', 'sqlite+aiosqlite:', 1)
+    elif not url.startswith('sqlite+aiosqlite:'):
+        return create_async_engine(url, echo=False)
+    
+    engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=config.DB_ASYNC_POOL_SIZE,
+        max_overflow=config.DB_ASYNC_MAX_OVERFLOW
+    )
+    
+    _apply_pragmas(engine.sync_engine)
+    return engine
+
+
+def _apply_pragmas(engine):
+    """Her yeni SQLite bağlantısında config.DB_PRAGMAS uygulanır"""
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in config.DB_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    
+    return engine
+
+
+def _instrument(engine):
+    """Sorgu sürelerini işlem türüne göre (select, insert, ...) metriğe yaz"""
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metrics_start', []).append(time.perf_counter())
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info['_metrics_start'].pop()
+        islem = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else 'bos'
+        metrics.DB_QUERY_SECONDS.observe(time.perf_counter() - start, islem=islem)
+    
+    @event.listens_for(engine, 'handle_error')
+    def _error(context):
+        starts = context.connection.info.get('_metrics_start') if context.connection is not None else None
+        if starts:
+            starts.pop()
+    
+    return engine
+
+
+engine = _instrument(_create_engine(config.DATABASE_URL))
+# Commit sonrası nesneler yeniden yüklenmez (oturum kapandıktan sonra da okunabilir)
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+async_engine = _create_async_engine(config.DATABASE_URL)
+_instrument(async_engine.sync_engine)
+# Async oturumlarda tembel yükleme (lazy load) yapılamaz - nesneler commit sonrası da okunabilir kalmalı
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
 
 
 class User(Base):
@@ -38,6 +123,10 @@ class Portfolio(Base):
     purchase_date = Column(DateTime, default=datetime.now)
     
     user = relationship("User", back_populates="portfolios")
+    
+    __table_args__ = (
+        Index('ix_portfolios_user_asset', 'user_id', 'asset_type', 'asset_name'),
+    )
 
 
 class Alert(Base):
@@ -53,8 +142,19 @@ class Alert(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.now)
     triggered_at = Column(DateTime, nullable=True)
+    # Uyarı türü: fiyat (hedef fiyat), yuzde (pencerede % hareket),
+    # ortalama (hareketli ortalama kesişimi), kirilim (N günlük zirve/dip)
+    kind = Column(String, nullable=False, default='fiyat', server_default='fiyat')
+    timeframe = Column(String, nullable=True)   # yuzde: 1h/24h, ortalama: 1h/1d
+    period = Column(Integer, nullable=True)     # ortalama: çubuk sayısı, kirilim: gün sayısı
+    threshold = Column(Float, nullable=True)    # yuzde: yüzde eşiği
     
     user = relationship("User", back_populates="alerts")
+    
+    __table_args__ = (
+        Index('ix_alerts_user_active', 'user_id', 'is_active'),
+        Index('ix_alerts_active_asset', 'is_active', 'asset_type', 'asset_name'),
+    )
 
 
 class TimeNotification(Base):
@@ -69,23 +169,198 @@ class TimeNotification(Base):
     last_sent = Column(DateTime, nullable=True)
     
     user = relationship("User", back_populates="notifications")
+    
+    __table_args__ = (
+        Index('ix_time_notifications_active_user', 'is_active', 'user_id'),
+        Index('ix_time_notifications_user_active', 'user_id', 'is_active'),
+    )
+
+
+class QuoteTick(Base):
+    """
+    Fiyat geçmişi - her fiyat değişiminin ham kaydı (quote_history.py yazar)
+    
+    Birincil anahtar (varlık, zaman) sırasıyla saklanan WITHOUT ROWID tablo:
+    satırlar anahtar sırasında tutulur, zaman aralığı sorguları ayrı indekse
+    ve tabloya ikinci okumaya gerek kalmadan tek aralık taramasıyla yapılır.
+    """
+    __tablename__ = 'quote_ticks'
+    
+    asset_type = Column(String, primary_key=True)  # doviz, altin, hisse
+    asset_name = Column(String, primary_key=True)  # USD, gram_altin, THYAO vb.
+    ts = Column(Integer, primary_key=True)         # Unix zamanı (saniye)
+    source = Column(String, nullable=True)         # Kaynak etiketi (link1, link2, ...)
+    alis = Column(Float, nullable=True)
+    satis = Column(Float, nullable=True)           # Hisselerde değer
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+
+
+class QuoteBar(Base):
+    """Fiyat geçmişi - 1m / 1h / 1d OHLC çubukları (satış / değer fiyatı)"""
+    __tablename__ = 'quote_bars'
+    
+    asset_type = Column(String, primary_key=True)
+    asset_name = Column(String, primary_key=True)
+    resolution = Column(String, primary_key=True)  # 1m, 1h, 1d
+    ts = Column(Integer, primary_key=True)         # Çubuk başlangıcı (Unix zamanı)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False, default=1)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+
+
+class QuoteSnapshot(Base):
+    """
+    Paylaşılan fiyat deposu - lider sürecin son çektiği veri seti
+    İşçi süreçleri fiyatları kaynaklardan değil buradan okur
+    """
+    __tablename__ = 'quote_snapshots'
+    
+    asset_class = Column(String, primary_key=True)  # doviz, altin, borsa
+    data = Column(String, nullable=False)            # Kaynak zincirinin sonucu (JSON, '_kaynak' dahil)
+    fetched_at = Column(Float, nullable=False)       # Unix zamanı
+    producer = Column(Integer, nullable=True)        # Yazan sürecin PID'i
+
+
+# ===== ŞEMA GÖÇLERİ =====
+# Mevcut finalert.db dosyaları açılışta güncellenir. Sürüm PRAGMA user_version
+# ile tutulur; her göç idempotenttir (yeni oluşturulan veritabanında da çalışır).
+def _migrate_indexes(conn):
+    """Sık kullanılan filtreler için bileşik indeksler"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def _migrate_quote_history(conn):
+    """Fiyat geçmişi tabloları"""
+    QuoteTick.__table__.create(bind=conn, checkfirst=True)
+    QuoteBar.__table__.create(bind=conn, checkfirst=True)
+
+
+def _migrate_alert_rules(conn):
+    """Uyarı türü ve kural parametreleri sütunları"""
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_info(alerts)"))}
+    new_columns = [
+        ('kind', "VARCHAR NOT NULL DEFAULT 'fiyat'"),
+        ('timeframe', 'VARCHAR'),
+        ('period', 'INTEGER'),
+        ('threshold', 'FLOAT')
+    ]
+    
+    for name, ddl in new_columns:
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE alerts ADD COLUMN {name} {ddl}"))
+
+
+def _migrate_quote_snapshots(conn):
+    """Lider / işçi süreçleri için paylaşılan fiyat deposu"""
+    QuoteSnapshot.__table__.create(bind=conn, checkfirst=True)
+
+
+MIGRATIONS = [
+    (1, _migrate_indexes),
+    (2, _migrate_quote_history),
+    (3, _migrate_alert_rules),
+    (4, _migrate_quote_snapshots),
+]
+
+
+def migrate_db():
+    """Bekleyen şema göçlerini sırayla uygula"""
+    with engine.begin() as conn:
+        version = conn.execute(text("PRAGMA user_version")).scalar() or 0
+        
+        for target, migration in MIGRATIONS:
+            if target > version:
+                migration(conn)
+                conn.execute(text(f"PRAGMA user_version={target}"))
+                print(f"✅ Veritabanı şeması güncellendi: v{target}")
+                version = target
+        
+        # Sorgu planlayıcısı için istatistikleri tazele
+        conn.execute(text("PRAGMA optimize"))
 
 
 def init_db():
     """Veritabanını başlat"""
     Base.metadata.create_all(engine)
+    migrate_db()
     print("✅ Veritabanı başarıyla oluşturuldu!")
 
 
 def get_db():
-    """Veritabanı oturumu al"""
+    """
+    Veritabanı oturumu al
+    
+    Oturum 'with' ile kullanılmalıdır, hata durumunda da kapanır:
+        with get_db() as db:
+            ...
+    """
+    return SessionLocal()
+
+
+@contextmanager
+def session_scope():
+    """
+    Yazma işlemleri için oturum - başarılıysa commit, hata varsa rollback,
+    her durumda kapatılır
+    """
     db = SessionLocal()
     try:
-        return db
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
-        pass
+        db.close()
+
+
+def get_async_db():
+    """
+    Async veritabanı oturumu al (handler'lar için - event loop'u bloklamaz)
+    
+    Oturum 'async with' ile kullanılmalıdır:
+        async with get_async_db() as db:
+            result = await db.execute(select(User)...)
+    """
+    return AsyncSessionLocal()
+
+
+@asynccontextmanager
+async def async_session_scope():
+    """
+    Async yazma işlemleri için oturum - başarılıysa commit, hata varsa rollback,
+    her durumda kapatılır
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def warm_async_db():
+    """
+    Async motoru kullanıma hazırla (bot başlarken, istekler gelmeden önce)
+    İlk bağlantıda dialect başlatılır; bu tek seferlik adım eşzamanlı ilk
+    kullanımda bağlantıları birbirine bekletir. Tek bağlantı açıp kapatmak yeter.
+    """
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def close_async_db():
+    """Async motorun bağlantılarını kapat (bot kapanırken)"""
+    await async_engine.dispose()
 
 
 if __name__ == '__main__':
     init_db()
-
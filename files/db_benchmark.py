@@ -0,0 +1,242 @@
+# FinAlert - Veritabanı erişimi event loop gecikmesi karşılaştırması
+# Handler'ların yaptığı veritabanı işlemleri (kullanıcı al/oluştur, uyarı ve
+# bildirim listele/ekle/sil, portföy listele/ekle) eşzamanlı sanal kullanıcılarla
+# iki yoldan çalıştırılır:
+# - senkron: eski handler kodu gibi event loop içinde senkron oturum (get_db)
+# - async:   data_access.py / portfolio_manager.py (aiosqlite, AsyncSession) ve
+#            kullanıcı kimlik önbelleği
+# Her yol için işlem süresi ve event loop gecikmesi (10 ms'lik uykuların ne kadar
+# geç uyandığı) ölçülür. Ayrı, geçici bir veritabanı kullanılır; ağa çıkılmaz.
+#
+# Kullanım:
+#     python db_benchmark.py                     # 10, 100, 500 kullanıcı, 5'er saniye
+#     python db_benchmark.py -k 50,1000 -s 10    # kullanıcı sayıları ve süre
+import argparse
+import asyncio
+import io
+import os
+import random
+import tempfile
+import time
+from contextlib import redirect_stdout
+import config
+
+# Ölçüm ayrı veritabanında çalışır - database modülü yüklenmeden önce ayarlanmalı
+VERITABANI = os.path.join(tempfile.gettempdir(), 'finalert_db_benchmark.db')
+config.DATABASE_URL = f"sqlite:///{VERITABANI}"
+
+import database
+import data_access
+import portfolio_manager
+from database import get_db, User, Portfolio, Alert, TimeNotification
+
+KULLANICI_BASI = 10 ** 9
+DONGU_ARALIGI = 0.01            # Event loop gecikmesi ölçüm aralığı (saniye)
+ISLEMLER = ('kullanici', 'uyari_listele', 'uyari_ekle', 'uyari_sil', 'bildirim_listele', 'bildirim_ekle',
+            'portfoy_listele', 'portfoy_ekle')
+
+
+def _yuzdelik(degerler, yuzde):
+    if not degerler:
+        return 0.0
+    degerler = sorted(degerler)
+    return degerler[min(len(degerler) - 1, int(round(yuzde / 100 * (len(degerler) - 1))))]
+
+
+# ===== SENKRON YOL (handler'ların önceki kodu) =====
+def _senkron_kullanici(telegram_id):
+    with get_db() as db:
+        user = db.query(User).filter(User.telegram_id == telegram_id).first()
+        
+        if not user:
+            user = User(telegram_id=telegram_id, username=f"db_{telegram_id}")
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+    
+    return user
+
+
+def _senkron_islem(islem, user_id):
+    with get_db() as db:
+        if islem == 'uyari_listele':
+            db.query(Alert).filter(Alert.user_id == user_id, Alert.is_active == True).all()
+        elif islem == 'uyari_ekle':
+            db.add(Alert(user_id=user_id, asset_type='doviz', asset_name='USD', target_price=40.0,
+                         condition='ustu', is_active=True))
+            db.commit()
+        elif islem == 'uyari_sil':
+            alert = db.query(Alert).filter(Alert.user_id == user_id, Alert.is_active == True).first()
+            if alert:
+                alert.is_active = False
+                db.commit()
+        elif islem == 'bildirim_listele':
+            db.query(TimeNotification).filter(
+                TimeNotification.user_id == user_id, TimeNotification.is_active == True
+            ).all()
+        elif islem == 'bildirim_ekle':
+            db.add(TimeNotification(user_id=user_id, interval='gunluk', asset_types='doviz', is_active=True))
+            db.commit()
+        elif islem == 'portfoy_listele':
+            db.query(Portfolio).filter(Portfolio.user_id == user_id).all()
+        elif islem == 'portfoy_ekle':
+            db.add(Portfolio(user_id=user_id, asset_type='doviz', asset_name='USD', amount=100, purchase_price=34.5))
+            db.commit()
+
+
+async def senkron_adim(telegram_id, islem):
+    user = _senkron_kullanici(telegram_id)
+    if islem != 'kullanici':
+        _senkron_islem(islem, user.id)
+
+
+# ===== ASYNC YOL =====
+async def async_adim(telegram_id, islem):
+    user_id = await data_access.get_user_id(telegram_id, f"db_{telegram_id}")
+    
+    if islem == 'uyari_listele':
+        await data_access.get_active_alerts(user_id)
+    elif islem == 'uyari_ekle':
+        await data_access.add_alert(user_id, asset_type='doviz', asset_name='USD', target_price=40.0, condition='ustu')
+    elif islem == 'uyari_sil':
+        alerts = await data_access.get_active_alerts(user_id)
+        if alerts:
+            await data_access.deactivate_alert(user_id, alerts[0].id)
+    elif islem == 'bildirim_listele':
+        await data_access.get_active_notifications(user_id)
+    elif islem == 'bildirim_ekle':
+        await data_access.add_notification(user_id, 'gunluk', 'doviz')
+    elif islem == 'portfoy_listele':
+        await portfolio_manager.get_user_portfolio(user_id)
+    elif islem == 'portfoy_ekle':
+        await portfolio_manager.add_portfolio_item(user_id, 'doviz', 'USD', 100, 34.5)
+
+
+YOLLAR = {'senkron': senkron_adim, 'async': async_adim}
+
+
+# ===== ÖLÇÜM =====
+async def dongu_gecikmesi(olcumler, dur):
+    """Event loop gecikmesi: DONGU_ARALIGI uykusundan geç uyanma süresi (ms)"""
+    while not dur.is_set():
+        baslangic = time.perf_counter()
+        await asyncio.sleep(DONGU_ARALIGI)
+        olcumler.append(max(0.0, (time.perf_counter() - baslangic - DONGU_ARALIGI) * 1000))
+
+
+async def _kullanici(adim, sira, bitis, dusunme, sureler, hatalar):
+    rnd = random.Random(sira)
+    telegram_id = KULLANICI_BASI + sira
+    
+    # Kullanıcılar aynı anda değil, ilk düşünme süresi içinde dağılarak başlar
+    await asyncio.sleep(rnd.uniform(0, dusunme * 2))
+    
+    while time.monotonic() < bitis:
+        baslangic = time.perf_counter()
+        try:
+            await adim(telegram_id, rnd.choice(ISLEMLER))
+            sureler.append((time.perf_counter() - baslangic) * 1000)
+        except Exception:
+            hatalar.append(1)
+        await asyncio.sleep(rnd.uniform(0, dusunme * 2))
+
+
+async def veritabani_sifirla():
+    """Her ölçüm boş veritabanıyla başlar"""
+    database.engine.dispose()
+    await database.close_async_db()
+    data_access.user_cache.invalidate()
+    for ek in ('', '-wal', '-shm'):
+        if os.path.exists(VERITABANI + ek):
+            os.remove(VERITABANI + ek)
+    
+    with redirect_stdout(io.StringIO()):
+        database.init_db()
+    
+    await database.warm_async_db()
+
+
+async def olc(yol, kullanici_sayisi, sure, dusunme):
+    """
+    Returns:
+        dict: Ölçüm özeti (süreler ms)
+    """
+    await veritabani_sifirla()
+    
+    sureler = []
+    hatalar = []
+    dongu = []
+    dur = asyncio.Event()
+    izleyici = asyncio.create_task(dongu_gecikmesi(dongu, dur))
+    
+    baslangic = time.monotonic()
+    bitis = baslangic + sure
+    await asyncio.gather(*(
+        _kullanici(YOLLAR[yol], sira, bitis, dusunme, sureler, hatalar) for sira in range(kullanici_sayisi)
+    ))
+    gecen = time.monotonic() - baslangic
+    
+    dur.set()
+    await izleyici
+    
+    return {
+        'yol': yol,
+        'kullanici': kullanici_sayisi,
+        'islem': len(sureler),
+        'throughput': len(sureler) / gecen if gecen else 0.0,
+        'p50': _yuzdelik(sureler, 50),
+        'p99': _yuzdelik(sureler, 99),
+        'dongu_p50': _yuzdelik(dongu, 50),
+        'dongu_p99': _yuzdelik(dongu, 99),
+        'dongu_max': max(dongu, default=0.0),
+        'hata': len(hatalar)
+    }
+
+
+BASLIKLAR = [
+    ('Yol', 'yol', 's'), ('Kullanıcı', 'kullanici', 'd'), ('İşlem', 'islem', 'd'), ('/sn', 'throughput', '.1f'),
+    ('p50 ms', 'p50', '.2f'), ('p99 ms', 'p99', '.2f'), ('Loop p50', 'dongu_p50', '.2f'),
+    ('Loop p99', 'dongu_p99', '.2f'), ('Loop max', 'dongu_max', '.2f'), ('Hata', 'hata', 'd'),
+]
+
+
+def yazdir_baslik():
+    print(''.join(f"{baslik:>12}" for baslik, _, _ in BASLIKLAR))
+
+
+def yazdir_satir(sonuc):
+    print(''.join(f"{sonuc[alan]:>12{bicim}}" for _, alan, bicim in BASLIKLAR))
+
+
+async def calistir(kullanici_sayilari, sure=5, dusunme=0.1):
+    """
+    Her kullanıcı sayısı için önce senkron, sonra async yolu ölç
+    
+    Returns:
+        list: Ölçüm özetleri
+    """
+    sonuclar = []
+    
+    for kullanici_sayisi in kullanici_sayilari:
+        for yol in YOLLAR:
+            sonuc = await olc(yol, kullanici_sayisi, sure, dusunme)
+            sonuclar.append(sonuc)
+            yazdir_satir(sonuc)
+    
+    database.engine.dispose()
+    await database.close_async_db()
+    return sonuclar
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='FinAlert veritabanı erişimi loop gecikmesi karşılaştırması')
+    parser.add_argument('-k', '--kullanici', default='10,100,500', help='Virgülle ayrılmış kullanıcı sayıları')
+    parser.add_argument('-s', '--sure', type=float, default=5, help='Ölçüm başına süre (saniye)')
+    parser.add_argument('--dusunme', type=float, default=0.1, help='İşlemler arası ortalama bekleme (saniye)')
+    args = parser.parse_args()
+    
+    kullanici_sayilari = [int(sayi) for sayi in args.kullanici.split(',') if sayi.strip()]
+    print(f"Veritabanı karşılaştırması: {args.sure:g} sn, düşünme {args.dusunme:g} sn\n")
+    yazdir_baslik()
+    
+    asyncio.run(calistir(kullanici_sayilari, args.sure, args.dusunme))
@@ -0,0 +1,307 @@
+# FinAlert - lxml tabanlı hızlı HTML ayrıştırıcılar
+# Her kaynak için XPath ifadeleri modül yüklenirken bir kez derlenir ve
+# sayfanın tamamı gezilmeden yalnızca hedef tablo hücreleri okunur.
+# Fonksiyonlar scrapers.py'deki BeautifulSoup çıkarıcılarıyla aynı ara yapıyı
+# (hücre metinleri) döndürür; fiyat sözlükleri scrapers.py'de ortak kodla kurulur.
+# Sayfa yapısı beklenenden farklıysa scrapers.py BeautifulSoup yoluna döner.
+from lxml import etree, html
+
+# Ortak ifadeler
+XP_FIRST_TABLE_ROWS = etree.XPath('(//table)[1]//tr')
+XP_TD = etree.XPath('.//td')
+XP_TD_TH = etree.XPath('.//td | .//th')
+XP_FIRST_LINK = etree.XPath('(.//a)[1]')
+XP_ROW_BY_NAME = etree.XPath('//tr[@data-name = $name][1]')
+XP_ROW_BY_CODE = etree.XPath('//tr[@data-code = $code][1]')
+XP_DIV_BY_CODE = etree.XPath('//div[@data-code = $code][1]')
+XP_LINKS = etree.XPath('//a')
+XP_PARENT_ROW = etree.XPath('ancestor::tr[1]')
+XP_NEXT_ROW = etree.XPath('following::tr[1]')
+
+
+def _has_class(*names):
+    # BeautifulSoup class_=[...] eşdeğeri: sınıf listesinde adlardan biri var mı
+    return ' or '.join(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in names)
+
+
+# link8: sınıf adında 'table' geçen tablo/div kapsayıcıları (büyük/küçük harf duyarsız)
+XP_TABLE_CONTAINERS = etree.XPath(
+    "//*[self::table or self::div]"
+    "[contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'table')]"
+)
+XP_ROWS = etree.XPath('.//tr')
+
+# link4: döviz kartı ve içindeki alış/satış alanları
+XP_CURRENCY_ITEM = etree.XPath(f"ancestor::div[{_has_class('item', 'currency-item')}][1]")
+XP_BUY_SPAN = etree.XPath(f"(.//span[{_has_class('value', 'buy', 'alis')}])[1]")
+XP_SELL_SPAN = etree.XPath(f"(.//span[{_has_class('value', 'sell', 'satis')}])[1]")
+
+# link7: kart içindeki değer alanları
+XP_VALUE_SPANS = etree.XPath(f".//span[{_has_class('value')}]")
+
+# link1: TCMB XML
+XP_TCMB_CURRENCY = etree.XPath('//Currency[@CurrencyCode = $code][1]')
+XP_TCMB_BUYING = etree.XPath('string((.//BanknoteBuying)[1])')
+XP_TCMB_SELLING = etree.XPath('string((.//BanknoteSelling)[1])')
+XP_TCMB_HAS_BUYING = etree.XPath('boolean(.//BanknoteBuying)')
+XP_TCMB_HAS_SELLING = etree.XPath('boolean(.//BanknoteSelling)')
+
+
+def _document(content):
+    """HTML içeriğini lxml ağacına çevir (boş içerikte hata verir)"""
+    if not content or not content.strip():
+        raise ValueError("Boş içerik")
+    
+    # Karakter seti belirtilmemiş sayfalarda lxml latin-1 varsayar;
+    # UTF-8 olarak çözülebilen içerik metin olarak verilir (Türkçe karakterler)
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+    
+    return html.fromstring(content)
+
+
+def _texts(cells):
+    return [cell.text_content() for cell in cells]
+
+
+def _first(elements):
+    return elements[0] if elements else None
+
+
+def _own_string(element):
+    # BeautifulSoup .string eşdeğeri: tek çocuklu etiketlerde içteki metin
+    while len(element) == 1 and not element.text and not element[0].tail:
+        element = element[0]
+    
+    if len(element) == 0:
+        return element.text
+    return None
+
+
+def first_table_rows(content):
+    """
+    İlk tablonun satırlarındaki <td> metinleri (link3, link11)
+    
+    Returns:
+        list: Her satır için hücre metinleri listesi
+    """
+    doc = _document(content)
+    return [_texts(XP_TD(row)) for row in XP_FIRST_TABLE_ROWS(doc)]
+
+
+def sabah_rows(content):
+    """
+    İlk tablonun satırları (link5) - ilk hücre bağlantı metni + hücre metni
+    
+    Returns:
+        list: Her satır için hücre metinleri listesi
+    """
+    doc = _document(content)
+    rows = []
+    
+    for row in XP_FIRST_TABLE_ROWS(doc):
+        elements = XP_TD(row)
+        cells = _texts(elements)
+        
+        if cells:
+            link = _first(XP_FIRST_LINK(elements[0]))
+            if link is not None:
+                cells[0] = link.text_content().strip() + " " + cells[0].strip()
+        
+        rows.append(cells)
+    
+    return rows
+
+
+def table_container_rows(content):
+    """
+    Sınıfında 'table' geçen kapsayıcılardaki satırlar (link8) - <td>/<th> metinleri
+    
+    Returns:
+        list: Her satır için hücre metinleri listesi
+    """
+    doc = _document(content)
+    return [
+        _texts(XP_TD_TH(row))
+        for container in XP_TABLE_CONTAINERS(doc)
+        for row in XP_ROWS(container)
+    ]
+
+
+def rows_by_name(content, names):
+    """
+    data-name özniteliğiyle bulunan satırlar (link6)
+    
+    Returns:
+        dict: data-name -> hücre metinleri (bulunamayanlar yok)
+    """
+    doc = _document(content)
+    found = {}
+    
+    for name in names:
+        row = _first(XP_ROW_BY_NAME(doc, name=name))
+        if row is not None:
+            found[name] = _texts(XP_TD(row))
+    
+    return found
+
+
+def rows_by_code(content, codes):
+    """
+    data-code özniteliğiyle bulunan satırlar (link15)
+    
+    Returns:
+        dict: data-code -> hücre metinleri (bulunamayanlar yok)
+    """
+    doc = _document(content)
+    found = {}
+    
+    for code in codes:
+        row = _first(XP_ROW_BY_CODE(doc, code=code))
+        if row is not None:
+            found[code] = _texts(XP_TD(row))
+    
+    return found
+
+
+def altin_bigpara_rows(content, mapping):
+    """
+    link9 satırları - önce data-name, yoksa metni terimi içeren bağlantının satırı
+    
+    Args:
+        mapping: altın türü -> arama terimleri
+    
+    Returns:
+        dict: altın türü -> hücre metinleri
+    """
+    doc = _document(content)
+    links = None
+    found = {}
+    
+    for altin_type, search_terms in mapping.items():
+        row = None
+        
+        for term in search_terms:
+            row = _first(XP_ROW_BY_NAME(doc, name=term))
+            if row is not None:
+                break
+            
+            # Alternatif arama - bağlantılar yalnızca gerekirse bir kez toplanır
+            if links is None:
+                links = [(text.lower(), link) for link in XP_LINKS(doc) for text in [_own_string(link)] if text]
+            
+            link = next((link for text, link in links if term in text), None)
+            if link is not None:
+                row = _first(XP_PARENT_ROW(link))
+                break
+        
+        if row is not None:
+            found[altin_type] = _texts(XP_TD(row))
+    
+    return found
+
+
+def borsa_foreks_rows(content, codes):
+    """
+    link14 satırları - data-code satırı, yoksa bağlantıdan sonraki ilk satır
+    XU100 için 'BIST 100' içeren, hisseler için metni koda eşit bağlantı aranır
+    
+    Returns:
+        dict: kod -> hücre metinleri
+    """
+    doc = _document(content)
+    links = None
+    found = {}
+    
+    for code in ['XU100'] + list(codes):
+        row = _first(XP_ROW_BY_CODE(doc, code=code))
+        
+        if row is None:
+            if links is None:
+                links = [(text, link) for link in XP_LINKS(doc) for text in [_own_string(link)] if text]
+            
+            if code == 'XU100':
+                link = next((link for text, link in links if 'BIST 100' in text), None)
+            else:
+                link = next((link for text, link in links if text == code), None)
+            
+            if link is not None:
+                row = _first(XP_NEXT_ROW(link))
+        
+        if row is not None:
+            found[code] = _texts(XP_TD(row))
+    
+    return found
+
+
+def dovizcom_html_items(content, codes):
+    """
+    link4 döviz kartları - data-code kartının üst 'item' kapsayıcısındaki alış/satış
+    
+    Returns:
+        dict: kod -> (alış metni, satış metni)
+    """
+    doc = _document(content)
+    found = {}
+    
+    for code in codes:
+        div = _first(XP_DIV_BY_CODE(doc, code=code))
+        if div is None:
+            continue
+        
+        parent = _first(XP_CURRENCY_ITEM(div))
+        if parent is None:
+            continue
+        
+        alis = _first(XP_BUY_SPAN(parent))
+        satis = _first(XP_SELL_SPAN(parent))
+        if alis is not None and satis is not None:
+            found[code] = (alis.text_content(), satis.text_content())
+    
+    return found
+
+
+def dovizcom_api_html_values(content, codes):
+    """
+    link7 HTML kartları - data-code kartındaki 'value' alanları
+    
+    Returns:
+        dict: kod -> değer metinleri
+    """
+    doc = _document(content)
+    found = {}
+    
+    for code in codes:
+        div = _first(XP_DIV_BY_CODE(doc, code=code))
+        if div is not None:
+            found[code] = _texts(XP_VALUE_SPANS(div))
+    
+    return found
+
+
+def tcmb_currencies(content, codes):
+    """
+    link1 XML - döviz kodları için banknot alış/satış metinleri
+    Alan yoksa metin '0' olur (BeautifulSoup yoluyla aynı)
+    
+    Returns:
+        dict: kod -> (alış metni, satış metni)
+    """
+    if not content or not content.strip():
+        raise ValueError("Boş içerik")
+    
+    doc = etree.fromstring(content, etree.XMLParser(resolve_entities=False, no_network=True))
+    found = {}
+    
+    for code in codes:
+        currency = _first(XP_TCMB_CURRENCY(doc, code=code))
+        if currency is not None:
+            found[code] = (
+                XP_TCMB_BUYING(currency) if XP_TCMB_HAS_BUYING(currency) else '0',
+                XP_TCMB_SELLING(currency) if XP_TCMB_HAS_SELLING(currency) else '0'
+            )
+    
+    return found
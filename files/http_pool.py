@@ -0,0 +1,279 @@
+# FinAlert - Havuzlu HTTP katmanı ve koşullu istekler
+# - Senkron tarafta her site (host) için ayrı, bağlantıları açık tutan requests.Session
+# - Kaynak sunucu ETag / Last-Modified gönderiyorsa sonraki istekte
+#   If-None-Match / If-Modified-Since eklenir; 304 Not Modified cevabında
+#   sayfa yeniden indirilmez ve ayrıştırılmaz, önceki sonuç kullanılır
+# - Site başına bağlantı yeniden kullanımı ve tasarruf edilen bayt istatistikleri
+# Async tarafta (aiohttp) aynı koşullu önbellek ve istatistikler kullanılır.
+import copy
+import json
+import threading
+from urllib.parse import urlsplit
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+import config
+import metrics
+
+_lock = threading.Lock()
+_sessions = {}      # host -> requests.Session
+_validators = {}    # url -> {'etag', 'last_modified', 'size', 'parsed'}
+_stats = {}         # host -> sayaçlar
+
+
+def _host(url):
+    return urlsplit(url).netloc or url
+
+
+def _stat(host):
+    # Kilit altında çağrılmalı
+    if host not in _stats:
+        _stats[host] = {
+            'requests': 0,
+            'new_connections': 0,
+            'reused_connections': 0,
+            'not_modified': 0,
+            'bytes_received': 0,
+            'bytes_saved': 0
+        }
+    return _stats[host]
+
+
+def _count(host, **counters):
+    with _lock:
+        stats = _stat(host)
+        for name, value in counters.items():
+            stats[name] += value
+
+
+# ===== KOŞULLU İSTEK ÖNBELLEĞİ =====
+def conditional_headers(url):
+    """Önceki cevabın doğrulayıcılarından koşullu istek başlıkları"""
+    if not config.HTTP_CONDITIONAL_REQUESTS:
+        return {}
+    
+    with _lock:
+        entry = _validators.get(url)
+    
+    headers = {}
+    if entry:
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def remember(url, response_headers, size, parsed):
+    """Başarıyla ayrıştırılan cevabın doğrulayıcılarını ve sonucunu sakla"""
+    etag = response_headers.get('ETag')
+    last_modified = response_headers.get('Last-Modified')
+    
+    with _lock:
+        if etag or last_modified:
+            _validators[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': size,
+                'parsed': copy.deepcopy(parsed)
+            }
+        else:
+            _validators.pop(url, None)
+
+
+def not_modified(url):
+    """
+    304 cevabı için önceki ayrıştırma sonucunu döndür (yoksa None)
+    Tasarruf edilen bayt, önceki cevabın boyutu kadar sayılır
+    """
+    with _lock:
+        entry = _validators.get(url)
+        if not entry:
+            return None
+        
+        stats = _stat(_host(url))
+        stats['not_modified'] += 1
+        stats['bytes_saved'] += entry['size']
+        return copy.deepcopy(entry['parsed'])
+
+
+# ===== SENKRON (requests) =====
+def get_session(url):
+    """Site başına paylaşılan, bağlantıları açık tutan oturum"""
+    host = _host(url)
+    
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=config.HTTP_MAX_CONNECTIONS_PER_HOST,
+                max_retries=0
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[host] = session
+    
+    return session
+
+
+def _connection_count(session, url):
+    # urllib3 havuzunun açtığı toplam bağlantı sayısı
+    try:
+        pool = session.get_adapter(url).poolmanager.connection_from_url(url)
+        return pool.num_connections
+    except Exception:
+        return 0
+
+
+def get(url, headers=None, timeout=None, conditional=True):
+    """
+    Havuzlu GET isteği
+    
+    Returns:
+        requests.Response: 304 cevabı da olduğu gibi döndürülür
+    """
+    host = _host(url)
+    session = get_session(url)
+    
+    headers = dict(headers or {})
+    if conditional:
+        headers.update(conditional_headers(url))
+    
+    before = _connection_count(session, url)
+    response = session.get(url, headers=headers, timeout=timeout or config.REQUEST_TIMEOUT)
+    new_connections = max(0, _connection_count(session, url) - before)
+    
+    _count(
+        host,
+        requests=1,
+        new_connections=new_connections,
+        reused_connections=0 if new_connections else 1,
+        bytes_received=len(response.content)
+    )
+    return response
+
+
+def fetch_parsed(url, parse, headers=None, timeout=None, as_json=False):
+    """
+    Kaynağı çek ve ayrıştır; 304 cevabında önceki sonucu döndür
+    
+    Args:
+        parse: İçerik (bytes) veya JSON verisini ayrıştıran fonksiyon
+        as_json: Cevap gövdesi JSON olarak çözülür
+    
+    Returns:
+        Ayrıştırma sonucu, 200/304 dışı cevaplarda None
+    """
+    response = get(url, headers=headers, timeout=timeout)
+    
+    if response.status_code == 304:
+        return not_modified(url)
+    
+    if response.status_code != 200:
+        return None
+    
+    parsed = parse(response.json() if as_json else response.content)
+    if parsed:
+        remember(url, response.headers, len(response.content), parsed)
+    return parsed
+
+
+def close_sessions():
+    """Senkron oturumları kapat"""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    
+    for session in sessions:
+        session.close()
+
+
+# ===== ASYNC (aiohttp) =====
+def trace_config():
+    """aiohttp oturumu için bağlantı açma / yeniden kullanma sayaçları"""
+    trace = aiohttp.TraceConfig()
+    
+    async def on_create(session, ctx, params):
+        if ctx.trace_request_ctx:
+            _count(ctx.trace_request_ctx['host'], new_connections=1)
+    
+    async def on_reuse(session, ctx, params):
+        if ctx.trace_request_ctx:
+            _count(ctx.trace_request_ctx['host'], reused_connections=1)
+    
+    trace.on_connection_create_end.append(on_create)
+    trace.on_connection_reuseconn.append(on_reuse)
+    return trace
+
+
+async def afetch_parsed(session, url, parse, headers=None, timeout=None, as_json=False):
+    """
+    fetch_parsed() metodunun async karşılığı (paylaşılan aiohttp oturumu ile)
+    
+    Returns:
+        Ayrıştırma sonucu, 200/304 dışı cevaplarda None
+    """
+    host = _host(url)
+    headers = dict(headers or {})
+    headers.update(conditional_headers(url))
+    
+    async with session.get(
+        url,
+        headers=headers,
+        timeout=aiohttp.ClientTimeout(total=timeout or config.REQUEST_TIMEOUT),
+        trace_request_ctx={'host': host}
+    ) as response:
+        _count(host, requests=1)
+        
+        if response.status == 304:
+            return not_modified(url)
+        
+        if response.status != 200:
+            return None
+        
+        body = await response.read()
+        response_headers = response.headers
+    
+    _count(host, bytes_received=len(body))
+    
+    parsed = parse(json.loads(body) if as_json else body)
+    if parsed:
+        remember(url, response_headers, len(body), parsed)
+    return parsed
+
+
+def get_http_stats():
+    """
+    Site başına HTTP istatistikleri
+    
+    Returns:
+        dict: host -> {requests, new_connections, reused_connections, reuse_rate,
+              not_modified, bytes_received, bytes_saved}
+    """
+    with _lock:
+        stats = {}
+        
+        for host, counters in _stats.items():
+            counters = dict(counters)
+            connections = counters['new_connections'] + counters['reused_connections']
+            counters['reuse_rate'] = counters['reused_connections'] / connections if connections else 0.0
+            stats[host] = counters
+        
+        return stats
+
+
+@metrics.register_collector
+def _collect_metrics():
+    for host, stats in get_http_stats().items():
+        yield ('finalert_http_requests_total', 'counter', 'Site başına HTTP istekleri',
+               {'host': host}, stats['requests'])
+        for tur in ('new', 'reused'):
+            yield ('finalert_http_connections_total', 'counter', 'Açılan / yeniden kullanılan bağlantılar',
+                   {'host': host, 'tur': tur}, stats[f'{tur}_connections'])
+        yield ('finalert_http_not_modified_total', 'counter', '304 (değişmedi) cevapları',
+               {'host': host}, stats['not_modified'])
+        for yon in ('received', 'saved'):
+            yield ('finalert_http_bytes_total', 'counter', 'Alınan / 304 ile tasarruf edilen bayt',
+                   {'host': host, 'yon': yon}, stats[f'bytes_{yon}'])
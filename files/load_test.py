@@ -0,0 +1,559 @@
+# FinAlert - Yük testi
+# Gerçek handler'lar (button_callback, message_handler ve komutlar) sahte
+# Telegram güncellemeleriyle (Update) çalıştırılır. Telegram Bot API'si ayrı
+# thread'de çalışan yerel bir sunucuyla, fiyat kaynakları sabit veri döndüren
+# çekicilerle taklit edilir; ağa çıkılmaz, ayrı bir veritabanı kullanılır.
+#
+# Her sanal kullanıcı sırayla bir akış seçer (piyasa, portföy, uyarı, bildirim),
+# her adımın cevabını bekler ve düşünme süresi kadar bekleyip devam eder.
+# Kullanıcı sayısı başına ölçülenler:
+# - Saniyede işlenen güncelleme (throughput)
+# - Gecikme p50/p99: güncellemenin kuyruğa girişinden handler'ın bitişine
+#   (kuyrukta bekleme dahil) ve yalnızca handler süresi
+# - Event loop gecikmesi (10 ms'lik uykuların ne kadar geç uyandığı)
+# - Veritabanı: sorgu sayısı, sorgu / yazma p99, kilit hataları, en çok açık bağlantı
+#
+# Kullanım:
+#     python load_test.py                          # 10, 100, 500 kullanıcı, 10'ar saniye
+#     python load_test.py -k 50,200,1000 -s 30     # kullanıcı sayıları ve süre
+#     python load_test.py --eszamanli 8            # güncellemeleri 8'er paralel işle
+#     python load_test.py --api-gecikme 50         # Bot API cevap süresi (ms)
+#     python load_test.py --webhook --eszamanli 8  # güncellemeler yerel webhook sunucusuna POST edilir
+import argparse
+import asyncio
+import copy
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+import aiohttp
+from aiohttp import web
+from sqlalchemy import event
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+import config
+
+# Yük testi ayrı veritabanında çalışır - database modülü yüklenmeden önce ayarlanmalı
+VERITABANI = os.path.join(tempfile.gettempdir(), 'finalert_load_test.db')
+config.DATABASE_URL = f"sqlite:///{VERITABANI}"
+
+import bot
+import database
+import data_access
+import async_scrapers
+import scraper_benchmark
+from webhook_server import WebhookServer, SECRET_HEADER
+from scrapers import quote_cache
+from alert_manager import alert_index
+
+TOKEN = '123456:YUK-TESTI'
+KULLANICI_BASI = 10 ** 9        # Sanal kullanıcıların Telegram id başlangıcı
+ADIM_ZAMAN_ASIMI = 60           # Cevabı bu kadar gecikmeyen adım hata sayılır (saniye)
+DONGU_ARALIGI = 0.01            # Event loop gecikmesi ölçüm aralığı (saniye)
+
+# Kullanıcı akışları: ('komut' | 'buton' | 'mesaj', değer)
+AKISLAR = {
+    'piyasa': [
+        ('komut', '/menu'),
+        ('buton', 'menu_doviz'),
+        ('buton', 'doviz_USD'),
+        ('buton', 'menu_altin'),
+        ('buton', 'altin_all'),
+        ('buton', 'menu_borsa'),
+        ('buton', 'borsa_THYAO'),
+        ('buton', 'menu_main'),
+    ],
+    'portfoy': [
+        ('buton', 'menu_portfolio'),
+        ('buton', 'portfolio_add'),
+        ('buton', 'portfolio_add_doviz'),
+        ('buton', 'portfolio_asset_USD'),
+        ('mesaj', '100'),
+        ('mesaj', '34,50'),
+        ('buton', 'portfolio_report'),
+        ('buton', 'menu_portfolio'),
+    ],
+    'uyari': [
+        ('buton', 'menu_alerts'),
+        ('buton', 'alert_add'),
+        ('buton', 'alert_type_altin'),
+        ('buton', 'alert_asset_gram'),
+        ('buton', 'alert_cond_ustu'),
+        ('mesaj', '5000'),
+        ('buton', 'alert_list'),
+    ],
+    'bildirim': [
+        ('buton', 'menu_notifications'),
+        ('buton', 'notification_add'),
+        ('buton', 'notif_interval_gunluk'),
+        ('buton', 'notif_type_all'),
+        ('buton', 'notification_list'),
+    ],
+}
+AKIS_AGIRLIKLARI = {'piyasa': 5, 'portfoy': 2, 'uyari': 2, 'bildirim': 1}
+
+
+def _yuzdelik(degerler, yuzde):
+    if not degerler:
+        return 0.0
+    degerler = sorted(degerler)
+    return degerler[min(len(degerler) - 1, int(round(yuzde / 100 * (len(degerler) - 1))))]
+
+
+# ===== SAHTE TELEGRAM BOT API =====
+class SahteBotApi:
+    """
+    Telegram Bot API taklidi (ayrı thread'de aiohttp sunucusu)
+    Handler'ların bot üzerinden yaptığı çağrılar gerçek HTTP isteği olarak gelir;
+    her metoda geçerli bir cevap döndürülür.
+    """
+    
+    def __init__(self, gecikme_ms=0):
+        self.gecikme = gecikme_ms / 1000
+        self.cagrilar = {}       # metod -> çağrı sayısı
+        self._mesaj_id = itertools.count(1)
+        self._loop = None
+        self._thread = None
+        self._hazir = threading.Event()
+        self.port = None
+    
+    @property
+    def adres(self):
+        return f"http://127.0.0.1:{self.port}"
+    
+    def _cevap(self, method, params):
+        if method == 'getMe':
+            return {'id': 1, 'is_bot': True, 'first_name': 'FinAlert', 'username': 'finalert_yuk_bot'}
+        
+        if method in ('sendMessage', 'editMessageText'):
+            return {
+                'message_id': next(self._mesaj_id),
+                'date': int(time.time()),
+                'chat': {'id': int(params.get('chat_id') or 0), 'type': 'private'},
+                'text': params.get('text', '')
+            }
+        
+        return True
+    
+    async def _handle(self, request):
+        method = request.match_info['method']
+        self.cagrilar[method] = self.cagrilar.get(method, 0) + 1
+        
+        if request.content_type == 'application/json':
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        
+        if self.gecikme:
+            await asyncio.sleep(self.gecikme)
+        
+        return web.json_response({'ok': True, 'result': self._cevap(method, params)})
+    
+    def _calistir(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._hazir.set()
+        
+        loop.run_forever()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+    
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._calistir, name='sahte-bot-api', daemon=True)
+        self._thread.start()
+        self._hazir.wait()
+        return self
+    
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+# ===== SAHTE FİYAT KAYNAKLARI =====
+def _ornek_veri(url_key):
+    uretici, as_json = scraper_benchmark.ORNEKLER[url_key]
+    icerik = uretici()
+    parser = getattr(async_scrapers, f"parse_{url_key}")
+    return parser(json.loads(icerik) if as_json else icerik)
+
+
+@contextmanager
+def sahte_kaynaklar(gecikme_ms=0):
+    """
+    Async kaynak zincirlerini sabit veri döndüren tek kaynakla değiştir
+    Veri, scraper_benchmark örnek sayfalarının ayrıştırılmasıyla elde edilir
+    """
+    veriler = {
+        'DOVIZ_KAYNAKLARI': _ornek_veri('doviz_sabah'),
+        'ALTIN_KAYNAKLARI': _ornek_veri('altin_mynet'),
+        'BORSA_KAYNAKLARI': _ornek_veri('borsa_genelpara'),
+    }
+    
+    def cekici(veri):
+        async def cek():
+            await asyncio.sleep(gecikme_ms / 1000)
+            return copy.deepcopy(veri)
+        return cek
+    
+    eski = {ad: getattr(async_scrapers, ad) for ad in veriler}
+    for ad, veri in veriler.items():
+        setattr(async_scrapers, ad, [('sahte', cekici(veri))])
+    quote_cache.invalidate()
+    
+    try:
+        yield
+    finally:
+        for ad, kaynaklar in eski.items():
+            setattr(async_scrapers, ad, kaynaklar)
+        quote_cache.invalidate()
+
+
+# ===== ÖLÇÜCÜLER =====
+class VeritabaniOlcer:
+    """SQLAlchemy olaylarıyla sorgu süreleri, kilit hataları ve açık bağlantı sayısı (tüm motorlarda)"""
+    
+    def __init__(self, *engines):
+        self._engines = engines
+        self.sorgular = []       # ms
+        self.yazmalar = []       # ms (INSERT / UPDATE / DELETE)
+        self.kilit_hatalari = 0
+        self.en_cok_baglanti = 0
+        self._dinleyiciler = [
+            ('before_cursor_execute', self._once),
+            ('after_cursor_execute', self._sonra),
+            ('handle_error', self._hata),
+            ('checkout', self._checkout),
+        ]
+    
+    def _once(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('yuk_testi_baslangic', []).append(time.perf_counter())
+    
+    def _sonra(self, conn, cursor, statement, parameters, context, executemany):
+        sure = (time.perf_counter() - conn.info['yuk_testi_baslangic'].pop()) * 1000
+        self.sorgular.append(sure)
+        if statement.lstrip()[:6].upper() in ('INSERT', 'UPDATE', 'DELETE'):
+            self.yazmalar.append(sure)
+    
+    def _hata(self, context):
+        if 'locked' in str(context.original_exception):
+            self.kilit_hatalari += 1
+    
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy):
+        acik = sum(engine.pool.checkedout() for engine in self._engines)
+        self.en_cok_baglanti = max(self.en_cok_baglanti, acik)
+    
+    def __enter__(self):
+        for engine in self._engines:
+            for ad, dinleyici in self._dinleyiciler:
+                event.listen(engine, ad, dinleyici)
+        return self
+    
+    def __exit__(self, *exc):
+        for engine in self._engines:
+            for ad, dinleyici in self._dinleyiciler:
+                event.remove(engine, ad, dinleyici)
+
+
+async def dongu_gecikmesi(olcumler, dur):
+    """Event loop gecikmesi: DONGU_ARALIGI uykusundan geç uyanma süresi (ms)"""
+    while not dur.is_set():
+        baslangic = time.perf_counter()
+        await asyncio.sleep(DONGU_ARALIGI)
+        olcumler.append(max(0.0, (time.perf_counter() - baslangic - DONGU_ARALIGI) * 1000))
+
+
+# ===== YÜK ÜRETİCİ =====
+def _update_verisi(update_id, kullanici_id, adim):
+    """Telegram'ın göndereceği biçimde güncelleme (JSON) verisi"""
+    tur, deger = adim
+    kimlik = {
+        'id': kullanici_id,
+        'is_bot': False,
+        'first_name': f"Kullanıcı {kullanici_id - KULLANICI_BASI}",
+        'username': f"yuk_{kullanici_id - KULLANICI_BASI}"
+    }
+    sohbet = {'id': kullanici_id, 'type': 'private'}
+    tarih = int(time.time())
+    
+    if tur == 'buton':
+        return {
+            'update_id': update_id,
+            'callback_query': {
+                'id': str(update_id),
+                'from': kimlik,
+                'chat_instance': str(kullanici_id),
+                'data': deger,
+                'message': {'message_id': 1, 'date': tarih, 'chat': sohbet, 'text': 'FinAlert'}
+            }
+        }
+    
+    mesaj = {'message_id': update_id, 'date': tarih, 'chat': sohbet, 'from': kimlik, 'text': deger}
+    if tur == 'komut':
+        mesaj['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(deger)}]
+    return {'update_id': update_id, 'message': mesaj}
+
+
+class YukTesti:
+    """
+    Tek bir kullanıcı sayısı için yük testi
+    
+    Güncellemeler uygulamanın kuyruğuna (update_queue) konur; botun kendi
+    işleme döngüsü (concurrent_updates ayarıyla) onları handler'lara dağıtır.
+    Webhook modunda Telegram yerine güncellemeler gizli anahtarla yerel
+    webhook sunucusuna POST edilir ve sunucunun işçileri (eszamanli) işler.
+    -1 ve 99 gruplarındaki TypeHandler'lar handler'ın başlangıç ve bitişini kaydeder.
+    """
+    
+    def __init__(self, api, kullanici_sayisi, sure, dusunme, eszamanli, webhook=False):
+        self.api = api
+        self.kullanici_sayisi = kullanici_sayisi
+        self.sure = sure
+        self.dusunme = dusunme
+        self.eszamanli = eszamanli
+        self.webhook = webhook
+        self.gecikmeler = []     # kuyruk + handler (ms)
+        self.isleme = []         # yalnızca handler (ms)
+        self.hatalar = 0
+        self.zaman_asimi = 0
+        self._bekleyen = {}      # update_id -> (future, kuyruğa giriş zamanı)
+        self._baslangic = {}     # update_id -> handler başlangıcı
+        self._sayac = itertools.count(1)
+        self._sunucu = None      # webhook modunda WebhookServer
+        self._oturum = None      # webhook modunda POST istemcisi
+    
+    def _uygulama(self):
+        application = (
+            Application.builder()
+            .token(TOKEN)
+            .base_url(f"{self.api.adres}/bot")
+            .updater(None)
+            .concurrent_updates(self.eszamanli if self.eszamanli > 1 and not self.webhook else False)
+            .build()
+        )
+        bot.add_handlers(application)
+        application.add_handler(TypeHandler(Update, self._handler_basladi), group=-1)
+        application.add_handler(TypeHandler(Update, self._handler_bitti), group=99)
+        application.add_error_handler(self._handler_hatasi)
+        return application
+    
+    async def _handler_basladi(self, update, context):
+        self._baslangic[update.update_id] = time.perf_counter()
+    
+    async def _handler_bitti(self, update, context):
+        simdi = time.perf_counter()
+        future, kuyruga_giris = self._bekleyen.pop(update.update_id, (None, None))
+        baslangic = self._baslangic.pop(update.update_id, simdi)
+        
+        if future is not None and not future.done():
+            self.gecikmeler.append((simdi - kuyruga_giris) * 1000)
+            self.isleme.append((simdi - baslangic) * 1000)
+            future.set_result(None)
+    
+    async def _handler_hatasi(self, update, context):
+        self.hatalar += 1
+    
+    async def _gonder(self, application, kullanici_id, adim):
+        update_id = next(self._sayac)
+        update = Update.de_json(_update_verisi(update_id, kullanici_id, adim), application.bot)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._bekleyen[update_id] = (future, time.perf_counter())
+        
+        if self.webhook:
+            async with self._oturum.post(
+                self._sunucu.address,
+                json=update.to_dict(),
+                headers={SECRET_HEADER: self._sunucu.secret_token}
+            ) as cevap:
+                if cevap.status != 200:
+                    self._bekleyen.pop(update_id, None)
+                    self.hatalar += 1
+                    return
+        else:
+            await application.update_queue.put(update)
+        
+        try:
+            await asyncio.wait_for(future, ADIM_ZAMAN_ASIMI)
+        except asyncio.TimeoutError:
+            self._bekleyen.pop(update_id, None)
+            self.zaman_asimi += 1
+    
+    async def _kullanici(self, application, sira, bitis):
+        rnd = random.Random(sira)
+        kullanici_id = KULLANICI_BASI + sira
+        akislar = list(AKIS_AGIRLIKLARI)
+        agirliklar = list(AKIS_AGIRLIKLARI.values())
+        
+        # Kullanıcılar aynı anda değil, ilk düşünme süresi içinde dağılarak başlar
+        await asyncio.sleep(rnd.uniform(0, self.dusunme * 2))
+        await self._gonder(application, kullanici_id, ('komut', '/start'))
+        
+        while time.monotonic() < bitis:
+            for adim in AKISLAR[rnd.choices(akislar, agirliklar)[0]]:
+                if time.monotonic() >= bitis:
+                    break
+                await self._gonder(application, kullanici_id, adim)
+                await asyncio.sleep(rnd.uniform(0, self.dusunme * 2))
+    
+    async def calistir(self):
+        """
+        Returns:
+            dict: Ölçüm özeti (süreler ms)
+        """
+        application = self._uygulama()
+        await application.initialize()
+        await application.start()
+        
+        if self.webhook:
+            self._sunucu = WebhookServer(application, host='127.0.0.1', port=0, workers=self.eszamanli)
+            await self._sunucu.start()
+            self._oturum = aiohttp.ClientSession()
+        
+        dongu = []
+        dur = asyncio.Event()
+        izleyici = asyncio.create_task(dongu_gecikmesi(dongu, dur))
+        
+        api_cagri = sum(self.api.cagrilar.values())
+        
+        # Handler'lar async motoru, arka plan görevleri senkron motoru kullanır
+        with VeritabaniOlcer(database.engine, database.async_engine.sync_engine) as db:
+            baslangic = time.monotonic()
+            bitis = baslangic + self.sure
+            await asyncio.gather(*(
+                self._kullanici(application, sira, bitis) for sira in range(self.kullanici_sayisi)
+            ))
+            gecen = time.monotonic() - baslangic
+        
+        dur.set()
+        await izleyici
+        
+        if self.webhook:
+            await self._oturum.close()
+            await self._sunucu.stop()
+        
+        await application.stop()
+        await application.shutdown()
+        
+        return {
+            'kullanici': self.kullanici_sayisi,
+            'guncelleme': len(self.gecikmeler),
+            'throughput': len(self.gecikmeler) / gecen if gecen else 0.0,
+            'p50': _yuzdelik(self.gecikmeler, 50),
+            'p99': _yuzdelik(self.gecikmeler, 99),
+            'isleme_p99': _yuzdelik(self.isleme, 99),
+            'dongu_p99': _yuzdelik(dongu, 99),
+            'dongu_max': max(dongu, default=0.0),
+            'db_sorgu': len(db.sorgular),
+            'db_p99': _yuzdelik(db.sorgular, 99),
+            'yazma_p99': _yuzdelik(db.yazmalar, 99),
+            'kilit': db.kilit_hatalari,
+            'baglanti': db.en_cok_baglanti,
+            'api_cagri': sum(self.api.cagrilar.values()) - api_cagri,
+            'hata': self.hatalar + self.zaman_asimi
+        }
+
+
+async def veritabani_sifirla():
+    """Her kullanıcı sayısı boş veritabanıyla başlar"""
+    database.engine.dispose()
+    await database.close_async_db()
+    data_access.user_cache.invalidate()
+    for ek in ('', '-wal', '-shm'):
+        if os.path.exists(VERITABANI + ek):
+            os.remove(VERITABANI + ek)
+    
+    with redirect_stdout(io.StringIO()):
+        database.init_db()
+    alert_index.load()
+
+
+async def calistir(kullanici_sayilari, sure=10, dusunme=0.5, eszamanli=1, api_gecikme_ms=20, kaynak_gecikme_ms=200,
+                   webhook=False):
+    """
+    Kullanıcı sayılarını sırayla dene
+    
+    Returns:
+        list: Kullanıcı sayısı başına ölçüm özetleri
+    """
+    sonuclar = []
+    
+    with SahteBotApi(api_gecikme_ms) as api, sahte_kaynaklar(kaynak_gecikme_ms):
+        for kullanici_sayisi in kullanici_sayilari:
+            await veritabani_sifirla()
+            quote_cache.invalidate()
+            
+            sonuc = await YukTesti(api, kullanici_sayisi, sure, dusunme, eszamanli, webhook).calistir()
+            sonuclar.append(sonuc)
+            yazdir_satir(sonuc)
+    
+    database.engine.dispose()
+    await database.close_async_db()
+    return sonuclar
+
+
+BASLIKLAR = [
+    ('Kullanıcı', 'kullanici', 'd'), ('Güncelleme', 'guncelleme', 'd'), ('/sn', 'throughput', '.1f'),
+    ('p50 ms', 'p50', '.1f'), ('p99 ms', 'p99', '.1f'), ('Handler p99', 'isleme_p99', '.1f'),
+    ('Loop p99', 'dongu_p99', '.1f'), ('Loop max', 'dongu_max', '.1f'), ('DB sorgu', 'db_sorgu', 'd'),
+    ('DB p99', 'db_p99', '.2f'), ('Yazma p99', 'yazma_p99', '.2f'), ('Kilit', 'kilit', 'd'),
+    ('Bağlantı', 'baglanti', 'd'), ('Bot API', 'api_cagri', 'd'), ('Hata', 'hata', 'd'),
+]
+
+
+def yazdir_baslik():
+    print(''.join(f"{baslik:>12}" for baslik, _, _ in BASLIKLAR))
+
+
+def yazdir_satir(sonuc):
+    print(''.join(f"{sonuc[alan]:>12{bicim}}" for _, alan, bicim in BASLIKLAR))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='FinAlert yük testi')
+    parser.add_argument('-k', '--kullanici', default='10,100,500', help='Virgülle ayrılmış kullanıcı sayıları')
+    parser.add_argument('-s', '--sure', type=float, default=10, help='Kullanıcı sayısı başına süre (saniye)')
+    parser.add_argument('--dusunme', type=float, default=0.5, help='Adımlar arası ortalama düşünme süresi (saniye)')
+    parser.add_argument('--eszamanli', type=int, default=1, help='Aynı anda işlenen güncelleme sayısı (bot varsayılanı 1)')
+    parser.add_argument('--api-gecikme', type=float, default=20, help='Bot API cevap süresi (ms)')
+    parser.add_argument('--kaynak-gecikme', type=float, default=200, help='Fiyat kaynağı cevap süresi (ms)')
+    parser.add_argument('--webhook', action='store_true', help='Güncellemeleri yerel webhook sunucusuna POST et')
+    parser.add_argument('--hedef-p99', type=float, default=1000, help='Kabul edilebilir p99 gecikmesi (ms)')
+    args = parser.parse_args()
+    
+    # Handler ve HTTP istemcisi kayıtları ölçüm çıktısını boğmasın
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    
+    kullanici_sayilari = [int(sayi) for sayi in args.kullanici.split(',') if sayi.strip()]
+    print(f"Yük testi: {args.sure:g} sn, düşünme {args.dusunme:g} sn, eşzamanlı {args.eszamanli}, "
+          f"Bot API {args.api_gecikme:g} ms, kaynak {args.kaynak_gecikme:g} ms"
+          f"{', webhook' if args.webhook else ''}\n")
+    yazdir_baslik()
+    
+    sonuclar = asyncio.run(calistir(
+        kullanici_sayilari, args.sure, args.dusunme, args.eszamanli, args.api_gecikme, args.kaynak_gecikme,
+        args.webhook
+    ))
+    
+    uygun = [sonuc['kullanici'] for sonuc in sonuclar if sonuc['p99'] <= args.hedef_p99 and not sonuc['hata']]
+    if uygun:
+        print(f"\n✅ p99 <= {args.hedef_p99:g} ms olan en yüksek kullanıcı sayısı: {max(uygun)}")
+    else:
+        print(f"\n❌ Hiçbir kullanıcı sayısında p99 <= {args.hedef_p99:g} ms sağlanamadı")
+    
+    sys.exit(0 if uygun else 1)
@@ -0,0 +1,274 @@
+# FinAlert - Event loop gecikme bekçisi (watchdog)
+# Loop içindeki kalp atışı görevi her LOOP_LAG_INTERVAL saniyede uyanır; planlanan
+# uyanma zamanından sapma loop gecikmesidir. Ayrı bir thread atışları izler:
+# son atış LOOP_LAG_THRESHOLD süresinden fazla gecikirse loop thread'inin yığını
+# (stack) alınır ve bloklayan çağrı yeri - projedeki en içteki çerçeve, örn.
+# scrapers.py veya database.py içindeki fonksiyon - kaydedilir.
+# Takılma süresi, takılma boyunca alınan örneklere göre çağrı yerlerine dağıtılır;
+# en çok bloklayan yerler sıralı rapor olarak /lag admin komutuyla görülür.
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+import config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_PROJE_DIZINI = os.path.dirname(os.path.abspath(__file__))
+_BU_DOSYA = os.path.abspath(__file__)
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def _is_project_file(filename):
+    if filename.startswith('<'):
+        return False
+    path = os.path.abspath(filename)
+    return path.startswith(_PROJE_DIZINI) and path != _BU_DOSYA
+
+
+def _frame_label(frame):
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+
+
+def locate(frame, depth=6):
+    """
+    Loop thread'inin yığınından bloklayan çağrı yerini bul
+    
+    Returns:
+        (çağrı yeri, yığın özeti): çağrı yeri projedeki en içteki çerçevedir;
+        özet dıştan içe proje çerçeveleri (en dıştaki handler + en içteki
+        depth çerçeve) ve en içteki (kütüphane) çerçeve
+    """
+    frames = traceback.extract_stack(frame)
+    project = [f for f in frames if _is_project_file(f.filename)]
+    
+    if not project:
+        innermost = frames[-1] if frames else None
+        site = _frame_label(innermost) if innermost else 'bilinmiyor'
+        return site, [site]
+    
+    stack = [_frame_label(f) for f in project[-depth:]]
+    if len(project) > depth:
+        stack = [_frame_label(project[0]), '…'] + stack
+    if frames[-1] is not project[-1]:
+        stack.append(_frame_label(frames[-1]))
+    return _frame_label(project[-1]), stack
+
+
+class LoopWatchdog:
+    """
+    Loop gecikmesi ölçümü ve bloklayan çağrı yerlerinin kaydı
+    
+    Kullanım (çalışan loop içinde):
+        loop_watchdog.start()
+        print(loop_watchdog.format_report())
+    """
+    
+    def __init__(self, interval=None, threshold=None, history=1000):
+        self.interval = interval or config.LOOP_LAG_INTERVAL
+        self.threshold = threshold or config.LOOP_LAG_THRESHOLD
+        self.sample_interval = min(0.05, self.threshold / 2)
+        self._lock = threading.Lock()
+        self._lags = deque(maxlen=history)
+        self._sites = {}       # çağrı yeri -> {total, count, max, stack, last_at}
+        self._current = {}     # süren takılmadaki örnekler: çağrı yeri -> (örnek sayısı, yığın)
+        self._beat = None
+        self._stalls = 0
+        self._max_lag = 0.0
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._loop_thread_id = None
+    
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        """Kalp atışı görevini ve izleyici thread'i başlat (çalışan loop içinden çağrılmalı)"""
+        if self.running:
+            return
+        
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        
+        self._task = loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._thread.start()
+        logger.info(
+            f"✅ Loop bekçisi başlatıldı (eşik {self.threshold * 1000:.0f} ms, "
+            f"aralık {self.interval * 1000:.0f} ms)"
+        )
+    
+    def stop(self):
+        """Görevi ve izleyici thread'i durdur"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+    
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._finish_beat(now, max(0.0, now - expected))
+    
+    def _finish_beat(self, now, lag):
+        metrics.LOOP_LAG_SECONDS.observe(lag)
+        
+        with self._lock:
+            self._beat = now
+            self._lags.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+            current, self._current = self._current, {}
+            
+            if lag < self.threshold:
+                return
+            
+            self._stalls += 1
+            if not current:
+                # Takılma örnekleme aralığından kısa sürdü - yığın alınamadı
+                current = {'örneklenemedi': (1, ['örneklenemedi'])}
+            
+            # Takılma süresi örnek sayısına göre çağrı yerlerine dağıtılır
+            samples = sum(count for count, _ in current.values())
+            dominant = max(current, key=lambda site: current[site][0])
+            for site, (count, stack) in current.items():
+                entry = self._sites.setdefault(site, {'total': 0.0, 'count': 0, 'max': 0.0, 'stack': stack, 'last_at': None})
+                entry['total'] += lag * count / samples
+                entry['stack'] = stack
+                entry['last_at'] = time.time()
+                if site == dominant:
+                    entry['count'] += 1
+                    entry['max'] = max(entry['max'], lag)
+        
+        metrics.LOOP_STALLS.inc()
+        logger.warning(f"🐢 Event loop {lag * 1000:.0f} ms bloklandı: {' → '.join(current[dominant][1])}")
+    
+    def _watch(self):
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                beat = self._beat
+            
+            if time.monotonic() - beat < self.interval + self.threshold:
+                continue
+            
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            
+            try:
+                site, stack = locate(frame)
+            finally:
+                del frame
+            
+            with self._lock:
+                # Örnek alınırken takılma bittiyse kaydedilmez
+                if self._beat != beat:
+                    continue
+                count, _ = self._current.get(site, (0, None))
+                self._current[site] = (count + 1, stack)
+    
+    def reset(self):
+        """Ölçümleri ve çağrı yeri kayıtlarını sıfırla"""
+        with self._lock:
+            self._lags.clear()
+            self._sites.clear()
+            self._current.clear()
+            self._stalls = 0
+            self._max_lag = 0.0
+    
+    def get_report(self, top=None):
+        """
+        Gecikme özeti ve en çok bloklayan çağrı yerleri
+        
+        Returns:
+            dict: {running, beats, p50, p99, max, stalls, sites: [{site, total, count, max, stack, last_at}]}
+                  süreler saniye; çağrı yerleri toplam bloklama süresine göre azalan
+        """
+        with self._lock:
+            lags = list(self._lags)
+            sites = [dict(entry, site=site) for site, entry in self._sites.items()]
+            stalls = self._stalls
+            max_lag = self._max_lag
+        
+        sites.sort(key=lambda entry: entry['total'], reverse=True)
+        return {
+            'running': self.running,
+            'beats': len(lags),
+            'p50': _percentile(lags, 50),
+            'p99': _percentile(lags, 99),
+            'max': max_lag,
+            'stalls': stalls,
+            'sites': sites[:top or config.LOOP_WATCHDOG_TOP]
+        }
+    
+    def format_report(self, top=None):
+        """Raporu düz metin olarak döndür (admin komutu)"""
+        report = self.get_report(top)
+        
+        if not report['running']:
+            return "🐢 Loop bekçisi çalışmıyor."
+        
+        if not report['beats']:
+            return "🐢 Henüz ölçüm yok."
+        
+        lines = [
+            "🐢 Event loop gecikmesi",
+            f"Son {report['beats']} ölçüm: p50 {report['p50'] * 1000:.1f} ms, "
+            f"p99 {report['p99'] * 1000:.1f} ms, en yüksek {report['max'] * 1000:.0f} ms",
+            f"Takılma (>{self.threshold * 1000:.0f} ms): {report['stalls']}"
+        ]
+        
+        if not report['sites']:
+            lines.append("\n✅ Bloklayan çağrı yeri kaydedilmedi.")
+            return '\n'.join(lines)
+        
+        lines.append("\nEn çok bloklayan çağrı yerleri:")
+        for i, entry in enumerate(report['sites'], 1):
+            lines.append(f"{i}. {entry['site']}")
+            lines.append(
+                f"   toplam {entry['total']:.2f} sn · {entry['count']} kez · "
+                f"en uzun {entry['max'] * 1000:.0f} ms"
+            )
+            lines.append(f"   {' → '.join(entry['stack'])}")
+        
+        return '\n'.join(lines)
+
+
+loop_watchdog = LoopWatchdog()
+
+
+def start_loop_watchdog():
+    """Yapılandırmada açıksa bekçiyi çalışan loop içinde başlat"""
+    if config.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
+
+
+def get_loop_report(top=None):
+    """Loop gecikmesi ve bloklayan çağrı yerleri raporu"""
+    return loop_watchdog.get_report(top)
+
+
+@metrics.register_collector
+def _collect_metrics():
+    for entry in loop_watchdog.get_report(top=50)['sites']:
+        yield ('finalert_loop_blocked_seconds_total', 'counter', 'Çağrı yerine göre event loop bloklanma süresi',
+               {'yer': entry['site']}, entry['total'])
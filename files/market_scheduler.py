@@ -0,0 +1,324 @@
+# FinAlert - Piyasa saatine duyarlı fiyat yenileme zamanlayıcısı
+# Her varlık sınıfı (doviz, altin, hisse) kendi aralığıyla yenilenir:
+# - Seans durumu (açık / sakin / kapalı) temel aralığı belirler
+# - Hedefi fiyata yakın uyarı sayısı ve son oynaklık aralığı kısaltır
+# - Saatlik kaynak istek bütçesi (config.REQUEST_BUDGET_PER_HOUR) asla aşılmaz
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from async_scrapers import get_doviz_data, get_altin_data, get_borsa_data
+from scrapers import quote_cache
+from quote_events import quote_hub, quote_price
+import config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Türkiye saati (2016'dan beri yaz saati uygulaması yok)
+TR_TZ = timezone(timedelta(hours=3))
+
+# Varlık sınıfı -> önbellek anahtarı ve async veri fonksiyonu
+CACHE_KEYS = {
+    'doviz': 'doviz',
+    'altin': 'altin',
+    'hisse': 'borsa'
+}
+
+FETCHERS = {
+    'doviz': get_doviz_data,
+    'altin': get_altin_data,
+    'hisse': get_borsa_data
+}
+
+
+def _parse_clock(text):
+    hour, minute = text.split(':')
+    return int(hour) * 60 + int(minute)
+
+
+def is_holiday(now):
+    """Resmi tatil mi? (config.PIYASA_TATILLERI)"""
+    return now.strftime('%m-%d') in config.PIYASA_TATILLERI or now.strftime('%Y-%m-%d') in config.PIYASA_TATILLERI
+
+
+def market_session(asset_class, now=None):
+    """
+    Varlık sınıfının şu anki seans durumu
+    
+    - hisse: BIST seansı 'open', seans öncesi/sonrası yarım saat 'quiet',
+      gece, hafta sonu ve tatiller 'closed'
+    - doviz/altin: hafta içi 09:00-18:00 'open', hafta içi diğer saatler ve
+      tatiller 'quiet' (küresel piyasa açık), hafta sonu 'closed'
+    
+    Returns:
+        str: 'open', 'quiet' veya 'closed'
+    """
+    now = (now or datetime.now(TR_TZ)).astimezone(TR_TZ)
+    minutes = now.hour * 60 + now.minute
+    weekend = now.weekday() >= 5
+    
+    if asset_class == 'hisse':
+        if weekend or is_holiday(now):
+            return 'closed'
+        
+        start, end = (_parse_clock(t) for t in config.BIST_SEANS)
+        if start <= minutes < end:
+            return 'open'
+        if start - 30 <= minutes < end + 30:
+            return 'quiet'
+        return 'closed'
+    
+    if weekend:
+        return 'closed'
+    
+    if is_holiday(now) or not (9 * 60 <= minutes < 18 * 60):
+        return 'quiet'
+    
+    return 'open'
+
+
+class AdaptivePoller:
+    """
+    Varlık sınıfı başına kendini yeniden zamanlayan fiyat yenileme işleri
+    
+    Her yenilemeden sonra bir sonraki aralık yeniden hesaplanır ve APScheduler
+    işi bu aralıkla yeniden zamanlanır. Güncel aralıklar get_cadence() ile okunur.
+    """
+    
+    def __init__(self, scheduler, alert_index, fetchers=None):
+        self.scheduler = scheduler
+        self.alert_index = alert_index
+        self._fetchers = fetchers or FETCHERS
+        self._lock = threading.Lock()
+        self._state = {
+            asset_class: {
+                'session': None,
+                'interval': None,
+                'near_alerts': 0,
+                'volatility': 0.0,
+                'requests': deque(),   # Son bir saatteki kaynak çekim zamanları
+                'last_miss': 0,
+                'fetched': 0,
+                'skipped': 0,          # Veri zaten tazeydi (kullanıcı sorgusu yeniledi)
+                'deferred': 0          # Bütçe dolu olduğu için ertelendi
+            }
+            for asset_class in self._fetchers
+        }
+        self._moves = {asset_class: [] for asset_class in self._fetchers}
+        self._unsubscribe = quote_hub.subscribe(self._on_changes)
+    
+    def start(self):
+        """Yenileme işlerini zamanlayıcıya ekle (ilk yenileme hemen yapılır)"""
+        for asset_class in self._fetchers:
+            interval = self.compute_interval(asset_class)
+            self._state[asset_class]['interval'] = interval
+            self.scheduler.add_job(
+                self._tick,
+                'interval',
+                seconds=interval,
+                args=[asset_class],
+                id=f'poll_{asset_class}',
+                next_run_time=datetime.now()
+            )
+    
+    def _on_changes(self, changes):
+        # Oynaklık ölçümü: yenileme başına fiyatların ortalama yüzde hareketi
+        with self._lock:
+            for change in changes:
+                old = quote_price(change.asset_type, change.old)
+                new = quote_price(change.asset_type, change.new)
+                
+                if change.asset_type in self._moves and old and new is not None:
+                    self._moves[change.asset_type].append(abs(new - old) / old * 100)
+    
+    def _account(self, asset_class):
+        """Önbellekteki çekim sayacından son bir saatteki kaynak isteklerini güncelle"""
+        state = self._state[asset_class]
+        misses = quote_cache.get_stats().get(CACHE_KEYS[asset_class], {}).get('miss', 0)
+        now = time.monotonic()
+        
+        # Kullanıcı sorgularıyla yapılan çekimler de bütçeden düşer
+        for _ in range(max(0, misses - state['last_miss'])):
+            state['requests'].append(now)
+        state['last_miss'] = misses
+        
+        while state['requests'] and now - state['requests'][0] >= 3600:
+            state['requests'].popleft()
+        
+        return len(state['requests'])
+    
+    def _update_volatility(self, asset_class):
+        with self._lock:
+            moves = self._moves[asset_class]
+            self._moves[asset_class] = []
+        
+        state = self._state[asset_class]
+        move = sum(moves) / len(moves) if moves else 0.0
+        state['volatility'] = 0.3 * move + 0.7 * state['volatility']
+    
+    def _near_alert_count(self, asset_class):
+        def price_of(asset_name):
+            quote, _ = quote_hub.get_last(asset_class, asset_name)
+            return quote_price(asset_class, quote)
+        
+        return self.alert_index.count_near(asset_class, price_of, config.POLL_NEAR_ALERT_PCT / 100)
+    
+    def compute_interval(self, asset_class, now=None):
+        """
+        Varlık sınıfı için bir sonraki yenileme aralığı (saniye)
+        
+        aralık = temel aralık / (yakın uyarı hızlandırması x oynaklık hızlandırması)
+        Sonuç POLL_MIN_INTERVAL ve saatlik bütçenin izin verdiği aralıktan kısa olamaz.
+        """
+        state = self._state[asset_class]
+        session = market_session(asset_class, now)
+        base = config.POLL_INTERVALS[asset_class][session]
+        
+        # Piyasa kapalıyken fiyat hareket etmez - hızlandırma yok
+        if session == 'closed':
+            near = 0
+            speedup = 1.0
+        else:
+            near = self._near_alert_count(asset_class)
+            near_speedup = 1 + 0.5 * min(near, config.POLL_NEAR_ALERT_MAX)
+            volatility_speedup = 1 + min(state['volatility'] / config.POLL_VOLATILITY_REF, 2)
+            speedup = near_speedup * volatility_speedup
+        
+        budget = config.REQUEST_BUDGET_PER_HOUR[asset_class]
+        interval = max(base / speedup, config.POLL_MIN_INTERVAL, 3600 / budget)
+        
+        # Bütçe dolduysa en eski istek pencereden çıkana kadar bekle
+        requests = state['requests']
+        if len(requests) >= budget:
+            interval = max(interval, 3600 - (time.monotonic() - requests[0]))
+        
+        state['session'] = session
+        state['near_alerts'] = near
+        return int(round(interval))
+    
+    async def _tick(self, asset_class):
+        state = self._state[asset_class]
+        
+        try:
+            used = self._account(asset_class)
+            age = quote_cache.get_age(CACHE_KEYS[asset_class])
+            
+            if age is not None and state['interval'] and age < state['interval'] * 0.9:
+                # Kullanıcı sorgusu veriyi zaten yeniledi - istek harcama
+                state['skipped'] += 1
+            elif used >= config.REQUEST_BUDGET_PER_HOUR[asset_class]:
+                state['deferred'] += 1
+                logger.warning(f"⏳ {asset_class} istek bütçesi doldu ({used}/saat), yenileme ertelendi")
+            else:
+                await self._fetchers[asset_class](force_refresh=True)
+                state['fetched'] += 1
+                self._account(asset_class)
+        
+        except Exception as e:
+            logger.error(f"❌ {asset_class} fiyat yenileme hatası: {e}")
+        
+        self._update_volatility(asset_class)
+        self._reschedule(asset_class)
+    
+    def _reschedule(self, asset_class):
+        state = self._state[asset_class]
+        interval = self.compute_interval(asset_class)
+        
+        if interval == state['interval']:
+            return
+        
+        state['interval'] = interval
+        try:
+            self.scheduler.reschedule_job(f'poll_{asset_class}', trigger='interval', seconds=interval)
+        except Exception as e:
+            logger.error(f"❌ {asset_class} yenileme işi yeniden zamanlanamadı: {e}")
+            return
+        
+        logger.info(
+            f"🔄 {asset_class} yenileme aralığı: {interval} sn "
+            f"(seans: {state['session']}, yakın uyarı: {state['near_alerts']}, "
+            f"oynaklık: %{state['volatility']:.2f})"
+        )
+    
+    def get_cadence(self):
+        """
+        Güncel yenileme temposu
+        
+        Returns:
+            dict: varlık sınıfı -> {session, interval, near_alerts, volatility,
+                  requests_last_hour, budget, fetched, skipped, deferred, next_run}
+        """
+        cadence = {}
+        
+        for asset_class, state in self._state.items():
+            job = self.scheduler.get_job(f'poll_{asset_class}')
+            cadence[asset_class] = {
+                'session': state['session'],
+                'interval': state['interval'],
+                'near_alerts': state['near_alerts'],
+                'volatility': round(state['volatility'], 4),
+                'requests_last_hour': self._account(asset_class),
+                'budget': config.REQUEST_BUDGET_PER_HOUR[asset_class],
+                'fetched': state['fetched'],
+                'skipped': state['skipped'],
+                'deferred': state['deferred'],
+                'next_run': job.next_run_time if job else None
+            }
+        
+        return cadence
+
+
+_poller = None
+
+
+def start_poller(scheduler, alert_index):
+    """Süreç genelindeki uyarlamalı yenileyiciyi oluştur ve başlat"""
+    global _poller
+    
+    _poller = AdaptivePoller(scheduler, alert_index)
+    _poller.start()
+    return _poller
+
+
+def get_cadence():
+    """Güncel yenileme temposunu döndür (yenileyici başlatılmadıysa boş)"""
+    return _poller.get_cadence() if _poller else {}
+
+
+def format_cadence():
+    """Yenileme temposunu düz metin olarak döndür (admin komutu); yenileyici yoksa boş metin"""
+    cadence = get_cadence()
+    if not cadence:
+        return ""
+    
+    lines = ["⏱️ Fiyat yenileme temposu"]
+    for asset_class, state in cadence.items():
+        next_run = state['next_run'].astimezone(TR_TZ).strftime('%H:%M:%S') if state['next_run'] else '-'
+        lines.append(
+            f"{asset_class}: her {state['interval']} sn ({state['session']}) · "
+            f"istek {state['requests_last_hour']}/{state['budget']} saat · "
+            f"yakın uyarı {state['near_alerts']} · sonraki {next_run}"
+        )
+    
+    return '\n'.join(lines)
+
+
+@metrics.register_collector
+def _collect_metrics():
+    for asset_class, state in get_cadence().items():
+        labels = {'varlik': asset_class}
+        yield ('finalert_poll_interval_seconds', 'gauge', 'Varlık sınıfının güncel fiyat yenileme aralığı',
+               labels, state['interval'] or 0)
+        yield ('finalert_poll_requests_last_hour', 'gauge', 'Son bir saatteki kaynak yenileme istekleri',
+               labels, state['requests_last_hour'])
+        yield ('finalert_poll_budget_per_hour', 'gauge', 'Saatlik kaynak istek bütçesi',
+               labels, state['budget'])
+        yield ('finalert_poll_budget_used_ratio', 'gauge', 'Saatlik istek bütçesinin kullanılan oranı',
+               labels, state['requests_last_hour'] / state['budget'] if state['budget'] else 0.0)
+        for sonuc in ('fetched', 'skipped', 'deferred'):
+            yield ('finalert_poll_ticks_total', 'counter', 'Yenileme turları (çekildi / atlandı / bütçe nedeniyle ertelendi)',
+                   dict(labels, sonuc=sonuc), state[sonuc])
+        yield ('finalert_poll_near_alerts', 'gauge', 'Hedefi fiyata yakın uyarı sayısı',
+               labels, state['near_alerts'])
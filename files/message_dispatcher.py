@@ -0,0 +1,181 @@
+# FinAlert - Telegram mesaj dağıtıcısı
+# Tetiklenen uyarılar ve periyodik raporlar sınırlı sayıda eşzamanlı
+# gönderici ile dağıtılır. Telegram'ın genel (~30 mesaj/sn) ve sohbet başı
+# (~1 mesaj/sn) sınırlarına uyulur, RetryAfter hatasında beklenip tekrar denenir.
+import asyncio
+import logging
+import time
+from telegram.error import TelegramError, RetryAfter, Forbidden, BadRequest, TimedOut, NetworkError
+import config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Basit aralıklı hız sınırlayıcı - saniyede en fazla `rate` izin verir"""
+    
+    def __init__(self, rate):
+        self._interval = 1.0 / rate
+        self._next = 0.0
+    
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        
+        # Sıradaki izin zamanını await'ten önce ayır (event loop tek thread)
+        wait = self._next - now
+        self._next = max(now, self._next) + self._interval
+        
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class MessageDispatcher:
+    """
+    Sınırlı eşzamanlılıkla mesaj gönderen kuyruk
+    
+    Kullanım:
+        jobs = [{'chat_id': 123, 'text': '...', 'ref': uyari}, ...]
+        jobs = await dispatcher.send_batch(jobs)
+        gonderilenler = [job['ref'] for job in jobs if job['ok']]
+    """
+    
+    def __init__(self, bot, workers=None, global_rate=None, per_chat_interval=None, max_retries=None):
+        self.bot = bot
+        self.workers = workers or config.SEND_WORKERS
+        self.per_chat_interval = per_chat_interval if per_chat_interval is not None else config.TELEGRAM_PER_CHAT_INTERVAL
+        self.max_retries = max_retries if max_retries is not None else config.SEND_MAX_RETRIES
+        self._global_limiter = RateLimiter(global_rate or config.TELEGRAM_GLOBAL_RATE)
+        self._chat_next = {}       # chat_id -> bir sonraki gönderim zamanı
+        self._paused_until = 0.0   # RetryAfter sonrası tüm göndericiler bekler
+        self.stats = {'sent': 0, 'failed': 0, 'retry_after': 0, 'retries': 0}
+    
+    async def send_batch(self, jobs):
+        """
+        Mesajları eşzamanlı gönder
+        
+        Args:
+            jobs: {'chat_id', 'text', 'parse_mode' (ops.), 'ref' (ops.)} sözlükleri
+        
+        Returns:
+            list: Aynı işler, 'ok' (bool) ve hata varsa 'error' alanlarıyla
+        """
+        if not jobs:
+            return jobs
+        
+        # Süresi geçmiş sohbet kayıtlarını temizle
+        now = asyncio.get_running_loop().time()
+        self._chat_next = {chat_id: t for chat_id, t in self._chat_next.items() if t > now}
+        
+        queue = asyncio.Queue()
+        for job in jobs:
+            job['ok'] = False
+            queue.put_nowait(job)
+        
+        worker_count = min(self.workers, len(jobs))
+        tasks = [asyncio.ensure_future(self._worker(queue)) for _ in range(worker_count)]
+        
+        try:
+            await queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return jobs
+    
+    async def _worker(self, queue):
+        while True:
+            job = await queue.get()
+            try:
+                await self._deliver(job)
+            except Exception as e:
+                job['error'] = str(e)
+                logger.error(f"❌ Mesaj gönderme hatası ({job['chat_id']}): {e}")
+            finally:
+                queue.task_done()
+    
+    async def _wait_turn(self, chat_id):
+        loop = asyncio.get_running_loop()
+        
+        # Sohbet başı sınır - zamanı await'ten önce ayır
+        now = loop.time()
+        chat_at = max(now, self._chat_next.get(chat_id, 0.0))
+        self._chat_next[chat_id] = chat_at + self.per_chat_interval
+        
+        wait = max(chat_at, self._paused_until) - now
+        if wait > 0:
+            await asyncio.sleep(wait)
+        
+        await self._global_limiter.acquire()
+    
+    async def _send(self, job):
+        # Tek gönderim denemesi - süre ve Telegram hata türü metriğe yazılır
+        start = time.perf_counter()
+        try:
+            await self.bot.send_message(
+                chat_id=job['chat_id'],
+                text=job['text'],
+                parse_mode=job.get('parse_mode', 'Markdown')
+            )
+        except TelegramError as e:
+            metrics.SEND_SECONDS.observe(time.perf_counter() - start, sonuc='hata')
+            metrics.TELEGRAM_ERRORS.inc(tur=type(e).__name__)
+            raise
+        
+        metrics.SEND_SECONDS.observe(time.perf_counter() - start, sonuc='ok')
+    
+    async def _deliver(self, job):
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        
+        while True:
+            await self._wait_turn(job['chat_id'])
+            
+            try:
+                await self._send(job)
+                job['ok'] = True
+                self.stats['sent'] += 1
+                return
+            
+            except RetryAfter as e:
+                # Telegram flood kontrolü - tüm göndericileri durdur
+                retry_after = e.retry_after
+                if hasattr(retry_after, 'total_seconds'):
+                    retry_after = retry_after.total_seconds()
+                self._paused_until = max(self._paused_until, loop.time() + float(retry_after))
+                self.stats['retry_after'] += 1
+                logger.warning(f"⏳ Telegram RetryAfter: {retry_after} sn bekleniyor")
+            
+            except (Forbidden, BadRequest) as e:
+                # Kullanıcı botu engellemiş veya mesaj geçersiz - tekrar deneme
+                job['error'] = str(e)
+                self.stats['failed'] += 1
+                logger.error(f"❌ Mesaj gönderilemedi ({job['chat_id']}): {e}")
+                return
+            
+            except (TimedOut, NetworkError) as e:
+                job['error'] = str(e)
+                await asyncio.sleep(min(2 ** attempt, 30))
+            
+            attempt += 1
+            self.stats['retries'] += 1
+            
+            if attempt > self.max_retries:
+                self.stats['failed'] += 1
+                logger.error(f"❌ Mesaj {attempt} denemede gönderilemedi: {job['chat_id']}")
+                return
+
+
+_dispatcher = None
+
+
+def get_dispatcher(bot):
+    """Süreç genelinde tek dağıtıcıyı al (sohbet başı sınırlar paylaşılır)"""
+    global _dispatcher
+    
+    if _dispatcher is None or _dispatcher.bot is not bot:
+        _dispatcher = MessageDispatcher(bot)
+    
+    return _dispatcher
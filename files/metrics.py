@@ -0,0 +1,394 @@
+# FinAlert - Metrikler (Prometheus metin biçimi)
+# Sayaçlar (counter), anlık değerler (gauge) ve histogramlar süreç içinde
+# tutulur ve yerel HTTP ucundan (/metrics) Prometheus metin biçiminde sunulur.
+# - timed(): senkron / async fonksiyonun süresini histograma yazan dekoratör
+# - register_collector(): modüllerin mevcut istatistiklerini (önbellek, HTTP,
+#   kaynak sağlığı...) okuma anında metriğe çeviren toplayıcılar
+# Harici paket gerektirmez; sunucu ayrı thread'de çalışır, event loop'u bloklamaz.
+import asyncio
+import bisect
+import functools
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+
+logger = logging.getLogger(__name__)
+
+# Saniye cinsinden varsayılan histogram sınırları
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_metrics = {}       # isim -> metrik
+_collectors = []    # okuma anında çağrılan toplayıcılar
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+    
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}   # etiket değerleri (tuple) -> değer
+    
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: etiketler {self.labelnames} olmalı, {tuple(labels)} verildi")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def _labels(self, key, **extra):
+        return list(zip(self.labelnames, key)) + list(extra.items())
+    
+    def samples(self):
+        """(ek isim, etiketler, değer) satırları"""
+        with self._lock:
+            return [('', self._labels(key), value) for key, value in sorted(self._values.items())]
+
+
+class Counter(_Metric):
+    """Yalnızca artan sayaç"""
+    kind = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Anlık değer"""
+    kind = 'gauge'
+    
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Dağılım - sınır başına sayım, toplam ve adet"""
+    kind = 'histogram'
+    
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+    
+    def time(self, **labels):
+        """Bloğun süresini kaydeden bağlam yöneticisi: with HISTOGRAM.time(kaynak='link1'):"""
+        return _Timer(self, labels)
+    
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in sorted(self._values.items())]
+        
+        samples = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', self._labels(key, le=_format_value(float(bound))), cumulative))
+            samples.append(('_bucket', self._labels(key, le='+Inf'), count))
+            samples.append(('_sum', self._labels(key), total))
+            samples.append(('_count', self._labels(key), count))
+        return samples
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+    
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+def _register(metric):
+    with _lock:
+        existing = _metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        _metrics[metric.name] = metric
+        return metric
+
+
+def counter(name, help_text, labelnames=()):
+    return _register(Counter(name, help_text, labelnames))
+
+
+def gauge(name, help_text, labelnames=()):
+    return _register(Gauge(name, help_text, labelnames))
+
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, help_text, labelnames, buckets))
+
+
+def timed(metric, **labels):
+    """
+    Fonksiyon süresini histograma yazan dekoratör (senkron veya async)
+    Fonksiyon hata verse de süre kaydedilir
+    
+    Kullanım:
+        @timed(HANDLER_SECONDS, handler='button_callback')
+        async def button_callback(update, context): ...
+    """
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    metric.observe(time.perf_counter() - start, **labels)
+            
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - start, **labels)
+        
+        return wrapper
+    
+    return decorator
+
+
+def register_collector(collector):
+    """
+    Okuma anında çağrılacak toplayıcıyı ekle
+    
+    Args:
+        collector: (isim, tür, açıklama, etiketler (dict), değer) satırları döndüren fonksiyon
+    """
+    with _lock:
+        if collector not in _collectors:
+            _collectors.append(collector)
+    return collector
+
+
+# ===== METRİK TANIMLARI =====
+SCRAPE_SECONDS = histogram(
+    'finalert_scrape_seconds', 'Kaynak çekim süresi (zincir içindeki her deneme)', ['kaynak', 'sonuc']
+)
+PARSE_SECONDS = histogram(
+    'finalert_parse_seconds', 'Sayfa ayrıştırma süresi', ['kaynak', 'yol'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+QUOTE_REFRESH_SECONDS = histogram(
+    'finalert_quote_refresh_seconds', 'Varlık sınıfı verisinin kaynak zincirinden yenilenme süresi', ['varlik']
+)
+CHAIN_DEPTH = histogram(
+    'finalert_chain_depth', 'Veriyi veren kaynağın zincirdeki öncelik sırası (1 = ilk kaynak)', ['zincir'],
+    buckets=(1, 2, 3, 4, 5, 6, 7)
+)
+CHAIN_FAILURES = counter(
+    'finalert_chain_failures_total', 'Hiçbir kaynağın veri vermediği zincir çalıştırmaları', ['zincir']
+)
+ALERT_TICK_SECONDS = histogram(
+    'finalert_alert_tick_seconds', 'Uyarı değerlendirme turu süresi', ['yol']
+)
+ALERT_ASSETS_EVALUATED = counter(
+    'finalert_alert_assets_evaluated_total', 'Uyarıları değerlendirilen varlık sayısı', ['yol']
+)
+ALERTS_TRIGGERED = counter(
+    'finalert_alerts_triggered_total', 'Tetiklenen uyarılar', ['yol']
+)
+NOTIFICATIONS_DUE = counter(
+    'finalert_notifications_due_total', 'Zamanı gelen periyodik bildirimler'
+)
+SEND_SECONDS = histogram(
+    'finalert_send_seconds', 'Telegram mesaj gönderim süresi (tek deneme)', ['sonuc']
+)
+TELEGRAM_ERRORS = counter(
+    'finalert_telegram_errors_total', 'Telegram API hataları', ['tur']
+)
+WEBHOOK_UPDATES = counter(
+    'finalert_webhook_updates_total', 'Webhook ile gelen güncellemeler', ['sonuc']
+)
+WEBHOOK_QUEUE_SECONDS = histogram(
+    'finalert_webhook_queue_seconds', 'Güncellemenin işçi kuyruğunda bekleme süresi'
+)
+DB_QUERY_SECONDS = histogram(
+    'finalert_db_query_seconds', 'Veritabanı sorgu süresi', ['islem'],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+)
+HANDLER_SECONDS = histogram(
+    'finalert_handler_seconds', 'Telegram handler süresi', ['handler']
+)
+LOOP_LAG_SECONDS = histogram(
+    'finalert_loop_lag_seconds', 'Event loop gecikmesi (kalp atışının planlanan zamandan sapması)',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+LOOP_STALLS = counter(
+    'finalert_loop_stalls_total', 'Eşiği aşan event loop takılmaları'
+)
+PORTFOLIO_SECONDS = histogram(
+    'finalert_portfolio_seconds', 'Portföy işlemleri süresi', ['islem']
+)
+
+
+def observe_chain(zincir, kaynaklar, data):
+    """
+    Zincir sonucunu kaydet: veriyi veren kaynağın öncelik sırası
+    
+    Args:
+        kaynaklar: Zincirin öncelik sırasındaki (etiket, çekici) listesi
+        data: '_kaynak' etiketli zincir sonucu
+    """
+    data = data or {}
+    etiketler = [kaynak for kaynak, _ in kaynaklar]
+    
+    if any(not str(key).startswith('_') for key in data) and data.get('_kaynak') in etiketler:
+        CHAIN_DEPTH.observe(etiketler.index(data['_kaynak']) + 1, zincir=zincir)
+    else:
+        CHAIN_FAILURES.inc(zincir=zincir)
+
+
+# ===== METİN BİÇİMİ =====
+def render():
+    """Tüm metrikleri Prometheus metin biçiminde döndür"""
+    with _lock:
+        metrics = list(_metrics.values())
+        collectors = list(_collectors)
+    
+    lines = []
+    for metric in metrics:
+        samples = metric.samples()
+        if not samples:
+            continue
+        
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+    
+    # Toplayıcı satırları isme göre gruplanır
+    groups = {}
+    for collector in collectors:
+        try:
+            rows = list(collector())
+        except Exception as e:
+            logger.error(f"❌ Metrik toplayıcı hatası ({getattr(collector, '__name__', collector)}): {e}")
+            continue
+        
+        for name, kind, help_text, labels, value in rows:
+            if value is None:
+                continue
+            group = groups.setdefault(name, (kind, help_text, []))
+            group[2].append((sorted(labels.items()), value))
+    
+    for name, (kind, help_text, rows) in groups.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in rows:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    
+    return '\n'.join(lines) + '\n'
+
+
+# ===== HTTP UCU =====
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def start_metrics_server(host=None, port=None):
+    """
+    /metrics ucunu ayrı thread'de başlat (yapılandırmada kapalıysa None)
+    
+    Returns:
+        ThreadingHTTPServer veya None
+    """
+    global _server
+    
+    if _server is not None or not config.METRICS_ENABLED:
+        return _server
+    
+    host = host or config.METRICS_HOST
+    port = config.METRICS_PORT if port is None else port
+    
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.error(f"❌ Metrik sunucusu başlatılamadı ({host}:{port}): {e}")
+        return None
+    
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name='metrics', daemon=True).start()
+    logger.info(f"✅ Metrikler: http://{host}:{_server.server_address[1]}/metrics")
+    return _server
+
+
+def stop_metrics_server():
+    """Metrik sunucusunu kapat"""
+    global _server
+    
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
@@ -0,0 +1,205 @@
+# FinAlert - Ayrıştırma (parse) süresi karşılaştırması
+# Her HTML/XML kaynağı için örnek sayfa üretilir ve lxml hızlı yolu ile
+# BeautifulSoup yolu aynı içerik üzerinde ölçülür. İki yolun aynı sonucu
+# verdiği de doğrulanır.
+#
+# Kullanım:
+#     python parse_benchmark.py            # varsayılan 50 tekrar
+#     python parse_benchmark.py 200        # tekrar sayısı
+import sys
+import time
+import config
+import scrapers
+
+# Gerçek sayfalardaki menü, reklam, script gibi içerikleri taklit eden dolgu
+DOLGU = ''.join(
+    f'<div class="nav-item"><a href="/haber/{i}">Haber başlığı {i}</a>'
+    f'<span class="meta">Açıklama metni {i}</span></div>'
+    for i in range(400)
+)
+
+
+def _sayfa(govde):
+    return (
+        '<html><head><title>Piyasalar</title>'
+        '<script>var x = 1;</script></head><body>'
+        f'{DOLGU}{govde}{DOLGU}</body></html>'
+    ).encode('utf-8')
+
+
+def _fiyat(deger):
+    return f"{deger:,.4f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def ornek_tcmb():
+    kurlar = {'USD': 34.1, 'EUR': 37.2, 'GBP': 44.3, 'CHF': 39.1, 'JPY': 0.23, 'CAD': 25.1}
+    govde = ''.join(
+        f'<Currency CrossOrder="{i}" Kod="{kod}" CurrencyCode="{kod}"><Unit>1</Unit>'
+        f'<Isim>{kod}</Isim><ForexBuying>{kur}</ForexBuying><ForexSelling>{kur}</ForexSelling>'
+        f'<BanknoteBuying>{kur * 0.99:.4f}</BanknoteBuying><BanknoteSelling>{kur * 1.01:.4f}</BanknoteSelling></Currency>'
+        for i, (kod, kur) in enumerate(kurlar.items())
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><Tarih_Date Tarih="18.10.2026">{govde}</Tarih_Date>'.encode('utf-8')
+
+
+def _mynet_tablosu(satirlar):
+    govde = ''.join(
+        f'<tr><td><a href="/{isim}">{isim}</a></td><td><i class="icon"></i></td>'
+        f'<td>{_fiyat(fiyat)}</td><td>{_fiyat(fiyat * 0.99)}</td><td>{_fiyat(fiyat * 1.01)}</td>'
+        f'<td>%0,12</td><td>18.10.2026</td></tr>'
+        for isim, fiyat in satirlar
+    )
+    return _sayfa(f'<table class="table-data"><thead><tr><th>İsim</th></tr></thead><tbody>{govde}</tbody></table>')
+
+
+def ornek_doviz_mynet():
+    satirlar = [('Kanada Doları', 25.1), ('Amerikan Doları', 34.1), ('Euro', 37.2), ('İngiliz Sterlini', 44.3)]
+    satirlar += [(f'Diğer Para {i}', 1.0 + i) for i in range(30)]
+    return _mynet_tablosu(satirlar)
+
+
+def ornek_altin_mynet():
+    satirlar = [('Gram Altın', 2950.0), ('Çeyrek Altın', 4850.0), ('Yarım Altın', 9700.0),
+                ('Tam Altın', 19400.0), ('Cumhuriyet Altını', 19900.0), ('Ons Altın TL', 91000.0),
+                ('Kapalıçarşı Gram Altın', 2960.0)]
+    satirlar += [(f'Diğer Altın {i}', 100.0 + i) for i in range(20)]
+    return _mynet_tablosu(satirlar)
+
+
+def ornek_doviz_sabah():
+    satirlar = [('Dolar', 34.1), ('Euro', 37.2), ('Sterlin', 44.3)] + [(f'Kur {i}', 1.0 + i) for i in range(30)]
+    govde = ''.join(
+        f'<tr><td><a href="/doviz/{i}">{isim}</a> <small>TL</small></td>'
+        f'<td>{_fiyat(fiyat * 0.99)}</td><td>{_fiyat(fiyat * 1.01)}</td><td>17:30</td><td>%0,10</td></tr>'
+        for i, (isim, fiyat) in enumerate(satirlar)
+    )
+    return _sayfa(f'<table><tr><th>DÖVİZ</th><th>ALIŞ</th><th>SATIŞ</th></tr>{govde}</table>')
+
+
+def ornek_doviz_bigpara():
+    satirlar = [('dolar', 34.1), ('euro', 37.2), ('sterlin', 44.3)] + [(f'kur{i}', 1.0 + i) for i in range(30)]
+    govde = ''.join(
+        f'<tr data-name="{isim}"><td>{isim}</td><td>{_fiyat(fiyat * 0.99)}</td><td>{_fiyat(fiyat * 1.01)}</td></tr>'
+        for isim, fiyat in satirlar
+    )
+    return _sayfa(f'<table>{govde}</table>')
+
+
+def ornek_doviz_dovizcom_html():
+    govde = ''.join(
+        f'<div class="item currency-item"><div data-code="{kod}"><span class="name">{kod}</span></div>'
+        f'<span class="value">{_fiyat(kur)}</span><span class="sell">{_fiyat(kur * 1.01)}</span></div>'
+        for kod, kur in [('USD', 34.1), ('EUR', 37.2), ('GBP', 44.3), ('CHF', 39.1)]
+    )
+    return _sayfa(govde)
+
+
+def ornek_doviz_dovizcom_api_html():
+    govde = ''.join(
+        f'<div data-code="{kod}"><span class="name">{kod}</span>'
+        f'<span class="value">{_fiyat(kur * 0.99)}</span><span class="value">{_fiyat(kur * 1.01)}</span></div>'
+        for kod, kur in [('USD', 34.1), ('EUR', 37.2), ('GBP', 44.3), ('CHF', 39.1)]
+    )
+    return _sayfa(govde)
+
+
+def ornek_altin_trt():
+    satirlar = [('Gram Altın', 2950.0), ('Çeyrek Altın', 4850.0), ('Yarım Altın', 9700.0)]
+    satirlar += [(f'Diğer {i}', 100.0 + i) for i in range(20)]
+    govde = ''.join(
+        f'<tr><td>{isim}</td><td>{_fiyat(fiyat * 0.99)}</td><td>{_fiyat(fiyat * 1.01)}</td></tr>'
+        for isim, fiyat in satirlar
+    )
+    return _sayfa(f'<div class="Table-wrapper"><table class="gold-table"><tr><th>Tür</th></tr>{govde}</table></div>')
+
+
+def ornek_altin_bigpara():
+    satirlar = [('gram-altin', 2950.0), ('ceyrek-altin', 4850.0), ('yarim-altin', 9700.0),
+                ('tam-altin', 19400.0), ('ons-altin', 91000.0)]
+    govde = ''.join(
+        f'<tr data-name="{isim}"><td>{isim}</td><td>{_fiyat(fiyat * 0.99)}</td><td>{_fiyat(fiyat * 1.01)}</td></tr>'
+        for isim, fiyat in satirlar
+    )
+    # Cumhuriyet altını yalnızca bağlantı metniyle bulunur (alternatif arama yolu)
+    govde += f'<tr><td><a href="/cumhuriyet">Cumhuriyet Altını</a></td><td>{_fiyat(19800.0)}</td><td>{_fiyat(20000.0)}</td></tr>'
+    return _sayfa(f'<table>{govde}</table>')
+
+
+def _borsa_satirlari():
+    return [('XU100', 9850.5)] + [(kod, 50.0 + i) for i, kod in enumerate(config.BORSA_SEMBOLLERI)] + \
+           [(f'HSS{i}', 10.0 + i) for i in range(60)]
+
+
+def ornek_borsa_foreks():
+    govde = ''.join(
+        f'<tr data-code="{kod}"><td>{kod}</td><td>{_fiyat(fiyat)}</td><td>%1,25</td></tr>'
+        for kod, fiyat in _borsa_satirlari()
+    )
+    return _sayfa(f'<table>{govde}</table>')
+
+
+def ornek_borsa_bigpara():
+    return ornek_borsa_foreks()
+
+
+# kaynak -> (örnek sayfa, hızlı çıkarıcı, BeautifulSoup çıkarıcı, sözlük kurucu)
+KAYNAKLAR = {
+    'doviz_tcmb': (ornek_tcmb, scrapers._fast_doviz_tcmb, scrapers._soup_doviz_tcmb, scrapers._build_doviz_pairs),
+    'doviz_mynet': (ornek_doviz_mynet, scrapers.fast_parsers.first_table_rows, scrapers._soup_first_table_rows, scrapers._build_doviz_mynet),
+    'doviz_dovizcom_html': (ornek_doviz_dovizcom_html, scrapers._fast_doviz_dovizcom_html, scrapers._soup_doviz_dovizcom_html, scrapers._build_doviz_pairs),
+    'doviz_sabah': (ornek_doviz_sabah, scrapers.fast_parsers.sabah_rows, scrapers._soup_doviz_sabah_rows, scrapers._build_doviz_sabah),
+    'doviz_bigpara': (ornek_doviz_bigpara, scrapers._fast_doviz_bigpara, scrapers._soup_doviz_bigpara, scrapers._build_doviz_bigpara),
+    'doviz_dovizcom_api_html': (ornek_doviz_dovizcom_api_html, scrapers._fast_doviz_dovizcom_api_html, scrapers._soup_doviz_dovizcom_api_html, scrapers._build_doviz_value_spans),
+    'altin_trt': (ornek_altin_trt, scrapers.fast_parsers.table_container_rows, scrapers._soup_altin_trt_rows, scrapers._build_altin_trt),
+    'altin_bigpara': (ornek_altin_bigpara, scrapers._fast_altin_bigpara, scrapers._soup_altin_bigpara, scrapers._build_altin_cells),
+    'altin_mynet': (ornek_altin_mynet, scrapers.fast_parsers.first_table_rows, scrapers._soup_first_table_rows, scrapers._build_altin_mynet),
+    'borsa_foreks': (ornek_borsa_foreks, scrapers._fast_borsa_foreks, scrapers._soup_borsa_foreks, scrapers._build_borsa_foreks),
+    'borsa_bigpara': (ornek_borsa_bigpara, scrapers._fast_borsa_bigpara, scrapers._soup_borsa_bigpara, scrapers._build_borsa_bigpara),
+}
+
+
+def olc(fonksiyon, content, tekrar):
+    """Ortalama çalışma süresi (milisaniye)"""
+    baslangic = time.perf_counter()
+    for _ in range(tekrar):
+        fonksiyon(content)
+    return (time.perf_counter() - baslangic) * 1000 / tekrar
+
+
+def calistir(tekrar=50):
+    """
+    Tüm kaynaklar için iki yolu ölç
+    
+    Returns:
+        list: (kaynak, bs_ms, lxml_ms, hızlanma, sonuçlar_aynı) satırları
+    """
+    sonuclar = []
+    
+    for kaynak, (ornek, fast_extract, soup_extract, build) in KAYNAKLAR.items():
+        content = ornek()
+        
+        def fast(c):
+            return build(fast_extract(c))
+        
+        def soup(c):
+            return build(soup_extract(c))
+        
+        ayni = bool(fast(content)) and fast(content) == soup(content)
+        bs_ms = olc(soup, content, tekrar)
+        lxml_ms = olc(fast, content, tekrar)
+        sonuclar.append((kaynak, bs_ms, lxml_ms, bs_ms / lxml_ms if lxml_ms else 0.0, ayni))
+    
+    return sonuclar
+
+
+if __name__ == '__main__':
+    tekrar = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"Ayrıştırma süreleri ({tekrar} tekrar ortalaması, ms)\n")
+    print(f"{'Kaynak':<26}{'BeautifulSoup':>14}{'lxml':>10}{'Hızlanma':>10}  Sonuç")
+    
+    hatali = False
+    for kaynak, bs_ms, lxml_ms, hizlanma, ayni in calistir(tekrar):
+        hatali = hatali or not ayni
+        print(f"{kaynak:<26}{bs_ms:>14.3f}{lxml_ms:>10.3f}{hizlanma:>9.1f}x  {'aynı' if ayni else 'FARKLI'}")
+    
+    sys.exit(1 if hatali else 0)
@@ -1,6 +1,18 @@
-from database import get_db, Portfolio
-from scrapers import get_doviz_data, get_altin_data, get_borsa_data
+import asyncio
+from sqlalchemy import select
+from database import get_async_db, async_session_scope, Portfolio
+from async_scrapers import get_doviz_data, get_altin_data, get_borsa_data
+from quote_events import quote_hub, quote_price
 from datetime import datetime
+import config
+import metrics
+
+# Portföy varlık türü -> (önbellek anahtarı, async veri çekimi)
+PRICE_SOURCES = {
+    'doviz': ('doviz', get_doviz_data),
+    'altin': ('altin', get_altin_data),
+    'hisse': ('borsa', get_borsa_data)
+}
 
 
 def format_price(price):
@@ -8,7 +20,8 @@ def format_price(price):
     return f"{price:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 
-def add_portfolio_item(user_id, asset_type, asset_name, amount, purchase_price):
+@metrics.timed(metrics.PORTFOLIO_SECONDS, islem='ekle')
+async def add_portfolio_item(user_id, asset_type, asset_name, amount, purchase_price):
     """
     Portföye yeni varlık ekle
     
@@ -22,80 +35,82 @@ def add_portfolio_item(user_id, asset_type, asset_name, amount, purchase_price):
     Returns:
         bool: Başarılı ise True
     """
-    db = get_db()
-    
     try:
-        portfolio_item = Portfolio(
-            user_id=user_id,
-            asset_type=asset_type,
-            asset_name=asset_name,
-            amount=amount,
-            purchase_price=purchase_price,
-            purchase_date=datetime.now()
-        )
-        
-        db.add(portfolio_item)
-        db.commit()
-        db.close()
+        async with async_session_scope() as db:
+            db.add(Portfolio(
+                user_id=user_id,
+                asset_type=asset_type,
+                asset_name=asset_name,
+                amount=amount,
+                purchase_price=purchase_price,
+                purchase_date=datetime.now()
+            ))
         
         return True
     
     except Exception as e:
         print(f"❌ Portföy ekleme hatası: {e}")
-        db.close()
         return False
 
 
-def get_user_portfolio(user_id):
+@metrics.timed(metrics.PORTFOLIO_SECONDS, islem='listele')
+async def get_user_portfolio(user_id):
     """
     Kullanıcının tüm portföyünü getir
     
     Returns:
         list: Portföy öğeleri listesi
     """
-    db = get_db()
-    portfolio = db.query(Portfolio).filter(Portfolio.user_id == user_id).all()
-    db.close()
+    async with get_async_db() as db:
+        result = await db.execute(select(Portfolio).where(Portfolio.user_id == user_id))
+        portfolio = result.scalars().all()
     
     return portfolio
 
 
-def calculate_portfolio_profit_loss(user_id):
+async def refresh_stale_prices(asset_types):
+    """
+    Fiyat akışı önbellek süresi içinde güncellenmemiş varlık türlerini yenile
+    
+    Lider süreçte fiyat yenileyici akışı güncel tutar ve burada veri çekilmez;
+    işçi süreçlerinde veya ilk açılışta ilgili sınıf önbellekten okunur ve akışa yayınlanır.
+    """
+    fetches = []
+    for asset_type in asset_types:
+        cache_key, fetch = PRICE_SOURCES[asset_type]
+        age = quote_hub.get_age(asset_type)
+        if age is None or age >= config.CACHE_TTL.get(cache_key, 60):
+            fetches.append(fetch())
+    
+    if fetches:
+        await asyncio.gather(*fetches)
+
+
+@metrics.timed(metrics.PORTFOLIO_SECONDS, islem='kar_zarar')
+async def calculate_portfolio_profit_loss(user_id):
     """
     Kullanıcının portföy kar/zararını hesapla
     
     Returns:
         dict: Detaylı kar/zarar bilgileri
     """
-    portfolio = get_user_portfolio(user_id)
+    portfolio = await get_user_portfolio(user_id)
     
     if not portfolio:
         return None
     
-    # Güncel fiyatları çek
-    doviz_data = get_doviz_data()
-    altin_data = get_altin_data()
-    borsa_data = get_borsa_data()
+    # Güncel fiyatlar fiyat değişim akışının son değerlerinden okunur - yalnızca
+    # portföydeki türler, akış eskiyse önce yenilenir
+    await refresh_stale_prices({item.asset_type for item in portfolio if item.asset_type in PRICE_SOURCES})
     
     total_investment = 0  # Toplam yatırım
     total_current_value = 0  # Toplam güncel değer
     items_detail = []
     
     for item in portfolio:
-        current_price = None
-        
-        # Güncel fiyatı al
-        if item.asset_type == 'doviz':
-            if item.asset_name in doviz_data:
-                current_price = doviz_data[item.asset_name]['satis']
-        
-        elif item.asset_type == 'altin':
-            if item.asset_name in altin_data:
-                current_price = altin_data[item.asset_name]['satis']
-        
-        elif item.asset_type == 'hisse':
-            if item.asset_name in borsa_data:
-                current_price = borsa_data[item.asset_name]['deger']
+        # Güncel fiyatı al (döviz/altın: satış, hisse: değer)
+        quote, _ = quote_hub.get_last(item.asset_type, item.asset_name)
+        current_price = quote_price(item.asset_type, quote)
         
         if current_price:
             # Hesaplamalar
@@ -134,34 +149,36 @@ def calculate_portfolio_profit_loss(user_id):
     }
 
 
-def delete_portfolio_item(item_id):
+@metrics.timed(metrics.PORTFOLIO_SECONDS, islem='sil')
+async def delete_portfolio_item(item_id, user_id=None):
     """
     Portföyden varlık sil
     
     Args:
         item_id: Silinecek öğenin ID'si
+        user_id: Verilirse yalnızca bu kullanıcının öğesi silinir
     
     Returns:
-        bool: Başarılı ise True
+        Portfolio: Silinen öğe (bilgileri okunabilir); bulunamazsa veya hata olursa None
     """
-    db = get_db()
-    
     try:
-        item = db.query(Portfolio).filter(Portfolio.id == item_id).first()
-        
-        if item:
-            db.delete(item)
-            db.commit()
-            db.close()
-            return True
+        async with async_session_scope() as db:
+            query = select(Portfolio).where(Portfolio.id == item_id)
+            if user_id is not None:
+                query = query.where(Portfolio.user_id == user_id)
+            
+            item = (await db.execute(query)).scalars().first()
+            
+            if not item:
+                return None
+            
+            await db.delete(item)
         
-        db.close()
-        return False
+        return item
     
     except Exception as e:
         print(f"❌ Portföy silme hatası: {e}")
-        db.close()
-        return False
+        return None
 
 
 def format_portfolio_report(portfolio_data):
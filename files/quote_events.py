@@ -0,0 +1,160 @@
+# FinAlert - Fiyat değişim olayları (publish/subscribe)
+# Veri katmanı her yeni veri setini buraya yayınlar; yalnızca değeri gerçekten
+# değişen varlıklar için olay üretilir. Uyarı değerlendirme, portföy değerleme
+# gibi tüketiciler bu akışa abone olur - fiyat değişmezse hiçbir iş yapılmaz.
+import asyncio
+import logging
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# asset_type: doviz, altin, hisse | old: önceki değer (ilk görülmede None) | new: yeni değer
+QuoteChange = namedtuple('QuoteChange', ['asset_type', 'asset_name', 'old', 'new', 'kaynak'])
+
+# Önbellek anahtarı -> olaylardaki varlık türü
+ASSET_TYPES = {
+    'doviz': 'doviz',
+    'altin': 'altin',
+    'borsa': 'hisse'
+}
+
+
+def quote_price(asset_type, quote):
+    """Bir varlığın fiyat alanını döndür (döviz/altın: satış, hisse: değer)"""
+    if not quote:
+        return None
+    
+    if asset_type == 'hisse':
+        return quote.get('deger')
+    
+    return quote.get('satis')
+
+
+class QuoteHub:
+    """
+    Fiyat değişim olaylarının yayın merkezi
+    
+    Aboneler bir veri seti içindeki tüm değişimleri tek listede alır:
+        callback(changes: list[QuoteChange])
+    Callback normal fonksiyon veya coroutine fonksiyonu olabilir.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last = {}          # (asset_type, asset_name) -> son değer
+        self._sources = {}       # asset_type -> son kaynak etiketi
+        self._published = {}     # asset_type -> son yayın zamanı (monotonic; değişim olmasa da güncellenir)
+        self._subscribers = []   # (callback, event loop)
+        self._tasks = set()      # Çalışan async callback görevleri
+        self.stats = {'published': 0, 'changes': 0}
+    
+    def subscribe(self, callback):
+        """
+        Değişim akışına abone ol
+        
+        Async callback'ler abone olunan event loop'ta çalıştırılır.
+        
+        Returns:
+            function: Aboneliği iptal eden fonksiyon
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        entry = (callback, loop)
+        with self._lock:
+            self._subscribers.append(entry)
+        
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        
+        return unsubscribe
+    
+    def publish(self, cache_key, data):
+        """
+        Yeni veri setini yayınla, değişen varlıklar için olay üret
+        
+        Args:
+            cache_key: doviz, altin veya borsa
+            data: Kaynak zincirinin döndürdüğü sözlük ('_kaynak' dahil)
+        
+        Returns:
+            list: Üretilen değişimler
+        """
+        asset_type = ASSET_TYPES.get(cache_key, cache_key)
+        kaynak = data.get('_kaynak', 'Bilinmeyen')
+        changes = []
+        
+        with self._lock:
+            self.stats['published'] += 1
+            self._sources[asset_type] = kaynak
+            self._published[asset_type] = time.monotonic()
+            
+            for asset_name, quote in data.items():
+                if str(asset_name).startswith('_') or not isinstance(quote, dict):
+                    continue
+                
+                key = (asset_type, asset_name)
+                old = self._last.get(key)
+                
+                if old != quote:
+                    self._last[key] = dict(quote)
+                    changes.append(QuoteChange(asset_type, asset_name, old, dict(quote), kaynak))
+            
+            self.stats['changes'] += len(changes)
+            subscribers = list(self._subscribers)
+        
+        if changes:
+            for callback, loop in subscribers:
+                self._dispatch(callback, loop, changes)
+        
+        return changes
+    
+    def _dispatch(self, callback, loop, changes):
+        try:
+            if not asyncio.iscoroutinefunction(callback):
+                callback(changes)
+                return
+            
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            
+            if running is not None and (loop is None or loop is running):
+                task = asyncio.ensure_future(self._run(callback, changes))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            elif loop is not None and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(self._run(callback, changes), loop)
+            else:
+                logger.warning("⚠️ Async abone için çalışan event loop yok, olay atlandı")
+        
+        except Exception as e:
+            logger.error(f"❌ Fiyat olayı dağıtım hatası: {e}")
+    
+    async def _run(self, callback, changes):
+        try:
+            await callback(changes)
+        except Exception as e:
+            logger.error(f"❌ Fiyat olayı işleme hatası: {e}")
+    
+    def get_last(self, asset_type, asset_name):
+        """Varlığın en son yayınlanan değeri ve kaynağı: (değer, kaynak)"""
+        with self._lock:
+            quote = self._last.get((asset_type, asset_name))
+            return (dict(quote) if quote else None), self._sources.get(asset_type, 'Bilinmeyen')
+    
+    def get_age(self, asset_type):
+        """Varlık türünün son yayınından beri geçen süre (saniye); hiç yayınlanmadıysa None"""
+        with self._lock:
+            published = self._published.get(asset_type)
+        return None if published is None else time.monotonic() - published
+
+
+quote_hub = QuoteHub()
@@ -0,0 +1,324 @@
+# FinAlert - Kalıcı fiyat geçmişi
+# Fiyat değişim akışındaki (quote_events) her değişim quote_ticks tablosuna,
+# aynı anda 1m / 1h / 1d OHLC çubuklarına (quote_bars) işlenir.
+# - Fiyatlar bellekte biriktirilir ve arka plan thread'inde toplu yazılır
+#   (event loop veritabanını beklemez)
+# - Değişmeyen fiyatlar tekrar yazılmaz; geçmiş basamaklı bir seri olarak tutulur
+# - Eski ham kayıtlar ve çubuklar config.HISTORY_RETENTION_DAYS'e göre silinir
+import logging
+import threading
+import time
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.sqlite import insert
+from database import engine, QuoteTick, QuoteBar
+from quote_events import quote_hub, quote_price
+import config
+
+logger = logging.getLogger(__name__)
+
+# Günlük çubuklar Türkiye saatiyle (UTC+3) gece yarısında başlar
+DAY_OFFSET = 3 * 3600
+
+PRUNE_INTERVAL = 3600
+
+
+def bucket_start(ts, resolution):
+    """Zaman damgasının düştüğü çubuğun başlangıcı"""
+    size = config.HISTORY_RESOLUTIONS[resolution]
+    offset = DAY_OFFSET if size >= 86400 else 0
+    return (ts + offset) // size * size - offset
+
+
+def _epoch(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return int(value.timestamp())
+
+
+class QuoteHistory:
+    """
+    Fiyat geçmişi deposu
+    
+    Kullanım:
+        quote_history.start()                       # Akışa abone ol, yazıcıyı başlat
+        quote_history.bars('doviz', 'USD', '1h', start=datetime(...))
+    """
+    
+    def __init__(self, db_engine=None):
+        self._engine = db_engine or engine
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._unsubscribe = None
+        self._last_prune = 0
+        self.stats = {
+            'recorded': 0,
+            'written': 0,
+            'flushes': 0,
+            'dropped': 0,
+            'pruned': 0,
+            'last_flush_ms': 0.0
+        }
+    
+    # ===== YAZMA =====
+    def record(self, asset_type, asset_name, satis, alis=None, source=None, ts=None):
+        """Bir fiyatı yazma kuyruğuna ekle"""
+        with self._lock:
+            self._buffer.append((asset_type, asset_name, int(ts or time.time()), source, alis, satis))
+            self.stats['recorded'] += 1
+    
+    def on_changes(self, changes):
+        """quote_hub aboneliği - değişen fiyatları kaydet"""
+        now = int(time.time())
+        
+        for change in changes:
+            price = quote_price(change.asset_type, change.new)
+            if price is None:
+                continue
+            
+            alis = None if change.asset_type == 'hisse' else change.new.get('alis')
+            self.record(change.asset_type, change.asset_name, price, alis, change.kaynak, now)
+    
+    def flush(self):
+        """
+        Biriken fiyatları tek işlemde yaz
+        
+        Returns:
+            int: Yazılan ham kayıt sayısı
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            
+            if not rows:
+                return 0
+            
+            start = time.perf_counter()
+            ticks = {}
+            bars = {}
+            
+            for asset_type, asset_name, ts, source, alis, satis in sorted(rows, key=lambda row: row[2]):
+                ticks[(asset_type, asset_name, ts)] = {
+                    'asset_type': asset_type,
+                    'asset_name': asset_name,
+                    'ts': ts,
+                    'source': source,
+                    'alis': alis,
+                    'satis': satis
+                }
+                
+                # Aynı yazımdaki fiyatlar çubuklara önce bellekte işlenir
+                for resolution in config.HISTORY_RESOLUTIONS:
+                    key = (asset_type, asset_name, resolution, bucket_start(ts, resolution))
+                    bar = bars.get(key)
+                    
+                    if bar is None:
+                        bars[key] = {
+                            'asset_type': asset_type,
+                            'asset_name': asset_name,
+                            'resolution': resolution,
+                            'ts': key[3],
+                            'open': satis,
+                            'high': satis,
+                            'low': satis,
+                            'close': satis,
+                            'count': 1
+                        }
+                    else:
+                        bar['high'] = max(bar['high'], satis)
+                        bar['low'] = min(bar['low'], satis)
+                        bar['close'] = satis
+                        bar['count'] += 1
+            
+            tick_stmt = insert(QuoteTick.__table__)
+            tick_stmt = tick_stmt.on_conflict_do_update(
+                index_elements=['asset_type', 'asset_name', 'ts'],
+                set_={
+                    'source': tick_stmt.excluded.source,
+                    'alis': tick_stmt.excluded.alis,
+                    'satis': tick_stmt.excluded.satis
+                }
+            )
+            
+            table = QuoteBar.__table__
+            bar_stmt = insert(table)
+            bar_stmt = bar_stmt.on_conflict_do_update(
+                index_elements=['asset_type', 'asset_name', 'resolution', 'ts'],
+                set_={
+                    'high': func.max(table.c.high, bar_stmt.excluded.high),
+                    'low': func.min(table.c.low, bar_stmt.excluded.low),
+                    'close': bar_stmt.excluded.close,
+                    'count': table.c.count + bar_stmt.excluded.count
+                }
+            )
+            
+            try:
+                with self._engine.begin() as conn:
+                    conn.execute(tick_stmt, list(ticks.values()))
+                    conn.execute(bar_stmt, list(bars.values()))
+            except Exception as e:
+                self.stats['dropped'] += len(rows)
+                logger.error(f"❌ Fiyat geçmişi yazma hatası ({len(rows)} kayıt atlandı): {e}")
+                return 0
+            
+            self.stats['written'] += len(ticks)
+            self.stats['flushes'] += 1
+            self.stats['last_flush_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            return len(ticks)
+    
+    def prune(self, now=None):
+        """
+        Saklama süresi dolan ham kayıtları ve çubukları sil
+        Silme varlık başına birincil anahtar aralığıyla yapılır (tam tarama yok)
+        
+        Returns:
+            int: Silinen satır sayısı
+        """
+        now = int(now or time.time())
+        deleted = 0
+        
+        with self._engine.begin() as conn:
+            assets = conn.execute(
+                select(QuoteBar.asset_type, QuoteBar.asset_name).where(QuoteBar.resolution == '1d').distinct()
+            ).all()
+            
+            for level, days in config.HISTORY_RETENTION_DAYS.items():
+                if days is None:
+                    continue
+                
+                cutoff = now - days * 86400
+                for asset_type, asset_name in assets:
+                    if level == 'tick':
+                        stmt = delete(QuoteTick).where(
+                            QuoteTick.asset_type == asset_type,
+                            QuoteTick.asset_name == asset_name,
+                            QuoteTick.ts < cutoff
+                        )
+                    else:
+                        stmt = delete(QuoteBar).where(
+                            QuoteBar.asset_type == asset_type,
+                            QuoteBar.asset_name == asset_name,
+                            QuoteBar.resolution == level,
+                            QuoteBar.ts < cutoff
+                        )
+                    deleted += conn.execute(stmt).rowcount
+        
+        self.stats['pruned'] += deleted
+        if deleted:
+            logger.info(f"🧹 Fiyat geçmişi temizlendi: {deleted} satır")
+        return deleted
+    
+    def _run(self):
+        while not self._stop.wait(config.HISTORY_FLUSH_SECONDS):
+            try:
+                self.flush()
+                
+                if time.time() - self._last_prune >= PRUNE_INTERVAL:
+                    self._last_prune = time.time()
+                    self.prune()
+            except Exception as e:
+                logger.error(f"❌ Fiyat geçmişi hatası: {e}")
+        
+        self.flush()
+    
+    def start(self):
+        """Fiyat değişim akışına abone ol ve yazıcı thread'ini başlat"""
+        if self._thread is not None:
+            return
+        
+        self._unsubscribe = quote_hub.subscribe(self.on_changes)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='quote-history', daemon=True)
+        self._thread.start()
+        logger.info("✅ Fiyat geçmişi kaydı başlatıldı")
+    
+    def stop(self):
+        """Aboneliği bırak, bekleyen kayıtları yaz"""
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+    
+    # ===== OKUMA =====
+    def ticks(self, asset_type, asset_name, start=None, end=None):
+        """
+        Ham fiyat kayıtları (zamana göre sıralı)
+        
+        Args:
+            start, end: datetime veya Unix zamanı (dahil)
+        
+        Returns:
+            list: {ts, source, alis, satis} sözlükleri
+        """
+        self.flush()
+        
+        stmt = select(QuoteTick.ts, QuoteTick.source, QuoteTick.alis, QuoteTick.satis).where(
+            QuoteTick.asset_type == asset_type,
+            QuoteTick.asset_name == asset_name
+        )
+        if start is not None:
+            stmt = stmt.where(QuoteTick.ts >= _epoch(start))
+        if end is not None:
+            stmt = stmt.where(QuoteTick.ts <= _epoch(end))
+        
+        with self._engine.connect() as conn:
+            return [dict(row._mapping) for row in conn.execute(stmt.order_by(QuoteTick.ts))]
+    
+    def bars(self, asset_type, asset_name, resolution='1h', start=None, end=None):
+        """
+        OHLC çubukları (zamana göre sıralı)
+        
+        Returns:
+            list: {ts, open, high, low, close, count} sözlükleri
+        """
+        self.flush()
+        
+        stmt = select(QuoteBar.ts, QuoteBar.open, QuoteBar.high, QuoteBar.low, QuoteBar.close, QuoteBar.count).where(
+            QuoteBar.asset_type == asset_type,
+            QuoteBar.asset_name == asset_name,
+            QuoteBar.resolution == resolution
+        )
+        if start is not None:
+            stmt = stmt.where(QuoteBar.ts >= bucket_start(_epoch(start), resolution))
+        if end is not None:
+            stmt = stmt.where(QuoteBar.ts <= _epoch(end))
+        
+        with self._engine.connect() as conn:
+            return [dict(row._mapping) for row in conn.execute(stmt.order_by(QuoteBar.ts))]
+    
+    def assets(self):
+        """Geçmişi olan varlıklar: (asset_type, asset_name) listesi"""
+        self.flush()
+        
+        stmt = select(QuoteBar.asset_type, QuoteBar.asset_name).where(QuoteBar.resolution == '1d').distinct()
+        with self._engine.connect() as conn:
+            return [tuple(row) for row in conn.execute(stmt)]
+    
+    def get_stats(self):
+        """Yazma istatistikleri (bekleyen kayıt sayısı dahil)"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pending'] = len(self._buffer)
+        stats['running'] = self._thread is not None
+        return stats
+
+
+quote_history = QuoteHistory()
+
+
+def start_history():
+    """Yapılandırmada açıksa fiyat geçmişi kaydını başlat"""
+    if config.HISTORY_ENABLED:
+        quote_history.start()
+    return quote_history
+
+
+def get_history_stats():
+    """Fiyat geçmişi yazma istatistiklerini döndür"""
+    return quote_history.get_stats()
@@ -0,0 +1,389 @@
+# FinAlert - Artımlı OHLC çubukları ve kayan istatistikler
+# Fiyat değişim akışındaki (quote_events) her yeni fiyat, varlığın bellekteki
+# çubuklarına ve kayan pencerelerine sabit sürede (O(1)) işlenir; ham geçmiş
+# yeniden taranmaz. Açılışta son çubuklar ve son 24 saatin fiyatları
+# quote_history'den yüklenir.
+# - Çubuklar: config.HISTORY_RESOLUTIONS (1m / 1h / 1d), günlük değişim ve aralık
+# - Hareketli ortalamalar: config.STATS_MA_PERIODS (tamamlanan çubukların kapanışı)
+# - Kayan pencereler: config.STATS_WINDOWS (en düşük / en yüksek / ortalama /
+#   pencere başına göre değişim / oynaklık)
+# Fiyatlar yalnızca değiştiğinde gelir; pencere ortalaması fiyat değişimleri üzerindendir.
+import logging
+import math
+import threading
+import time
+from collections import deque
+from quote_events import quote_hub, quote_price
+from quote_history import quote_history, bucket_start
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class RollingWindow:
+    """
+    Zaman tabanlı kayan pencere
+    En düşük / en yüksek değerler monoton kuyruklarla, ortalama ve oynaklık
+    toplamlarla tutulur - ekleme ve çıkarma amorti O(1)
+    """
+    
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.anchor = None        # Pencere başındaki fiyat (pencereden çıkan son fiyat)
+        self._items = deque()     # (sıra, zaman, fiyat, getiri %)
+        self._max = deque()       # (sıra, fiyat) - azalan
+        self._min = deque()       # (sıra, fiyat) - artan
+        self._seq = 0
+        self._sum = 0.0
+        self._returns = 0
+        self._ret_sum = 0.0
+        self._ret_sq = 0.0
+    
+    def add(self, ts, price, ret=None):
+        self._seq += 1
+        self._items.append((self._seq, ts, price, ret))
+        self._sum += price
+        
+        if ret is not None:
+            self._returns += 1
+            self._ret_sum += ret
+            self._ret_sq += ret * ret
+        
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((self._seq, price))
+        
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((self._seq, price))
+        
+        self.evict(ts)
+    
+    def evict(self, now):
+        """Pencere dışına düşen fiyatları çıkar"""
+        # Son fiyat, pencere dışında kalsa da geçerli fiyat olduğu için tutulur
+        while len(self._items) > 1 and self._items[0][1] <= now - self.seconds:
+            seq, _, price, ret = self._items.popleft()
+            self.anchor = price
+            self._sum -= price
+            
+            if ret is not None:
+                self._returns -= 1
+                self._ret_sum -= ret
+                self._ret_sq -= ret * ret
+            
+            if self._max[0][0] == seq:
+                self._max.popleft()
+            if self._min[0][0] == seq:
+                self._min.popleft()
+    
+    def __len__(self):
+        return len(self._items)
+    
+    @property
+    def low(self):
+        return self._min[0][1] if self._min else None
+    
+    @property
+    def high(self):
+        return self._max[0][1] if self._max else None
+    
+    @property
+    def mean(self):
+        return self._sum / len(self._items) if self._items else None
+    
+    @property
+    def volatility(self):
+        """Fiyat değişimlerinin yüzde getirilerinin standart sapması"""
+        if self._returns < 2:
+            return 0.0
+        mean = self._ret_sum / self._returns
+        return math.sqrt(max(0.0, self._ret_sq / self._returns - mean * mean))
+    
+    def change_pct(self, price):
+        """Pencere başındaki fiyata göre yüzde değişim"""
+        base = self.anchor if self.anchor is not None else (self._items[0][2] if self._items else None)
+        if not base:
+            return None
+        return (price - base) / base * 100
+    
+    def snapshot(self, price):
+        return {
+            'low': self.low,
+            'high': self.high,
+            'mean': self.mean,
+            'change_pct': self.change_pct(price),
+            'volatility': self.volatility,
+            'ticks': len(self._items)
+        }
+
+
+class BarSeries:
+    """
+    Tek çözünürlükteki OHLC çubukları
+    Açık çubuk her fiyatta güncellenir; çubuk kapandığında hareketli ortalama
+    toplamları bir ekleme ve bir çıkarmayla güncellenir
+    """
+    
+    def __init__(self, resolution, ma_periods=()):
+        self.resolution = resolution
+        self.ma_periods = tuple(ma_periods)
+        self.current = None
+        self.last_bar = None
+        keep = max(self.ma_periods + (config.STATS_MAX_BARS,))
+        self.closes = deque(maxlen=keep + 1)
+        self.highs = deque(maxlen=keep + 1)
+        self.lows = deque(maxlen=keep + 1)
+        self._sums = {period: 0.0 for period in self.ma_periods}
+        self._extremes = {}   # count -> (en yüksek, en düşük), çubuk kapanınca sıfırlanır
+    
+    def update(self, ts, price):
+        start = bucket_start(ts, self.resolution)
+        bar = self.current
+        
+        if bar is not None and bar['ts'] == start:
+            bar['high'] = max(bar['high'], price)
+            bar['low'] = min(bar['low'], price)
+            bar['close'] = price
+            bar['count'] += 1
+            return
+        
+        if bar is not None and start < bar['ts']:
+            return   # Sıra dışı (eski) fiyat
+        
+        if bar is not None:
+            self.complete(bar)
+        self.current = {'ts': start, 'open': price, 'high': price, 'low': price, 'close': price, 'count': 1}
+    
+    def complete(self, bar):
+        """Kapanan çubuğu ortalamalara ve geçmiş listelerine ekle"""
+        close = bar['close']
+        
+        for period in self.ma_periods:
+            self._sums[period] += close
+            if len(self.closes) >= period:
+                self._sums[period] -= self.closes[-period]
+        
+        self.closes.append(close)
+        self.highs.append(bar['high'])
+        self.lows.append(bar['low'])
+        self.last_bar = dict(bar)
+        self._extremes.clear()
+    
+    def load(self, bars, now):
+        """Geçmiş çubuklarla doldur (zamana göre sıralı); içinde bulunulan çubuk açık kalır"""
+        current_start = bucket_start(now, self.resolution)
+        
+        for bar in bars:
+            if bar['ts'] >= current_start:
+                self.current = dict(bar)
+            else:
+                self.complete(bar)
+    
+    def ma(self, period):
+        """Son `period` tamamlanmış çubuğun kapanış ortalaması (yetersizse None)"""
+        if period not in self._sums or len(self.closes) < period:
+            return None
+        return self._sums[period] / period
+    
+    def extreme(self, count):
+        """
+        Son `count` tamamlanmış çubuğun en yüksek ve en düşük değeri
+        Sonuç bir sonraki çubuk kapanana kadar saklanır
+        
+        Returns:
+            tuple: (en yüksek, en düşük) - yetersiz geçmişte (None, None)
+        """
+        if len(self.highs) < count:
+            return None, None
+        
+        if count not in self._extremes:
+            highs = list(self.highs)[-count:]
+            lows = list(self.lows)[-count:]
+            self._extremes[count] = (max(highs), min(lows))
+        return self._extremes[count]
+
+
+class AssetStats:
+    """Bir varlığın çubukları ve kayan pencereleri"""
+    
+    def __init__(self):
+        self.series = {
+            resolution: BarSeries(resolution, config.STATS_MA_PERIODS.get(resolution, ()))
+            for resolution in config.HISTORY_RESOLUTIONS
+        }
+        self.windows = {name: RollingWindow(seconds) for name, seconds in config.STATS_WINDOWS.items()}
+        self.price = None
+        self.ts = None
+    
+    def update(self, ts, price, bars=True):
+        ret = (price - self.price) / self.price * 100 if self.price else None
+        
+        for window in self.windows.values():
+            window.add(ts, price, ret)
+        
+        if bars:
+            for series in self.series.values():
+                series.update(ts, price)
+        
+        self.price = price
+        self.ts = ts
+    
+    def day(self):
+        """
+        Günlük açılış / en yüksek / en düşük ve önceki kapanışa göre değişim
+        Önceki gün yoksa günün açılışına göre hesaplanır
+        """
+        series = self.series.get('1d')
+        bar = series.current if series else None
+        if bar is None or self.price is None:
+            return None
+        
+        prev_close = series.last_bar['close'] if series.last_bar else None
+        base = prev_close or bar['open']
+        change = self.price - base
+        
+        return {
+            'open': bar['open'],
+            'high': bar['high'],
+            'low': bar['low'],
+            'prev_close': prev_close,
+            'change': change,
+            'change_pct': change / base * 100 if base else 0.0
+        }
+    
+    def snapshot(self, now):
+        for window in self.windows.values():
+            window.evict(now)
+        
+        return {
+            'price': self.price,
+            'ts': self.ts,
+            'day': self.day(),
+            'windows': {name: window.snapshot(self.price) for name, window in self.windows.items()},
+            'ma': {
+                resolution: {period: series.ma(period) for period in series.ma_periods}
+                for resolution, series in self.series.items()
+                if series.ma_periods
+            }
+        }
+
+
+class QuoteStats:
+    """
+    Varlık başına anlık istatistikler
+    
+    Kullanım:
+        quote_stats.start()                   # Geçmişten yükle, akışa abone ol
+        quote_stats.get('doviz', 'USD')       # {'price', 'day', 'windows', 'ma'}
+    """
+    
+    def __init__(self, history=None):
+        self._history = history or quote_history
+        self._lock = threading.Lock()
+        self._assets = {}
+        self._unsubscribe = None
+        self.stats = {'updates': 0, 'warmed_assets': 0}
+    
+    def _asset(self, asset_type, asset_name):
+        # Kilit altında çağrılmalı
+        key = (asset_type, asset_name)
+        if key not in self._assets:
+            self._assets[key] = AssetStats()
+        return self._assets[key]
+    
+    def update(self, asset_type, asset_name, price, ts=None):
+        """Yeni fiyatı işle"""
+        with self._lock:
+            self._asset(asset_type, asset_name).update(int(ts or time.time()), price)
+            self.stats['updates'] += 1
+    
+    def on_changes(self, changes):
+        """quote_hub aboneliği"""
+        now = int(time.time())
+        
+        for change in changes:
+            price = quote_price(change.asset_type, change.new)
+            if price is not None:
+                self.update(change.asset_type, change.asset_name, price, now)
+    
+    def warm_up(self, now=None):
+        """Çubukları ve kayan pencereleri kalıcı geçmişten doldur"""
+        now = int(now or time.time())
+        longest = max(config.STATS_WINDOWS.values())
+        
+        for asset_type, asset_name in self._history.assets():
+            loaded = {}
+            for resolution, size in config.HISTORY_RESOLUTIONS.items():
+                keep = self._asset_keep(resolution)
+                loaded[resolution] = self._history.bars(asset_type, asset_name, resolution, start=now - keep * size)
+            
+            ticks = self._history.ticks(asset_type, asset_name, start=now - longest)
+            
+            with self._lock:
+                asset = self._asset(asset_type, asset_name)
+                for resolution, bars in loaded.items():
+                    asset.series[resolution].load(bars, now)
+                
+                # Ham fiyatlar yalnızca pencerelere işlenir (çubuklar zaten yüklendi)
+                for tick in ticks:
+                    asset.update(tick['ts'], tick['satis'], bars=False)
+                
+                self.stats['warmed_assets'] += 1
+    
+    @staticmethod
+    def _asset_keep(resolution):
+        return max(config.STATS_MA_PERIODS.get(resolution, ()) + (config.STATS_MAX_BARS,)) + 1
+    
+    def get(self, asset_type, asset_name, now=None):
+        """
+        Varlığın anlık istatistikleri
+        
+        Returns:
+            dict: {price, ts, day, windows, ma} - fiyat görülmediyse None
+        """
+        with self._lock:
+            asset = self._assets.get((asset_type, asset_name))
+            if asset is None or asset.price is None:
+                return None
+            return asset.snapshot(int(now or time.time()))
+    
+    def extreme(self, asset_type, asset_name, count, resolution='1d'):
+        """
+        Son `count` tamamlanmış çubuğun en yüksek ve en düşük değeri
+        
+        Returns:
+            tuple: (en yüksek, en düşük) - yetersiz geçmişte (None, None)
+        """
+        with self._lock:
+            asset = self._assets.get((asset_type, asset_name))
+            if asset is None or resolution not in asset.series:
+                return None, None
+            return asset.series[resolution].extreme(count)
+    
+    def start(self):
+        """Geçmişten yükle ve fiyat değişim akışına abone ol"""
+        if self._unsubscribe is not None:
+            return
+        
+        try:
+            self.warm_up()
+        except Exception as e:
+            logger.error(f"❌ Fiyat istatistikleri geçmişten yüklenemedi: {e}")
+        
+        self._unsubscribe = quote_hub.subscribe(self.on_changes)
+        logger.info(f"✅ Fiyat istatistikleri başlatıldı ({self.stats['warmed_assets']} varlık geçmişten yüklendi)")
+
+
+quote_stats = QuoteStats()
+
+
+def start_quote_stats():
+    """Süreç genelindeki istatistik motorunu başlat"""
+    quote_stats.start()
+    return quote_stats
+
+
+def get_quote_stats(asset_type, asset_name):
+    """Varlığın anlık istatistiklerini döndür (yoksa None)"""
+    return quote_stats.get(asset_type, asset_name)
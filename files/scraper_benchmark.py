@@ -0,0 +1,695 @@
+# FinAlert - Çevrimdışı kaynak (scraper) performans ölçümü
+# Her kaynağın kayıtlı (veya örnek) cevabı yerel bir HTTP sunucusundan verilir;
+# kaynak adresleri ölçüm süresince bu sunucuya yönlendirilir. Ağa çıkılmaz.
+# Kaynak başına ölçülenler:
+# - Ayrıştırma süresi ve tepe bellek kullanımı (tracemalloc)
+# - Uçtan uca gecikme: senkron (requests) ve async (aiohttp) çekici, p50/p95
+# Zincir başına (döviz / altın / borsa) ölçülenler:
+# - normal: ilk kaynak cevap verir
+# - yedek:  ilk kaynak 503 döner, zincir sıradaki kaynağa geçer
+# Sonuçlar kaydedilmiş temel ölçümle (scraper_benchmark.json) karşılaştırılır.
+# Yalnızca makineden bağımsız değerler kapıdan geçer:
+# - ayrıştırma süresinin aynı çalıştırmadaki referans işe (BeautifulSoup ile
+#   sabit bir sayfanın ayrıştırılması) oranı
+# - ayrıştırmanın tepe bellek kullanımı
+# Bunlarda tolerans aşılırsa, bir kaynak beklenen sonucu vermezse veya temel
+# ölçüm yoksa çıkış kodu 1 olur. Uçtan uca (yerel HTTP) süreler makine yüküne
+# çok bağlı olduğu için yalnızca raporlanır.
+#
+# benchmark_ornekleri/ klasöründeki cevaplar --ornek-dondur ile üretilmiş
+# sentetik sayfalardır (kaynak adresleri bu depoda yer tutucudur); kaynakların
+# sayfa yapısını ve boyutunu taklit eder, gerçek kayıt değildir. Kaynak adresi
+# yapılandırılmış kurulumlarda --ornek-kaydet ile gerçek cevaplar kaydedilebilir;
+# cevaplar değişince temel ölçüm --temel ile yenilenmelidir.
+#
+# link13 (Yahoo Finance) yfinance üzerinden çekildiği için yerel sunucuya
+# yönlendirilemez; yalnızca örnek tablo üzerinde ayrıştırma ölçülür, zincirlerde
+# aynı tabloyu ayrıştıran çekici kullanılır.
+#
+# Kullanım:
+#     python scraper_benchmark.py                   # 20 tekrar, temel ölçümle karşılaştır
+#     python scraper_benchmark.py -n 50             # tekrar sayısı
+#     python scraper_benchmark.py --temel           # sonuçları temel ölçüm olarak kaydet
+#     python scraper_benchmark.py --gecikme 20      # sunucu cevabına 20 ms ağ gecikmesi ekle
+#     python scraper_benchmark.py --ornek-kaydet    # gerçek kaynaklardan cevap kaydet (ağ gerekir)
+#     python scraper_benchmark.py --ornek-dondur    # eksik cevap dosyalarını sentetik örneklerden oluştur
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+import http_pool
+import scrapers
+import async_scrapers
+import parse_benchmark
+from parse_benchmark import _fiyat
+from source_health import source_health
+
+# Cevap dosyaları: <url anahtarı>.html / <url anahtarı>.json (sentetik veya --ornek-kaydet ile kaydedilmiş)
+# Dosyası olmayan kaynaklar için örnek cevap üretilir
+ORNEK_KLASORU = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_ornekleri')
+TEMEL_DOSYA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scraper_benchmark.json')
+
+TOLERANS = 0.5          # Temel ölçümden %50 fazlası gerileme sayılır
+ESIK_ORAN = 0.01        # Bundan küçük süre oranı farkları gerileme sayılmaz (ölçüm gürültüsü)
+ESIK_KB = 16            # Bundan küçük bellek farkları gerileme sayılmaz
+ESIK_UCTAN_MS = 2.0     # Uçtan uca ölçümlerde raporlanmayan fark
+DOGRULAMA = 2           # Gerileme görülürse ölçüm bu kadar kez tekrarlanır; her seferinde gerileyen alan sayılır
+PARTI = 5               # Süre ölçümleri bu kadar partiye bölünür, en hızlı parti alınır (anlık yük elenir)
+REFERANS = 'doviz_mynet'
+
+YAHOO = 'borsa_yahoo'
+
+
+# ===== ÖRNEK CEVAPLAR =====
+def ornek_exchangerate():
+    kurlar = {'TRY': 34.1, 'EUR': 0.92, 'GBP': 0.77, 'JPY': 149.5}
+    kurlar.update({f'K{i:02d}': 1.0 + i for i in range(150)})
+    return json.dumps({'result': 'success', 'base_code': 'USD', 'rates': kurlar}).encode('utf-8')
+
+
+def ornek_dovizcom_api():
+    kurlar = {'USD': 34.1, 'EUR': 37.2, 'GBP': 44.3, 'CHF': 39.1}
+    kurlar.update({f'K{i:02d}': 1.0 + i for i in range(40)})
+    return json.dumps({
+        kod: {'buying': _fiyat(kur * 0.99), 'selling': _fiyat(kur * 1.01), 'change_rate': 0.1}
+        for kod, kur in kurlar.items()
+    }).encode('utf-8')
+
+
+def ornek_collectapi():
+    altinlar = [('Gram Altın', 2950.0), ('Çeyrek Altın', 4850.0), ('Yarım Altın', 9700.0),
+                ('Tam Altın', 19400.0), ('Cumhuriyet Altını', 19900.0)]
+    altinlar += [(f'Ziynet {i}', 100.0 + i) for i in range(20)]
+    return json.dumps({
+        'success': True,
+        'result': [
+            {'name': isim, 'buying': _fiyat(fiyat * 0.99), 'selling': _fiyat(fiyat * 1.01), 'rate': 0.1}
+            for isim, fiyat in altinlar
+        ]
+    }).encode('utf-8')
+
+
+def ornek_altin_genelpara():
+    altinlar = {'GA': 2950.0, 'C': 4850.0, 'Y': 9700.0, 'T': 19400.0, 'ONS': 2650.0}
+    altinlar.update({f'Z{i:02d}': 100.0 + i for i in range(30)})
+    return json.dumps({
+        kod: {'alis': _fiyat(fiyat * 0.99), 'satis': _fiyat(fiyat * 1.01), 'degisim': '0,12'}
+        for kod, fiyat in altinlar.items()
+    }).encode('utf-8')
+
+
+def ornek_borsa_genelpara():
+    return json.dumps({
+        kod: {'d': _fiyat(fiyat), 'dd': '1,25', 'h': '1.250.000'}
+        for kod, fiyat in parse_benchmark._borsa_satirlari()
+    }).encode('utf-8')
+
+
+def ornek_yahoo():
+    """yf.download() çıktısı biçiminde (sembol bazlı gruplanmış) 5 günlük tablo"""
+    import pandas as pd
+    
+    tickers = {kod: f"{kod}.IS" for kod in scrapers.get_borsa_semboller()}
+    alanlar = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+    columns = pd.MultiIndex.from_product([list(tickers.values()), alanlar])
+    satirlar = [[50.0 + i + gun * 0.5 for i in range(len(columns))] for gun in range(5)]
+    frame = pd.DataFrame(satirlar, index=pd.date_range('2026-10-12', periods=5, freq='B'), columns=columns)
+    return frame, tickers
+
+
+# url anahtarı -> (örnek cevap üretici, JSON mu)
+ORNEKLER = {
+    'doviz_tcmb': (parse_benchmark.ornek_tcmb, False),
+    'doviz_exchangerate': (ornek_exchangerate, True),
+    'doviz_mynet': (parse_benchmark.ornek_doviz_mynet, False),
+    'doviz_dovizcom_html': (parse_benchmark.ornek_doviz_dovizcom_html, False),
+    'doviz_sabah': (parse_benchmark.ornek_doviz_sabah, False),
+    'doviz_bigpara': (parse_benchmark.ornek_doviz_bigpara, False),
+    'doviz_dovizcom_api': (ornek_dovizcom_api, True),
+    'doviz_dovizcom_api_html': (parse_benchmark.ornek_doviz_dovizcom_api_html, False),
+    'altin_trt': (parse_benchmark.ornek_altin_trt, False),
+    'altin_bigpara': (parse_benchmark.ornek_altin_bigpara, False),
+    'altin_collectapi': (ornek_collectapi, True),
+    'altin_mynet': (parse_benchmark.ornek_altin_mynet, False),
+    'altin_genelpara': (ornek_altin_genelpara, True),
+    'borsa_foreks': (parse_benchmark.ornek_borsa_foreks, False),
+    'borsa_bigpara': (parse_benchmark.ornek_borsa_bigpara, False),
+    'borsa_genelpara': (ornek_borsa_genelpara, True),
+}
+
+
+def _ornek_yolu(url_key, as_json):
+    return os.path.join(ORNEK_KLASORU, f"{url_key}.{'json' if as_json else 'html'}")
+
+
+def ornek_yukle():
+    """
+    Sunucunun vereceği cevaplar
+    
+    Returns:
+        dict: url anahtarı -> (gövde, content-type, kayıtlı mı)
+    """
+    ornekler = {}
+    
+    for url_key, (uretici, as_json) in ORNEKLER.items():
+        yol = _ornek_yolu(url_key, as_json)
+        kayitli = os.path.exists(yol)
+        
+        if kayitli:
+            with open(yol, 'rb') as f:
+                govde = f.read()
+        else:
+            govde = uretici()
+        
+        content_type = 'application/json' if as_json else 'text/html; charset=utf-8'
+        ornekler[url_key] = (govde, content_type, kayitli)
+    
+    return ornekler
+
+
+def ornek_kaydet():
+    """Gerçek kaynakların güncel cevaplarını ORNEK_KLASORU'ne kaydet (ağ erişimi gerekir)"""
+    os.makedirs(ORNEK_KLASORU, exist_ok=True)
+    
+    for url_key, (_, as_json) in ORNEKLER.items():
+        url = scrapers.KAYNAK_URLLERI[url_key]
+        if url_key == 'doviz_exchangerate':
+            url = f"{url}/USD"
+        
+        try:
+            response = http_pool.get(url, headers=scrapers.get_headers(), conditional=False)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"⚠️ {url_key} kaydedilemedi ({url}): {e}")
+            continue
+        
+        with open(_ornek_yolu(url_key, as_json), 'wb') as f:
+            f.write(response.content)
+        print(f"✅ {url_key}: {len(response.content) / 1024:.1f} KB")
+
+
+def ornek_dondur():
+    """Cevap dosyası olmayan kaynaklar için sentetik örnek cevabı ORNEK_KLASORU'ne yaz (mevcut dosyalar korunur)"""
+    os.makedirs(ORNEK_KLASORU, exist_ok=True)
+    
+    for url_key, (uretici, as_json) in ORNEKLER.items():
+        yol = _ornek_yolu(url_key, as_json)
+        if os.path.exists(yol):
+            continue
+        
+        govde = uretici()
+        with open(yol, 'wb') as f:
+            f.write(govde)
+        print(f"✅ {url_key}: {len(govde) / 1024:.1f} KB")
+
+
+# ===== YEREL SUNUCU =====
+class _OrnekHandler(BaseHTTPRequestHandler):
+    """/<url anahtarı>[/...] isteğine kayıtlı cevabı döndürür"""
+    
+    protocol_version = 'HTTP/1.1'   # Bağlantılar açık tutulur (havuz yeniden kullanımı ölçülür)
+    disable_nagle_algorithm = True  # Küçük JSON cevaplarında ~40 ms TCP bekleme olmaz
+    
+    def do_GET(self):
+        url_key = self.path.strip('/').split('/')[0]
+        ornek = self.server.ornekler.get(url_key)
+        
+        if self.server.gecikme:
+            time.sleep(self.server.gecikme)
+        
+        if ornek is None or url_key in self.server.hatali:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        govde, content_type, _ = ornek
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(govde)))
+        self.end_headers()
+        self.wfile.write(govde)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class OrnekSunucu:
+    """
+    Arka plan thread'inde çalışan yerel kaynak sunucusu
+    
+    Kullanım:
+        with OrnekSunucu(ornek_yukle()) as sunucu:
+            with sunucu.yonlendir():
+                scrapers.get_doviz_mynet()   # yerel sunucudan çeker
+    """
+    
+    def __init__(self, ornekler, gecikme_ms=0):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _OrnekHandler)
+        self._server.daemon_threads = True
+        self._server.ornekler = ornekler
+        self._server.gecikme = gecikme_ms / 1000
+        self._server.hatali = set()
+        self._thread = None
+    
+    @property
+    def adres(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+    
+    @property
+    def hatali(self):
+        """503 döndürülecek url anahtarları (yedek senaryosu)"""
+        return self._server.hatali
+    
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='benchmark-sunucu', daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+    
+    @contextmanager
+    def yonlendir(self):
+        """
+        Kaynak adreslerini yerel sunucuya yönlendir
+        Ölçüm süresince rastgele bekleme ve koşullu istekler kapatılır
+        (her tur tam indirme + ayrıştırma yapar)
+        """
+        eski_urller = dict(scrapers.KAYNAK_URLLERI)
+        eski_ayarlar = (config.REQUEST_JITTER, config.HTTP_CONDITIONAL_REQUESTS)
+        
+        scrapers.KAYNAK_URLLERI.update({url_key: f"{self.adres}/{url_key}" for url_key in eski_urller})
+        config.REQUEST_JITTER = False
+        config.HTTP_CONDITIONAL_REQUESTS = False
+        try:
+            yield self
+        finally:
+            scrapers.KAYNAK_URLLERI.update(eski_urller)
+            config.REQUEST_JITTER, config.HTTP_CONDITIONAL_REQUESTS = eski_ayarlar
+
+
+# ===== ÖLÇÜM YARDIMCILARI =====
+def _ozet(sureler):
+    """Süre listesinden (ms) p50 / p95"""
+    sureler = sorted(sureler)
+    return {
+        'p50': statistics.median(sureler),
+        'p95': sureler[min(len(sureler) - 1, int(round(0.95 * (len(sureler) - 1))))]
+    }
+
+
+def _sure_ms(fonksiyon, tekrar):
+    """Çağrı başına süre (ms) - partilerin en hızlısı"""
+    parti = max(1, tekrar // PARTI)
+    sureler = []
+    for _ in range(PARTI):
+        baslangic = time.perf_counter()
+        for _ in range(parti):
+            fonksiyon()
+        sureler.append((time.perf_counter() - baslangic) * 1000 / parti)
+    return min(sureler)
+
+
+def olc_referans(ornekler, tekrar):
+    """Referans iş: sabit bir sayfanın BeautifulSoup ile ayrıştırılması (ms) - makine hızının ölçüsü"""
+    govde = ornekler[REFERANS][0]
+    
+    def referans_is():
+        return scrapers.BeautifulSoup(govde, 'html.parser')
+    
+    referans_is()
+    return _sure_ms(referans_is, tekrar)
+
+
+def _tepe_bellek(fonksiyon):
+    """Tek çağrının tepe bellek kullanımı (KB)"""
+    tracemalloc.start()
+    try:
+        fonksiyon()
+        _, tepe = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return tepe / 1024
+
+
+def _temiz(data):
+    return {k: v for k, v in (data or {}).items() if k != '_kaynak'}
+
+
+def kaynak_listesi(yahoo):
+    """
+    Zincir sırasıyla (etiket, url anahtarı, senkron çekici, async çekici) dörtlüleri
+    link13 yerine örnek tabloyu ayrıştıran çekiciler kullanılır
+    """
+    async_cekiciler = dict(async_scrapers.DOVIZ_KAYNAKLARI + async_scrapers.ALTIN_KAYNAKLARI + async_scrapers.BORSA_KAYNAKLARI)
+    
+    zincirler = {}
+    for zincir, kaynaklar in (('doviz', scrapers.DOVIZ_KAYNAKLARI),
+                              ('altin', scrapers.ALTIN_KAYNAKLARI),
+                              ('borsa', scrapers.BORSA_KAYNAKLARI)):
+        zincirler[zincir] = []
+        
+        for etiket, cekici in kaynaklar:
+            url_key = cekici.__name__[len('get_'):]
+            if url_key == YAHOO:
+                zincirler[zincir].append((etiket, url_key, yahoo[0], yahoo[1]))
+            else:
+                zincirler[zincir].append((etiket, url_key, cekici, async_cekiciler[etiket]))
+    
+    return zincirler
+
+
+def _yahoo_cekicileri(sunucu, frame, tickers):
+    # Yedek senaryosunda link13 de 503 alan kaynak gibi boş döner
+    def yahoo():
+        if YAHOO in sunucu.hatali:
+            return {}
+        return scrapers.parse_borsa_yahoo(frame, tickers)
+    
+    async def yahoo_async():
+        return yahoo()
+    
+    return yahoo, yahoo_async
+
+
+# ===== ÖLÇÜMLER =====
+def olc_ayristirma(ornekler, frame, tickers, tekrar):
+    """
+    Kaynak başına ayrıştırma süresi (ms) ve tepe bellek (KB)
+    JSON kaynaklarında çözme (json.loads) dahildir
+    """
+    sonuclar = {}
+    
+    cagrilar = {}
+    for url_key, (govde, _, _) in ornekler.items():
+        parser = getattr(scrapers, f"parse_{url_key}")
+        if ORNEKLER[url_key][1]:
+            cagrilar[url_key] = lambda parser=parser, govde=govde: parser(json.loads(govde))
+        else:
+            cagrilar[url_key] = lambda parser=parser, govde=govde: parser(govde)
+    cagrilar[YAHOO] = lambda: scrapers.parse_borsa_yahoo(frame, tickers)
+    
+    for url_key, cagri in cagrilar.items():
+        sonuc = cagri()   # Isınma (derlenmiş XPath'ler, önbellekler)
+        sure = _sure_ms(cagri, tekrar)
+        
+        govde = ornekler[url_key][0] if url_key in ornekler else b''
+        sonuclar[url_key] = {
+            'parse_ms': sure,
+            'bellek_kb': _tepe_bellek(cagri),
+            'boyut_kb': len(govde) / 1024,
+            'kayitli': ornekler[url_key][2] if url_key in ornekler else False,
+            'sonuc': sonuc
+        }
+    
+    return sonuclar
+
+
+def olc_kaynaklar(zincirler, tekrar):
+    """Etiket başına senkron uçtan uca gecikme (ms) ve son sonuç"""
+    sonuclar = {}
+    
+    for kaynaklar in zincirler.values():
+        for etiket, url_key, cekici, _ in kaynaklar:
+            cekici()   # Isınma - bağlantı açılır
+            
+            sureler = []
+            for _ in range(tekrar):
+                baslangic = time.perf_counter()
+                data = cekici()
+                sureler.append((time.perf_counter() - baslangic) * 1000)
+            
+            sonuclar[etiket] = dict(_ozet(sureler), url_key=url_key, sonuc=data)
+    
+    return sonuclar
+
+
+def olc_zincirler(zincirler, sunucu, tekrar):
+    """Zincir ve senaryo başına senkron uçtan uca gecikme (ms)"""
+    sonuclar = {}
+    
+    for zincir, kaynaklar in zincirler.items():
+        liste = [(etiket, cekici) for etiket, _, cekici, _ in kaynaklar]
+        
+        for senaryo, hatali, beklenen in _senaryolar(kaynaklar):
+            sunucu.hatali.clear()
+            sunucu.hatali.update(hatali)
+            
+            sureler = []
+            kaynak_dogru = True
+            for _ in range(tekrar):
+                source_health.reset()
+                baslangic = time.perf_counter()
+                data = scrapers.run_source_chain(liste)
+                sureler.append((time.perf_counter() - baslangic) * 1000)
+                kaynak_dogru = kaynak_dogru and data.get('_kaynak') == beklenen
+            
+            sonuclar[f"{zincir}/{senaryo}"] = dict(_ozet(sureler), kaynak_dogru=kaynak_dogru)
+    
+    sunucu.hatali.clear()
+    source_health.reset()
+    return sonuclar
+
+
+def _senaryolar(kaynaklar):
+    """(senaryo, 503 dönecek url anahtarları, beklenen kaynak etiketi)"""
+    ilk_key = kaynaklar[0][1]
+    hatali = {url_key for url_key in ORNEKLER if url_key.startswith(ilk_key)} | {ilk_key}
+    return [
+        ('normal', set(), kaynaklar[0][0]),
+        ('yedek', hatali, kaynaklar[1][0])
+    ]
+
+
+async def olc_async(zincirler, sunucu, tekrar):
+    """
+    Async çekicilerin ve zincirlerin uçtan uca gecikmesi (ms)
+    Zincirler yapılandırmadaki gibi (HEDGED_FETCH) çalıştırılır
+    """
+    kaynak_sonuclari = {}
+    zincir_sonuclari = {}
+    
+    try:
+        for kaynaklar in zincirler.values():
+            for etiket, url_key, _, cekici in kaynaklar:
+                await cekici()
+                
+                sureler = []
+                for _ in range(tekrar):
+                    baslangic = time.perf_counter()
+                    data = await cekici()
+                    sureler.append((time.perf_counter() - baslangic) * 1000)
+                
+                kaynak_sonuclari[etiket] = dict(_ozet(sureler), sonuc=data)
+        
+        for zincir, kaynaklar in zincirler.items():
+            liste = [(etiket, cekici) for etiket, _, _, cekici in kaynaklar]
+            
+            for senaryo, hatali, beklenen in _senaryolar(kaynaklar):
+                sunucu.hatali.clear()
+                sunucu.hatali.update(hatali)
+                
+                sureler = []
+                kaynak_dogru = True
+                for _ in range(tekrar):
+                    source_health.reset()
+                    baslangic = time.perf_counter()
+                    data = await async_scrapers._run_chain(liste)
+                    sureler.append((time.perf_counter() - baslangic) * 1000)
+                    kaynak_dogru = kaynak_dogru and data.get('_kaynak') == beklenen
+                
+                zincir_sonuclari[f"{zincir}/{senaryo}"] = dict(_ozet(sureler), kaynak_dogru=kaynak_dogru)
+    finally:
+        sunucu.hatali.clear()
+        source_health.reset()
+        await async_scrapers.close_session()
+    
+    return kaynak_sonuclari, zincir_sonuclari
+
+
+def calistir(tekrar=20, gecikme_ms=0):
+    """
+    Tüm ölçümleri yap
+    
+    Returns:
+        tuple: (ölçümler, hatalar)
+            ölçümler: {'ayristirma': {url anahtarı: {...}}, 'kaynaklar': {etiket: {...}},
+                       'zincirler': {'doviz/normal': {...}, ...}} - süreler ms, bellek KB
+            hatalar: Beklenen sonucu vermeyen kaynak / zincir açıklamaları
+    """
+    ornekler = ornek_yukle()
+    frame, tickers = ornek_yahoo()
+    hatalar = []
+    
+    # Referans iş ayrıştırmadan önce ve sonra ölçülür, hızlısı alınır
+    referans = olc_referans(ornekler, tekrar)
+    ayristirma = olc_ayristirma(ornekler, frame, tickers, tekrar)
+    referans = min(referans, olc_referans(ornekler, tekrar))
+    
+    for url_key, olcum in ayristirma.items():
+        olcum['parse_orani'] = olcum['parse_ms'] / referans
+        if not olcum.pop('sonuc'):
+            hatalar.append(f"{url_key}: ayrıştırma boş sonuç verdi")
+    
+    with OrnekSunucu(ornekler, gecikme_ms) as sunucu, sunucu.yonlendir():
+        zincirler = kaynak_listesi(_yahoo_cekicileri(sunucu, frame, tickers))
+        
+        kaynaklar = olc_kaynaklar(zincirler, tekrar)
+        zincir_sync = olc_zincirler(zincirler, sunucu, tekrar)
+        kaynak_async, zincir_async = asyncio.run(olc_async(zincirler, sunucu, tekrar))
+    
+    for etiket, olcum in kaynaklar.items():
+        sync_sonuc = _temiz(olcum.pop('sonuc'))
+        async_olcum = kaynak_async[etiket]
+        async_sonuc = _temiz(async_olcum.pop('sonuc'))
+        
+        if not sync_sonuc:
+            hatalar.append(f"{etiket} ({olcum['url_key']}): senkron çekici boş sonuç verdi")
+        elif sync_sonuc != async_sonuc:
+            hatalar.append(f"{etiket} ({olcum['url_key']}): senkron ve async sonuçlar farklı")
+        
+        olcum['async_p50'] = async_olcum['p50']
+        olcum['async_p95'] = async_olcum['p95']
+    
+    for ad, olcum in zincir_sync.items():
+        async_olcum = zincir_async[ad]
+        if not (olcum.pop('kaynak_dogru') and async_olcum['kaynak_dogru']):
+            hatalar.append(f"{ad}: zincir beklenen kaynaktan sonuç vermedi")
+        
+        olcum['async_p50'] = async_olcum['p50']
+        olcum['async_p95'] = async_olcum['p95']
+    
+    return {'referans_ms': referans, 'ayristirma': ayristirma, 'kaynaklar': kaynaklar, 'zincirler': zincir_sync}, hatalar
+
+
+# ===== TEMEL ÖLÇÜMLE KARŞILAŞTIRMA =====
+# bölüm -> karşılaştırılan alanlar ve alan başına gürültü eşiği
+# Kapı: makineden bağımsız değerler (süre oranı, bellek)
+KARSILASTIRILAN = {
+    'ayristirma': {'parse_orani': ESIK_ORAN, 'bellek_kb': ESIK_KB},
+}
+
+# Yalnızca raporlanır: yerel HTTP süreleri makineye ve anlık yüke bağlı
+RAPORLANAN = {
+    'kaynaklar': {'p50': ESIK_UCTAN_MS, 'async_p50': ESIK_UCTAN_MS},
+    'zincirler': {'p50': ESIK_UCTAN_MS, 'async_p50': ESIK_UCTAN_MS},
+}
+
+
+def karsilastir(olcumler, temel, tolerans=TOLERANS, bolumler=KARSILASTIRILAN):
+    """
+    Temel ölçüme göre gerilemeler
+    
+    Returns:
+        list: (bölüm, ad, alan, temel değer, yeni değer) satırları
+    """
+    gerilemeler = []
+    
+    for bolum, alanlar in bolumler.items():
+        for ad, olcum in olcumler.get(bolum, {}).items():
+            eski = temel.get(bolum, {}).get(ad)
+            if not eski:
+                continue
+            
+            for alan, esik in alanlar.items():
+                if alan not in eski or alan not in olcum:
+                    continue
+                if olcum[alan] > eski[alan] * (1 + tolerans) and olcum[alan] - eski[alan] > esik:
+                    gerilemeler.append((bolum, ad, alan, eski[alan], olcum[alan]))
+    
+    return gerilemeler
+
+
+def yazdir(olcumler):
+    print(f"Referans iş ({REFERANS}, BeautifulSoup): {olcumler['referans_ms']:.3f} ms\n")
+    print(f"{'Ayrıştırma':<26}{'ms':>9}{'Oran':>8}{'Bellek KB':>11}{'Boyut KB':>10}  Örnek")
+    for url_key, o in olcumler['ayristirma'].items():
+        print(f"{url_key:<26}{o['parse_ms']:>9.3f}{o['parse_orani']:>8.3f}{o['bellek_kb']:>11.1f}{o['boyut_kb']:>10.1f}  "
+              f"{'dosya' if o['kayitli'] else 'üretilmiş'}")
+    
+    print(f"\n{'Kaynak (uçtan uca, ms)':<34}{'p50':>8}{'p95':>8}{'async p50':>11}{'async p95':>11}")
+    for etiket, o in olcumler['kaynaklar'].items():
+        print(f"{etiket + ' ' + o['url_key']:<34}{o['p50']:>8.2f}{o['p95']:>8.2f}{o['async_p50']:>11.2f}{o['async_p95']:>11.2f}")
+    
+    print(f"\n{'Zincir (uçtan uca, ms)':<34}{'p50':>8}{'p95':>8}{'async p50':>11}{'async p95':>11}")
+    for ad, o in olcumler['zincirler'].items():
+        print(f"{ad:<34}{o['p50']:>8.2f}{o['p95']:>8.2f}{o['async_p50']:>11.2f}{o['async_p95']:>11.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='FinAlert çevrimdışı kaynak ölçümü')
+    parser.add_argument('-n', '--tekrar', type=int, default=20, help='Ölçüm başına tekrar sayısı')
+    parser.add_argument('--gecikme', type=float, default=0, help='Sunucu cevabına eklenecek gecikme (ms)')
+    parser.add_argument('--tolerans', type=float, default=TOLERANS, help='İzin verilen artış oranı (0.5 = %%50)')
+    parser.add_argument('--temel', action='store_true', help='Sonuçları temel ölçüm olarak kaydet')
+    parser.add_argument('--ornek-kaydet', action='store_true', help='Gerçek kaynaklardan cevap kaydet')
+    parser.add_argument('--ornek-dondur', action='store_true', help='Eksik cevap dosyalarını sentetik örneklerden oluştur')
+    args = parser.parse_args()
+    
+    if args.ornek_kaydet:
+        ornek_kaydet()
+        sys.exit(0)
+    
+    if args.ornek_dondur:
+        ornek_dondur()
+        sys.exit(0)
+    
+    print(f"Kaynak ölçümü ({args.tekrar} tekrar, sunucu gecikmesi {args.gecikme:g} ms)\n")
+    olcumler, hatalar = calistir(args.tekrar, args.gecikme)
+    yazdir(olcumler)
+    
+    for hata in hatalar:
+        print(f"❌ {hata}")
+    
+    if args.temel:
+        with open(TEMEL_DOSYA, 'w', encoding='utf-8') as f:
+            json.dump(olcumler, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ Temel ölçüm kaydedildi: {TEMEL_DOSYA}")
+        sys.exit(1 if hatalar else 0)
+    
+    # Temel ölçüm olmadan gerileme kontrol edilemez - sessizce geçilmez
+    if not os.path.exists(TEMEL_DOSYA):
+        print("\n❌ Temel ölçüm yok - kaydetmek için: python scraper_benchmark.py --temel")
+        sys.exit(1)
+    
+    with open(TEMEL_DOSYA, encoding='utf-8') as f:
+        temel = json.load(f)
+    
+    for bolum, ad, alan, eski, yeni in karsilastir(olcumler, temel, args.tolerans, RAPORLANAN):
+        print(f"ℹ️ Uçtan uca yavaşlama (kapı dışı) - {bolum} / {ad} / {alan}: {eski:.3f} -> {yeni:.3f} ms")
+    
+    gerilemeler = karsilastir(olcumler, temel, args.tolerans)
+    
+    # Tek seferlik yavaşlamalar (makine yükü) gerileme sayılmaz - ölçüm tekrarlanır,
+    # yalnızca her tekrarda gerileyen alanlar kalır
+    for _ in range(DOGRULAMA):
+        if not gerilemeler:
+            break
+        
+        print(f"\n🔁 {len(gerilemeler)} olası gerileme - ölçüm doğrulama için tekrarlanıyor")
+        tekrar_olcum, _ = calistir(args.tekrar, args.gecikme)
+        tekrar = {(bolum, ad, alan): yeni for bolum, ad, alan, _, yeni in karsilastir(tekrar_olcum, temel, args.tolerans)}
+        gerilemeler = [
+            (bolum, ad, alan, eski, max(yeni, tekrar[(bolum, ad, alan)]))
+            for bolum, ad, alan, eski, yeni in gerilemeler
+            if (bolum, ad, alan) in tekrar
+        ]
+    
+    for bolum, ad, alan, eski, yeni in gerilemeler:
+        print(f"❌ Gerileme - {bolum} / {ad} / {alan}: {eski:.3f} -> {yeni:.3f}")
+    if not gerilemeler:
+        print(f"\n✅ Temel ölçüme göre gerileme yok (tolerans %{args.tolerans * 100:g})")
+    
+    sys.exit(1 if hatalar or gerilemeler else 0)
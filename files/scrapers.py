@@ -1,10 +1,18 @@
 import requests
 from bs4 import BeautifulSoup
 import time
+import copy
 import random
+import threading
+import asyncio
 from fake_useragent import UserAgent
 import config
 import re
+from quote_events import quote_hub
+import fast_parsers
+import http_pool
+from source_health import source_health
+import metrics
 
 try:
     import yfinance as yf
@@ -16,6 +24,27 @@ except ImportError:
 ua = UserAgent()
 
 
+# Kaynak adresleri - tek yerden yönetilir (senkron ve async çekiciler ortak kullanır)
+KAYNAK_URLLERI = {
+    'doviz_tcmb': "link1",
+    'doviz_exchangerate': "link2",
+    'doviz_mynet': "link3",
+    'doviz_dovizcom_html': "link4 ad",
+    'doviz_sabah': "link5",
+    'doviz_bigpara': "link6",
+    'doviz_dovizcom_api': "link7",
+    'doviz_dovizcom_api_html': "link7",
+    'altin_trt': "link8",
+    'altin_bigpara': "link9",
+    'altin_collectapi': "link10",
+    'altin_mynet': "link11",
+    'altin_genelpara': "link12",
+    'borsa_foreks': "link14",
+    'borsa_bigpara': "link15",
+    'borsa_genelpara': "link16",
+}
+
+
 def get_headers():
     """Random user agent ile header oluştur"""
     return {
@@ -28,16 +57,25 @@ def get_headers():
     }
 
 
+def request_delay(delay=True):
+    """
+    İstek öncesi rastgele bekleme süresi (saniye)
+    Anlık veri için kısa gecikme; config.REQUEST_JITTER kapalıysa 0
+    """
+    if not config.REQUEST_JITTER:
+        return 0
+    
+    if delay:
+        return random.uniform(1, 3)
+    return random.uniform(0.3, 0.8)
+
+
 def safe_request(url, delay=True):
     """Güvenli HTTP isteği - Ban yememek için gecikmeli"""
-    if delay:
-        time.sleep(random.uniform(1, 3))
-    else:
-        # Anlık veri için kısa gecikme
-        time.sleep(random.uniform(0.3, 0.8))
+    time.sleep(request_delay(delay))
     
     try:
-        response = requests.get(url, headers=get_headers(), timeout=config.REQUEST_TIMEOUT)
+        response = http_pool.get(url, headers=get_headers(), timeout=config.REQUEST_TIMEOUT, conditional=False)
         response.raise_for_status()
         return response
     except Exception as e:
@@ -45,6 +83,24 @@ def safe_request(url, delay=True):
         return None
 
 
+def safe_fetch(url, parser, delay=True):
+    """
+    Güvenli HTTP isteği + ayrıştırma - Ban yememek için gecikmeli
+    Site başına açık bağlantı kullanılır; sayfa değişmediyse (304)
+    yeniden indirilmez ve önceki ayrıştırma sonucu döndürülür
+    
+    Returns:
+        Ayrıştırma sonucu, hata durumunda None
+    """
+    time.sleep(request_delay(delay))
+    
+    try:
+        return http_pool.fetch_parsed(url, parser, headers=get_headers(), timeout=config.REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f" İstek hatası ({url}): {e}")
+        return None
+
+
 def parse_price(text):
     """Fiyat textini float'a çevir"""
     if not text:
@@ -62,56 +118,311 @@ def parse_price(text):
         return 0.0
 
 
-# ===== DÖVİZ MODÜLÜ =====
-def get_doviz_data():
+# ===== AYRIŞTIRMA (PARSE) KATMANI =====
+# HTML/XML kaynakları önce lxml hızlı yolundan (fast_parsers, derlenmiş XPath)
+# ayrıştırılır. Hızlı yol hata verir veya boş sonuç dönerse BeautifulSoup
+# yoluna geçilir. İki yol aynı ara yapıyı üretir, sözlük aynı kodla kurulur.
+_parse_stats = {}
+_parse_stats_lock = threading.Lock()
+
+
+def _parse_with_fallback(kaynak, content, fast_extract, soup_extract, build):
     """
-    Döviz verilerini çek (USD, EUR, GBP vb.)
-    ANLIK CANLI VERİ - Çoklu kaynak ile yedekli sistem
-    Kaynak bilgisi de döndürülür
+    İçeriği önce hızlı yoldan, gerekirse BeautifulSoup ile ayrıştır
+    
+    Args:
+        kaynak: İstatistik anahtarı (örn. 'doviz_mynet')
+        fast_extract: lxml çıkarıcı (fast_parsers)
+        soup_extract: BeautifulSoup çıkarıcı (aynı ara yapı)
+        build: Ara yapıdan fiyat sözlüğünü kuran fonksiyon
     """
+    start = time.perf_counter()
+    result = None
     try:
-        # ÖNCELİK 1: [link1 web sitesi adı]
-        doviz_data = get_doviz_sabah()
-        if doviz_data and len(doviz_data) > 0:
-            doviz_data['_kaynak'] = 'link1'
-            return doviz_data
-        
-        # ÖNCELİK 2: [link2 web sitesi adı]
-        doviz_data = get_doviz_mynet()
-        if doviz_data and len(doviz_data) > 0:
-            doviz_data['_kaynak'] = 'link2'
-            return doviz_data
-        
-        # ÖNCELİK 3: [link3 web sitesi adı]
-        doviz_data = get_doviz_dovizcom_html()
-        if doviz_data and len(doviz_data) > 0:
-            doviz_data['_kaynak'] = 'link3'
-            return doviz_data
+        result = build(fast_extract(content))
+    except Exception:
+        result = None
+    
+    path = 'fast' if result else 'fallback'
+    with _parse_stats_lock:
+        stats = _parse_stats.setdefault(kaynak, {'fast': 0, 'fallback': 0})
+        stats[path] += 1
+    
+    if result:
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - start, kaynak=kaynak, yol=path)
+        return result
+    
+    with metrics.PARSE_SECONDS.time(kaynak=kaynak, yol=path):
+        return build(soup_extract(content))
+
+
+def get_parse_stats():
+    """Kaynak başına hızlı yol / BeautifulSoup yedek yolu kullanım sayıları"""
+    with _parse_stats_lock:
+        return {kaynak: dict(stats) for kaynak, stats in _parse_stats.items()}
+
+
+# ===== ÖNBELLEK (CACHE) MODÜLÜ =====
+class QuoteCache:
+    """
+    Süreç genelinde paylaşılan fiyat önbelleği
+    - Varlık sınıfı başına TTL (config.CACHE_TTL)
+    - Tekil çekim (single-flight): aynı anda gelen istekler tek bir çekimi bekler
+    - İsabet / ıska / bekleme sayaçları ve veri yaşı
+    - Her çağrı verinin derin kopyasını alır: çağıranın yaptığı değişiklik önbelleği bozmaz
+    - Okuyucu (reader): veri kaynaklar yerine başka yerden okunur (işçi süreçleri
+      fiyatları liderin yazdığı paylaşılan depodan alır)
+    - Dinleyiciler (listener): yenilenen her veri seti ile çağrılır
+    """
+    
+    def __init__(self, ttls, error_ttl):
+        self._ttls = dict(ttls)
+        self._error_ttl = error_ttl
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> (veri, monotonic zaman, ttl, duvar saati zamanı)
+        self._inflight = {}  # key -> threading.Event (senkron çağrılar)
+        self._tasks = {}     # key -> asyncio.Task (async çağrılar)
+        self._readers = {}   # key -> (okuyucu, ttl)
+        self._listeners = []
+        self._stats = {}
+    
+    def set_reader(self, key, reader=None, ttl=None):
+        """
+        Veriyi kaynak zinciri yerine reader() ile al (None verilirse zincire dönülür)
+        Okuyucu hızlı, senkron bir fonksiyon olmalıdır - async çağrılarda da doğrudan çalışır
+        """
+        with self._lock:
+            if reader is None:
+                self._readers.pop(key, None)
+            else:
+                self._readers[key] = (reader, ttl)
+            self._entries.pop(key, None)
+    
+    def add_listener(self, listener):
+        """Yenilenen her veri setiyle listener(key, data) çağrılır"""
+        with self._lock:
+            self._listeners.append(listener)
+    
+    def _stat(self, key):
+        if key not in self._stats:
+            self._stats[key] = {'hit': 0, 'miss': 0, 'wait': 0}
+        return self._stats[key]
+    
+    def get(self, key, fetcher, force_refresh=False):
+        """
+        Önbellekteki veriyi döndür, süresi dolmuşsa fetcher() ile yenile
+        
+        Aynı anda gelen çağrılar devam eden çekimi bekler ve aynı veriyi alır.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and not force_refresh and self._is_fresh(entry):
+                    self._stat(key)['hit'] += 1
+                    return copy.deepcopy(entry[0])
+                
+                event = self._inflight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    self._stat(key)['miss'] += 1
+                    if key in self._readers:
+                        fetcher = self._readers[key][0]
+                    break
+                
+                self._stat(key)['wait'] += 1
+            
+            # Başka bir çağrı veriyi çekiyor - onu bekle
+            event.wait()
+            
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and self._is_fresh(entry):
+                    return copy.deepcopy(entry[0])
         
-        # ÖNCELİK 4: [link4 web sitesi adı]
-        doviz_data = get_doviz_bigpara()
-        if doviz_data and len(doviz_data) > 0:
-            doviz_data['_kaynak'] = 'link4'
-            return doviz_data
+        data = None
+        try:
+            data = fetcher()
+            return copy.deepcopy(data)
+        finally:
+            with self._lock:
+                if data is not None:
+                    self._store(key, data)
+                self._inflight.pop(key, None)
+            event.set()
+            
+            if data is not None:
+                self._publish(key, data)
+    
+    async def aget(self, key, fetcher, force_refresh=False):
+        """
+        get() metodunun async karşılığı - fetcher bir coroutine fonksiyonudur
+        
+        Aynı anda gelen çağrılar tek bir asyncio görevini (task) bekler,
+        bekleyen çağrılardan biri iptal edilse bile çekim yarıda kalmaz.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not force_refresh and self._is_fresh(entry):
+                self._stat(key)['hit'] += 1
+                return copy.deepcopy(entry[0])
+            
+            task = self._tasks.get(key)
+            if task is None or task.done():
+                if key in self._readers:
+                    fetcher = self._areader(self._readers[key][0])
+                task = asyncio.ensure_future(self._afetch(key, fetcher))
+                self._tasks[key] = task
+                self._stat(key)['miss'] += 1
+            else:
+                self._stat(key)['wait'] += 1
+        
+        data = await asyncio.shield(task)
+        return copy.deepcopy(data)
+    
+    @staticmethod
+    def _areader(reader):
+        async def read():
+            return reader()
+        return read
+    
+    async def _afetch(self, key, fetcher):
+        try:
+            data = await fetcher()
+            with self._lock:
+                self._store(key, data)
+            self._publish(key, data)
+            return data
+        finally:
+            with self._lock:
+                self._tasks.pop(key, None)
+    
+    def _is_fresh(self, entry):
+        return time.monotonic() - entry[1] < entry[2]
+    
+    def _publish(self, key, data):
+        # Yeni veriyi dinleyicilere ve değişim akışına ver (kilit dışında çağrılır)
+        if not _has_quotes(data):
+            return
         
-        # ÖNCELİK 5: [link5 web sitesi adı]
-        doviz_data = get_doviz_exchangerate()
-        if doviz_data and len(doviz_data) > 0:
-            doviz_data['_kaynak'] = 'link5'
-            return doviz_data
+        with self._lock:
+            listeners = list(self._listeners)
         
-        # ÖNCELİK 6: [link6 web sitesi adı]
-        doviz_data = get_doviz_dovizcom_api()
-        if doviz_data and len(doviz_data) > 0:
-            doviz_data['_kaynak'] = 'link6'
-            return doviz_data
+        for listener in listeners:
+            try:
+                listener(key, data)
+            except Exception as e:
+                print(f" Önbellek dinleyicisi hatası: {e}")
         
-        # ÖNCELİK 7  [link7 web sitesi adı]
-        doviz_data = get_doviz_tcmb()
-        doviz_data['_kaynak'] = 'link7'
-        return doviz_data
+        try:
+            quote_hub.publish(key, data)
+        except Exception as e:
+            print(f" Fiyat olayı yayınlama hatası: {e}")
+    
+    def _store(self, key, data):
+        # Kilit altında çağrılmalı
+        ttl = self._ttls.get(key, 60) if _has_quotes(data) else self._error_ttl
+        if key in self._readers and self._readers[key][1] is not None:
+            ttl = min(ttl, self._readers[key][1])
+        self._entries[key] = (data, time.monotonic(), ttl, time.time())
+    
+    def invalidate(self, key=None):
+        """Önbelleği temizle (key verilmezse tamamı)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+    
+    def get_age(self, key):
+        """Önbellekteki verinin yaşı (saniye), veri yoksa None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return time.monotonic() - entry[1] if entry else None
+    
+    def get_stats(self):
+        """
+        Önbellek istatistikleri
+        
+        Returns:
+            dict: key -> {hit, miss, wait, hit_rate, age, fetched_at}
+        """
+        with self._lock:
+            now = time.monotonic()
+            stats = {}
+            
+            for key in set(self._stats) | set(self._entries):
+                counters = dict(self._stat(key))
+                total = counters['hit'] + counters['miss'] + counters['wait']
+                entry = self._entries.get(key)
+                
+                # Kendi çekimini yapmadan veri alan çağrıların oranı
+                counters['hit_rate'] = (counters['hit'] + counters['wait']) / total if total else 0.0
+                counters['age'] = now - entry[1] if entry else None
+                counters['fetched_at'] = entry[3] if entry else None
+                stats[key] = counters
+            
+            return stats
+
+
+def _has_quotes(data):
+    """Sözlükte kaynak etiketi dışında gerçek fiyat verisi var mı?"""
+    return any(not str(key).startswith('_') for key in data)
+
+
+quote_cache = QuoteCache(config.CACHE_TTL, config.CACHE_ERROR_TTL)
+
+
+def get_cache_stats():
+    """Fiyat önbelleği istatistiklerini döndür"""
+    return quote_cache.get_stats()
+
+
+@metrics.register_collector
+def _collect_metrics():
+    for key, stats in quote_cache.get_stats().items():
+        for sonuc in ('hit', 'miss', 'wait'):
+            yield ('finalert_cache_requests_total', 'counter', 'Fiyat önbelleği istekleri (wait = süren çekimi bekleyen)',
+                   {'anahtar': key, 'sonuc': sonuc}, stats[sonuc])
+        yield ('finalert_cache_hit_ratio', 'gauge', 'Kendi çekimini yapmadan veri alan isteklerin oranı',
+               {'anahtar': key}, stats['hit_rate'])
+        yield ('finalert_cache_age_seconds', 'gauge', 'Önbellekteki verinin yaşı',
+               {'anahtar': key}, stats['age'])
+    
+    for kaynak, stats in get_parse_stats().items():
+        for yol, count in stats.items():
+            yield ('finalert_parse_path_total', 'counter', 'Ayrıştırma yolu kullanımı (fast = lxml, fallback = BeautifulSoup)',
+                   {'kaynak': kaynak, 'yol': yol}, count)
+
+
+def invalidate_cache(asset_class=None):
+    """Fiyat önbelleğini temizle (doviz, altin, borsa veya tamamı)"""
+    quote_cache.invalidate(asset_class)
+
+
+# ===== DÖVİZ MODÜLÜ =====
+def get_doviz_data(force_refresh=False):
+    """
+    Döviz verilerini çek (USD, EUR, GBP vb.)
+    Önbellekten okunur, süresi dolduysa kaynaklardan yenilenir
+    """
+    return quote_cache.get('doviz', _fetch_doviz_data, force_refresh)
+
+
+@metrics.timed(metrics.QUOTE_REFRESH_SECONDS, varlik='doviz')
+def _fetch_doviz_data():
+    """
+    Döviz verilerini çek (USD, EUR, GBP vb.)
+    ANLIK CANLI VERİ - Çoklu kaynak ile yedekli sistem
+    Kaynak bilgisi de döndürülür
+    """
+    try:
+        data = run_source_chain(DOVIZ_KAYNAKLARI)
+        metrics.observe_chain('doviz', DOVIZ_KAYNAKLARI, data)
+        return data
     
     except Exception as e:
+        metrics.CHAIN_FAILURES.inc(zincir='doviz')
         print(f" Döviz verisi çekme hatası: {e}")
         doviz_data = get_doviz_tcmb()
         doviz_data['_kaynak'] = 'linK7'
@@ -123,50 +434,51 @@ def get_doviz_tcmb():
     link1 ad
     """
     try:
-        url = "link1"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'xml')
-            
-            doviz_dict = {}
-            
-            # USD
-            usd = soup.find('Currency', {'CurrencyCode': 'USD'})
-            if usd:
-                doviz_dict['USD'] = {
-                    'alis': parse_price(usd.find('BanknoteBuying').text if usd.find('BanknoteBuying') else '0'),
-                    'satis': parse_price(usd.find('BanknoteSelling').text if usd.find('BanknoteSelling') else '0'),
-                    'degisim': 0.0
-                }
-            
-            # EUR
-            eur = soup.find('Currency', {'CurrencyCode': 'EUR'})
-            if eur:
-                doviz_dict['EUR'] = {
-                    'alis': parse_price(eur.find('BanknoteBuying').text if eur.find('BanknoteBuying') else '0'),
-                    'satis': parse_price(eur.find('BanknoteSelling').text if eur.find('BanknoteSelling') else '0'),
-                    'degisim': 0.0
-                }
-            
-            # GBP
-            gbp = soup.find('Currency', {'CurrencyCode': 'GBP'})
-            if gbp:
-                doviz_dict['GBP'] = {
-                    'alis': parse_price(gbp.find('BanknoteBuying').text if gbp.find('BanknoteBuying') else '0'),
-                    'satis': parse_price(gbp.find('BanknoteSelling').text if gbp.find('BanknoteSelling') else '0'),
-                    'degisim': 0.0
-                }
-            
-            return doviz_dict
-        
-        return {}
+        return http_pool.fetch_parsed(KAYNAK_URLLERI['doviz_tcmb'], parse_doviz_tcmb, timeout=10) or {}
     
     except Exception as e:
         print(f"linK1 verisi çekme hatası: {e}")
         return {}
 
 
+def parse_doviz_tcmb(content):
+    """link1 XML içeriğini ayrıştır"""
+    return _parse_with_fallback('doviz_tcmb', content, _fast_doviz_tcmb, _soup_doviz_tcmb, _build_doviz_pairs)
+
+
+def _fast_doviz_tcmb(content):
+    return fast_parsers.tcmb_currencies(content, ['USD', 'EUR', 'GBP'])
+
+
+def _soup_doviz_tcmb(content):
+    soup = BeautifulSoup(content, 'xml')
+    found = {}
+    
+    for code in ['USD', 'EUR', 'GBP']:
+        currency = soup.find('Currency', {'CurrencyCode': code})
+        if currency:
+            found[code] = (
+                currency.find('BanknoteBuying').text if currency.find('BanknoteBuying') else '0',
+                currency.find('BanknoteSelling').text if currency.find('BanknoteSelling') else '0'
+            )
+    
+    return found
+
+
+def _build_doviz_pairs(found):
+    """kod -> (alış metni, satış metni) yapısından döviz sözlüğü"""
+    doviz_dict = {}
+    
+    for code, (alis, satis) in found.items():
+        doviz_dict[code] = {
+            'alis': parse_price(alis),
+            'satis': parse_price(satis),
+            'degisim': 0.0
+        }
+    
+    return doviz_dict
+
+
 def get_doviz_exchangerate():
     """
     link2 ad
@@ -178,19 +490,11 @@ def get_doviz_exchangerate():
         
         for code in currencies:
             try:
-                url = f"link2/{code}"
-                response = requests.get(url, timeout=5)
+                url = f"{KAYNAK_URLLERI['doviz_exchangerate']}/{code}"
+                entry = http_pool.fetch_parsed(url, parse_doviz_exchangerate, timeout=5, as_json=True)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    rate = data.get('rates', {}).get('TRY', 0)
-                    
-                    if rate > 0:
-                        doviz_dict[code] = {
-                            'alis': rate * 0.998,  # %0.2 spread
-                            'satis': rate * 1.002,
-                            'degisim': 0.0
-                        }
+                if entry:
+                    doviz_dict[code] = entry
             except:
                 pass
         
@@ -201,90 +505,100 @@ def get_doviz_exchangerate():
         return {}
 
 
+def parse_doviz_exchangerate(data):
+    """link2 JSON cevabından TRY kurunu ayrıştır (%0.2 spread ile)"""
+    rate = data.get('rates', {}).get('TRY', 0)
+    
+    if rate > 0:
+        return {
+            'alis': rate * 0.998,  # %0.2 spread
+            'satis': rate * 1.002,
+            'degisim': 0.0
+        }
+    
+    return None
+
+
 def get_doviz_mynet():
     """
     link3 ad
     """
     try:
-        url = "link3"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        doviz_dict = {}
-        
+        return safe_fetch(KAYNAK_URLLERI['doviz_mynet'], parse_doviz_mynet, delay=False) or {}
+    
+    except Exception as e:
+        print(f" link3 Finans döviz hatası: {e}")
+        return {}
 
-        table = soup.find('table')
-        
-        if not table:
-            return {}
-        
-        rows = table.find_all('tr')
-        
-        # Döviz mapping
-        doviz_mapping = {
-            'USD': ['dolar', 'usd', 'amerikan doları', 'amerikan dolari'],
-            'EUR': ['euro', 'eur', 'avrupa'],
-            'GBP': ['sterlin', 'gbp', 'ingiliz sterlini', 'ingiliz', 'pound']
-        }
-        
-        for row in rows:
-            cells = row.find_all('td')
-            
-            # Tablo yapısı: İsim | İkon | Son | Alış | Satış | % | Tarih
-            if len(cells) >= 5:
-                try:
-                    isim = cells[0].text.strip().lower()
-                    
-                    # Alış ve Satış sütunları (index 3 ve 4)
-                    alis = parse_price(cells[3].text)
-                    satis = parse_price(cells[4].text)
-                    
-                    # Sadece pozitif değerleri al
-                    if alis <= 0 or satis <= 0:
-                        continue
-                    
-                    # Döviz tipini belirle - daha spesifik kontrol
-                    matched = False
-                    
-                    # USD kontrolü - Kanada ve Avustralya doları hariç
-                    if ('dolar' in isim or 'usd' in isim) and 'USD' not in doviz_dict:
-                        if 'kanada' not in isim and 'avustralya' not in isim:
-                            doviz_dict['USD'] = {
-                                'alis': alis,
-                                'satis': satis,
-                                'degisim': 0.0
-                            }
-                            matched = True
-                    
-                    # EUR kontrolü
-                    if not matched and ('euro' in isim or 'eur' in isim) and 'EUR' not in doviz_dict:
-                        doviz_dict['EUR'] = {
-                            'alis': alis,
-                            'satis': satis,
-                            'degisim': 0.0
-                        }
-                        matched = True
-                    
-                    # GBP kontrolü
-                    if not matched and ('sterlin' in isim or 'gbp' in isim or 'ingiliz' in isim) and 'GBP' not in doviz_dict:
-                        doviz_dict['GBP'] = {
+
+def parse_doviz_mynet(content):
+    """link3 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('doviz_mynet', content, fast_parsers.first_table_rows, _soup_first_table_rows, _build_doviz_mynet)
+
+
+def _soup_first_table_rows(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    table = soup.find('table')
+    
+    if not table:
+        return []
+    
+    return [[cell.text for cell in row.find_all('td')] for row in table.find_all('tr')]
+
+
+def _build_doviz_mynet(rows):
+    doviz_dict = {}
+    
+    for cells in rows:
+        # Tablo yapısı: İsim | İkon | Son | Alış | Satış | % | Tarih
+        if len(cells) >= 5:
+            try:
+                isim = cells[0].strip().lower()
+                
+                # Alış ve Satış sütunları (index 3 ve 4)
+                alis = parse_price(cells[3])
+                satis = parse_price(cells[4])
+                
+                # Sadece pozitif değerleri al
+                if alis <= 0 or satis <= 0:
+                    continue
+                
+                # Döviz tipini belirle - daha spesifik kontrol
+                matched = False
+                
+                # USD kontrolü - Kanada ve Avustralya doları hariç
+                if ('dolar' in isim or 'usd' in isim) and 'USD' not in doviz_dict:
+                    if 'kanada' not in isim and 'avustralya' not in isim:
+                        doviz_dict['USD'] = {
                             'alis': alis,
                             'satis': satis,
                             'degisim': 0.0
                         }
                         matched = True
                 
-                except Exception as e:
-                    continue
-        
-        return doviz_dict
+                # EUR kontrolü
+                if not matched and ('euro' in isim or 'eur' in isim) and 'EUR' not in doviz_dict:
+                    doviz_dict['EUR'] = {
+                        'alis': alis,
+                        'satis': satis,
+                        'degisim': 0.0
+                    }
+                    matched = True
+                
+                # GBP kontrolü
+                if not matched and ('sterlin' in isim or 'gbp' in isim or 'ingiliz' in isim) and 'GBP' not in doviz_dict:
+                    doviz_dict['GBP'] = {
+                        'alis': alis,
+                        'satis': satis,
+                        'degisim': 0.0
+                    }
+                    matched = True
+            
+            except Exception:
+                continue
     
-    except Exception as e:
-        print(f" link3 Finans döviz hatası: {e}")
-        return {}
+    return doviz_dict
 
 
 def get_doviz_dovizcom_html():
@@ -292,77 +606,44 @@ def get_doviz_dovizcom_html():
     link4 ad
     """
     try:
-        url = "link4 ad"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        doviz_dict = {}
-        
+        return safe_fetch(KAYNAK_URLLERI['doviz_dovizcom_html'], parse_doviz_dovizcom_html, delay=False) or {}
+    
+    except Exception as e:
+        print(f" link4 HTML hatası: {e}")
+        return {}
 
-        # Her döviz için ayrı div/kart yapısı var
-        
-        # USD
-        try:
-            usd_div = soup.find('div', {'data-code': 'USD'}) or soup.find('span', string=lambda t: t and 'dolar' in t.lower() if t else False)
-            if usd_div:
-                parent = usd_div.find_parent('div', class_=['item', 'currency-item'])
-                if parent:
-                    alis_elem = parent.find('span', class_=['value', 'buy', 'alis'])
-                    satis_elem = parent.find('span', class_=['value', 'sell', 'satis'])
-                    
-                    if alis_elem and satis_elem:
-                        doviz_dict['USD'] = {
-                            'alis': parse_price(alis_elem.text),
-                            'satis': parse_price(satis_elem.text),
-                            'degisim': 0.0
-                        }
-        except:
-            pass
-        
-        # EUR
-        try:
-            eur_div = soup.find('div', {'data-code': 'EUR'}) or soup.find('span', string=lambda t: t and 'euro' in t.lower() if t else False)
-            if eur_div:
-                parent = eur_div.find_parent('div', class_=['item', 'currency-item'])
-                if parent:
-                    alis_elem = parent.find('span', class_=['value', 'buy', 'alis'])
-                    satis_elem = parent.find('span', class_=['value', 'sell', 'satis'])
-                    
-                    if alis_elem and satis_elem:
-                        doviz_dict['EUR'] = {
-                            'alis': parse_price(alis_elem.text),
-                            'satis': parse_price(satis_elem.text),
-                            'degisim': 0.0
-                        }
-        except:
-            pass
-        
-        # GBP
+
+def parse_doviz_dovizcom_html(content):
+    """link4 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('doviz_dovizcom_html', content, _fast_doviz_dovizcom_html, _soup_doviz_dovizcom_html, _build_doviz_pairs)
+
+
+def _fast_doviz_dovizcom_html(content):
+    return fast_parsers.dovizcom_html_items(content, ['USD', 'EUR', 'GBP'])
+
+
+def _soup_doviz_dovizcom_html(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    found = {}
+    
+    # Her döviz için ayrı div/kart yapısı var
+    arama = {'USD': 'dolar', 'EUR': 'euro', 'GBP': 'sterlin'}
+    
+    for code, kelime in arama.items():
         try:
-            gbp_div = soup.find('div', {'data-code': 'GBP'}) or soup.find('span', string=lambda t: t and 'sterlin' in t.lower() if t else False)
-            if gbp_div:
-                parent = gbp_div.find_parent('div', class_=['item', 'currency-item'])
+            div = soup.find('div', {'data-code': code}) or soup.find('span', string=lambda t: t and kelime in t.lower() if t else False)
+            if div:
+                parent = div.find_parent('div', class_=['item', 'currency-item'])
                 if parent:
                     alis_elem = parent.find('span', class_=['value', 'buy', 'alis'])
                     satis_elem = parent.find('span', class_=['value', 'sell', 'satis'])
                     
                     if alis_elem and satis_elem:
-                        doviz_dict['GBP'] = {
-                            'alis': parse_price(alis_elem.text),
-                            'satis': parse_price(satis_elem.text),
-                            'degisim': 0.0
-                        }
+                        found[code] = (alis_elem.text, satis_elem.text)
         except:
             pass
-        
-        return doviz_dict
     
-    except Exception as e:
-        print(f" link4 HTML hatası: {e}")
-        return {}
+    return found
 
 
 def get_doviz_sabah():
@@ -370,96 +651,105 @@ def get_doviz_sabah():
     link5 ad
     """
     try:
-        url = "link5"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        doviz_dict = {}
-        
-        #  tablosu - basit ve temiz yapı
-        # Tablo yapısı: DÖVİZ | ALIŞ (TL) | SATIŞ (TL) | SAAT | FARK (%)
-        table = soup.find('table')
-        
-        if not table:
-            return {}
-        
-        rows = table.find_all('tr')
-        
-        # Döviz mapping - daha spesifik kontrol
-        doviz_mapping = {
-            'USD': ['dolar', 'usd'],
-            'EUR': ['euro', 'eur'],
-            'GBP': ['sterlin', 'gbp', 'ingiliz']
-        }
-        
-        for row in rows:
-            cells = row.find_all('td')
+        return safe_fetch(KAYNAK_URLLERI['doviz_sabah'], parse_doviz_sabah, delay=False) or {}
+    
+    except Exception as e:
+        print(f" link5 Finans döviz hatası: {e}")
+        return {}
+
+
+def parse_doviz_sabah(content):
+    """link5 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('doviz_sabah', content, fast_parsers.sabah_rows, _soup_doviz_sabah_rows, _build_doviz_sabah)
+
+
+def _soup_doviz_sabah_rows(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    #  tablosu - basit ve temiz yapı
+    table = soup.find('table')
+    
+    if not table:
+        return []
+    
+    rows = []
+    for row in table.find_all('tr'):
+        try:
+            cells = [cell.text for cell in row.find_all('td')]
             
-            # En az 3 sütun olmalı: İsim, Alış, Satış
-            if len(cells) >= 3:
-                try:
-                    # İlk sütun: Döviz ismi (hem text hem de link içeriğini kontrol et)
-                    # Link içindeki text'i de al
-                    first_cell = cells[0]
-                    link = first_cell.find('a')
-                    
-                    if link:
-                        # Link varsa hem link text'ini hem de full text'i al
-                        link_text = link.text.strip().lower()
-                        full_text = first_cell.text.strip().lower()
-                        isim = link_text + " " + full_text
-                    else:
-                        isim = first_cell.text.strip().lower()
-                    
-                    # İkinci sütun: Alış fiyatı
-                    alis = parse_price(cells[1].text)
-                    
-                    # Üçüncü sütun: Satış fiyatı
-                    satis = parse_price(cells[2].text)
-                    
-                    # Sadece pozitif değerleri al
-                    if alis <= 0 or satis <= 0:
-                        continue
-                    
-                    # Döviz tipini belirle - tam eşleşme kontrolü
-                    for code, search_terms in doviz_mapping.items():
-                        matched = False
-                        for term in search_terms:
-                            # Kelime sınırlarını kontrol et
-                            # "dolar" arıyorsak sadece "dolar" veya "usd" kelimesini bul
-                            # "kanada doları" gibi diğer para birimlerini atla
-                            if code == 'USD' and ('dolar' in isim or 'usd' in isim):
-                                # "kanada" veya "avustralya" içermiyorsa USD'dir
-                                if 'kanada' not in isim and 'avustralya' not in isim:
-                                    matched = True
-                                    break
-                            elif code == 'EUR' and ('euro' in isim or 'eur' in isim):
-                                matched = True
-                                break
-                            elif code == 'GBP' and ('sterlin' in isim or 'gbp' in isim or 'ingiliz' in isim):
-                                # "sterlin", "gbp" veya "ingiliz" içeriyorsa GBP'dir
+            if cells:
+                # Link içindeki text'i de al
+                link = row.find_all('td')[0].find('a')
+                if link:
+                    cells[0] = link.text.strip() + " " + cells[0].strip()
+        except:
+            continue
+        
+        rows.append(cells)
+    
+    return rows
+
+
+def _build_doviz_sabah(rows):
+    doviz_dict = {}
+    
+    # Tablo yapısı: DÖVİZ | ALIŞ (TL) | SATIŞ (TL) | SAAT | FARK (%)
+    # Döviz mapping - daha spesifik kontrol
+    doviz_mapping = {
+        'USD': ['dolar', 'usd'],
+        'EUR': ['euro', 'eur'],
+        'GBP': ['sterlin', 'gbp', 'ingiliz']
+    }
+    
+    for cells in rows:
+        # En az 3 sütun olmalı: İsim, Alış, Satış
+        if len(cells) >= 3:
+            try:
+                # İlk sütun: Döviz ismi (link varsa link text'i + hücre text'i)
+                isim = cells[0].strip().lower()
+                
+                # İkinci sütun: Alış fiyatı
+                alis = parse_price(cells[1])
+                
+                # Üçüncü sütun: Satış fiyatı
+                satis = parse_price(cells[2])
+                
+                # Sadece pozitif değerleri al
+                if alis <= 0 or satis <= 0:
+                    continue
+                
+                # Döviz tipini belirle - tam eşleşme kontrolü
+                for code, search_terms in doviz_mapping.items():
+                    matched = False
+                    for term in search_terms:
+                        # Kelime sınırlarını kontrol et
+                        # "dolar" arıyorsak sadece "dolar" veya "usd" kelimesini bul
+                        # "kanada doları" gibi diğer para birimlerini atla
+                        if code == 'USD' and ('dolar' in isim or 'usd' in isim):
+                            # "kanada" veya "avustralya" içermiyorsa USD'dir
+                            if 'kanada' not in isim and 'avustralya' not in isim:
                                 matched = True
                                 break
-                        
-                        if matched and code not in doviz_dict:  # Daha önce eklenmemişse
-                            doviz_dict[code] = {
-                                'alis': alis,
-                                'satis': satis,
-                                'degisim': 0.0
-                            }
+                        elif code == 'EUR' and ('euro' in isim or 'eur' in isim):
+                            matched = True
                             break
-                
-                except Exception as e:
-                    continue
-        
-        return doviz_dict
+                        elif code == 'GBP' and ('sterlin' in isim or 'gbp' in isim or 'ingiliz' in isim):
+                            # "sterlin", "gbp" veya "ingiliz" içeriyorsa GBP'dir
+                            matched = True
+                            break
+                    
+                    if matched and code not in doviz_dict:  # Daha önce eklenmemişse
+                        doviz_dict[code] = {
+                            'alis': alis,
+                            'satis': satis,
+                            'degisim': 0.0
+                        }
+                        break
+            
+            except Exception:
+                continue
     
-    except Exception as e:
-        print(f" link5 Finans döviz hatası: {e}")
-        return {}
+    return doviz_dict
 
 
 def get_doviz_bigpara():
@@ -467,180 +757,157 @@ def get_doviz_bigpara():
     link6 ad
     """
     try:
-        url = "link6"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        doviz_dict = {}
-        
-        # link6'da veri çekme
-        # USD
-        try:
-            usd_row = soup.find('tr', {'data-name': 'dolar'})
-            if usd_row:
-                cells = usd_row.find_all('td')
-                if len(cells) >= 3:
-                    doviz_dict['USD'] = {
-                        'alis': parse_price(cells[1].text),
-                        'satis': parse_price(cells[2].text),
-                        'degisim': 0.0
-                    }
-        except:
-            pass
-        
-        # EUR
-        try:
-            eur_row = soup.find('tr', {'data-name': 'euro'})
-            if eur_row:
-                cells = eur_row.find_all('td')
-                if len(cells) >= 3:
-                    doviz_dict['EUR'] = {
-                        'alis': parse_price(cells[1].text),
-                        'satis': parse_price(cells[2].text),
-                        'degisim': 0.0
-                    }
-        except:
-            pass
-        
-        # GBP - link "sterlin" olarak geçiyor
-        try:
-            gbp_row = soup.find('tr', {'data-name': 'sterlin'})
-            if gbp_row:
-                cells = gbp_row.find_all('td')
-                if len(cells) >= 3:
-                    doviz_dict['GBP'] = {
-                        'alis': parse_price(cells[1].text),
-                        'satis': parse_price(cells[2].text),
-                        'degisim': 0.0
-                    }
-        except:
-            pass
-        
-        return doviz_dict
+        return safe_fetch(KAYNAK_URLLERI['doviz_bigpara'], parse_doviz_bigpara, delay=False) or {}
     
     except Exception as e:
         print(f"link6 hatası: {e}")
         return {}
 
 
+def parse_doviz_bigpara(content):
+    """link6 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('doviz_bigpara', content, _fast_doviz_bigpara, _soup_doviz_bigpara, _build_doviz_bigpara)
+
+
+# link6 satır adları - GBP "sterlin" olarak geçiyor
+BIGPARA_DOVIZ_SATIRLARI = {'dolar': 'USD', 'euro': 'EUR', 'sterlin': 'GBP'}
+
+
+def _fast_doviz_bigpara(content):
+    return fast_parsers.rows_by_name(content, list(BIGPARA_DOVIZ_SATIRLARI))
+
+
+def _soup_doviz_bigpara(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    found = {}
+    
+    for name in BIGPARA_DOVIZ_SATIRLARI:
+        try:
+            row = soup.find('tr', {'data-name': name})
+            if row:
+                found[name] = [cell.text for cell in row.find_all('td')]
+        except:
+            pass
+    
+    return found
+
+
+def _build_doviz_bigpara(found):
+    doviz_dict = {}
+    
+    for name, code in BIGPARA_DOVIZ_SATIRLARI.items():
+        cells = found.get(name)
+        if cells and len(cells) >= 3:
+            doviz_dict[code] = {
+                'alis': parse_price(cells[1]),
+                'satis': parse_price(cells[2]),
+                'degisim': 0.0
+            }
+    
+    return doviz_dict
+
+
 def get_doviz_dovizcom_api():
     """
     link7 JSON API - RESMİ API
     """
     try:
-        url = "link7"
-        response = requests.get(url, timeout=5)
-        
         # link JSON API
-        if response.status_code == 200:
-            try:
-                data = response.json()
-                doviz_dict = {}
-                
-                # USD
-                if 'USD' in data:
-                    usd = data['USD']
-                    doviz_dict['USD'] = {
-                        'alis': parse_price(usd.get('buying', 0)),
-                        'satis': parse_price(usd.get('selling', 0)),
-                        'degisim': 0.0
-                    }
-                
-                # EUR
-                if 'EUR' in data:
-                    eur = data['EUR']
-                    doviz_dict['EUR'] = {
-                        'alis': parse_price(eur.get('buying', 0)),
-                        'satis': parse_price(eur.get('selling', 0)),
-                        'degisim': 0.0
-                    }
-                
-                # GBP
-                if 'GBP' in data:
-                    gbp = data['GBP']
-                    doviz_dict['GBP'] = {
-                        'alis': parse_price(gbp.get('buying', 0)),
-                        'satis': parse_price(gbp.get('selling', 0)),
-                        'degisim': 0.0
-                    }
-                
-                return doviz_dict
-            except:
-                pass
+        try:
+            result = http_pool.fetch_parsed(KAYNAK_URLLERI['doviz_dovizcom_api'], parse_doviz_dovizcom_api, timeout=5, as_json=True)
+            if result is not None:
+                return result
+        except requests.RequestException:
+            raise
+        except:
+            pass
         
         # API çalışmazsa HTML scraping
-        url = "link7"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        doviz_dict = {}
-        
-        # Basit div yapısı
-        for code in ['USD', 'EUR', 'GBP']:
-            try:
-                item = soup.find('div', {'data-code': code})
-                if item:
-                    values = item.find_all('span', class_='value')
-                    if len(values) >= 2:
-                        doviz_dict[code] = {
-                            'alis': parse_price(values[0].text),
-                            'satis': parse_price(values[1].text),
-                            'degisim': 0.0
-                        }
-            except:
-                pass
-        
-        return doviz_dict
+        return safe_fetch(KAYNAK_URLLERI['doviz_dovizcom_api_html'], parse_doviz_dovizcom_api_html, delay=False) or {}
     
     except Exception as e:
         print(f" link7 hatası: {e}")
         return {}
 
 
+def parse_doviz_dovizcom_api(data):
+    """link7 JSON cevabını ayrıştır"""
+    doviz_dict = {}
+    
+    for code in ['USD', 'EUR', 'GBP']:
+        if code in data:
+            item = data[code]
+            doviz_dict[code] = {
+                'alis': parse_price(item.get('buying', 0)),
+                'satis': parse_price(item.get('selling', 0)),
+                'degisim': 0.0
+            }
+    
+    return doviz_dict
+
+
+def parse_doviz_dovizcom_api_html(content):
+    """link7 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('doviz_dovizcom_api_html', content, _fast_doviz_dovizcom_api_html, _soup_doviz_dovizcom_api_html, _build_doviz_value_spans)
+
+
+def _fast_doviz_dovizcom_api_html(content):
+    return fast_parsers.dovizcom_api_html_values(content, ['USD', 'EUR', 'GBP'])
+
+
+def _soup_doviz_dovizcom_api_html(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    found = {}
+    
+    # Basit div yapısı
+    for code in ['USD', 'EUR', 'GBP']:
+        try:
+            item = soup.find('div', {'data-code': code})
+            if item:
+                found[code] = [value.text for value in item.find_all('span', class_='value')]
+        except:
+            pass
+    
+    return found
+
+
+def _build_doviz_value_spans(found):
+    doviz_dict = {}
+    
+    for code, values in found.items():
+        if len(values) >= 2:
+            doviz_dict[code] = {
+                'alis': parse_price(values[0]),
+                'satis': parse_price(values[1]),
+                'degisim': 0.0
+            }
+    
+    return doviz_dict
+
+
 # ===== ALTIN MODÜLÜ =====
-def get_altin_data():
+def get_altin_data(force_refresh=False):
+    """
+    Altın fiyatlarını çek
+    Önbellekten okunur, süresi dolduysa kaynaklardan yenilenir
+    """
+    return quote_cache.get('altin', _fetch_altin_data, force_refresh)
+
+
+@metrics.timed(metrics.QUOTE_REFRESH_SECONDS, varlik='altin')
+def _fetch_altin_data():
     """
     Altın fiyatlarını çek - ANLIK CANLI VERİ
     Çoklu kaynak ile yedekli sistem
     Kaynak bilgisi de döndürülür
     """
     try:
-        # ÖNCELİK 1: [link8 web sitesi adı]
-        altin_data = get_altin_mynet()
-        if altin_data and len(altin_data) > 0:
-            altin_data['_kaynak'] = 'link8'
-            return altin_data
-        
-        # ÖNCELİK 2: [link9 web sitesi adı]
-        altin_data = get_altin_bigpara()
-        if altin_data and len(altin_data) > 0:
-            altin_data['_kaynak'] = 'link9'
-            return altin_data
-        
-        # ÖNCELİK 3: [link10 web sitesi adı]
-        altin_data = get_altin_trt()
-        if altin_data and len(altin_data) > 0:
-            altin_data['_kaynak'] = 'link10'
-            return altin_data
-        
-        # ÖNCELİK 4: [link11 web sitesi adı]
-        altin_data = get_altin_genelpara()
-        if altin_data and len(altin_data) > 0:
-            altin_data['_kaynak'] = 'link11'
-            return altin_data
-        
-        # ÖNCELİK 5: [link12 web sitesi adı]
-        altin_data = get_altin_collectapi()
-        altin_data['_kaynak'] = 'link12'
-        return altin_data
+        data = run_source_chain(ALTIN_KAYNAKLARI)
+        metrics.observe_chain('altin', ALTIN_KAYNAKLARI, data)
+        return data
     
     except Exception as e:
+        metrics.CHAIN_FAILURES.inc(zincir='altin')
         print(f" Altın verisi çekme hatası: {e}")
         return {'_kaynak': 'Hata'}
 
@@ -650,165 +917,149 @@ def get_altin_trt():
     link8 ad
     """
     try:
-        url = "link8"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        altin_dict = {}
-        
-        # link8 altın tablosu - modern HTML yapısı
-        # Web sayfadaki tablo yapısını ara
-        tables = soup.find_all(['table', 'div'], class_=lambda x: x and 'table' in str(x).lower())
-        
-        for table in tables:
-            rows = table.find_all('tr')
-            
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                
-                if len(cells) >= 3:
-                    isim_cell = cells[0].text.strip().lower()
-                    
-                    # Altın tipini belirle
-                    altin_key = None
-                    if 'gram' in isim_cell and 'altın' in isim_cell or 'gram altin' in isim_cell:
-                        altin_key = 'gram'
-                    elif 'çeyrek' in isim_cell or 'ceyrek' in isim_cell:
-                        altin_key = 'ceyrek'
-                    elif 'yarım' in isim_cell or 'yarim' in isim_cell:
-                        altin_key = 'yarim'
-                    
-                    if altin_key:
-                        try:
-                            alis = parse_price(cells[1].text)
-                            satis = parse_price(cells[2].text)
-                            
-                            if alis > 0 and satis > 0:
-                                altin_dict[altin_key] = {
-                                    'alis': alis,
-                                    'satis': satis,
-                                }
-                        except:
-                            pass
-        
-        # Alternatif: Tüm text'i tara ve pattern match yap
-        if not altin_dict:
-            page_text = soup.get_text()
-            
-            # Basit örnek değerler (fallback)
-            # link çalışmazsa diğer kaynaklara geçecek
-            pass
-        
-        return altin_dict
+        return safe_fetch(KAYNAK_URLLERI['altin_trt'], parse_altin_trt, delay=False) or {}
     
     except Exception as e:
         print(f" link8 altın scraping hatası: {e}")
         return {}
 
 
+def parse_altin_trt(content):
+    """link8 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('altin_trt', content, fast_parsers.table_container_rows, _soup_altin_trt_rows, _build_altin_trt)
+
+
+def _soup_altin_trt_rows(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # link8 altın tablosu - modern HTML yapısı
+    # Web sayfadaki tablo yapısını ara
+    tables = soup.find_all(['table', 'div'], class_=lambda x: x and 'table' in str(x).lower())
+    
+    return [
+        [cell.text for cell in row.find_all(['td', 'th'])]
+        for table in tables
+        for row in table.find_all('tr')
+    ]
+
+
+def _build_altin_trt(rows):
+    altin_dict = {}
+    
+    for cells in rows:
+        if len(cells) >= 3:
+            isim_cell = cells[0].strip().lower()
+            
+            # Altın tipini belirle
+            altin_key = None
+            if 'gram' in isim_cell and 'altın' in isim_cell or 'gram altin' in isim_cell:
+                altin_key = 'gram'
+            elif 'çeyrek' in isim_cell or 'ceyrek' in isim_cell:
+                altin_key = 'ceyrek'
+            elif 'yarım' in isim_cell or 'yarim' in isim_cell:
+                altin_key = 'yarim'
+            
+            if altin_key:
+                try:
+                    alis = parse_price(cells[1])
+                    satis = parse_price(cells[2])
+                    
+                    if alis > 0 and satis > 0:
+                        altin_dict[altin_key] = {
+                            'alis': alis,
+                            'satis': satis,
+                        }
+                except:
+                    pass
+    
+    # link çalışmazsa diğer kaynaklara geçecek
+    return altin_dict
+
+
 def get_altin_bigpara():
     """
     link9 ad
     """
     try:
-        url = "link9"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        altin_dict = {}
-        
-        # link altın için basit tablo
-        altin_mapping = {
-            'gram': ['gram-altin', 'gram altın'],
-            'ceyrek': ['ceyrek-altin', 'çeyrek altın'],
-            'yarim': ['yarim-altin', 'yarım altın'],
-            'tam': ['tam-altin', 'tam altın'],
-            'cumhuriyet': ['cumhuriyet-altini', 'cumhuriyet altını'],
-            'ons': ['ons-altin', 'ons altın']
-        }
-        
-        for altin_type, search_terms in altin_mapping.items():
-            try:
-                row = None
-                for term in search_terms:
-                    row = soup.find('tr', {'data-name': term})
-                    if row:
-                        break
-                    # Alternatif arama
-                    row = soup.find('a', string=lambda t: t and term in t.lower())
-                    if row:
-                        row = row.find_parent('tr')
-                        break
-                
-                if row:
-                    cells = row.find_all('td')
-                    if len(cells) >= 3:
-                        altin_dict[altin_type] = {
-                            'alis': parse_price(cells[1].text),
-                            'satis': parse_price(cells[2].text),
-                        }
-            except:
-                pass
-        
-        return altin_dict
+        return safe_fetch(KAYNAK_URLLERI['altin_bigpara'], parse_altin_bigpara, delay=False) or {}
     
     except Exception as e:
         print(f" link9 altın hatası: {e}")
         return {}
 
 
+def parse_altin_bigpara(content):
+    """link9 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('altin_bigpara', content, _fast_altin_bigpara, _soup_altin_bigpara, _build_altin_cells)
+
+
+# link altın için basit tablo
+BIGPARA_ALTIN_TERIMLERI = {
+    'gram': ['gram-altin', 'gram altın'],
+    'ceyrek': ['ceyrek-altin', 'çeyrek altın'],
+    'yarim': ['yarim-altin', 'yarım altın'],
+    'tam': ['tam-altin', 'tam altın'],
+    'cumhuriyet': ['cumhuriyet-altini', 'cumhuriyet altını'],
+    'ons': ['ons-altin', 'ons altın']
+}
+
+
+def _fast_altin_bigpara(content):
+    return fast_parsers.altin_bigpara_rows(content, BIGPARA_ALTIN_TERIMLERI)
+
+
+def _soup_altin_bigpara(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    found = {}
+    
+    for altin_type, search_terms in BIGPARA_ALTIN_TERIMLERI.items():
+        try:
+            row = None
+            for term in search_terms:
+                row = soup.find('tr', {'data-name': term})
+                if row:
+                    break
+                # Alternatif arama
+                row = soup.find('a', string=lambda t: t and term in t.lower())
+                if row:
+                    row = row.find_parent('tr')
+                    break
+            
+            if row:
+                found[altin_type] = [cell.text for cell in row.find_all('td')]
+        except:
+            pass
+    
+    return found
+
+
+def _build_altin_cells(found):
+    """altın türü -> hücre metinleri yapısından altın sözlüğü (1: alış, 2: satış)"""
+    altin_dict = {}
+    
+    for altin_type, cells in found.items():
+        if len(cells) >= 3:
+            altin_dict[altin_type] = {
+                'alis': parse_price(cells[1]),
+                'satis': parse_price(cells[2]),
+            }
+    
+    return altin_dict
+
+
 def get_altin_collectapi():
     """
     link10 ad
     """
     try:
         # Ücretsiz endpoint
-        url = "link10"
-        
         # API key gerektirmeez(public endpoint)
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 200:
-            try:
-                data = response.json()
-                altin_dict = {}
-                
-                if 'result' in data:
-                    items = data['result']
-                    
-                    for item in items:
-                        name = item.get('name', '').lower()
-                        
-                        if 'gram' in name:
-                            altin_dict['gram'] = {
-                                'alis': parse_price(item.get('buying', 0)),
-                                'satis': parse_price(item.get('selling', 0)),
-                            }
-                        elif 'çeyrek' in name or 'ceyrek' in name:
-                            altin_dict['ceyrek'] = {
-                                'alis': parse_price(item.get('buying', 0)),
-                                'satis': parse_price(item.get('selling', 0)),
-                            }
-                        elif 'yarım' in name or 'yarim' in name:
-                            altin_dict['yarim'] = {
-                                'alis': parse_price(item.get('buying', 0)),
-                                'satis': parse_price(item.get('selling', 0)),
-                            }
-                        elif 'tam' in name:
-                            altin_dict['tam'] = {
-                                'alis': parse_price(item.get('buying', 0)),
-                                'satis': parse_price(item.get('selling', 0)),
-                            }
-                
-                return altin_dict
-            except:
-                pass
+        try:
+            return http_pool.fetch_parsed(KAYNAK_URLLERI['altin_collectapi'], parse_altin_collectapi, timeout=5, as_json=True) or {}
+        except requests.RequestException:
+            raise
+        except:
+            pass
         
         return {}
     
@@ -817,153 +1068,160 @@ def get_altin_collectapi():
         return {}
 
 
+def parse_altin_collectapi(data):
+    """link10 JSON cevabını ayrıştır"""
+    altin_dict = {}
+    
+    if 'result' in data:
+        items = data['result']
+        
+        for item in items:
+            name = item.get('name', '').lower()
+            
+            altin_key = None
+            if 'gram' in name:
+                altin_key = 'gram'
+            elif 'çeyrek' in name or 'ceyrek' in name:
+                altin_key = 'ceyrek'
+            elif 'yarım' in name or 'yarim' in name:
+                altin_key = 'yarim'
+            elif 'tam' in name:
+                altin_key = 'tam'
+            
+            if altin_key:
+                altin_dict[altin_key] = {
+                    'alis': parse_price(item.get('buying', 0)),
+                    'satis': parse_price(item.get('selling', 0)),
+                }
+    
+    return altin_dict
+
+
 def get_altin_mynet():
     """
     link11 ad
     """
     try:
-        url = "link11"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        altin_dict = {}
-        
-
-        table = soup.find('table')
-        
-        if not table:
-            return {}
-        
-        rows = table.find_all('tr')
-        
-        for row in rows:
-            cells = row.find_all('td')
-            
-            # 7 sütun olmalı: İsim(0) | İkon(1) | Son(2) | Alış(3) | Satış(4) | %(5) | Tarih(6)
-            if len(cells) >= 5:
-                try:
-                    isim = cells[0].text.strip().lower()
-                    alis = parse_price(cells[3].text)  # Alış sütunu
-                    satis = parse_price(cells[4].text)  # Satış sütunu
-                    
-                    # Sadece pozitif değerleri al
-                    if alis <= 0 or satis <= 0:
-                        continue
-                    
-                    # Altın tipini belirle (Kapalı Çarşı olmayan)
-                    if 'kapalı' in isim or 'kapali' in isim:
-                        continue
-                    
-                    altin_key = None
-                    if 'gram' in isim and 'altın' in isim:
-                        altin_key = 'gram'
-                    elif 'çeyrek' in isim or 'ceyrek' in isim:
-                        altin_key = 'ceyrek'
-                    elif 'yarım' in isim or 'yarim' in isim:
-                        altin_key = 'yarim'
-                    elif 'cumhuriyet' in isim:
-                        altin_key = 'cumhuriyet'
-                    elif 'tam' in isim:
-                        altin_key = 'tam'
-                    elif 'ons' in isim and 'tl' in isim:
-                        altin_key = 'ons'
-                    
-                    if altin_key:
-                        altin_dict[altin_key] = {
-                            'alis': alis,
-                            'satis': satis,
-                        }
-                
-                except Exception as e:
-                    pass
-        
-        return altin_dict
+        return safe_fetch(KAYNAK_URLLERI['altin_mynet'], parse_altin_mynet, delay=False) or {}
     
     except Exception as e:
         print(f" link11 altın scraping hatası: {e}")
         return {}
 
 
+def parse_altin_mynet(content):
+    """link11 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('altin_mynet', content, fast_parsers.first_table_rows, _soup_first_table_rows, _build_altin_mynet)
+
+
+def _build_altin_mynet(rows):
+    altin_dict = {}
+    
+    for cells in rows:
+        # 7 sütun olmalı: İsim(0) | İkon(1) | Son(2) | Alış(3) | Satış(4) | %(5) | Tarih(6)
+        if len(cells) >= 5:
+            try:
+                isim = cells[0].strip().lower()
+                alis = parse_price(cells[3])  # Alış sütunu
+                satis = parse_price(cells[4])  # Satış sütunu
+                
+                # Sadece pozitif değerleri al
+                if alis <= 0 or satis <= 0:
+                    continue
+                
+                # Altın tipini belirle (Kapalı Çarşı olmayan)
+                if 'kapalı' in isim or 'kapali' in isim:
+                    continue
+                
+                altin_key = None
+                if 'gram' in isim and 'altın' in isim:
+                    altin_key = 'gram'
+                elif 'çeyrek' in isim or 'ceyrek' in isim:
+                    altin_key = 'ceyrek'
+                elif 'yarım' in isim or 'yarim' in isim:
+                    altin_key = 'yarim'
+                elif 'cumhuriyet' in isim:
+                    altin_key = 'cumhuriyet'
+                elif 'tam' in isim:
+                    altin_key = 'tam'
+                elif 'ons' in isim and 'tl' in isim:
+                    altin_key = 'ons'
+                
+                if altin_key:
+                    altin_dict[altin_key] = {
+                        'alis': alis,
+                        'satis': satis,
+                    }
+            
+            except Exception:
+                pass
+    
+    return altin_dict
+
+
 def get_altin_genelpara():
     """
     link12 ad
     """
     try:
-        url = "link12"
-        response = requests.get(url, headers=get_headers(), timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            altin_dict = {
-                'gram': {
-                    'alis': parse_price(data.get('GA', {}).get('alis', 0)),
-                    'satis': parse_price(data.get('GA', {}).get('satis', 0)),
-                },
-                'ceyrek': {
-                    'alis': parse_price(data.get('C', {}).get('alis', 0)),
-                    'satis': parse_price(data.get('C', {}).get('satis', 0)),
-                },
-                'yarim': {
-                    'alis': parse_price(data.get('Y', {}).get('alis', 0)),
-                    'satis': parse_price(data.get('Y', {}).get('satis', 0)),
-                },
-                'tam': {
-                    'alis': parse_price(data.get('T', {}).get('alis', 0)),
-                    'satis': parse_price(data.get('T', {}).get('satis', 0)),
-                },
-                'cumhuriyet': {
-                    'alis': parse_price(data.get('C', {}).get('alis', 0)),
-                    'satis': parse_price(data.get('C', {}).get('satis', 0)),
-                },
-                'ons': {
-                    'alis': parse_price(data.get('ONS', {}).get('alis', 0)) if data.get('ONS') else 0,
-                    'satis': parse_price(data.get('ONS', {}).get('satis', 0)) if data.get('ONS') else 0,
-                }
-            }
-            
-            return altin_dict
-        
-        return {}
+        return http_pool.fetch_parsed(KAYNAK_URLLERI['altin_genelpara'], parse_altin_genelpara, headers=get_headers(), timeout=10, as_json=True) or {}
     
     except Exception as e:
         print(f" link12 API hatası: {e}")
         return {}
 
 
+def parse_altin_genelpara(data):
+    """link12 JSON cevabını ayrıştır"""
+    return {
+        'gram': {
+            'alis': parse_price(data.get('GA', {}).get('alis', 0)),
+            'satis': parse_price(data.get('GA', {}).get('satis', 0)),
+        },
+        'ceyrek': {
+            'alis': parse_price(data.get('C', {}).get('alis', 0)),
+            'satis': parse_price(data.get('C', {}).get('satis', 0)),
+        },
+        'yarim': {
+            'alis': parse_price(data.get('Y', {}).get('alis', 0)),
+            'satis': parse_price(data.get('Y', {}).get('satis', 0)),
+        },
+        'tam': {
+            'alis': parse_price(data.get('T', {}).get('alis', 0)),
+            'satis': parse_price(data.get('T', {}).get('satis', 0)),
+        },
+        'cumhuriyet': {
+            'alis': parse_price(data.get('C', {}).get('alis', 0)),
+            'satis': parse_price(data.get('C', {}).get('satis', 0)),
+        },
+        'ons': {
+            'alis': parse_price(data.get('ONS', {}).get('alis', 0)) if data.get('ONS') else 0,
+            'satis': parse_price(data.get('ONS', {}).get('satis', 0)) if data.get('ONS') else 0,
+        }
+    }
+
+
 # ===== BORSA MODÜLÜ =====
-def get_borsa_data():
+def get_borsa_data(force_refresh=False):
+    """
+    Borsa verilerini çek
+    Önbellekten okunur, süresi dolduysa kaynaklardan yenilenir
+    """
+    return quote_cache.get('borsa', _fetch_borsa_data, force_refresh)
+
+
+@metrics.timed(metrics.QUOTE_REFRESH_SECONDS, varlik='borsa')
+def _fetch_borsa_data():
     """
     Borsa fiyatları için web scrabing & API servisleri
     """
     try:
-        # ÖNCELİK 1: [link13 web sitesi adı](python kütüphanesi ile calisan)
-        borsa_data = get_borsa_yahoo()
-        if borsa_data and len(borsa_data) > 0:
-            borsa_data['_kaynak'] = 'link13'
-            return borsa_data
-        
-        # ÖNCELİK 2: [link14 web sitesi adı] - JSON
-        borsa_data = get_borsa_genelpara()
-        if borsa_data and len(borsa_data) > 0:
-            borsa_data['_kaynak'] = 'link14'
-            return borsa_data
-        
-        # ÖNCELİK 3: [link15 web sitesi adı]
-        borsa_data = get_borsa_bigpara()
-        if borsa_data and len(borsa_data) > 0:
-            borsa_data['_kaynak'] = 'link15'
-            return borsa_data
-        
-        # ÖNCELİK 4: [link16 web sitesi adı] - Alternatif
-        borsa_data = get_borsa_foreks()
-        borsa_data['_kaynak'] = 'link16'
-        return borsa_data
+        data = run_source_chain(BORSA_KAYNAKLARI)
+        metrics.observe_chain('borsa', BORSA_KAYNAKLARI, data)
+        return data
     
     except Exception as e:
+        metrics.CHAIN_FAILURES.inc(zincir='borsa')
         print(f"Borsa verisi çekme hatası: {e}")
         borsa_data = get_borsa_genelpara()
         borsa_data['_kaynak'] = 'link15API'
@@ -973,122 +1231,145 @@ def get_borsa_data():
 def get_borsa_yahoo():
     """
     link13 ad
+    Tüm semboller tek bir toplu (multi-ticker) indirme çağrısıyla çekilir,
+    önceki kapanış aynı tablodan hesaplanır (.info isteği yapılmaz)
     """
     try:
         if not YFINANCE_AVAILABLE:
             return {}
         
-        borsa_dict = {}
-        
-
-        try:
-            xu100 = yf.Ticker("XU100.IS")
-            data = xu100.history(period="1d")
-            
-            if not data.empty:
-                current_price = data['Close'].iloc[-1]
-                prev_close = xu100.info.get('previousClose', current_price)
-                
-                change_percent = ((current_price - prev_close) / prev_close * 100) if prev_close else 0
-                
-                borsa_dict['XU100'] = {
-                    'deger': float(current_price),
-                    'degisim_yuzde': float(change_percent),
-                }
-        except Exception as e:
-            print(f"⚠️ XU100 link13 hatası: {e}")
-        
-        # Popüler hisseler - .IS uzantısı Borsa Istanbul için
-        hisseler = {
-            'THYAO': 'THYAO.IS',
-            'GARAN': 'GARAN.IS',
-            'AKBNK': 'AKBNK.IS',
-            'EREGL': 'EREGL.IS',
-            'SAHOL': 'SAHOL.IS',
-            'TUPRS': 'TUPRS.IS',
-            'PETKM': 'PETKM.IS',
-            'SISE': 'SISE.IS'
-        }
+        # .IS uzantısı Borsa Istanbul için
+        tickers = {kod: f"{kod}.IS" for kod in get_borsa_semboller()}
         
-        for kod, ticker in hisseler.items():
-            try:
-                stock = yf.Ticker(ticker)
-                data = stock.history(period="1d")
-                
-                if not data.empty:
-                    current_price = data['Close'].iloc[-1]
-                    prev_close = stock.info.get('previousClose', current_price)
-                    
-                    change_percent = ((current_price - prev_close) / prev_close * 100) if prev_close else 0
-                    
-                    borsa_dict[kod] = {
-                        'deger': float(current_price),
-                        'degisim_yuzde': float(change_percent),
-                    }
-            except:
-                pass
+        data = yf.download(
+            list(tickers.values()),
+            period="5d",
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=False,
+            threads=True,
+            progress=False
+        )
         
-        return borsa_dict
+        return parse_borsa_yahoo(data, tickers)
     
     except Exception as e:
         print(f" link13 hatası: {e}")
         return {}
 
 
+def parse_borsa_yahoo(frame, tickers):
+    """
+    Toplu yfinance tablosunu ayrıştır
+    
+    Args:
+        frame: yf.download() sonucu (sembol bazlı gruplanmış)
+        tickers: {kod: yahoo sembolü} sözlüğü
+    """
+    borsa_dict = {}
+    
+    if frame is None or frame.empty:
+        return borsa_dict
+    
+    grouped = getattr(frame.columns, 'nlevels', 1) > 1
+    
+    for kod, ticker in tickers.items():
+        try:
+            if grouped:
+                if ticker not in frame.columns.get_level_values(0):
+                    continue
+                closes = frame[ticker]['Close'].dropna()
+            else:
+                closes = frame['Close'].dropna()
+            
+            if closes.empty:
+                continue
+            
+            current_price = float(closes.iloc[-1])
+            prev_close = float(closes.iloc[-2]) if len(closes) > 1 else current_price
+            
+            change_percent = ((current_price - prev_close) / prev_close * 100) if prev_close else 0
+            
+            borsa_dict[kod] = {
+                'deger': current_price,
+                'degisim_yuzde': float(change_percent),
+            }
+        except Exception as e:
+            print(f"⚠️ {kod} link13 hatası: {e}")
+    
+    return borsa_dict
+
+
+def get_borsa_semboller():
+    """Takip edilen borsa sembolleri (BIST 100 endeksi her zaman başta)"""
+    return ['XU100'] + [kod for kod in config.BORSA_SEMBOLLERI if kod != 'XU100']
+
+
 def get_borsa_foreks():
     """
     link14 ad
     """
     try:
-        url = "link14"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        borsa_dict = {}
-        
-        # BIST 100
+        return safe_fetch(KAYNAK_URLLERI['borsa_foreks'], parse_borsa_foreks, delay=False) or {}
+    
+    except Exception as e:
+        print(f"link14 scraping hatası: {e}")
+        return {}
+
+
+def parse_borsa_foreks(content):
+    """link14 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('borsa_foreks', content, _fast_borsa_foreks, _soup_borsa_foreks, _build_borsa_foreks)
+
+
+def _fast_borsa_foreks(content):
+    return fast_parsers.borsa_foreks_rows(content, config.BORSA_SEMBOLLERI)
+
+
+def _soup_borsa_foreks(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    found = {}
+    
+    # BIST 100 ve popüler hisseler - satır yoksa bağlantıdan sonraki satır
+    for code in ['XU100'] + config.BORSA_SEMBOLLERI:
         try:
-            bist_row = soup.find('tr', {'data-code': 'XU100'}) or \
-                       soup.find('a', string=lambda t: t and 'BIST 100' in t)
+            if code == 'XU100':
+                row = soup.find('tr', {'data-code': 'XU100'}) or \
+                      soup.find('a', string=lambda t: t and 'BIST 100' in t)
+            else:
+                row = soup.find('tr', {'data-code': code}) or \
+                      soup.find('a', string=code)
             
-            if bist_row:
-                cells = bist_row.find_all('td') if bist_row.name == 'tr' else bist_row.find_next('tr').find_all('td')
-                
-                if len(cells) >= 2:
-                    borsa_dict['XU100'] = {
-                        'deger': parse_price(cells[1].text if len(cells) > 1 else cells[0].text),
-                        'degisim_yuzde': parse_price(cells[2].text) if len(cells) > 2 else 0.0,
-                    }
+            if row:
+                cells = row.find_all('td') if row.name == 'tr' else row.find_next('tr').find_all('td')
+                found[code] = [cell.text for cell in cells]
         except:
             pass
-        
-        # Popüler hisseler - basit tablo
-        populer_hisseler = ['THYAO', 'GARAN', 'AKBNK', 'EREGL', 'SAHOL', 'TUPRS']
-        
-        for hisse in populer_hisseler:
-            try:
-                row = soup.find('tr', {'data-code': hisse}) or \
-                      soup.find('a', string=hisse)
-                
-                if row:
-                    cells = row.find_all('td') if row.name == 'tr' else row.find_next('tr').find_all('td')
-                    
-                    if len(cells) >= 2:
-                        borsa_dict[hisse] = {
-                            'deger': parse_price(cells[1].text),
-                            'degisim_yuzde': parse_price(cells[2].text) if len(cells) > 2 else 0.0,
-                        }
-            except:
-                pass
-        
-        return borsa_dict
     
-    except Exception as e:
-        print(f"link14 scraping hatası: {e}")
-        return {}
+    return found
+
+
+def _build_borsa_foreks(found):
+    borsa_dict = {}
+    
+    # BIST 100
+    cells = found.get('XU100')
+    if cells and len(cells) >= 2:
+        borsa_dict['XU100'] = {
+            'deger': parse_price(cells[1] if len(cells) > 1 else cells[0]),
+            'degisim_yuzde': parse_price(cells[2]) if len(cells) > 2 else 0.0,
+        }
+    
+    # Popüler hisseler - basit tablo
+    for hisse in config.BORSA_SEMBOLLERI:
+        cells = found.get(hisse)
+        if cells and len(cells) >= 2:
+            borsa_dict[hisse] = {
+                'deger': parse_price(cells[1]),
+                'degisim_yuzde': parse_price(cells[2]) if len(cells) > 2 else 0.0,
+            }
+    
+    return borsa_dict
 
 
 def get_borsa_bigpara():
@@ -1096,92 +1377,135 @@ def get_borsa_bigpara():
     link15 ad
     """
     try:
-        url = "link15"
-        response = safe_request(url, delay=False)
-        
-        if not response:
-            return {}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        borsa_dict = {}
-        
-        # BIST 100 - basit tablo satırı
-        try:
-            bist_row = soup.find('tr', {'data-code': 'XU100'})
-            
-            if bist_row:
-                cells = bist_row.find_all('td')
-                
-                if len(cells) >= 3:
-                    borsa_dict['XU100'] = {
-                        'deger': parse_price(cells[1].text),
-                        'degisim_yuzde': parse_price(cells[2].text),
-                    }
-        except:
-            pass
-        
-        # Popüler hisseler - aynı basit yapı
-        populer_hisseler = ['THYAO', 'GARAN', 'AKBNK', 'EREGL', 'SAHOL', 'TUPRS', 'PETKM', 'SISE']
-        
-        for hisse in populer_hisseler:
-            try:
-                row = soup.find('tr', {'data-code': hisse})
-                
-                if row:
-                    cells = row.find_all('td')
-                    
-                    if len(cells) >= 3:
-                        borsa_dict[hisse] = {
-                            'deger': parse_price(cells[1].text),
-                            'degisim_yuzde': parse_price(cells[2].text),
-                        }
-            except:
-                pass
-        
-        return borsa_dict
+        return safe_fetch(KAYNAK_URLLERI['borsa_bigpara'], parse_borsa_bigpara, delay=False) or {}
     
     except Exception as e:
         print(f" link15 borsa scraping hatası: {e}")
         return {}
 
 
+def parse_borsa_bigpara(content):
+    """link15 HTML içeriğini ayrıştır"""
+    return _parse_with_fallback('borsa_bigpara', content, _fast_borsa_bigpara, _soup_borsa_bigpara, _build_borsa_bigpara)
+
+
+def _fast_borsa_bigpara(content):
+    return fast_parsers.rows_by_code(content, ['XU100'] + config.BORSA_SEMBOLLERI)
+
+
+def _soup_borsa_bigpara(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    found = {}
+    
+    # BIST 100 ve popüler hisseler - aynı basit tablo satırı
+    for code in ['XU100'] + config.BORSA_SEMBOLLERI:
+        try:
+            row = soup.find('tr', {'data-code': code})
+            if row:
+                found[code] = [cell.text for cell in row.find_all('td')]
+        except:
+            pass
+    
+    return found
+
+
+def _build_borsa_bigpara(found):
+    borsa_dict = {}
+    
+    for code in ['XU100'] + config.BORSA_SEMBOLLERI:
+        cells = found.get(code)
+        if cells and len(cells) >= 3:
+            borsa_dict[code] = {
+                'deger': parse_price(cells[1]),
+                'degisim_yuzde': parse_price(cells[2]),
+            }
+    
+    return borsa_dict
+
+
 def get_borsa_genelpara():
     """
     link16 ad
     """
     try:
-        url = "link16"
-        response = requests.get(url, headers=get_headers(), timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            borsa_dict = {
-                'XU100': {
-                    'deger': parse_price(data.get('XU100', {}).get('d', 0)),
-                    'degisim_yuzde': parse_price(data.get('XU100', {}).get('dd', 0)),
-                }
-            }
-            
-            # Popüler hisseler
-            populer_hisseler = ['THYAO', 'GARAN', 'AKBNK', 'EREGL', 'SAHOL', 'TUPRS', 'PETKM', 'SISE']
-            
-            for hisse in populer_hisseler:
-                if hisse in data:
-                    borsa_dict[hisse] = {
-                        'deger': parse_price(data.get(hisse, {}).get('d', 0)),
-                        'degisim_yuzde': parse_price(data.get(hisse, {}).get('dd', 0)),
-                    }
-            
-            return borsa_dict
-        
-        return {}
+        return http_pool.fetch_parsed(KAYNAK_URLLERI['borsa_genelpara'], parse_borsa_genelpara, headers=get_headers(), timeout=10, as_json=True) or {}
     
     except Exception as e:
         print(f" link16 API hatası: {e}")
         return {}
 
 
+def parse_borsa_genelpara(data):
+    """link16 JSON cevabını ayrıştır"""
+    borsa_dict = {
+        'XU100': {
+            'deger': parse_price(data.get('XU100', {}).get('d', 0)),
+            'degisim_yuzde': parse_price(data.get('XU100', {}).get('dd', 0)),
+        }
+    }
+    
+    # Popüler hisseler
+    populer_hisseler = config.BORSA_SEMBOLLERI
+    
+    for hisse in populer_hisseler:
+        if hisse in data:
+            borsa_dict[hisse] = {
+                'deger': parse_price(data.get(hisse, {}).get('d', 0)),
+                'degisim_yuzde': parse_price(data.get(hisse, {}).get('dd', 0)),
+            }
+    
+    return borsa_dict
+
+
+# ===== KAYNAK ZİNCİRLERİ =====
+# Öncelik sırasına göre (kaynak etiketi, senkron çekici) çiftleri
+# Async motor (async_scrapers.py) aynı sırayı ve etiketleri kullanır
+DOVIZ_KAYNAKLARI = [
+    ('link1', get_doviz_sabah),
+    ('link2', get_doviz_mynet),
+    ('link3', get_doviz_dovizcom_html),
+    ('link4', get_doviz_bigpara),
+    ('link5', get_doviz_exchangerate),
+    ('link6', get_doviz_dovizcom_api),
+    ('link7', get_doviz_tcmb),
+]
+
+ALTIN_KAYNAKLARI = [
+    ('link8', get_altin_mynet),
+    ('link9', get_altin_bigpara),
+    ('link10', get_altin_trt),
+    ('link11', get_altin_genelpara),
+    ('link12', get_altin_collectapi),
+]
+
+BORSA_KAYNAKLARI = [
+    ('link13', get_borsa_yahoo),
+    ('link14', get_borsa_genelpara),
+    ('link15', get_borsa_bigpara),
+    ('link16', get_borsa_foreks),
+]
+
+
+def run_source_chain(kaynaklar):
+    """
+    Kaynakları öncelik sırasıyla dene, ilk dolu sonucu etiketleyip döndür
+    Hiçbiri veri vermezse son kaynağın (boş) sonucu etiketlenerek döner
+    Devresi açık kaynaklar atlanır, sıra kaynak sağlığına göre düzenlenir
+    """
+    kaynaklar = source_health.prepare(kaynaklar)
+    
+    for kaynak, fetcher in kaynaklar[:-1]:
+        data = fetcher()
+        if data and len(data) > 0:
+            data['_kaynak'] = kaynak
+            return data
+    
+    kaynak, fetcher = kaynaklar[-1]
+    data = fetcher()
+    data['_kaynak'] = kaynak
+    return data
+
+
 # Test fonksiyonu
 if __name__ == '__main__':
     print("Döviz verileri test ediliyor...")
@@ -1195,4 +1519,7 @@ if __name__ == '__main__':
     print("\n Borsa verileri test ediliyor...")
     borsa = get_borsa_data()
     print(borsa)
+    
+    print("\n Önbellek istatistikleri:")
+    print(get_cache_stats())
 
@@ -0,0 +1,279 @@
+# FinAlert - Paylaşılan bellek fiyat görüntüsü (memory-mapped)
+# Lider süreç her yenilenen veri setini sabit düzenli bir dosyaya yazar; aynı
+# makinedeki işçi süreçleri dosyayı mmap ile eşler ve fiyatları IPC, JSON
+# ayrıştırma veya veritabanı sorgusu olmadan doğrudan okur.
+# Düzen:
+#   dosya başlığı: sihirli sözcük, sürüm, düzen özeti (crc32), varlık sınıfı sayısı
+#   varlık sınıfı başına: sürüm sayacı (seqlock), yazılma zamanı, eksik bayrağı,
+#                         kaynak etiketi (sabit uzunluk) ve varlık yuvaları
+#   varlık yuvası: alis, satis, deger, degisim, degisim_yuzde, zaman (double;
+#                  NaN = alan yok)
+# Seqlock: yazar sayacı tek sayıya çeker, yuvaları yazar, çift sayıya çeker.
+# Okuyucu sayacı önce ve sonra okur; tek veya farklıysa (yazım sürüyor) tekrar dener.
+# Düzende olmayan bir varlık gelirse sınıf "eksik" işaretlenir; okuyucular o
+# sınıf için paylaşılan depoya (quote_snapshots) döner.
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from scrapers import get_borsa_semboller
+import config
+
+MAGIC = b'FINQ'
+VERSION = 1
+
+# Varlık sınıfı -> sabit varlık sırası (yuva indeksleri)
+DOVIZ_KODLARI = ('USD', 'EUR', 'GBP')
+ALTIN_TURLERI = ('gram', 'ceyrek', 'yarim', 'tam', 'cumhuriyet', 'ons')
+
+FIELDS = ('alis', 'satis', 'deger', 'degisim', 'degisim_yuzde')
+SLOT_WIDTH = len(FIELDS) + 1   # + zaman damgası
+
+FILE_HEADER = struct.Struct('<4sIII')    # sihirli sözcük, sürüm, düzen özeti, sınıf sayısı
+FILE_HEADER_SIZE = 64
+SEQ = struct.Struct('<Q')
+KAYNAK_SIZE = 48
+CLASS_HEADER = struct.Struct(f'<QdII{KAYNAK_SIZE}s')  # sayaç, yazılma zamanı, eksik, ayrılmış, kaynak
+SLOT = struct.Struct(f'<{SLOT_WIDTH}d')
+READ_RETRIES = 100
+
+NAN = float('nan')
+
+
+def default_layout():
+    """Varlık sınıfı -> varlık adları (tüm süreçlerde aynı yapılandırmadan üretilir)"""
+    return {
+        'doviz': DOVIZ_KODLARI,
+        'altin': ALTIN_TURLERI,
+        'borsa': tuple(get_borsa_semboller())
+    }
+
+
+class SharedQuoteMap:
+    """
+    Sabit düzenli, mmap ile paylaşılan son fiyatlar
+    
+    Tek yazar (lider) ve çok okuyucu (işçiler) için tasarlanmıştır:
+        lider:  quote_map.open(writer=True); quote_map.write('doviz', data)
+        işçi:   quote_map.read('doviz')  /  quote_map.get('doviz', 'USD')
+    """
+    
+    def __init__(self, path=None, layout=None):
+        self.path = path or config.SHARED_QUOTES_FILE
+        self._layout = layout
+        self._writer = False
+        self._mm = None
+        self._file = None
+        self._digest = None
+        self._regions = {}   # sınıf -> (başlangıç, yuva düzeni (Struct), varlık adları, ad -> yuva)
+        self._write_lock = threading.Lock()
+        self.stats = {'writes': 0, 'reads': 0, 'retries': 0, 'fallbacks': 0}
+    
+    @property
+    def is_open(self):
+        return self._mm is not None
+    
+    def _build(self):
+        layout = self._layout or default_layout()
+        digest = zlib.crc32(repr(sorted(layout.items())).encode('utf-8'))
+        
+        regions = {}
+        offset = FILE_HEADER_SIZE
+        for asset_class, names in layout.items():
+            slots = struct.Struct(f'<{len(names) * SLOT_WIDTH}d')
+            index = {name: i for i, name in enumerate(names)}
+            regions[asset_class] = (offset, slots, tuple(names), index)
+            offset += CLASS_HEADER.size + slots.size
+        
+        return regions, digest, offset
+    
+    def open(self, writer=False):
+        """
+        Dosyayı eşle - yazar dosyayı oluşturur / düzeni yazar, okuyucu yalnızca okur
+        
+        Returns:
+            bool: Eşlendiyse True (okuyucuda dosya yoksa veya düzen farklıysa False)
+        """
+        self.close()
+        regions, digest, size = self._build()
+        
+        try:
+            if writer:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                # Dosya hiç küçültülmez: eşlemesi açık okuyucular dosya dışına erişmesin
+                if os.fstat(fd).st_size < size:
+                    os.ftruncate(fd, size)
+                mm = mmap.mmap(fd, size)
+            else:
+                fd = os.open(self.path, os.O_RDONLY)
+                if os.fstat(fd).st_size < size:
+                    os.close(fd)
+                    return False
+                mm = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+        except OSError:
+            return False
+        
+        header = FILE_HEADER.unpack_from(mm, 0)
+        if writer and header != (MAGIC, VERSION, digest, len(regions)):
+            # Yeni dosya veya farklı düzen: bölgeleri sıfırla, başlığı en son yaz
+            mm[FILE_HEADER_SIZE:size] = bytes(size - FILE_HEADER_SIZE)
+            FILE_HEADER.pack_into(mm, 0, MAGIC, VERSION, digest, len(regions))
+        elif not writer and header != (MAGIC, VERSION, digest, len(regions)):
+            mm.close()
+            os.close(fd)
+            return False
+        
+        self._mm = mm
+        self._file = fd
+        self._writer = writer
+        self._regions = regions
+        self._digest = digest
+        return True
+    
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            os.close(self._file)
+        self._mm = None
+        self._file = None
+    
+    def write(self, asset_class, data):
+        """Lider: veri setini ilgili sınıfın yuvalarına yaz (seqlock ile)"""
+        if not self._writer or asset_class not in self._regions:
+            return False
+        
+        offset, slots, names, index = self._regions[asset_class]
+        now = time.time()
+        
+        values = [NAN] * (len(names) * SLOT_WIDTH)
+        partial = 0
+        for asset_name, quote in data.items():
+            if str(asset_name).startswith('_') or not isinstance(quote, dict):
+                continue
+            
+            slot = index.get(asset_name)
+            if slot is None:
+                partial = 1   # Düzende yeri yok - okuyucular paylaşılan depoya döner
+                continue
+            
+            base = slot * SLOT_WIDTH
+            for i, field in enumerate(FIELDS):
+                value = quote.get(field)
+                if value is not None:
+                    values[base + i] = float(value)
+            values[base + len(FIELDS)] = now
+        
+        kaynak = str(data.get('_kaynak', '')).encode('utf-8')[:KAYNAK_SIZE]
+        
+        with self._write_lock:
+            seq = SEQ.unpack_from(self._mm, offset)[0]
+            seq += 1 if seq % 2 == 0 else 2   # Yarıda kalmış yazımdan sonra da tek sayıya geç
+            SEQ.pack_into(self._mm, offset, seq)
+            slots.pack_into(self._mm, offset + CLASS_HEADER.size, *values)
+            CLASS_HEADER.pack_into(self._mm, offset, seq, now, partial, 0, kaynak)
+            SEQ.pack_into(self._mm, offset, seq + 1)
+        
+        self.stats['writes'] += 1
+        return True
+    
+    def _check(self):
+        # Okuyucu: dosya yoksa / düzen değiştiyse yeniden eşlemeyi dene
+        if self._mm is not None and not self._writer:
+            if FILE_HEADER.unpack_from(self._mm, 0)[2] != self._digest:
+                self.close()
+        
+        if self._mm is None and not self.open():
+            return False
+        return True
+    
+    def _read_consistent(self, offset, reader):
+        # Seqlock okuması: sayaç tek ise veya okuma sırasında değiştiyse tekrar dene
+        for _ in range(READ_RETRIES):
+            before = SEQ.unpack_from(self._mm, offset)[0]
+            if before % 2 == 0:
+                result = reader()
+                if SEQ.unpack_from(self._mm, offset)[0] == before:
+                    return before, result
+            self.stats['retries'] += 1
+            time.sleep(0)
+        return None, None
+    
+    def read(self, asset_class, max_age=None):
+        """
+        Sınıfın son veri setini scrapers.py ile aynı biçimde oku
+        
+        Returns:
+            dict: Veri seti ('_kaynak' dahil); veri max_age saniyeden eskiyse boş sözlük
+            None: Eşleme yok, sınıf hiç yazılmadı, eksik veya okunamadı - paylaşılan depo kullanılmalı
+        """
+        if not self._check() or asset_class not in self._regions:
+            self.stats['fallbacks'] += 1
+            return None
+        
+        offset, slots, names, _ = self._regions[asset_class]
+        seq, result = self._read_consistent(offset, lambda: (
+            CLASS_HEADER.unpack_from(self._mm, offset),
+            slots.unpack_from(self._mm, offset + CLASS_HEADER.size)
+        ))
+        
+        if not seq or result[0][2]:
+            self.stats['fallbacks'] += 1
+            return None
+        
+        self.stats['reads'] += 1
+        (_, fetched_at, _, _, kaynak), values = result
+        
+        max_age = config.CLUSTER_MAX_AGE if max_age is None else max_age
+        if time.time() - fetched_at > max_age:
+            return {}
+        
+        data = {}
+        for slot, asset_name in enumerate(names):
+            quote = _unpack_quote(values, slot * SLOT_WIDTH)
+            if quote:
+                data[asset_name] = quote
+        data['_kaynak'] = kaynak.rstrip(b'\0').decode('utf-8', errors='ignore')
+        return data
+    
+    def get(self, asset_class, asset_name, max_age=None):
+        """
+        Tek varlığın yuvasını oku (tüm veri setini kurmadan)
+        
+        Returns:
+            dict: {'alis': ..., 'satis': ...} gibi alanlar; yoksa / okunamazsa None
+        """
+        if not self._check() or asset_class not in self._regions:
+            return None
+        
+        offset, slots, _, index = self._regions[asset_class]
+        slot = index.get(asset_name)
+        if slot is None:
+            return None
+        
+        position = offset + CLASS_HEADER.size + slot * SLOT.size
+        seq, values = self._read_consistent(offset, lambda: SLOT.unpack_from(self._mm, position))
+        if not seq:
+            return None
+        
+        self.stats['reads'] += 1
+        max_age = config.CLUSTER_MAX_AGE if max_age is None else max_age
+        if math.isnan(values[-1]) or time.time() - values[-1] > max_age:
+            return None
+        return _unpack_quote(values, 0)
+    
+    def get_stats(self):
+        return dict(self.stats, open=self.is_open, writer=self._writer)
+
+
+def _unpack_quote(values, base):
+    if math.isnan(values[base + len(FIELDS)]):
+        return None
+    
+    return {
+        field: values[base + i]
+        for i, field in enumerate(FIELDS)
+        if not math.isnan(values[base + i])
+    }
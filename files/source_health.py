@@ -0,0 +1,265 @@
+# FinAlert - Kaynak sağlığı ve devre kesiciler (circuit breaker)
+# Her kaynak (link1, link2, ...) için son çağrılardaki başarı oranı, gecikme
+# (p50/p95), son hata ve art arda hata sayısı tutulur.
+# - closed:    Kaynak normal kullanılır
+# - open:      Art arda SOURCE_FAILURE_THRESHOLD hata - SOURCE_OPEN_SECONDS boyunca atlanır
+# - half_open: Bekleme bitti - tek bir deneme (probe) yapılır; başarılıysa closed,
+#              başarısızsa tekrar open
+# Zincir sırası, sağlıklı kaynaklar arasında beklenen gecikmeye göre yeniden dizilir.
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+import config
+import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+class SourceHealth:
+    """Tek bir kaynağın sağlık kaydı"""
+    
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)   # (başarılı mı, gecikme sn)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.last_error = None
+        self.last_error_at = None
+        self.last_success_at = None
+    
+    def success_rate(self):
+        if not self.samples:
+            return None
+        return sum(1 for ok, _ in self.samples if ok) / len(self.samples)
+    
+    def latencies(self):
+        return [latency for ok, latency in self.samples if ok]
+    
+    def expected_latency(self):
+        """
+        Veri almak için beklenen süre: başarılı çağrıların p50 gecikmesi / başarı oranı
+        Hiç başarılı çağrı yoksa None
+        """
+        p50 = _percentile(self.latencies(), 50)
+        if p50 is None:
+            return None
+        return p50 / max(self.success_rate(), 0.05)
+
+
+class SourceHealthTracker:
+    """
+    Kaynak sağlığı kayıtları ve zincir düzenleme
+    
+    Kullanım:
+        kaynaklar = source_health.prepare(DOVIZ_KAYNAKLARI)
+        # Açık devreli kaynaklar çıkarılmış, sıralanmış ve ölçülen fetcher'lar
+    """
+    
+    def __init__(self, window=None, failure_threshold=None, open_seconds=None):
+        self.window = window or config.SOURCE_HEALTH_WINDOW
+        self.failure_threshold = failure_threshold or config.SOURCE_FAILURE_THRESHOLD
+        self.open_seconds = open_seconds or config.SOURCE_OPEN_SECONDS
+        self._lock = threading.Lock()
+        self._sources = {}
+    
+    def _get(self, kaynak):
+        # Kilit altında çağrılmalı
+        if kaynak not in self._sources:
+            self._sources[kaynak] = SourceHealth(self.window)
+        return self._sources[kaynak]
+    
+    def _available(self, health, now):
+        # Kilit altında çağrılmalı - kaynak bu çağrıda denenebilir mi?
+        if health.state == OPEN and now - health.opened_at >= self.open_seconds:
+            health.state = HALF_OPEN
+            health.probing = False
+        
+        if health.state == CLOSED:
+            return True
+        if health.state == HALF_OPEN and not health.probing:
+            return True
+        return False
+    
+    def record(self, kaynak, ok, latency, error=None):
+        """Bir kaynak çağrısının sonucunu kaydet"""
+        now = time.time()
+        metrics.SCRAPE_SECONDS.observe(latency, kaynak=kaynak, sonuc='ok' if ok else ('hata' if error else 'bos'))
+        
+        with self._lock:
+            health = self._get(kaynak)
+            health.samples.append((ok, latency))
+            health.probing = False
+            
+            if ok:
+                health.consecutive_failures = 0
+                health.last_success_at = now
+                health.state = CLOSED
+                return
+            
+            health.consecutive_failures += 1
+            health.last_error = error or 'Boş sonuç'
+            health.last_error_at = now
+            
+            if health.state == HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+                health.state = OPEN
+                health.opened_at = time.monotonic()
+    
+    def reset(self):
+        """Tüm kaynak kayıtlarını sil (ölçümler her turda aynı zincir sırasıyla başlar)"""
+        with self._lock:
+            self._sources.clear()
+    
+    def release(self, kaynak):
+        """Sonuçsuz biten (iptal edilen) denemeyi kayda almadan serbest bırak"""
+        with self._lock:
+            self._get(kaynak).probing = False
+    
+    def begin(self, kaynak):
+        """
+        Çağrı başlarken: yarı açık kaynağın tek deneme hakkını al
+        
+        Returns:
+            bool: Çağrı yapılabilirse True; başka bir deneme sürüyorsa False
+        """
+        with self._lock:
+            health = self._get(kaynak)
+            if health.state != HALF_OPEN:
+                return True
+            if health.probing:
+                return False
+            health.probing = True
+            return True
+    
+    def arrange(self, kaynaklar):
+        """
+        Zinciri düzenle
+        - Açık devreli kaynaklar atlanır (hepsi açıksa sıra değişmeden denenir)
+        - Yarı açık kaynak, deneme (probe) için en başa alınır; deneme hakkı
+          çağrı gerçekten başladığında alınır (begin), çağrılmayan kaynak kilitlenmez
+        - Diğerleri beklenen gecikmeye göre sıralanır; ölçümü olmayan kaynaklar
+          ve eşit gecikme dilimindekiler özgün öncelik sırasını korur
+        """
+        now = time.monotonic()
+        bucket = config.SOURCE_LATENCY_BUCKET
+        
+        with self._lock:
+            available = []
+            for index, (kaynak, fetcher) in enumerate(kaynaklar):
+                health = self._get(kaynak)
+                if not self._available(health, now):
+                    continue
+                
+                if health.state == HALF_OPEN:
+                    key = (0, 0, index)
+                elif config.SOURCE_ADAPTIVE_ORDER and health.expected_latency() is not None:
+                    key = (1, int(health.expected_latency() / bucket), index)
+                else:
+                    key = (2, 0, index)
+                
+                available.append((key, (kaynak, fetcher)))
+        
+        if not available:
+            return list(kaynaklar)
+        
+        return [item for _, item in sorted(available, key=lambda pair: pair[0])]
+    
+    def track(self, kaynak, fetcher):
+        """Fetcher'ı süre ve sonuç ölçen sarmalayıcıyla döndür (senkron veya async)"""
+        if asyncio.iscoroutinefunction(fetcher):
+            @functools.wraps(fetcher)
+            async def tracked_async():
+                if not self.begin(kaynak):
+                    return {}
+                
+                start = time.perf_counter()
+                try:
+                    data = await fetcher()
+                except asyncio.CancelledError:
+                    self.release(kaynak)
+                    raise
+                except Exception as e:
+                    self.record(kaynak, False, time.perf_counter() - start, str(e))
+                    raise
+                self.record(kaynak, bool(data), time.perf_counter() - start)
+                return data
+            
+            return tracked_async
+        
+        @functools.wraps(fetcher)
+        def tracked():
+            if not self.begin(kaynak):
+                return {}
+            
+            start = time.perf_counter()
+            try:
+                data = fetcher()
+            except Exception as e:
+                self.record(kaynak, False, time.perf_counter() - start, str(e))
+                raise
+            self.record(kaynak, bool(data), time.perf_counter() - start)
+            return data
+        
+        return tracked
+    
+    def prepare(self, kaynaklar):
+        """Zinciri düzenle ve her kaynağı ölçülen fetcher ile sar"""
+        return [(kaynak, self.track(kaynak, fetcher)) for kaynak, fetcher in self.arrange(kaynaklar)]
+    
+    def get_stats(self):
+        """
+        Kaynak sağlığı özeti
+        
+        Returns:
+            dict: kaynak -> {state, success_rate, p50, p95, samples,
+                  consecutive_failures, last_error, last_error_at, last_success_at}
+        """
+        with self._lock:
+            stats = {}
+            
+            for kaynak, health in self._sources.items():
+                latencies = health.latencies()
+                stats[kaynak] = {
+                    'state': health.state,
+                    'success_rate': health.success_rate(),
+                    'p50': _percentile(latencies, 50),
+                    'p95': _percentile(latencies, 95),
+                    'samples': len(health.samples),
+                    'consecutive_failures': health.consecutive_failures,
+                    'last_error': health.last_error,
+                    'last_error_at': health.last_error_at,
+                    'last_success_at': health.last_success_at
+                }
+            
+            return stats
+
+
+source_health = SourceHealthTracker()
+
+
+def get_source_health():
+    """Kaynak sağlığı özetini döndür"""
+    return source_health.get_stats()
+
+
+@metrics.register_collector
+def _collect_metrics():
+    for kaynak, stats in source_health.get_stats().items():
+        for state in (CLOSED, OPEN, HALF_OPEN):
+            yield ('finalert_source_state', 'gauge', 'Kaynak devre durumu (1 = geçerli durum)',
+                   {'kaynak': kaynak, 'state': state}, int(stats['state'] == state))
+        yield ('finalert_source_success_ratio', 'gauge', 'Kaynağın son çağrılardaki başarı oranı',
+               {'kaynak': kaynak}, stats['success_rate'])
+        yield ('finalert_source_consecutive_failures', 'gauge', 'Kaynağın art arda hata sayısı',
+               {'kaynak': kaynak}, stats['consecutive_failures'])
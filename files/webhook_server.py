@@ -0,0 +1,250 @@
+# FinAlert - Webhook sunucusu (run_polling yerine)
+# Telegram güncellemeleri gömülü aiohttp sunucusuna POST edilir:
+# - X-Telegram-Bot-Api-Secret-Token başlığı doğrulanır (yanlışsa 403)
+# - Güncelleme sohbet id'sine göre bir işçi kuyruğuna konur ve hemen 200 dönülür;
+#   aynı sohbetin güncellemeleri hep aynı işçide, geliş sırasıyla işlenir
+# - Kuyruk doluysa 503 dönülür, Telegram güncellemeyi daha sonra tekrar gönderir
+# Yönlendirici modunda (WEBHOOK_ROUTES) güncellemeler işlenmez; kullanıcının
+# telegram_id'sine göre işçi süreçlerinden birine aynı gizli anahtarla aktarılır
+# ve işçinin cevabı Telegram'a iletilir (işçi ulaşılamazsa 503).
+import asyncio
+import hmac
+import json
+import logging
+import secrets
+import signal
+import time
+import aiohttp
+from aiohttp import web
+from telegram import Update
+from cluster import shard_of
+import config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class WebhookServer:
+    """
+    Güncellemeleri alan HTTP sunucusu ve işçi havuzu
+    
+    Kullanım (çalışan loop içinde, application.start() sonrası):
+        server = WebhookServer(application)
+        await server.start()
+        ...
+        await server.stop()
+    """
+    
+    def __init__(self, application, host=None, port=None, path=None, secret_token=None, workers=None, queue_size=None,
+                 routes=None):
+        self.application = application
+        self.host = host or config.WEBHOOK_HOST
+        self.port = config.WEBHOOK_PORT if port is None else port
+        self.path = path or config.WEBHOOK_PATH
+        self.secret_token = secret_token or config.WEBHOOK_SECRET or secrets.token_urlsafe(32)
+        self.workers = max(1, workers or config.WEBHOOK_WORKERS)
+        self.queue_size = queue_size or config.WEBHOOK_QUEUE_SIZE
+        self.routes = list(config.WEBHOOK_ROUTES if routes is None else routes)
+        self.stats = {
+            'received': 0, 'processed': 0, 'rejected': 0, 'unauthorized': 0, 'invalid': 0, 'errors': 0,
+            'forwarded': 0, 'forward_failed': 0
+        }
+        self._queues = []
+        self._tasks = []
+        self._runner = None
+        self._session = None
+    
+    @property
+    def address(self):
+        """Sunucunun dinlediği adres (port 0 verildiyse atanan port ile)"""
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}{self.path}"
+    
+    async def start(self):
+        """İşçileri ve HTTP sunucusunu başlat"""
+        if self.routes:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=config.REQUEST_TIMEOUT))
+        else:
+            self._queues = [asyncio.Queue(self.queue_size) for _ in range(self.workers)]
+            self._tasks = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+        
+        app = web.Application()
+        app.router.add_post(self.path, self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        
+        if self.routes:
+            logger.info(f"✅ Webhook yönlendiricisi: {self.address} -> {len(self.routes)} işçi süreci")
+        else:
+            logger.info(f"✅ Webhook sunucusu: {self.address} ({self.workers} işçi)")
+    
+    async def stop(self, timeout=10):
+        """Yeni güncelleme almayı bırak, kuyruktakileri işle ve işçileri durdur"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Webhook kuyruğunda işlenmemiş güncelleme kaldı: {self.pending()}")
+        
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    def pending(self):
+        """Kuyruklarda bekleyen güncelleme sayısı"""
+        return sum(queue.qsize() for queue in self._queues)
+    
+    @staticmethod
+    def _shard_key(update):
+        # Kullanıcının güncellemeleri hep aynı işçiye - konuşma adımları sırayla işlenir
+        user = update.effective_user
+        chat = update.effective_chat
+        return user.id if user else (chat.id if chat else update.update_id)
+    
+    def _shard(self, update):
+        return self._queues[shard_of(self._shard_key(update), len(self._queues))]
+    
+    async def _handle(self, request):
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ''), self.secret_token):
+            self.stats['unauthorized'] += 1
+            metrics.WEBHOOK_UPDATES.inc(sonuc='yetkisiz')
+            return web.Response(status=403)
+        
+        body = await request.read()
+        try:
+            update = Update.de_json(json.loads(body), self.application.bot)
+        except Exception as e:
+            update = None
+            logger.error(f"❌ Geçersiz webhook gövdesi: {e}")
+        
+        if update is None:
+            self.stats['invalid'] += 1
+            metrics.WEBHOOK_UPDATES.inc(sonuc='gecersiz')
+            return web.Response(status=400)
+        
+        if self.routes:
+            return await self._forward(update, body)
+        
+        try:
+            self._shard(update).put_nowait((update, time.perf_counter()))
+        except asyncio.QueueFull:
+            # Telegram 2xx dışı cevapta güncellemeyi tekrar gönderir
+            self.stats['rejected'] += 1
+            metrics.WEBHOOK_UPDATES.inc(sonuc='dolu')
+            return web.Response(status=503)
+        
+        self.stats['received'] += 1
+        metrics.WEBHOOK_UPDATES.inc(sonuc='kabul')
+        return web.Response()
+    
+    async def _forward(self, update, body):
+        route = self.routes[shard_of(self._shard_key(update), len(self.routes))]
+        
+        try:
+            async with self._session.post(
+                route,
+                data=body,
+                headers={SECRET_HEADER: self.secret_token, 'Content-Type': 'application/json'}
+            ) as response:
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"❌ Güncelleme işçiye aktarılamadı ({route}): {e}")
+            status = 503
+        
+        if status == 200:
+            self.stats['forwarded'] += 1
+            metrics.WEBHOOK_UPDATES.inc(sonuc='aktarildi')
+            return web.Response()
+        
+        # İşçi meşgul / kapalı - Telegram güncellemeyi daha sonra tekrar gönderir
+        self.stats['forward_failed'] += 1
+        metrics.WEBHOOK_UPDATES.inc(sonuc='aktarilamadi')
+        return web.Response(status=503)
+    
+    async def _worker(self, queue):
+        while True:
+            update, enqueued_at = await queue.get()
+            metrics.WEBHOOK_QUEUE_SECONDS.observe(time.perf_counter() - enqueued_at)
+            
+            try:
+                await self.application.process_update(update)
+                self.stats['processed'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Güncelleme işlenemedi ({update.update_id}): {e}")
+            finally:
+                queue.task_done()
+    
+    def get_stats(self):
+        """Sayaçlar ve kuyrukta bekleyen güncelleme sayısı"""
+        return dict(self.stats, pending=self.pending())
+
+
+async def serve(application, stop_event=None):
+    """
+    Uygulamayı webhook sunucusuyla çalıştır (stop_event set edilene veya
+    SIGINT/SIGTERM gelene kadar)
+    """
+    stop_event = stop_event or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass   # Windows - Ctrl+C KeyboardInterrupt ile durdurur
+    
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+    
+    server = WebhookServer(application)
+    await server.start()
+    
+    if config.WEBHOOK_URL:
+        await application.bot.set_webhook(
+            url=config.WEBHOOK_URL,
+            secret_token=server.secret_token,
+            allowed_updates=Update.ALL_TYPES,
+            max_connections=config.WEBHOOK_MAX_CONNECTIONS
+        )
+        logger.info(f"✅ Telegram webhook adresi: {config.WEBHOOK_URL}")
+    elif not config.WEBHOOK_SECRET:
+        logger.warning("⚠️ WEBHOOK_URL ve WEBHOOK_SECRET boş - gizli anahtar bu başlatmaya özel üretildi")
+    
+    try:
+        await stop_event.wait()
+    finally:
+        # Kapanış sırası run_polling() ile aynı
+        await server.stop()
+        await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def run_webhook(application):
+    """
+    run_polling() yerine webhook ile çalıştır
+    Zamanlayıcılar varsayılan loop'a bağlandığı için run_polling() gibi aynı loop kullanılır
+    """
+    loop = asyncio.get_event_loop()
+    
+    try:
+        loop.run_until_complete(serve(application))
+    except KeyboardInterrupt:
+        pass